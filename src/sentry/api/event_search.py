@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import re
-from collections import namedtuple
+import threading
+from collections import OrderedDict, namedtuple
 from collections.abc import Mapping, Sequence
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
@@ -37,6 +38,7 @@ from sentry.search.utils import (
     parse_size,
 )
 from sentry.snuba.dataset import Dataset
+from sentry.utils import metrics
 from sentry.utils.snuba import is_duration_measurement, is_measurement, is_span_op_breakdown
 from sentry.utils.validators import is_event_id, is_span_id
 
@@ -45,6 +47,15 @@ from sentry.utils.validators import is_event_id, is_span_id
 # before the asterisk is actually escaping the asterisk.
 WILDCARD_CHARS = re.compile(r"(?<!\\)(\\\\)*\*")
 
+# A filter of the form `key:value` or `!key:value`, with a value that can't be
+# mistaken for any of the typed values of the grammar (numbers, dates,
+# durations, sizes, lists, quoted strings, ...). This is the shape of the vast
+# majority of queries, which can therefore be parsed without the grammar.
+SIMPLE_FILTER_RE = re.compile(
+    r"(!?)([a-zA-Z0-9_.-]+):" r'([^\s()"\[\]\\<>=!+\-0-9][^\s()"\[\]\\]*)'
+)
+SIMPLE_KEY_RE = re.compile(r"[a-zA-Z0-9_.-]+")
+
 event_search_grammar = Grammar(
     r"""
 search = spaces term*
@@ -973,12 +984,17 @@ class SearchVisitor(NodeVisitor):
                 'Invalid format for "has" search: was expecting a field or tag instead'
             )
 
-        operator = "=" if is_negated(negation) else "!="
+        return self._handle_has_filter(is_negated(negation), search_key)
+
+    def _handle_has_filter(self, negated, search_key):
+        operator = "=" if negated else "!="
         return SearchFilter(search_key, operator, SearchValue(""))
 
     def visit_is_filter(self, node, children):
         negation, _, _, _, search_value = children
+        return self._handle_is_filter(is_negated(negation), search_value)
 
+    def _handle_is_filter(self, negated, search_value):
         translators = self.config.is_filter_translation
 
         if not translators:
@@ -995,7 +1011,7 @@ class SearchVisitor(NodeVisitor):
 
         search_key, search_value = translators[search_value.raw_value]
 
-        operator = "!=" if is_negated(negation) else "="
+        operator = "!=" if negated else "="
         search_key = SearchKey(search_key)
         search_value = SearchValue(search_value)
 
@@ -1029,6 +1045,23 @@ class SearchVisitor(NodeVisitor):
 
         return self._handle_text_filter(search_key, operator, search_value)
 
+    def handle_simple_filter(self, negation: str, key: str, value: str):
+        """
+        Equivalent to visiting the parse tree of a filter matched by
+        `SIMPLE_FILTER_RE`, which the grammar parses as a `has_filter`,
+        `is_filter` or `text_filter`.
+        """
+        negated = negation == "!"
+        search_key = self._handle_search_key(key)
+
+        if key == "has":
+            return self._handle_has_filter(negated, self._handle_search_key(value))
+        if key == "is":
+            return self._handle_is_filter(negated, SearchValue(value))
+
+        operator = OPERATOR_NEGATION_MAP["="] if negated else "="
+        return self._handle_text_filter(search_key, operator, SearchValue(value))
+
     def _handle_text_filter(self, search_key, operator, search_value):
         if operator not in ("=", "!=") and search_key.name not in self.config.text_operator_keys:
             # If operators aren't allowed for this key then push it back into the value
@@ -1083,7 +1116,9 @@ class SearchVisitor(NodeVisitor):
         return f'"{value}"'
 
     def visit_search_key(self, node, children):
-        key = children[0]
+        return self._handle_search_key(children[0])
+
+    def _handle_search_key(self, key):
         if (
             self.config.allowed_keys
             and key not in self.config.allowed_keys
@@ -1240,6 +1275,92 @@ QueryOp = Literal["AND", "OR"]
 QueryToken = Union[SearchFilter, QueryOp, ParenExpression]
 
 
+class ParseCache:
+    """
+    Process-local LRU of parsed queries, for the queries that are parsed with
+    the default builder and without params. The results of these only depend
+    on the query and the config, unless they contain relative dates, which
+    are not cached.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[
+            tuple[str, int], tuple[SearchConfig, list[QueryToken]]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, query: str, config: SearchConfig) -> list[QueryToken] | None:
+        with self._lock:
+            entry = self._entries.get((query, id(config)))
+            # The entry keeps the config alive, so its id can't be reused
+            if entry is None or entry[0] is not config:
+                return None
+            self._entries.move_to_end((query, id(config)))
+            return _copy_tokens(entry[1])
+
+    def set(self, query: str, config: SearchConfig, tokens: list[QueryToken]) -> None:
+        with self._lock:
+            self._entries[(query, id(config))] = (config, _copy_tokens(tokens))
+            self._entries.move_to_end((query, id(config)))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _copy_tokens(tokens):
+    # The filters are immutable, but callers are free to modify the lists
+    return [
+        (
+            ParenExpression(_copy_tokens(token.children))
+            if isinstance(token, ParenExpression)
+            else token
+        )
+        for token in tokens
+    ]
+
+
+parse_cache = ParseCache(max_entries=1000)
+
+
+def parse_simple_search_query(query: str, visitor: SearchVisitor) -> list[QueryToken] | None:
+    """
+    Parses queries that only consist of filters matching `SIMPLE_FILTER_RE`
+    without the grammar, with the same result. Returns `None` for any other
+    query.
+    """
+    matches = []
+    for term in query.split(" "):
+        if not term:
+            continue
+        match = SIMPLE_FILTER_RE.fullmatch(term)
+        if match is None:
+            return None
+        negation, key, value = match.groups()
+        # `true` and `false` are boolean values, and the value of `has:` is a key
+        if value.lower() in ("true", "false"):
+            return None
+        if key == "has" and not SIMPLE_KEY_RE.fullmatch(value):
+            return None
+        matches.append((negation, key, value))
+
+    if not matches:
+        return None
+    return [visitor.handle_simple_filter(*match) for match in matches]
+
+
+def _depends_on_current_time(node: Node) -> bool:
+    if node.expr_name == "rel_date_format":
+        return True
+    return any(_depends_on_current_time(child) for child in node.children)
+
+
 def parse_search_query(
     query, config=None, params=None, builder=None, config_overrides=None
 ) -> list[
@@ -1248,6 +1369,24 @@ def parse_search_query(
     if config is None:
         config = default_config
 
+    cacheable = builder is None and not params and not config_overrides
+    if cacheable:
+        cached = parse_cache.get(query, config)
+        if cached is not None:
+            metrics.incr("event_search.parse", tags={"parser": "cache"})
+            return cached
+
+    if config_overrides:
+        config = SearchConfig.create_from(config, **config_overrides)
+    visitor = SearchVisitor(config, params=params, builder=builder)
+
+    tokens = parse_simple_search_query(query, visitor)
+    if tokens is not None:
+        metrics.incr("event_search.parse", tags={"parser": "simple"})
+        if cacheable:
+            parse_cache.set(query, config, tokens)
+        return tokens
+
     try:
         tree = event_search_grammar.parse(query)
     except IncompleteParseError as e:
@@ -1261,7 +1400,8 @@ def parse_search_query(
             )
         )
 
-    if config_overrides:
-        config = SearchConfig.create_from(config, **config_overrides)
-
-    return SearchVisitor(config, params=params, builder=builder).visit(tree)
+    metrics.incr("event_search.parse", tags={"parser": "grammar"})
+    tokens = visitor.visit(tree)
+    if cacheable and isinstance(tokens, list) and not _depends_on_current_time(tree):
+        parse_cache.set(query, config, tokens)
+    return tokens
@@ -1,4 +1,9 @@
+from __future__ import annotations
+
+import io
 import zlib
+from collections.abc import Iterator
+from typing import IO
 
 import sentry_sdk
 import zstandard
@@ -67,6 +72,28 @@ class CachedAttachment:
         assert self._data is not UNINITIALIZED_DATA
         return self._data
 
+    def stream_data(self) -> Iterator[bytes]:
+        """
+        Yields the data of the attachment in chunks, without loading more than one
+        chunk from the cache at a time.
+
+        Raises `MissingAttachmentChunks` while iterating if a chunk has expired.
+        """
+        if self._data is UNINITIALIZED_DATA and self._cache is not None:
+            yield from self._cache.stream_data(self)
+            return
+
+        assert self._data is not UNINITIALIZED_DATA
+        if self._data:
+            yield self._data
+
+    def open(self) -> IO[bytes]:
+        """
+        Returns a file-like reader over the data of the attachment, which streams it
+        from the cache like `stream_data`.
+        """
+        return io.BufferedReader(ChunkedReader(self.stream_data()))
+
     def delete(self):
         for key in self.chunk_keys:
             self._cache.inner.delete(key)
@@ -162,19 +189,34 @@ class BaseAttachmentCache:
             yield CachedAttachment(cache=self, **attachment)
 
     def get_data(self, attachment) -> bytes:
-        data = bytearray()
+        data = b"".join(self._iter_chunks(attachment))
+        metrics.distribution(
+            "attachments.peak-buffer-size",
+            len(data),
+            tags={"type": attachment.type, "mode": "full"},
+            unit="byte",
+        )
+        return data
+
+    def stream_data(self, attachment) -> Iterator[bytes]:
+        peak_buffer_size = 0
+        for chunk in self._iter_chunks(attachment):
+            peak_buffer_size = max(peak_buffer_size, len(chunk))
+            yield chunk
 
+        metrics.distribution(
+            "attachments.peak-buffer-size",
+            peak_buffer_size,
+            tags={"type": attachment.type, "mode": "stream"},
+            unit="byte",
+        )
+
+    def _iter_chunks(self, attachment) -> Iterator[bytes]:
         for key in attachment.chunk_keys:
             raw_data = self.inner.get(key, raw=True)
             if raw_data is None:
                 raise MissingAttachmentChunks()
-            if raw_data.startswith(b"\x28\xb5\x2f\xfd"):
-                decompressed = zstandard.decompress(raw_data)
-            else:
-                decompressed = zlib.decompress(raw_data)
-            data.extend(decompressed)
-
-        return bytes(data)
+            yield decompress_chunk(raw_data)
 
     @sentry_sdk.tracing.trace
     def delete(self, key):
@@ -184,5 +226,36 @@ class BaseAttachmentCache:
         self.inner.delete(ATTACHMENT_META_KEY.format(key=key))
 
 
+class ChunkedReader(io.RawIOBase):
+    """
+    A raw binary stream reading from an iterator of chunks.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._chunk = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._chunk:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._chunk = memoryview(chunk)
+
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+
 def compress_chunk(chunk_data: bytes) -> bytes:
     return zstandard.compress(chunk_data)
+
+
+def decompress_chunk(raw_data: bytes) -> bytes:
+    if raw_data.startswith(b"\x28\xb5\x2f\xfd"):
+        return zstandard.decompress(raw_data)
+    return zlib.decompress(raw_data)
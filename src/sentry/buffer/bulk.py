@@ -0,0 +1,264 @@
+"""
+Multi-row application of flushed buffer values.
+
+The default flush path (`Buffer.process`) issues one `UPDATE` per buffered
+(model, filters) pair. When many rows of the same model are flushed together
+we can instead coalesce them into a single statement of the form::
+
+    UPDATE <table> AS t SET col = t.col + v.col, ...
+    FROM (VALUES (...), (...)) AS v (...)
+    WHERE t.id = v.id
+
+Only rows that are addressed purely by primary key and that are not
+`signal_only` are eligible, since everything else relies on
+`create_or_update` semantics. Ineligible rows are returned to the caller so
+they can go through the regular per-row path, and so are rows that turn out
+not to exist, which the per-row path creates.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from django.db import connections, router, transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from sentry.db import models
+from sentry.signals import buffer_incr_complete
+from sentry.utils import metrics
+
+_PK_FILTER_NAMES = frozenset(("id", "pk"))
+
+
+@dataclass(frozen=True)
+class BufferedUpdate:
+    model: type[models.Model]
+    columns: dict[str, int]
+    filters: dict[str, Any]
+    extra: dict[str, Any] | None = None
+    signal_only: bool | None = None
+
+    @property
+    def pk(self) -> Any:
+        (value,) = self.filters.values()
+        if isinstance(value, models.Model):
+            return value.pk
+        return value
+
+    def is_bulk_eligible(self) -> bool:
+        return (
+            not self.signal_only
+            and len(self.filters) == 1
+            and next(iter(self.filters)) in _PK_FILTER_NAMES
+            and bool(self.columns or self.extra)
+        )
+
+    def signature(self) -> tuple[type[models.Model], tuple[str, ...], tuple[str, ...]]:
+        return (self.model, tuple(sorted(self.columns)), tuple(sorted(self.extra or ())))
+
+
+def partition_updates(
+    updates: Sequence[BufferedUpdate],
+) -> tuple[dict[tuple[Any, ...], list[BufferedUpdate]], list[BufferedUpdate]]:
+    """
+    Splits `updates` into groups that can share a single statement (keyed by
+    model and the set of touched columns) and the remainder that has to be
+    processed row by row.
+    """
+    grouped: dict[tuple[Any, ...], list[BufferedUpdate]] = defaultdict(list)
+    fallback: list[BufferedUpdate] = []
+    for update in updates:
+        if update.is_bulk_eligible():
+            grouped[update.signature()].append(update)
+        else:
+            fallback.append(update)
+    return grouped, fallback
+
+
+def _auto_now_fields(model: type[models.Model], extra_columns: Sequence[str]) -> list[Any]:
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) and field.name not in extra_columns
+    ]
+
+
+def _updates_score(
+    model: type[models.Model], columns: Sequence[str], extra_columns: Sequence[str]
+) -> bool:
+    from sentry.models.group import Group
+
+    # Mirror `Buffer.process`, which recomputes the score for groups whenever
+    # both `times_seen` and `last_seen` move.
+    return model is Group and "times_seen" in columns and "last_seen" in extra_columns
+
+
+def _send_post_save(
+    model: type[models.Model], columns: Sequence[str], extra_columns: Sequence[str], pks: set[Any]
+) -> None:
+    """
+    `Buffer.process` updates groups through `Group.update` so that `post_save`
+    receivers (issue alerts, group attributes) see the new counters. Send the
+    same signal for every group that was updated in bulk.
+    """
+    update_fields = [*columns, *extra_columns]
+    update_fields += [field.name for field in _auto_now_fields(model, extra_columns)]
+    if _updates_score(model, columns, extra_columns):
+        update_fields.append("score")
+
+    for instance in model.objects.filter(pk__in=pks):
+        post_save.send(sender=model, instance=instance, created=False, update_fields=update_fields)
+
+
+def _build_statement(
+    model: type[models.Model],
+    columns: Sequence[str],
+    extra_columns: Sequence[str],
+    rows: Sequence[BufferedUpdate],
+    connection: Any,
+) -> tuple[str, list[Any]]:
+    qn = connection.ops.quote_name
+    opts = model._meta
+    pk_field = opts.pk
+
+    auto_now_fields = _auto_now_fields(model, extra_columns)
+    with_score = _updates_score(model, columns, extra_columns)
+
+    value_fields: list[tuple[str, Any]] = [("pk", pk_field)]
+    value_fields += [(f"i_{name}", opts.get_field(name)) for name in columns]
+    value_fields += [(f"e_{name}", opts.get_field(name)) for name in extra_columns]
+
+    set_clauses = []
+    for name in columns:
+        column = qn(opts.get_field(name).column)
+        set_clauses.append(f"{column} = t.{column} + v.{qn(f'i_{name}')}")
+    for name in extra_columns:
+        column = qn(opts.get_field(name).column)
+        set_clauses.append(f"{column} = v.{qn(f'e_{name}')}")
+    for field in auto_now_fields:
+        set_clauses.append(f"{qn(field.column)} = %s")
+    if with_score:
+        times_seen = qn(opts.get_field("times_seen").column)
+        set_clauses.append(
+            f"{qn(opts.get_field('score').column)} = "
+            f"log(t.{times_seen} + v.{qn('i_times_seen')}) * 600 + v.{qn('last_seen_ts')}"
+        )
+
+    params: list[Any] = []
+    now = timezone.now()
+    for field in auto_now_fields:
+        params.append(field.get_db_prep_save(now, connection))
+
+    value_rows = []
+    for row in rows:
+        placeholders = []
+        for alias, field in value_fields:
+            if alias == "pk":
+                value = row.pk
+            elif alias.startswith("i_"):
+                value = row.columns[alias[2:]]
+            else:
+                value = (row.extra or {})[alias[2:]]
+            params.append(field.get_db_prep_save(value, connection))
+            # Postgres infers the column types of a VALUES list from its first
+            # row, so only that one needs explicit casts.
+            placeholders.append(f"%s::{field.db_type(connection)}" if not value_rows else "%s")
+        if with_score:
+            params.append(int(row.extra["last_seen"].timestamp()))  # type: ignore[index]
+            placeholders.append("%s::bigint" if not value_rows else "%s")
+        value_rows.append(f"({', '.join(placeholders)})")
+
+    aliases = [qn(alias) for alias, _ in value_fields]
+    if with_score:
+        aliases.append(qn("last_seen_ts"))
+
+    sql = (
+        f"UPDATE {qn(opts.db_table)} AS t SET {', '.join(set_clauses)} "
+        f"FROM (VALUES {', '.join(value_rows)}) AS v ({', '.join(aliases)}) "
+        f"WHERE t.{qn(pk_field.column)} = v.{qn('pk')} "
+        f"RETURNING t.{qn(pk_field.column)}"
+    )
+    return sql, params
+
+
+def apply_bulk_updates(
+    model: type[models.Model],
+    rows: Sequence[BufferedUpdate],
+    chunk_size: int = 500,
+) -> set[Any]:
+    """
+    Applies `rows` (which must all share the same `signature()`) using
+    multi-row `UPDATE ... FROM (VALUES ...)` statements and fires the signals
+    `Buffer.process` would for each of the updated rows.
+
+    Returns the primary keys of the rows that were actually updated. Rows that
+    don't exist are left alone; the caller has to pass them to the per-row
+    path, which creates them.
+    """
+    from sentry.models.group import Group
+
+    if not rows:
+        return set()
+
+    # The same key may have been flushed twice within a batch if it was
+    # re-buffered in between. Merge those here so that every row appears
+    # at most once per statement.
+    merged: dict[Any, BufferedUpdate] = {}
+    for row in rows:
+        existing = merged.get(row.pk)
+        if existing is None:
+            merged[row.pk] = row
+            continue
+        merged[row.pk] = BufferedUpdate(
+            model=model,
+            columns={k: v + row.columns.get(k, 0) for k, v in existing.columns.items()},
+            filters=existing.filters,
+            extra={**(existing.extra or {}), **(row.extra or {})},
+        )
+
+    columns = sorted(rows[0].columns)
+    extra_columns = sorted(rows[0].extra or ())
+    using = router.db_for_write(model)
+    connection = connections[using]
+    unique_rows = list(merged.values())
+
+    updated: set[Any] = set()
+    tags = {"model": model.__name__}
+    with metrics.timer("buffer.bulk-flush.statement", tags=tags):
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                for i in range(0, len(unique_rows), chunk_size):
+                    sql, params = _build_statement(
+                        model, columns, extra_columns, unique_rows[i : i + chunk_size], connection
+                    )
+                    cursor.execute(sql, params)
+                    updated.update(pk for (pk,) in cursor.fetchall())
+
+    metrics.distribution("buffer.bulk-flush.rows", len(unique_rows), tags=tags)
+    metrics.distribution("buffer.bulk-flush.rows-updated", len(updated), tags=tags)
+
+    uncache_object = getattr(model.objects, "uncache_object", None)
+    if uncache_object is not None:
+        for pk in updated:
+            uncache_object(pk)
+
+    if model is Group and updated:
+        _send_post_save(model, columns, extra_columns, updated)
+
+    for row in unique_rows:
+        if row.pk not in updated:
+            continue
+        buffer_incr_complete.send_robust(
+            model=model,
+            columns=row.columns,
+            filters=row.filters,
+            extra=row.extra,
+            created=False,
+            sender=model,
+        )
+
+    return updated
@@ -0,0 +1,252 @@
+"""
+In-process write combining for `Buffer.incr`.
+
+Hot groups can receive thousands of `buffer_incr` calls per second on a single
+worker, each of which costs a Redis pipeline. `WriteCombiningBuffer` merges
+those calls locally by (model, filters) for a short window -- counters are
+summed and `extra` columns are last-write-wins, exactly like the Redis buffer
+does -- and then hands a single combined increment to the real buffer.
+
+The pending increments live in the memory of the process that made them, so
+they are flushed by a background thread of that process rather than by a
+task, and when the process shuts down.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from celery import signals
+
+from sentry.db import models
+from sentry.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+CombinedKey = tuple[type[models.Model], tuple[tuple[str, Any], ...], bool | None]
+
+
+@dataclass
+class CombinedIncr:
+    model: type[models.Model]
+    filters: dict[str, Any]
+    signal_only: bool | None
+    columns: dict[str, int] = field(default_factory=dict)
+    extra: dict[str, Any] | None = None
+    calls: int = 0
+
+    def merge(self, columns: dict[str, int], extra: dict[str, Any] | None) -> None:
+        for column, amount in columns.items():
+            self.columns[column] = self.columns.get(column, 0) + amount
+        if extra:
+            if self.extra is None:
+                self.extra = {}
+            self.extra.update(extra)
+        self.calls += 1
+
+
+def _make_combined_key(
+    model: type[models.Model], filters: dict[str, Any], signal_only: bool | None
+) -> CombinedKey:
+    return (
+        model,
+        tuple(sorted((k, v.pk if isinstance(v, models.Model) else v) for k, v in filters.items())),
+        signal_only,
+    )
+
+
+class WriteCombiningBuffer:
+    """
+    Accumulates increments and flushes them through `flush_func` once the
+    oldest pending entry is older than `window` seconds, or as soon as
+    `max_keys` distinct keys are pending so that memory stays bounded.
+
+    Flushes happen on a daemon thread, which `incr` wakes up early when the
+    window expired or too many keys are pending. Callers of `incr` don't wait
+    for the flush unless the flusher falls behind: once `HARD_LIMIT_FACTOR`
+    times `max_keys` keys are pending, increments for new keys are passed to
+    `flush_func` directly instead of being combined. Everything left over is
+    flushed at interpreter exit and on Celery worker shutdown.
+
+    If `get_settings` is given, the window and the maximum number of keys are
+    updated from it after every flush.
+    """
+
+    HARD_LIMIT_FACTOR = 2
+
+    def __init__(
+        self,
+        flush_func: Callable[[CombinedIncr], None],
+        window: float = 1.0,
+        max_keys: int = 10000,
+        get_settings: Callable[[], tuple[float, int]] | None = None,
+    ) -> None:
+        assert window > 0
+        assert max_keys > 0
+        self.flush_func = flush_func
+        self.window = window
+        self.max_keys = max_keys
+        self.get_settings = get_settings
+
+        self._lock = threading.Lock()
+        self._pending: dict[CombinedKey, CombinedIncr] = {}
+        self._window_start: float | None = None
+        self._pid = os.getpid()
+        self._flusher: threading.Thread | None = None
+        self._wakeup = threading.Event()
+
+    def incr(
+        self,
+        model: type[models.Model],
+        columns: dict[str, int],
+        filters: dict[str, Any],
+        extra: dict[str, Any] | None = None,
+        signal_only: bool | None = None,
+    ) -> None:
+        key = _make_combined_key(model, filters, signal_only)
+        overflow = None
+        with self._lock:
+            self._check_fork()
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = CombinedIncr(model=model, filters=dict(filters), signal_only=signal_only)
+                if len(self._pending) < self.max_keys * self.HARD_LIMIT_FACTOR:
+                    self._pending[key] = entry
+                else:
+                    overflow = entry
+            entry.merge(columns, extra)
+            if self._window_start is None:
+                self._window_start = time.monotonic()
+            self._ensure_flusher()
+
+            full = len(self._pending) >= self.max_keys
+            expired = time.monotonic() - self._window_start >= self.window
+
+        if full or expired:
+            if full and not self._wakeup.is_set():
+                metrics.incr("buffer.write-combining.forced-flush", tags={"reason": "full"})
+            self._wakeup.set()
+
+        if overflow is not None:
+            # The flusher can't keep up, don't let the pending keys grow any further.
+            metrics.incr("buffer.write-combining.overflow")
+            self.flush_func(overflow)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._check_fork()
+            pending = self._pending
+            self._pending = {}
+            self._window_start = None
+
+        if pending:
+            calls = 0
+            for entry in pending.values():
+                calls += entry.calls
+                try:
+                    self.flush_func(entry)
+                except Exception:
+                    logger.exception(
+                        "buffer.write-combining.flush-failed",
+                        extra={"model": entry.model.__name__, "filters": entry.filters},
+                    )
+
+            metrics.incr("buffer.write-combining.calls", amount=calls)
+            metrics.incr("buffer.write-combining.flushed", amount=len(pending))
+            metrics.distribution("buffer.write-combining.ratio", calls / len(pending))
+
+        if self.get_settings is not None:
+            window, max_keys = self.get_settings()
+            if window > 0 and max_keys > 0:
+                self.window, self.max_keys = window, max_keys
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _check_fork(self) -> None:
+        # Entries inherited from a parent process are still owned (and will be
+        # flushed) by the parent, flushing them here as well would double count.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._pending = {}
+            self._window_start = None
+            self._flusher = None
+            self._wakeup = threading.Event()
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        self._flusher = threading.Thread(
+            target=self._run_flusher, name="buffer-write-combining", daemon=True
+        )
+        self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        pid = os.getpid()
+        while pid == self._pid:
+            self._wakeup.wait(self.window)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("buffer.write-combining.flusher-failed")
+
+
+_combiner: WriteCombiningBuffer | None = None
+_combiner_lock = threading.Lock()
+
+
+def get_write_combiner(flush_func: Callable[[CombinedIncr], None]) -> WriteCombiningBuffer:
+    """
+    Returns the process-wide combiner, creating it on first use. The combiner
+    picks up changes to its options after every flush, and is flushed when the
+    process or the Celery worker shuts down.
+    """
+    global _combiner
+
+    if _combiner is None:
+        with _combiner_lock:
+            if _combiner is None:
+                window, max_keys = _get_settings()
+                _combiner = WriteCombiningBuffer(
+                    flush_func, window=window, max_keys=max_keys, get_settings=_get_settings
+                )
+                atexit.register(_combiner.flush)
+    return _combiner
+
+
+@signals.worker_process_shutdown.connect
+@signals.worker_shutdown.connect
+def _flush_on_worker_shutdown(**kwargs: object) -> None:
+    # Prefork children leave through `os._exit`, which skips `atexit` handlers.
+    if _combiner is not None:
+        _combiner.flush()
+
+
+def _get_settings() -> tuple[float, int]:
+    from sentry import options
+
+    return (
+        options.get("buffer.write-combining.window-seconds"),
+        options.get("buffer.write-combining.max-keys"),
+    )
+
+
+def reset_write_combiner() -> None:
+    """
+    Flushes and drops the process-wide combiner. Meant for tests.
+    """
+    global _combiner
+
+    with _combiner_lock:
+        if _combiner is not None:
+            _combiner.flush()
+            atexit.unregister(_combiner.flush)
+        _combiner = None
@@ -13,7 +13,9 @@ import rb
 from django.utils.encoding import force_bytes, force_str
 from rediscluster import RedisCluster
 
+from sentry import options
 from sentry.buffer.base import Buffer
+from sentry.buffer.bulk import BufferedUpdate, apply_bulk_updates, partition_updates
 from sentry.db import models
 from sentry.tasks.process_buffer import process_incr
 from sentry.utils import json, metrics
@@ -513,8 +515,15 @@ class RedisBuffer(Buffer):
         if not lock_key:
             return
 
+        # In bulk mode every process_incr task flushes a much larger batch of keys
+        # in a handful of round trips, see `_process_bulk`.
+        incr_batch_size = (
+            options.get("buffer.bulk-flush.batch-size")
+            if options.get("buffer.bulk-flush.enabled")
+            else self.incr_batch_size
+        )
         pending_buffers_router = redis_buffer_router.create_pending_buffers_router(
-            incr_batch_size=self.incr_batch_size
+            incr_batch_size=incr_batch_size
         )
 
         def _generate_process_incr_kwargs(model_key: str | None) -> dict[str, Any]:
@@ -612,6 +621,9 @@ class RedisBuffer(Buffer):
             batch_keys = [key]
 
         if batch_keys is not None:
+            if len(batch_keys) > 1 and options.get("buffer.bulk-flush.enabled"):
+                self._process_bulk(batch_keys)
+                return
             for key in batch_keys:
                 self._process_single_incr(key)
 
@@ -625,6 +637,42 @@ class RedisBuffer(Buffer):
     ) -> Any:
         return super().process(model, columns, filters, extra, signal_only)
 
+    def _decode_buffered_values(self, values: dict[str, Any]) -> BufferedUpdate:
+        """
+        Turns the raw contents of a buffer hash (as written by `incr`) back into the
+        arguments for `Buffer.process`.
+        """
+        model = import_string(force_str(values.pop("m")))
+
+        if values["f"].startswith(b"{" if not self.is_redis_cluster else "{"):
+            filters = self._load_values(json.loads(force_str(values.pop("f"))))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(force_bytes(values.pop("f")))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"[" if not self.is_redis_cluster else "["):
+                    extra_values[k[2:]] = self._load_value(json.loads(force_str(v)))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(force_bytes(v))
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return BufferedUpdate(
+            model=model,
+            columns=incr_values,
+            filters=filters,
+            extra=extra_values,
+            signal_only=signal_only,
+        )
+
     def _process_single_incr(self, key: str) -> None:
         client = get_cluster_routing_client(self.cluster, self.is_redis_cluster)
         lock_key = self._lock_key(client, key, ex=10)
@@ -650,29 +698,102 @@ class RedisBuffer(Buffer):
                 logger.debug("buffer.revoked.empty", extra={"redis_key": key})
                 return
 
-            model = import_string(force_str(values.pop("m")))
-
-            if values["f"].startswith(b"{" if not self.is_redis_cluster else "{"):
-                filters = self._load_values(json.loads(force_str(values.pop("f"))))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(force_bytes(values.pop("f")))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"[" if not self.is_redis_cluster else "["):
-                        extra_values[k[2:]] = self._load_value(json.loads(force_str(v)))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(force_bytes(v))
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            self._process(model, incr_values, filters, extra_values, signal_only)
+            update = self._decode_buffered_values(values)
+            self._process(
+                update.model, update.columns, update.filters, update.extra, update.signal_only
+            )
         finally:
             client.delete(lock_key)
+
+    def _pipelines_by_node(self, keys: list[str]) -> list[tuple[list[str], Pipeline]]:
+        """
+        Groups `keys` by the Redis node they live on and returns one non-transactional
+        pipeline per node. For redis-cluster the client pipeline already fans out per
+        node on execute, so a single pipeline is returned.
+        """
+        if is_instance_redis_cluster(self.cluster, self.is_redis_cluster):
+            return [(keys, self.cluster.pipeline(transaction=False))]
+        elif is_instance_rb_cluster(self.cluster, self.is_redis_cluster):
+            router = self.cluster.get_router()
+            keys_by_host: dict[int, list[str]] = {}
+            for key in keys:
+                keys_by_host.setdefault(router.get_host_for_key(key), []).append(key)
+            return [
+                (host_keys, self.cluster.get_local_client(host_id).pipeline(transaction=False))
+                for host_id, host_keys in keys_by_host.items()
+            ]
+        else:
+            raise AssertionError("unreachable")
+
+    def _process_bulk(self, batch_keys: list[str]) -> None:
+        """
+        Flushes a whole batch of buffer keys at once: locks and fetches every hash
+        with a single pipelined round trip per Redis node, then coalesces the values
+        per model and applies them with multi-row UPDATE statements. Rows that
+        can't be expressed as a plain update by primary key go through `_process`.
+        """
+        start = time()
+        # Lock keys are routed on their own (as in `_lock_key`) so that bulk and
+        # per-key flushes keep excluding each other.
+        keys_by_lock_key = {self._make_lock_key(key): key for key in batch_keys}
+
+        acquired_lock_keys: list[str] = []
+        for node_lock_keys, pipe in self._pipelines_by_node(list(keys_by_lock_key)):
+            for lock_key in node_lock_keys:
+                pipe.set(lock_key, "1", nx=True, ex=10)
+            for lock_key, acquired in zip(node_lock_keys, pipe.execute()):
+                if acquired:
+                    acquired_lock_keys.append(lock_key)
+                else:
+                    metrics.incr("buffer.revoked", tags={"reason": "locked"}, skip_internal=False)
+                    logger.debug(
+                        "buffer.revoked.locked", extra={"redis_key": keys_by_lock_key[lock_key]}
+                    )
+        locked_keys = [keys_by_lock_key[lock_key] for lock_key in acquired_lock_keys]
+
+        try:
+            updates: list[BufferedUpdate] = []
+            for node_keys, pipe in self._pipelines_by_node(locked_keys):
+                for key in node_keys:
+                    pipe.hgetall(key)
+                    pipe.zrem(self.pending_key, key)
+                    pipe.delete(key)
+                results = pipe.execute()
+                for key, values in zip(node_keys, results[::3]):
+                    values = {force_str(k): v for k, v in values.items()}
+                    if not values:
+                        metrics.incr(
+                            "buffer.revoked", tags={"reason": "empty"}, skip_internal=False
+                        )
+                        logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+                        continue
+                    updates.append(self._decode_buffered_values(values))
+
+            metrics.timing("buffer.bulk-flush.fetch-duration", time() - start)
+
+            grouped, fallback = partition_updates(updates)
+            for (model, _, _), rows in grouped.items():
+                try:
+                    updated = apply_bulk_updates(model, rows)
+                except Exception:
+                    # Don't lose the batch over a single bad statement; the per-row
+                    # path is what we used before bulk flushing anyway.
+                    logger.exception("buffer.bulk-flush.failed", extra={"model": str(model)})
+                    fallback.extend(rows)
+                else:
+                    # Rows that don't exist yet are created by the per-row path.
+                    fallback.extend(row for row in rows if row.pk not in updated)
+
+            for update in fallback:
+                self._process(
+                    update.model, update.columns, update.filters, update.extra, update.signal_only
+                )
+        finally:
+            for node_lock_keys, pipe in self._pipelines_by_node(acquired_lock_keys):
+                for lock_key in node_lock_keys:
+                    pipe.delete(lock_key)
+                pipe.execute()
+
+        metrics.distribution("buffer.bulk-flush.keys", len(batch_keys))
+        metrics.distribution("buffer.bulk-flush.fallback-rows", len(fallback))
+        metrics.timing("buffer.bulk-flush.duration", time() - start)
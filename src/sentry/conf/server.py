@@ -137,6 +137,7 @@ SENTRY_ESCALATION_THRESHOLDS_REDIS_CLUSTER = "default"
 SENTRY_SPAN_BUFFER_CLUSTER = "default"
 SENTRY_ASSEMBLE_CLUSTER = "default"
 SENTRY_UPTIME_DETECTOR_CLUSTER = "default"
+SENTRY_NODESTORE_LOCAL_CACHE_REDIS_CLUSTER = "default"
 
 # Hosts that are allowed to use system token authentication.
 # http://en.wikipedia.org/wiki/Reserved_IP_addresses
@@ -1681,6 +1682,10 @@ SENTRY_SNUBA_CACHE_TTL_SECONDS = 60
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
 SENTRY_NODESTORE_OPTIONS: dict[str, Any] = {}
+# Paths to trained zstd dictionaries that nodestore payloads may be compressed
+# with, see `sentry.nodestore.compression`. Dictionaries have to stay listed
+# here for as long as data written with them is retained.
+SENTRY_NODESTORE_COMPRESSION_DICTIONARIES: list[str] = []
 
 # Node storage backend used for ArtifactBundle indexing (aka FlatFileIndex aka BundleIndex)
 SENTRY_INDEXSTORE = "sentry.nodestore.django.DjangoNodeStorage"
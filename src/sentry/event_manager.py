@@ -58,6 +58,7 @@ from sentry.grouping.ingest.hashing import (
     find_existing_grouphash,
     get_hash_values,
     get_or_create_grouphashes,
+    get_or_create_grouphashes_many,
     maybe_run_background_grouping,
     maybe_run_secondary_grouping,
     run_primary_grouping,
@@ -544,65 +545,149 @@ class EventManager:
         has_attachments: bool = False,
     ) -> Event:
         jobs = [job]
+        job["cache_key"] = cache_key
 
-        is_reprocessed = is_reprocessed_event(job["data"])
-
-        _get_or_create_release_many(jobs, projects)
-        _get_event_user_many(jobs, projects)
-
-        job["project_key"] = None
-        if job["key_id"] is not None:
-            try:
-                job["project_key"] = ProjectKey.objects.get_from_cache(id=job["key_id"])
-            except ProjectKey.DoesNotExist:
-                pass
-
-        _derive_plugin_tags_many(jobs, projects)
-        _derive_interface_tags_many(jobs)
+        _prepare_error_jobs(jobs, projects)
 
         # Load attachments first, but persist them at the very last after
         # posting to eventstream to make sure all counters and eventstream are
         # incremented for sure. Also wait for grouping to remove attachments
         # based on the group counter.
         if has_attachments:
-            attachments = get_attachments(cache_key, job)
+            job["attachments"] = get_attachments(cache_key, job)
         else:
-            attachments = []
+            job["attachments"] = []
 
         try:
             group_info = assign_event_to_group(event=job["event"], job=job, metric_tags=metric_tags)
 
         except HashDiscarded:
-            discard_event(job, attachments)
+            discard_event(job, job["attachments"])
             raise
 
         if not group_info:
             return job["event"]
 
+        _save_grouped_error_events(jobs, projects, raw)
+
+        self._data = job["event"].data.data
+
+        return job["event"]
+
+
+@sentry_sdk.tracing.trace
+def save_error_events_many(
+    jobs: Sequence[Job],
+    projects: ProjectsMapping,
+    on_inserted: Callable[[Job], None] | None = None,
+) -> list[Job]:
+    """
+    Batched version of `EventManager.save_error_events` for error events
+    without attachments, which have already been through `_pull_out_data`.
+
+    Releases and environments are fetched once per distinct value in the
+    batch, and the primary grouphashes of all events are resolved in bulk.
+    Events whose hash is discarded are dropped from the batch. Returns the
+    jobs whose events were saved, and sets ``hash_discarded`` on the jobs
+    that were discarded.
+
+    `on_inserted` is called with every job as soon as its event has been
+    inserted into the eventstream, so that callers know which events were
+    saved if saving the rest of the batch fails.
+    """
+    for job in jobs:
+        job.setdefault("cache_key", None)
+        job["attachments"] = []
+        job["hash_discarded"] = False
+        job["in_grouping_transition"] = is_in_transition(job["event"].project)
+        job["metric_tags"] = {
+            "platform": job["event"].platform or "unknown",
+            "sdk": normalized_sdk_tag_from_event(job["event"].data),
+            "in_transition": job["in_grouping_transition"],
+        }
+
+    _prepare_error_jobs(jobs, projects)
+    get_primary_grouphashes_many(jobs, {"batched": True})
+
+    grouped_jobs = []
+    for job in jobs:
+        try:
+            group_info = assign_event_to_group(
+                event=job["event"], job=job, metric_tags=job["metric_tags"]
+            )
+        except HashDiscarded:
+            discard_event(job, job["attachments"])
+            job["hash_discarded"] = True
+            continue
+
+        if group_info:
+            grouped_jobs.append(job)
+
+    _save_grouped_error_events(grouped_jobs, projects, raw=False, on_inserted=on_inserted)
+    return grouped_jobs
+
+
+def _prepare_error_jobs(jobs: Sequence[Job], projects: ProjectsMapping) -> None:
+    for job in jobs:
+        job["is_reprocessed"] = is_reprocessed_event(job["data"])
+
+    _get_or_create_release_many(jobs, projects)
+    _get_event_user_many(jobs, projects)
+
+    for job in jobs:
+        job["project_key"] = None
+        if job["key_id"] is not None:
+            try:
+                job["project_key"] = ProjectKey.objects.get_from_cache(id=job["key_id"])
+            except ProjectKey.DoesNotExist:
+                pass
+
+    _derive_plugin_tags_many(jobs, projects)
+    _derive_interface_tags_many(jobs)
+
+
+def _save_grouped_error_events(
+    jobs: Sequence[Job],
+    projects: ProjectsMapping,
+    raw: bool,
+    on_inserted: Callable[[Job], None] | None = None,
+) -> None:
+    """
+    Everything `save_error_events` does once the events have been assigned to
+    groups.
+    """
+    if not jobs:
+        return
+
+    for job in jobs:
         # store a reference to the group id to guarantee validation of isolation
         # XXX(markus): No clue what this does
         job["event"].data.bind_ref(job["event"])
 
-        _get_or_create_environment_many(jobs, projects)
-        _get_or_create_group_environment_many(jobs)
-        _get_or_create_release_associated_models(jobs, projects)
-        _increment_release_associated_counts_many(jobs, projects)
-        _get_or_create_group_release_many(jobs)
-        _tsdb_record_all_metrics(jobs)
+    _get_or_create_environment_many(jobs, projects)
+    _get_or_create_group_environment_many(jobs)
+    _get_or_create_release_associated_models(jobs, projects)
+    _increment_release_associated_counts_many(jobs, projects)
+    _get_or_create_group_release_many(jobs)
+    _tsdb_record_all_metrics(jobs)
 
-        if attachments:
-            attachments = filter_attachments_for_group(attachments, job)
+    for job in jobs:
+        if job["attachments"]:
+            job["attachments"] = filter_attachments_for_group(job["attachments"], job)
 
-        # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
-        _materialize_event_metrics(jobs)
+    # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
+    _materialize_event_metrics(jobs)
 
-        for attachment in attachments:
+    for job in jobs:
+        for attachment in job["attachments"]:
             key = f"bytes.stored.{attachment.type}"
             old_bytes = job["event_metrics"].get(key) or 0
             job["event_metrics"][key] = old_bytes + attachment.size
 
-        _nodestore_save_many(jobs=jobs, app_feature="errors")
+    _nodestore_save_many(jobs=jobs, app_feature="errors")
 
+    for job in jobs:
+        project = job["event"].project
         if not raw:
             if not project.first_event:
                 project.update(first_event=job["event"].datetime)
@@ -618,7 +703,7 @@ class EventManager:
                     project=project, event=job["event"], sender=Project
                 )
 
-        if is_reprocessed:
+        if job["is_reprocessed"]:
             safe_execute(
                 reprocessing2.buffered_delete_old_primary_hash,
                 project_id=job["event"].project_id,
@@ -629,16 +714,17 @@ class EventManager:
                 current_primary_hash=job["event"].get_primary_hash(),
             )
 
-        _eventstream_insert_many(jobs)
+    _eventstream_insert_many(jobs, on_inserted=on_inserted)
 
+    for job in jobs:
         # Do this last to ensure signals get emitted even if connection to the
         # file store breaks temporarily.
         #
         # We do not need this for reprocessed events as for those we update the
         # group_id on existing models in post_process_group, which already does
         # this because of indiv. attachments.
-        if not is_reprocessed and attachments:
-            save_attachments(cache_key, attachments, job)
+        if not job["is_reprocessed"] and job["attachments"]:
+            save_attachments(job["cache_key"], job["attachments"], job)
 
         metric_tags = {"from_relay": str("_relay_processed" in job["data"])}
 
@@ -656,11 +742,7 @@ class EventManager:
             tags=metric_tags,
         )
 
-        _track_outcome_accepted_many(jobs)
-
-        self._data = job["event"].data.data
-
-        return job["event"]
+    _track_outcome_accepted_many(jobs)
 
 
 @sentry_sdk.tracing.trace
@@ -944,10 +1026,14 @@ def _get_group_processing_kwargs(job: Job) -> dict[str, Any]:
 
 @sentry_sdk.tracing.trace
 def _get_or_create_environment_many(jobs: Sequence[Job], projects: ProjectsMapping) -> None:
+    environments: dict[tuple[int, str | None], Environment] = {}
     for job in jobs:
-        job["environment"] = Environment.get_or_create(
-            project=projects[job["project_id"]], name=job["environment"]
-        )
+        key = (job["project_id"], job["environment"])
+        if key not in environments:
+            environments[key] = Environment.get_or_create(
+                project=projects[job["project_id"]], name=job["environment"]
+            )
+        job["environment"] = environments[key]
 
 
 @sentry_sdk.tracing.trace
@@ -1146,7 +1232,9 @@ def _nodestore_save_many(jobs: Sequence[Job], app_feature: str) -> None:
         job["event"].data.save(subkeys=subkeys)
 
 
-def _eventstream_insert_many(jobs: Sequence[Job]) -> None:
+def _eventstream_insert_many(
+    jobs: Sequence[Job], on_inserted: Callable[[Job], None] | None = None
+) -> None:
     for job in jobs:
 
         if job["event"].project_id == settings.SENTRY_PROJECT:
@@ -1201,6 +1289,8 @@ def _eventstream_insert_many(jobs: Sequence[Job]) -> None:
             skip_consume=job.get("raw", False),
             group_states=group_states,
         )
+        if on_inserted is not None:
+            on_inserted(job)
 
 
 def _track_outcome_accepted_many(jobs: Sequence[Job]) -> None:
@@ -1579,7 +1669,9 @@ def _save_aggregate_new(
     secondary = NULL_GROUPHASH_INFO
 
     # Try looking for an existing group using the current grouping config
-    primary = get_hashes_and_grouphashes(job, run_primary_grouping, metric_tags)
+    primary = _pop_batched_primary_grouphash_info(job) or get_hashes_and_grouphashes(
+        job, run_primary_grouping, metric_tags
+    )
 
     # If we've found one, great. No need to do any more calculations
     if primary.existing_grouphash:
@@ -1664,6 +1756,44 @@ def get_hashes_and_grouphashes(
         return NULL_GROUPHASH_INFO
 
 
+def get_primary_grouphashes_many(jobs: Sequence[Job], metric_tags: MutableTags) -> None:
+    """
+    Batched version of the first step of `_save_aggregate_new`: calculate the primary hashes of
+    all jobs and get or create their `GroupHash` records in bulk, instead of with several queries
+    per event. The result is stored on each job and picked up when the job's event is assigned to
+    a group.
+    """
+    results = [run_primary_grouping(job["event"].project, job, metric_tags) for job in jobs]
+    grouphashes_many = get_or_create_grouphashes_many(
+        [(job["event"].project, hashes) for job, (_, hashes) in zip(jobs, results)]
+    )
+
+    ungrouped_ids: set[int] = set()
+    for job, (grouping_config, hashes), grouphashes in zip(jobs, results, grouphashes_many):
+        job_ungrouped_ids = {gh.id for gh in grouphashes if gh.group_id is None}
+        # If an earlier event in the batch has the same ungrouped hash, it may have created a
+        # group for it by the time this event is assigned to one
+        may_be_stale = not ungrouped_ids.isdisjoint(job_ungrouped_ids)
+        ungrouped_ids |= job_ungrouped_ids
+        job["batched_primary_grouphashes"] = (grouping_config, hashes, grouphashes, may_be_stale)
+
+
+def _pop_batched_primary_grouphash_info(job: Job) -> GroupHashInfo | None:
+    batched = job.pop("batched_primary_grouphashes", None)
+    if batched is None:
+        return None
+
+    grouping_config, hashes, grouphashes, may_be_stale = batched
+    if not hashes:
+        return NULL_GROUPHASH_INFO
+    if may_be_stale:
+        refreshed = GroupHash.objects.in_bulk([grouphash.id for grouphash in grouphashes])
+        grouphashes = [refreshed.get(grouphash.id, grouphash) for grouphash in grouphashes]
+
+    existing_grouphash = find_existing_grouphash(grouphashes)
+    return GroupHashInfo(grouping_config, hashes, grouphashes, existing_grouphash)
+
+
 def handle_existing_grouphash(
     job: Job,
     existing_grouphash: GroupHash,
@@ -2678,22 +2808,6 @@ def save_attachment(
     else:
         timestamp = datetime.now(timezone.utc)
 
-    try:
-        attachment.data
-    except MissingAttachmentChunks:
-        track_outcome(
-            org_id=project.organization_id,
-            project_id=project.id,
-            key_id=key_id,
-            outcome=Outcome.INVALID,
-            reason="missing_chunks",
-            timestamp=timestamp,
-            event_id=event_id,
-            category=DataCategory.ATTACHMENT,
-        )
-
-        logger.exception("Missing chunks for cache_key=%s", cache_key)
-        return
     from sentry import ratelimits as ratelimiter
 
     is_limited, num_requests, reset_time = ratelimiter.backend.is_limited_with_value(
@@ -2728,7 +2842,24 @@ def save_attachment(
         )
         return
 
-    file = EventAttachment.putfile(project.id, attachment)
+    # The attachment is streamed from the cache into storage, so missing chunks
+    # are only detected while storing it.
+    try:
+        file = EventAttachment.putfile(project.id, attachment)
+    except MissingAttachmentChunks:
+        track_outcome(
+            org_id=project.organization_id,
+            project_id=project.id,
+            key_id=key_id,
+            outcome=Outcome.INVALID,
+            reason="missing_chunks",
+            timestamp=timestamp,
+            event_id=event_id,
+            category=DataCategory.ATTACHMENT,
+        )
+
+        logger.exception("Missing chunks for cache_key=%s", cache_key)
+        return
 
     EventAttachment.objects.create(
         # lookup:
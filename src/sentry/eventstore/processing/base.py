@@ -27,8 +27,13 @@ class EventProcessingStore(Service):
     implementations.
     """
 
-    def __init__(self, inner: KVStorage[str, Event]):
+    def __init__(
+        self, inner: KVStorage[str, Event], raw_inner: KVStorage[str, bytes] | None = None
+    ):
         self.inner = inner
+        # The storage underneath `inner` for backends that store events as
+        # JSON, used to write events that are already JSON encoded.
+        self.raw_inner = raw_inner
         self.timeout = timedelta(seconds=DEFAULT_TIMEOUT)
 
     def __get_unprocessed_key(self, key: str) -> str:
@@ -45,6 +50,18 @@ class EventProcessingStore(Service):
         self.inner.set(key, event, self.timeout)
         return key
 
+    def store_raw(self, event: Event, payload: bytes) -> str:
+        """
+        Stores `event`, given as `payload` which is its JSON encoding. This
+        skips encoding the event again when the backend stores JSON.
+        """
+        key = cache_key_for_event(event)
+        if self.raw_inner is None:
+            self.inner.set(key, event, self.timeout)
+        else:
+            self.raw_inner.set(key, payload, self.timeout)
+        return key
+
     def get(self, key: str, unprocessed: bool = False) -> MutableMapping[str, Any] | None:
         if unprocessed:
             key = self.__get_unprocessed_key(key)
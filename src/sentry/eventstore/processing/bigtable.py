@@ -14,9 +14,11 @@ class BigtableEventProcessingStore(EventProcessingStore):
     """
 
     def __init__(self, **options):
+        storage = BigtableKVStorage(**options)
         super().__init__(
             KVStorageCodecWrapper(
-                BigtableKVStorage(**options),
+                storage,
                 JSONCodec() | BytesCodec(),  # maintains functional parity with cache backend
-            )
+            ),
+            raw_inner=storage,
         )
@@ -13,8 +13,5 @@ class RedisClusterEventProcessingStore(EventProcessingStore):
     """
 
     def __init__(self, **options):
-        super().__init__(
-            KVStorageCodecWrapper(
-                RedisKVStorage(redis_clusters.get(options.pop("cluster", "default"))), JSONCodec()
-            )
-        )
+        storage = RedisKVStorage(redis_clusters.get(options.pop("cluster", "default")))
+        super().__init__(KVStorageCodecWrapper(storage, JSONCodec()), raw_inner=storage)
@@ -0,0 +1,275 @@
+"""
+Cache for the hashes computed by `Event.get_hashes`.
+
+Building the grouping component tree is the most expensive part of grouping,
+and a large share of the events a project sends are repeats of the same few
+crashes. Once an event has been normalized for grouping and had its
+fingerprint applied, the resulting hashes only depend on a small part of the
+payload, so they are cached under a digest of exactly that part:
+
+- the project (message parameterization experiments are rolled out per project)
+- the grouping config id and the project's enhancements, which means that
+  changing either of them invalidates all entries of the project
+- the event's platform, fingerprint, ``_fingerprint_info``, checksum and
+  ``main_exception_id``, which covers changes to the project's fingerprinting
+  rules
+- the grouping interfaces (exception, stacktrace, threads, message, ...), with
+  frame fields that grouping never looks at (``vars``, ``pre_context`` and
+  ``post_context``) left out
+
+Events with a fingerprint that references other parts of the payload (e.g.
+``{{ transaction }}`` or ``{{ tags.foo }}``) bypass the cache.
+
+There are two tiers, a process-local LRU and the shared default cache, which
+can be enabled independently.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from sentry import options
+from sentry.grouping.utils import is_default_fingerprint_var
+from sentry.utils import metrics
+from sentry.utils.cache import cache
+from sentry.utils.hashlib import hash_values
+
+if TYPE_CHECKING:
+    from sentry.eventstore.models import Event
+    from sentry.grouping.api import GroupingConfig
+    from sentry.grouping.strategies.base import StrategyConfiguration
+
+# Bump this when a change to the grouping code changes the hashes produced
+# for an unchanged grouping config.
+CACHE_VERSION = 1
+CACHE_KEY_PREFIX = f"grouping:hashes:{CACHE_VERSION}:"
+
+GROUPING_INTERFACES = (
+    "exception",
+    "stacktrace",
+    "threads",
+    "logentry",
+    "template",
+    "csp",
+    "hpkp",
+    "expectct",
+    "expectstaple",
+)
+IGNORED_FRAME_FIELDS = frozenset(("vars", "pre_context", "post_context"))
+
+
+class CachedHashes(TypedDict):
+    hashes: list[str]
+    # Set by the exception strategies as a side effect of grouping
+    main_exception_id: int | None
+    # Time it took to compute the hashes, in seconds
+    duration: float
+
+
+def _strip_stacktrace(stacktrace: Any) -> Any:
+    if not isinstance(stacktrace, Mapping) or not isinstance(stacktrace.get("frames"), list):
+        return stacktrace
+    return {
+        **stacktrace,
+        "frames": [
+            (
+                {k: v for k, v in frame.items() if k not in IGNORED_FRAME_FIELDS}
+                if isinstance(frame, Mapping)
+                else frame
+            )
+            for frame in stacktrace["frames"]
+        ],
+    }
+
+
+def _strip_values(container: Any) -> Any:
+    if not isinstance(container, Mapping) or not isinstance(container.get("values"), list):
+        return container
+    return {
+        **container,
+        "values": [
+            (
+                {
+                    **value,
+                    "stacktrace": _strip_stacktrace(value.get("stacktrace")),
+                    "raw_stacktrace": None,
+                }
+                if isinstance(value, Mapping)
+                else value
+            )
+            for value in container["values"]
+        ],
+    }
+
+
+def get_cache_key(project_id: int, event: Event, grouping_config: GroupingConfig) -> str | None:
+    """
+    Returns the cache key for the hashes of `event`, or `None` if the event
+    can't be cached.
+    """
+    data = event.data
+    fingerprint = data.get("fingerprint") or ["{{ default }}"]
+    for value in fingerprint:
+        if "{{" in value and not is_default_fingerprint_var(value):
+            return None
+
+    interfaces = {name: data.get(name) for name in GROUPING_INTERFACES}
+    interfaces["exception"] = _strip_values(interfaces["exception"])
+    interfaces["threads"] = _strip_values(interfaces["threads"])
+    interfaces["stacktrace"] = _strip_stacktrace(interfaces["stacktrace"])
+
+    try:
+        digest = hash_values(
+            [
+                project_id,
+                grouping_config["id"],
+                grouping_config["enhancements"],
+                event.platform,
+                fingerprint,
+                data.get("_fingerprint_info"),
+                data.get("checksum"),
+                data.get("main_exception_id"),
+                interfaces,
+            ],
+            algorithm=hashlib.sha1,
+        )
+    except TypeError:
+        # Floats and other values that can't be hashed deterministically
+        return None
+    return CACHE_KEY_PREFIX + digest
+
+
+class LocalHashCache:
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        assert max_entries > 0
+        assert ttl > 0
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[CachedHashes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CachedHashes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedHashes) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_local_cache: LocalHashCache | None = None
+_local_cache_lock = threading.Lock()
+
+
+def get_local_cache() -> LocalHashCache | None:
+    """
+    Returns the process-wide cache, or `None` if it is disabled through the
+    ``grouping.hash_cache.local_max_entries`` option. The cache is recreated
+    when its options change.
+    """
+    global _local_cache
+
+    max_entries = options.get("grouping.hash_cache.local_max_entries")
+    if not max_entries:
+        return None
+    ttl = options.get("grouping.hash_cache.ttl_seconds")
+
+    local_cache = _local_cache
+    if local_cache is None or local_cache.max_entries != max_entries or local_cache.ttl != ttl:
+        with _local_cache_lock:
+            local_cache = _local_cache
+            if (
+                local_cache is None
+                or local_cache.max_entries != max_entries
+                or local_cache.ttl != ttl
+            ):
+                local_cache = _local_cache = LocalHashCache(max_entries=max_entries, ttl=ttl)
+    return local_cache
+
+
+def _lookup(key: str, local_cache: LocalHashCache | None) -> CachedHashes | None:
+    if local_cache is not None:
+        value = local_cache.get(key)
+        if value is not None:
+            metrics.incr("grouping.hash_cache.lookup", tags={"result": "hit", "tier": "local"})
+            return value
+
+    if options.get("grouping.hash_cache.shared_enabled"):
+        value = cache.get(key)
+        if value is not None:
+            metrics.incr("grouping.hash_cache.lookup", tags={"result": "hit", "tier": "shared"})
+            if local_cache is not None:
+                local_cache.set(key, value)
+            return value
+
+    metrics.incr("grouping.hash_cache.lookup", tags={"result": "miss"})
+    return None
+
+
+def get_hashes(
+    project_id: int,
+    event: Event,
+    grouping_config: GroupingConfig,
+    loaded_grouping_config: StrategyConfiguration,
+) -> list[str]:
+    """
+    Equivalent to ``event.get_hashes(loaded_grouping_config)``, except that the
+    hashes (and the other changes grouping makes to the event) are served from
+    the cache if an event with the same grouping inputs has been seen before.
+    """
+    if not options.get("grouping.hash_cache.enabled"):
+        return event.get_hashes(loaded_grouping_config)
+
+    key = get_cache_key(project_id, event, grouping_config)
+    if key is None:
+        metrics.incr("grouping.hash_cache.lookup", tags={"result": "bypass"})
+        return event.get_hashes(loaded_grouping_config)
+
+    local_cache = get_local_cache()
+    cached = _lookup(key, local_cache)
+    if cached is not None:
+        event.data["hashes"] = list(cached["hashes"])
+        if cached["main_exception_id"] is not None:
+            event.data["main_exception_id"] = cached["main_exception_id"]
+        metrics.distribution(
+            "grouping.hash_cache.time_saved", cached["duration"] * 1000, unit="millisecond"
+        )
+        return event.data["hashes"]
+
+    start = time.perf_counter()
+    hashes = event.get_hashes(loaded_grouping_config)
+    duration = time.perf_counter() - start
+
+    value: CachedHashes = {
+        "hashes": list(hashes),
+        "main_exception_id": event.data.get("main_exception_id"),
+        "duration": duration,
+    }
+    if local_cache is not None:
+        local_cache.set(key, value)
+    if options.get("grouping.hash_cache.shared_enabled"):
+        cache.set(key, value, int(options.get("grouping.hash_cache.ttl_seconds")))
+    return hashes
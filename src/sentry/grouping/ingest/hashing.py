@@ -21,6 +21,7 @@ from sentry.grouping.api import (
     get_grouping_config_dict_for_project,
     load_grouping_config,
 )
+from sentry.grouping.ingest import hash_cache
 from sentry.grouping.ingest.config import is_in_transition
 from sentry.grouping.ingest.metrics import record_hash_calculation_metrics
 from sentry.models.grouphash import GroupHash
@@ -77,7 +78,9 @@ def _calculate_event_grouping(
             # default long before we get here. Should we consolidate bogus config handling into the
             # code actually getting the config?
             try:
-                hashes = event.get_hashes(loaded_grouping_config)
+                hashes = hash_cache.get_hashes(
+                    project.id, event, grouping_config, loaded_grouping_config
+                )
             except GroupingConfigNotFound:
                 event.data["grouping_config"] = get_grouping_config_dict_for_project(project)
                 hashes = event.get_hashes()
@@ -239,21 +242,86 @@ def get_hash_values(
 
 
 def get_or_create_grouphashes(project: Project, hashes: Sequence[str]) -> list[GroupHash]:
-    grouphashes = []
+    return get_or_create_grouphashes_many([(project, hashes)])[0]
 
-    for hash_value in hashes:
-        grouphash, created = GroupHash.objects.get_or_create(project=project, hash=hash_value)
+
+def _fetch_grouphashes(keys: set[tuple[int, str]]) -> dict[tuple[int, str], GroupHash]:
+    # A single `IN` query per column. Combinations of project and hash we didn't ask for are very
+    # unlikely (hashes are md5 digests), and simply ignored.
+    queryset = GroupHash.objects.filter(
+        project_id__in={project_id for project_id, _ in keys},
+        hash__in={hash_value for _, hash_value in keys},
+    )
+    return {
+        (grouphash.project_id, grouphash.hash): grouphash
+        for grouphash in queryset
+        if (grouphash.project_id, grouphash.hash) in keys
+    }
+
+
+def get_or_create_grouphashes_many(
+    project_hashes: Sequence[tuple[Project, Sequence[str]]],
+) -> list[list[GroupHash]]:
+    """
+    Get or create the `GroupHash` records for a batch of (project, hashes) pairs, e.g. the hashes
+    of several events. Existing records are looked up with a single query, missing ones are
+    inserted with a single bulk insert.
+
+    Returns the grouphashes for each pair, in the order of its hashes. Pairs mentioning the same
+    hash share the same `GroupHash` instance.
+    """
+    keys = {(project.id, hash_value) for project, hashes in project_hashes for hash_value in hashes}
+    if not keys:
+        return [[] for _ in project_hashes]
+
+    grouphashes = _fetch_grouphashes(keys)
+    missing = keys - grouphashes.keys()
+
+    if missing:
+        # Insert in a stable order so that concurrent batches don't deadlock each other. Rows
+        # created concurrently by another process are picked up by the second lookup.
+        GroupHash.objects.bulk_create(
+            [
+                GroupHash(project_id=project_id, hash=hash_value)
+                for project_id, hash_value in sorted(missing)
+            ],
+            ignore_conflicts=True,
+        )
+        created = _fetch_grouphashes(missing)
+        # Rows the pre-insert lookup didn't find. This can include a row another process inserted
+        # in between, as `ignore_conflicts` doesn't tell us which rows were skipped.
+        inserted = len(created)
+        # Only possible if a row was deleted right after being inserted
+        for project_id, hash_value in missing - created.keys():
+            created[(project_id, hash_value)], was_created = GroupHash.objects.get_or_create(
+                project_id=project_id, hash=hash_value
+            )
+            inserted += was_created
+        grouphashes.update(created)
+        metrics.incr("grouping.grouphashes.created", amount=inserted)
 
         # TODO: Do we want to expand this to backfill metadata for existing grouphashes? If we do,
         # we'll have to override the metadata creation date for them.
-        if (
-            created
-            and options.get("grouping.grouphash_metadata.ingestion_writes_enabled")
-            and features.has("organizations:grouphash-metadata-creation", project.organization)
-        ):
+        if created and options.get("grouping.grouphash_metadata.ingestion_writes_enabled"):
+            projects = {project.id: project for project, _ in project_hashes}
+            metadata_enabled = {
+                project_id: features.has(
+                    "organizations:grouphash-metadata-creation", projects[project_id].organization
+                )
+                for project_id in {project_id for project_id, _ in created}
+            }
             # For now, this just creates a record with a creation timestamp
-            GroupHashMetadata.objects.create(grouphash=grouphash)
-
-        grouphashes.append(grouphash)
-
-    return grouphashes
+            metadata = [
+                GroupHashMetadata(grouphash=grouphash)
+                for (project_id, _), grouphash in sorted(created.items())
+                if metadata_enabled[project_id]
+            ]
+            if metadata:
+                GroupHashMetadata.objects.bulk_create(metadata, ignore_conflicts=True)
+
+    metrics.distribution("grouping.grouphashes.batch_size", len(keys))
+
+    return [
+        [grouphashes[(project.id, hash_value)] for hash_value in hashes]
+        for project, hashes in project_hashes
+    ]
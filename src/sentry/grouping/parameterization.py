@@ -1,6 +1,6 @@
 import dataclasses
 import re
-from collections import defaultdict
+from collections import Counter, defaultdict
 from collections.abc import Callable, Sequence
 from functools import lru_cache
 
@@ -181,6 +181,40 @@ DEFAULT_PARAMETERIZATION_REGEXES = [
 
 DEFAULT_PARAMETERIZATION_REGEXES_MAP = {r.name: r.pattern for r in DEFAULT_PARAMETERIZATION_REGEXES}
 
+# Messages up to this length are memoized by `Parameterizer.parametrize_w_regex`
+MEMOIZE_MAX_LENGTH = 1024
+
+
+@lru_cache(maxsize=16)
+def _compile_parameterization_regex(pattern_keys: tuple[str, ...]) -> re.Pattern[str]:
+    return re.compile(
+        rf"(?x){'|'.join(DEFAULT_PARAMETERIZATION_REGEXES_MAP[k] for k in pattern_keys)}"
+    )
+
+
+def _parameterize_with_regex(
+    parameterization_regex: re.Pattern[str], content: str
+) -> tuple[str, tuple[tuple[str, int], ...]]:
+    """
+    Returns the parameterized content and the number of replacements made per pattern.
+    """
+    counts: dict[str, int] = {}
+
+    def _handle_regex_match(match: re.Match[str]) -> str:
+        # Every alternative of the combined regex is a named group wrapping the entire pattern,
+        # so the group that closed last is the one that matched. For example, given a match of
+        # the `hex` group, this returns '<hex>' as a replacement for the original value.
+        key = match.lastgroup
+        if key is None:
+            return ""
+        counts[key] = counts.get(key, 0) + 1
+        return f"<{key}>"
+
+    return parameterization_regex.sub(_handle_regex_match, content), tuple(counts.items())
+
+
+_parameterize_with_regex_memoized = lru_cache(maxsize=4096)(_parameterize_with_regex)
+
 
 @dataclasses.dataclass
 class ParameterizationCallable:
@@ -237,6 +271,7 @@ class _UniqueId:
     TOKEN_LENGTH_RATIO_LONG = 0.4
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def is_probably_uniq_id(token_str: str) -> bool:
         token_str = token_str.strip("\"'[]{}():;")
         if len(token_str) < _UniqueId.TOKEN_LENGTH_MINIMUM:
@@ -297,11 +332,11 @@ class Parameterizer:
 
         The `(?x)` tells the regex compiler to ignore comments and unescaped whitespace,
         so we can use newlines and indentation for better legibility in patterns above.
+
+        Compiled patterns are shared between instances.
         """
 
-        return re.compile(
-            rf"(?x){'|'.join(DEFAULT_PARAMETERIZATION_REGEXES_MAP[k] for k in pattern_keys)}"
-        )
+        return _compile_parameterization_regex(tuple(pattern_keys))
 
     def parametrize_w_regex(self, content: str) -> str:
         """
@@ -312,19 +347,21 @@ class Parameterizer:
         @param match_callback: An optional callback function to call with the key of the matched pattern.
 
         @returns: The content with all matches replaced with placeholders.
+
+        Results for short messages are memoized, since the same messages tend to come in over and
+        over again.
         """
 
-        def _handle_regex_match(match: re.Match[str]) -> str:
-            # Find the first (should be only) non-None match entry, and sub in the placeholder. For
-            # example, given the groupdict item `('hex', '0x40000015')`, this returns '<hex>' as a
-            # replacement for the original value in the string.
-            for key, value in match.groupdict().items():
-                if value is not None:
-                    self.matches_counter[key] += 1
-                    return f"<{key}>"
-            return ""
+        if len(content) <= MEMOIZE_MAX_LENGTH:
+            content, counts = _parameterize_with_regex_memoized(
+                self._parameterization_regex, content
+            )
+        else:
+            content, counts = _parameterize_with_regex(self._parameterization_regex, content)
 
-        return self._parameterization_regex.sub(_handle_regex_match, content)
+        for key, count in counts:
+            self.matches_counter[key] += count
+        return content
 
     def parametrize_w_experiments(
         self, content: str, should_run: Callable[[str], bool] = lambda _: True
@@ -366,3 +403,21 @@ class Parameterizer:
         self, content: str, should_run: Callable[[str], bool] = lambda _: True
     ) -> str:
         return self.parametrize_w_experiments(self.parametrize_w_regex(content), should_run)
+
+    def parameterize_all_many(
+        self, contents: Sequence[str], should_run: Callable[[str], bool] = lambda _: True
+    ) -> list[str]:
+        """
+        Parameterize a batch of messages, equivalent to calling `parameterize_all` on each of them.
+
+        Every distinct message is only parameterized once, `matches_counter` is still updated as
+        if each message had been parameterized separately.
+        """
+        results: dict[str, str] = {}
+        for content, occurrences in Counter(contents).items():
+            before = dict(self.matches_counter)
+            results[content] = self.parameterize_all(content, should_run)
+            if occurrences > 1:
+                for key, value in list(self.matches_counter.items()):
+                    self.matches_counter[key] += (value - before.get(key, 0)) * (occurrences - 1)
+        return [results[content] for content in contents]
@@ -4,7 +4,7 @@ import abc
 import contextlib
 import datetime
 import threading
-from collections.abc import Generator, Iterable, Mapping
+from collections.abc import Generator, Iterable, Mapping, Sequence
 from typing import Any, Self
 
 import sentry_sdk
@@ -32,7 +32,12 @@ from sentry.db.postgres.transactions import (
     in_test_assert_no_transaction,
 )
 from sentry.hybridcloud.outbox.category import OutboxCategory, OutboxScope
-from sentry.hybridcloud.outbox.signals import process_control_outbox, process_region_outbox
+from sentry.hybridcloud.outbox.signals import (
+    process_control_outbox,
+    process_control_outbox_batch,
+    process_region_outbox,
+    process_region_outbox_batch,
+)
 from sentry.hybridcloud.rpc import REGION_NAME_LENGTH
 from sentry.silo.base import SiloMode
 from sentry.silo.safety import unguarded_write
@@ -40,6 +45,10 @@ from sentry.utils import metrics
 
 THE_PAST = datetime.datetime(2016, 8, 1, 0, 0, 0, 0, tzinfo=datetime.UTC)
 
+# How many messages at the head of a shard are read at most to find the coalesced
+# groups of a batch, relative to the batch size.
+BATCH_SCAN_FACTOR = 10
+
 
 class OutboxFlushError(Exception):
     def __init__(self, message: str, outbox: OutboxBase) -> None:
@@ -154,6 +163,24 @@ class OutboxBase(Model):
     def select_coalesced_messages(self) -> models.QuerySet[Self]:
         return self.objects.filter(**self.key_from(self.coalesced_columns))
 
+    def select_batch(self, latest_shard_row: OutboxBase | None, batch_size: int) -> list[Self]:
+        """
+        Returns the first message of up to `batch_size` coalesced groups at the head
+        of the shard, stopping at the first message of another category so that
+        messages of different categories are still processed in order.
+        """
+        batch: dict[tuple[Any, ...], Self] = {}
+        head = self.selected_messages_in_shard(latest_shard_row=latest_shard_row).order_by("id")
+        for message in head[: batch_size * BATCH_SCAN_FACTOR]:
+            if message.category != self.category:
+                break
+            key = tuple(message.key_from(self.coalesced_columns).values())
+            if key not in batch:
+                if len(batch) == batch_size:
+                    break
+                batch[key] = message
+        return list(batch.values())
+
     class Meta:
         abstract = True
 
@@ -312,10 +339,57 @@ class OutboxBase(Model):
                 return True
         return False
 
+    def process_batch(
+        self, latest_shard_row: OutboxBase | None, batch_size: int, is_synchronous_flush: bool
+    ) -> bool:
+        """
+        Like `process`, but processes the coalesced groups of the batch starting at
+        this message with a single signal. Either all or none of the groups are
+        marked as completed.
+        """
+        with contextlib.ExitStack() as stack:
+            coalesced_messages: list[OutboxBase] = []
+            for message in self.select_batch(latest_shard_row, batch_size):
+                coalesced = stack.enter_context(
+                    message.process_coalesced(is_synchronous_flush=is_synchronous_flush)
+                )
+                if coalesced is not None:
+                    coalesced_messages.append(coalesced)
+            if not coalesced_messages or self.should_skip_shard():
+                return False
+
+            tags = {
+                "category": OutboxCategory(self.category).name,
+                "synchronous": int(is_synchronous_flush),
+            }
+            with (
+                metrics.timer("outbox.send_batch_signal.duration", tags=tags),
+                sentry_sdk.start_span(op="outbox.process_batch") as span,
+            ):
+                self._set_span_data_for_coalesced_message(span=span, message=coalesced_messages[0])
+                span.set_data("outbox_batch_size", len(coalesced_messages))
+                try:
+                    self.send_batch_signal(coalesced_messages)
+                except Exception as e:
+                    raise OutboxFlushError(
+                        f"Could not flush shard batch category={self.category} ({OutboxCategory(self.category).name})",
+                        coalesced_messages[0],
+                    ) from e
+            metrics.distribution("outbox.batch_size", len(coalesced_messages), tags=tags)
+        return True
+
     @abc.abstractmethod
     def send_signal(self) -> None:
         pass
 
+    @abc.abstractmethod
+    def has_batch_receivers(self) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def send_batch_signal(self, messages: Sequence[OutboxBase]) -> None:
+        pass
+
     def drain_shard(
         self, flush_all: bool = False, _test_processing_barrier: threading.Barrier | None = None
     ) -> None:
@@ -332,6 +406,7 @@ class OutboxBase(Model):
             if latest_shard_row is None:
                 return
 
+        batch_size: int = options.get("hybridcloud.outbox.batch-size")
         shard_row: OutboxBase | None
         while True:
             with self.process_shard(latest_shard_row) as shard_row:
@@ -341,7 +416,12 @@ class OutboxBase(Model):
                 if _test_processing_barrier:
                     _test_processing_barrier.wait()
 
-                processed = shard_row.process(is_synchronous_flush=not flush_all)
+                if batch_size > 1 and shard_row.has_batch_receivers():
+                    processed = shard_row.process_batch(
+                        latest_shard_row, batch_size, is_synchronous_flush=not flush_all
+                    )
+                else:
+                    processed = shard_row.process(is_synchronous_flush=not flush_all)
 
                 if _test_processing_barrier:
                     _test_processing_barrier.wait()
@@ -396,6 +476,12 @@ class RegionOutboxBase(OutboxBase):
             shard_scope=self.shard_scope,
         )
 
+    def has_batch_receivers(self) -> bool:
+        return process_region_outbox_batch.has_listeners(OutboxCategory(self.category))
+
+    def send_batch_signal(self, messages: Sequence[OutboxBase]) -> None:
+        process_region_outbox_batch.send(sender=OutboxCategory(self.category), messages=messages)
+
     sharding_columns = ("shard_scope", "shard_identifier")
     coalesced_columns = ("shard_scope", "shard_identifier", "category", "object_identifier")
 
@@ -455,6 +541,14 @@ class ControlOutboxBase(OutboxBase):
             scheduled_for=self.scheduled_for,
         )
 
+    def has_batch_receivers(self) -> bool:
+        return process_control_outbox_batch.has_listeners(OutboxCategory(self.category))
+
+    def send_batch_signal(self, messages: Sequence[OutboxBase]) -> None:
+        process_control_outbox_batch.send(
+            sender=OutboxCategory(self.category), messages=messages, region_name=self.region_name
+        )
+
     class Meta:
         abstract = True
 
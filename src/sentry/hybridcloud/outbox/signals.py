@@ -2,3 +2,10 @@ from django.dispatch import Signal
 
 process_region_outbox = Signal()  # ["payload", "object_identifier"]
 process_control_outbox = Signal()  # ["payload", "region_name", "object_identifier"]
+
+# Receive the coalesced messages of consecutive objects of a category at once, in
+# the order they were queued in. When batching is enabled (see
+# `hybridcloud.outbox.batch-size`), messages of categories with batch receivers are
+# sent to those instead of the receivers of single messages.
+process_region_outbox_batch = Signal()  # ["messages"]
+process_control_outbox_batch = Signal()  # ["messages", "region_name"]
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 
 import sentry_sdk
 from celery import Task
 from django.conf import settings
+from django.db import connections
 from django.db.models import Max, Min
 
+from sentry import options
 from sentry.hybridcloud.models.outbox import (
     ControlOutboxBase,
     OutboxBase,
@@ -174,33 +178,79 @@ def drain_outbox_shards_control(
 def process_outbox_batch(
     outbox_identifier_hi: int, outbox_identifier_low: int, outbox_model: type[OutboxBase]
 ) -> int:
+    """
+    Drains the scheduled shards with messages in the given id range. Shards are
+    independent of each other and can be drained concurrently by up to
+    `hybridcloud.outbox.drain-worker-threads` threads, while the messages of each
+    shard are still processed in order by a single thread.
+    """
+    worker_threads: int = options.get("hybridcloud.outbox.drain-worker-threads")
+    metrics_tags = {"outbox_name": outbox_model._meta.label, "parallel": int(worker_threads > 1)}
     processed_count: int = 0
-    for shard_attributes in outbox_model.find_scheduled_shards(
-        outbox_identifier_low, outbox_identifier_hi
-    ):
-        shard_outbox: OutboxBase | None = outbox_model.prepare_next_from_shard(shard_attributes)
-        if not shard_outbox:
-            continue
-
-        try:
+    start = time.monotonic()
+
+    shard_outboxes = (
+        shard_outbox
+        for shard_attributes in outbox_model.find_scheduled_shards(
+            outbox_identifier_low, outbox_identifier_hi
+        )
+        if (shard_outbox := outbox_model.prepare_next_from_shard(shard_attributes))
+    )
+    if worker_threads > 1:
+        with ThreadPoolExecutor(
+            max_workers=worker_threads, thread_name_prefix="outbox-drain"
+        ) as threadpool:
+            futures = []
+            for shard_outbox in shard_outboxes:
+                processed_count += 1
+                futures.append(threadpool.submit(_drain_shard_in_thread, shard_outbox))
+            for future in as_completed(futures):
+                future.result()
+    else:
+        for shard_outbox in shard_outboxes:
             processed_count += 1
-            shard_outbox.drain_shard(flush_all=True)
-        except Exception as e:
-            with sentry_sdk.isolation_scope() as scope:
-                if isinstance(e, OutboxFlushError):
-                    scope.set_tag("outbox.category", e.outbox.category)
-                    scope.set_tag("outbox.shard_scope", e.outbox.shard_scope)
-                    scope.set_context(
-                        "outbox",
-                        {
-                            "shard_identifier": e.outbox.shard_identifier,
-                            "object_identifier": e.outbox.object_identifier,
-                            "payload": e.outbox.payload,
-                        },
-                    )
-                sentry_sdk.capture_exception(e)
-                # In production, it's ok to just continue processing forward, but in tests we aim to surface
-                # problems aggressively.
-                if in_test_environment():
-                    raise
+            _drain_shard(shard_outbox)
+
+    metrics.incr("deliver_from_outbox.shards_drained", processed_count, tags=metrics_tags)
+    metrics.timing(
+        "deliver_from_outbox.process_batch.duration", time.monotonic() - start, tags=metrics_tags
+    )
     return processed_count
+
+
+def _drain_shard_in_thread(shard_outbox: OutboxBase) -> None:
+    try:
+        _drain_shard(shard_outbox)
+    finally:
+        # Worker threads get their own database connections, which aren't
+        # cleaned up by the task.
+        connections.close_all()
+
+
+def _drain_shard(shard_outbox: OutboxBase) -> None:
+    # The message prepared for a shard is the oldest one in it.
+    metrics.timing(
+        "deliver_from_outbox.shard_lag",
+        time.time() - shard_outbox.date_added.timestamp(),
+        tags={"outbox_name": type(shard_outbox)._meta.label},
+    )
+    try:
+        shard_outbox.drain_shard(flush_all=True)
+    except Exception as e:
+        with sentry_sdk.isolation_scope() as scope:
+            if isinstance(e, OutboxFlushError):
+                scope.set_tag("outbox.category", e.outbox.category)
+                scope.set_tag("outbox.shard_scope", e.outbox.shard_scope)
+                scope.set_context(
+                    "outbox",
+                    {
+                        "shard_identifier": e.outbox.shard_identifier,
+                        "object_identifier": e.outbox.object_identifier,
+                        "payload": e.outbox.payload,
+                    },
+                )
+            sentry_sdk.capture_exception(e)
+            # In production, it's ok to just continue processing forward, but in tests we aim to surface
+            # problems aggressively.
+            if in_test_environment():
+                raise
@@ -18,12 +18,20 @@ from .processors import (
     process_individual_attachment,
     process_userreport,
 )
+from .worker import get_project, track_utilization
 
 logger = logging.getLogger(__name__)
 
 
 def decode_and_process_chunks(
     raw_message: Message[KafkaPayload], consumer_type: str, reprocess_only_stuck_events: bool
+) -> IngestMessage | None:
+    with track_utilization():
+        return _decode_and_process_chunks(raw_message, consumer_type, reprocess_only_stuck_events)
+
+
+def _decode_and_process_chunks(
+    raw_message: Message[KafkaPayload], consumer_type: str, reprocess_only_stuck_events: bool
 ) -> IngestMessage | None:
     """
     The first pass for the `attachments` topic:
@@ -61,6 +69,13 @@ def decode_and_process_chunks(
 
 def process_attachments_and_events(
     raw_message: Message[IngestMessage], reprocess_only_stuck_events: bool
+) -> None:
+    with track_utilization():
+        _process_attachments_and_events(raw_message, reprocess_only_stuck_events)
+
+
+def _process_attachments_and_events(
+    raw_message: Message[IngestMessage], reprocess_only_stuck_events: bool
 ) -> None:
     """
     The second pass for the `attachments` topic processes *individual* `attachments`
@@ -80,7 +95,7 @@ def process_attachments_and_events(
 
     try:
         with metrics.timer("ingest_consumer.fetch_project"):
-            project = Project.objects.get_from_cache(id=project_id)
+            project = get_project(project_id)
     except Project.DoesNotExist:
         logger.exception("Project for ingested event does not exist: %s", project_id)
         return None
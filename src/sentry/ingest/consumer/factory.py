@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from collections.abc import Callable, Mapping
 from functools import partial
-from typing import NamedTuple, TypeVar
+from typing import Any, NamedTuple, TypeVar
 
 from arroyo.backends.kafka.consumer import KafkaPayload
 from arroyo.processing.strategies import (
@@ -12,14 +12,17 @@ from arroyo.processing.strategies import (
     ProcessingStrategyFactory,
     RunTask,
 )
+from arroyo.processing.strategies.batching import BatchStep
 from arroyo.types import Commit, FilteredPayload, Message, Partition
 
+from sentry import options
 from sentry.ingest.types import ConsumerType
 from sentry.processing.backpressure.arroyo import HealthChecker, create_backpressure_step
 from sentry.utils.arroyo import MultiprocessingPool, run_task_with_multiprocessing
 
 from .attachment_event import decode_and_process_chunks, process_attachments_and_events
-from .simple_event import process_simple_event_message
+from .simple_event import process_simple_event_message, save_simple_event_batch
+from .worker import initialize_worker
 
 
 class MultiProcessConfig(NamedTuple):
@@ -76,14 +79,26 @@ class IngestStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
         self.stop_at_timestamp = stop_at_timestamp
 
         self.multi_process = None
-        self._pool = MultiprocessingPool(num_processes)
+        # The processes of the pool load the projects recently seen by the
+        # consumer into their project cache before handling messages.
+        self._pool = MultiprocessingPool(num_processes, initializer=initialize_worker)
 
         # XXX: Attachment topic has two multiprocessing strategies chained together so we use
         # two pools.
         if self.is_attachment_topic:
-            self._attachments_pool: MultiprocessingPool | None = MultiprocessingPool(num_processes)
+            self._attachments_pool: MultiprocessingPool | None = MultiprocessingPool(
+                num_processes, initializer=initialize_worker
+            )
         else:
             self._attachments_pool = None
+        # Batches of events are saved by a separate pool, so saving them
+        # doesn't block the consumer or the processing of the next messages.
+        if consumer_type == ConsumerType.Events:
+            self._save_pool: MultiprocessingPool | None = MultiprocessingPool(
+                num_processes, initializer=initialize_worker
+            )
+        else:
+            self._save_pool = None
         if num_processes > 1:
             self.multi_process = MultiProcessConfig(
                 num_processes, max_batch_size, max_batch_time, input_block_size, output_block_size
@@ -101,12 +116,29 @@ class IngestStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
         final_step = CommitOffsets(commit)
 
         if not self.is_attachment_topic:
+            # Error events that don't need to be processed can be saved in
+            # batches right here, instead of going through `save_event` tasks.
+            save_batch_size = options.get("ingest-consumer.save-batch.max-size")
+            batch_save = self.consumer_type == ConsumerType.Events and save_batch_size > 1
+
             event_function = partial(
                 process_simple_event_message,
                 consumer_type=self.consumer_type,
                 reprocess_only_stuck_events=self.reprocess_only_stuck_events,
+                batch_save=batch_save,
             )
-            next_step = maybe_multiprocess_step(mp, event_function, final_step, self._pool)
+            if batch_save:
+                assert self._save_pool is not None
+                event_next_step: ProcessingStrategy[Any] = BatchStep(
+                    max_batch_size=save_batch_size,
+                    max_batch_time=options.get("ingest-consumer.save-batch.max-time-ms") / 1000,
+                    next_step=maybe_multiprocess_step(
+                        mp, save_simple_event_batch, final_step, self._save_pool
+                    ),
+                )
+            else:
+                event_next_step = final_step
+            next_step = maybe_multiprocess_step(mp, event_function, event_next_step, self._pool)
             return create_backpressure_step(health_checker=self.health_checker, next_step=next_step)
 
         # The `attachments` topic is a bit different, as it allows multiple event types:
@@ -159,3 +191,5 @@ class IngestStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
         self._pool.close()
         if self._attachments_pool:
             self._attachments_pool.close()
+        if self._save_pool:
+            self._save_pool.close()
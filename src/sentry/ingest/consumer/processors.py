@@ -1,7 +1,9 @@
 import functools
 import logging
-from collections.abc import Mapping, MutableMapping
-from typing import Any
+import time
+from collections import defaultdict
+from collections.abc import Mapping, MutableMapping, Sequence
+from typing import Any, NamedTuple
 
 import orjson
 import sentry_sdk
@@ -9,13 +11,14 @@ from django.conf import settings
 from django.core.cache import cache
 from usageaccountant import UsageUnit
 
-from sentry import eventstore, features
+from sentry import eventstore, features, reprocessing2
 from sentry.attachments import CachedAttachment, attachment_cache
 from sentry.event_manager import save_attachment
 from sentry.eventstore.processing import event_processing_store
 from sentry.feedback.usecases.create_feedback import FeedbackCreationSource
 from sentry.ingest.userreport import Conflict, save_userreport
 from sentry.killswitches import killswitch_matches_context
+from sentry.models.organization import Organization
 from sentry.models.project import Project
 from sentry.signals import event_accepted
 from sentry.tasks.store import preprocess_event, save_event_feedback, save_event_transaction
@@ -36,6 +39,33 @@ class Retriable(Exception):
     pass
 
 
+class BatchedEvent(NamedTuple):
+    """
+    An error event that is saved by `save_event_batch` together with the other
+    events of its project, instead of being passed on to `preprocess_event`.
+    """
+
+    cache_key: str
+    data: MutableMapping[str, Any]
+    start_time: float
+    project_id: int
+    deduplication_key: str
+    remote_addr: str | None
+
+
+def can_save_in_batch(data: Mapping[str, Any]) -> bool:
+    """
+    Whether `preprocess_event` would pass the event straight on to `save_event`,
+    without symbolicating or processing it first.
+    """
+    from sentry.stacktraces.processing import find_stacktraces_in_data
+    from sentry.tasks.store import should_process
+    from sentry.tasks.symbolication import get_symbolication_platforms
+
+    stacktraces = find_stacktraces_in_data(data)
+    return not get_symbolication_platforms(data, stacktraces) and not should_process(data)
+
+
 def trace_func(**span_kwargs):
     def wrapper(f):
         @functools.wraps(f)
@@ -56,10 +86,16 @@ def trace_func(**span_kwargs):
 @trace_func(name="ingest_consumer.process_event")
 @metrics.wraps("ingest_consumer.process_event")
 def process_event(
-    message: IngestMessage, project: Project, reprocess_only_stuck_events: bool = False
-) -> None:
+    message: IngestMessage,
+    project: Project,
+    reprocess_only_stuck_events: bool = False,
+    batch_save: bool = False,
+) -> BatchedEvent | None:
     """
     Perform some initial filtering and deserialize the message payload.
+
+    With `batch_save`, error events that can be saved right away are returned
+    instead, to be saved in a batch by `save_event_batch`.
     """
     payload = message["payload"]
     start_time = float(message["start_time"])
@@ -118,6 +154,8 @@ def process_event(
     # Parse the JSON payload. This is required to compute the cache key and
     # call process_event. The payload will be put into Kafka raw, to avoid
     # serializing it again.
+    if isinstance(payload, str):
+        payload = payload.encode()
     data = orjson.loads(payload)
 
     if project_id == settings.SENTRY_PROJECT:
@@ -148,7 +186,9 @@ def process_event(
             return
 
         with metrics.timer("ingest_consumer._store_event"):
-            cache_key = event_processing_store.store(data)
+            # The payload is stored as is, as the processing store would just
+            # encode `data` back to the same JSON.
+            cache_key = event_processing_store.store_raw(data, payload)
 
         try:
             # Records rc-processing usage broken down by
@@ -201,6 +241,17 @@ def process_event(
                     event_id=event_id,
                     project_id=project_id,
                 )
+        elif batch_save and not attachments and can_save_in_batch(data):
+            # Deduplication and `event_accepted` are taken care of once the
+            # event has actually been saved.
+            return BatchedEvent(
+                cache_key=cache_key,
+                data=data,
+                start_time=start_time,
+                project_id=project_id,
+                deduplication_key=deduplication_key,
+                remote_addr=remote_addr,
+            )
         else:
             # Preprocess this event, which spawns either process_event or
             # save_event. Pass data explicitly to avoid fetching it again from the
@@ -225,6 +276,189 @@ def process_event(
             raise
         raise Retriable(exc)
 
+    return None
+
+
+@trace_func(name="ingest_consumer.save_event_batch")
+def save_event_batch(events: Sequence[BatchedEvent]) -> None:
+    """
+    Saves a batch of error events returned by `process_event`, with one call
+    to `save_error_events_many` per project. This replaces the
+    `preprocess_event` and `save_event` tasks for those events.
+
+    If saving the events of a project fails, the events that weren't saved yet
+    are passed on to the `save_event` task one by one, so that a single bad
+    event only fails its own task.
+    """
+    events_by_project: dict[int, list[BatchedEvent]] = defaultdict(list)
+    deduplication_keys = set()
+    for event in events:
+        # The deduplication cache is only written once an event is saved
+        if event.deduplication_key in deduplication_keys:
+            continue
+        deduplication_keys.add(event.deduplication_key)
+        events_by_project[event.project_id].append(event)
+
+    start = time.monotonic()
+    for project_id, project_events in events_by_project.items():
+        try:
+            project = Project.objects.get_from_cache(id=project_id)
+            project.set_cached_field_value(
+                "organization", Organization.objects.get_from_cache(id=project.organization_id)
+            )
+        except Exception as exc:
+            # Nothing was saved yet, events of earlier projects are skipped by
+            # the deduplication check when the batch is retried.
+            raise Retriable(exc)
+
+        unsaved_events = _save_project_event_batch(project, project_events)
+        if not unsaved_events:
+            continue
+
+        metrics.incr("ingest_consumer.save_event_batch.fallback", amount=len(unsaved_events))
+        try:
+            for event in unsaved_events:
+                _save_event_in_task(event, project)
+        except Exception as exc:
+            # Scheduling a task only fails if the broker is unavailable.
+            raise Retriable(exc)
+
+    duration = time.monotonic() - start
+    metrics.distribution("ingest_consumer.save_event_batch.size", len(events))
+    metrics.distribution("ingest_consumer.save_event_batch.projects", len(events_by_project))
+    metrics.timing("ingest_consumer.save_event_batch.duration", duration)
+    if duration > 0:
+        metrics.distribution(
+            "ingest_consumer.save_event_batch.events_per_second", len(events) / duration
+        )
+
+
+def _save_event_in_task(event: BatchedEvent, project: Project) -> None:
+    from sentry.tasks.store import save_event
+
+    # The original payload is still in the processing store under the cache key.
+    save_event.delay(
+        cache_key=event.cache_key,
+        data=None,
+        start_time=event.start_time,
+        event_id=event.data["event_id"],
+        project_id=event.project_id,
+    )
+    _mark_event_handled(event)
+    event_accepted.send_robust(
+        ip=event.remote_addr, data=event.data, project=project, sender=process_event
+    )
+
+
+def _mark_event_handled(event: BatchedEvent) -> None:
+    # remember for an 1 hour that we saved this event (deduplication protection)
+    cache.set(event.deduplication_key, "", CACHE_TIMEOUT)
+
+
+def _save_project_event_batch(
+    project: Project, events: Sequence[BatchedEvent]
+) -> list[BatchedEvent]:
+    """
+    Saves the events of one project. Returns the events that weren't saved
+    because saving the batch failed, so that they can be saved one by one.
+    """
+    from sentry.event_manager import _pull_out_data, save_error_events_many
+
+    project_id = project.id
+    projects = {project.id: project}
+
+    jobs = []
+    for event in events:
+        if killswitch_matches_context(
+            "store.load-shed-save-event-projects",
+            {
+                "project_id": project_id,
+                "event_type": event.data.get("type") or "none",
+                "platform": event.data.get("platform") or "none",
+            },
+        ):
+            event_processing_store.delete_by_key(event.cache_key)
+            continue
+
+        jobs.append(
+            {
+                "data": event.data,
+                "project_id": project_id,
+                "raw": False,
+                "start_time": event.start_time,
+                "cache_key": event.cache_key,
+                "batched_event": event,
+                "inserted": False,
+            }
+        )
+
+    if not jobs:
+        return []
+
+    def on_inserted(job: MutableMapping[str, Any]) -> None:
+        job["inserted"] = True
+        # The event must not be saved again, even if the rest of the batch fails.
+        _mark_event_handled(job["batched_event"])
+
+    try:
+        _pull_out_data(jobs, projects)
+        with metrics.timer("ingest_consumer.save_event_batch.save_error_events"):
+            save_error_events_many(jobs, projects, on_inserted=on_inserted)
+    except Exception:
+        logger.exception(
+            "ingest_consumer.save_event_batch.project_failed", extra={"project_id": project_id}
+        )
+
+    unsaved_events = []
+    for job in jobs:
+        event = job["batched_event"]
+        if not job["inserted"] and not job.get("hash_discarded"):
+            unsaved_events.append(event)
+            continue
+
+        try:
+            _finish_saved_event(job, project)
+        except Exception:
+            # The event is saved already and must not be saved again.
+            logger.exception(
+                "ingest_consumer.save_event_batch.finish_failed",
+                extra={"project_id": project_id, "event_id": event.data.get("event_id")},
+            )
+
+    return unsaved_events
+
+
+def _finish_saved_event(job: MutableMapping[str, Any], project: Project) -> None:
+    from sentry.tasks.store import time_synthetic_monitoring_event
+
+    event = job["batched_event"]
+    data = job["event"].data.data
+    if not isinstance(data, dict):
+        data = dict(data.items())
+
+    if job["hash_discarded"]:
+        # The event won't show up in post-processing
+        event_processing_store.delete_by_key(event.cache_key)
+        _mark_event_handled(event)
+    else:
+        # Put the updated event back into the cache so that post_process
+        # has the most recent data.
+        event_processing_store.store(data)
+
+    reprocessing2.mark_event_reprocessed(data)
+    metrics.timing(
+        "events.time-to-process",
+        time.time() - event.start_time,
+        instance=data["platform"],
+        tags={
+            "is_reprocessing2": "true" if reprocessing2.is_reprocessed_event(data) else "false",
+        },
+    )
+    time_synthetic_monitoring_event(data, project.id, event.start_time)
+    event_accepted.send_robust(
+        ip=event.remote_addr, data=event.data, project=project, sender=process_event
+    )
+
 
 @trace_func(name="ingest_consumer.process_attachment_chunk")
 @metrics.wraps("ingest_consumer.process_attachment_chunk")
@@ -3,19 +3,24 @@ import logging
 import msgpack
 from arroyo.backends.kafka.consumer import KafkaPayload
 from arroyo.dlq import InvalidMessage
-from arroyo.types import BrokerValue, Message
+from arroyo.processing.strategies.batching import ValuesBatch
+from arroyo.types import FILTERED_PAYLOAD, BrokerValue, FilteredPayload, Message
 
 from sentry.models.project import Project
 from sentry.utils import metrics
 
-from .processors import IngestMessage, Retriable, process_event
+from .processors import BatchedEvent, IngestMessage, Retriable, process_event, save_event_batch
+from .worker import get_project, track_utilization
 
 logger = logging.getLogger(__name__)
 
 
 def process_simple_event_message(
-    raw_message: Message[KafkaPayload], consumer_type: str, reprocess_only_stuck_events: bool
-) -> None:
+    raw_message: Message[KafkaPayload],
+    consumer_type: str,
+    reprocess_only_stuck_events: bool,
+    batch_save: bool = False,
+) -> BatchedEvent | FilteredPayload | None:
     """
     Processes a single Kafka Message containing a "simple" Event payload.
 
@@ -28,8 +33,23 @@ def process_simple_event_message(
     - Store the JSON payload in the event processing store, and pass it on to
       `preprocess_event`, which will schedule a followup task such as
       `symbolicate_event` or `process_event`.
+
+    With `batch_save`, error events that don't need to be processed are
+    returned instead, and saved by `save_simple_event_batch`. All other
+    messages are filtered out of the batch.
     """
+    with track_utilization():
+        return _process_simple_event_message(
+            raw_message, consumer_type, reprocess_only_stuck_events, batch_save
+        )
+
 
+def _process_simple_event_message(
+    raw_message: Message[KafkaPayload],
+    consumer_type: str,
+    reprocess_only_stuck_events: bool,
+    batch_save: bool,
+) -> BatchedEvent | FilteredPayload | None:
     raw_payload = raw_message.payload.value
     metrics.distribution(
         "ingest_consumer.payload_size",
@@ -49,12 +69,17 @@ def process_simple_event_message(
 
         try:
             with metrics.timer("ingest_consumer.fetch_project"):
-                project = Project.objects.get_from_cache(id=project_id)
+                project = get_project(project_id)
         except Project.DoesNotExist:
             logger.exception("Project for ingested event does not exist: %s", project_id)
-            return
+            return FILTERED_PAYLOAD if batch_save else None
 
-        return process_event(message, project, reprocess_only_stuck_events)
+        batched_event = process_event(
+            message, project, reprocess_only_stuck_events, batch_save=batch_save
+        )
+        if batch_save and batched_event is None:
+            return FILTERED_PAYLOAD
+        return batched_event
 
     except Exception as exc:
         # If the retriable exception was raised, we should not DLQ
@@ -64,3 +89,11 @@ def process_simple_event_message(
         raw_value = raw_message.value
         assert isinstance(raw_value, BrokerValue)
         raise InvalidMessage(raw_value.partition, raw_value.offset) from exc
+
+
+def save_simple_event_batch(raw_message: Message[ValuesBatch[BatchedEvent]]) -> None:
+    """
+    Saves the events batched up from `process_simple_event_message`.
+    """
+    with track_utilization():
+        save_event_batch([value.payload for value in raw_message.payload])
@@ -0,0 +1,185 @@
+"""
+State kept by each process of the ingest consumer.
+
+With multiprocessing, every message is handled by one of the processes of the
+consumer's pool, each of which would otherwise fetch the project of every
+message from the shared cache. Instead, each process keeps the projects it has
+seen in a local, read-mostly cache, refreshed after
+``ingest-consumer.project-cache.ttl-seconds``.
+
+The processes periodically publish the ids of the projects they have recently
+seen to the shared cache, and new processes load those projects before they
+start handling messages, so that restarting a consumer doesn't start with a
+cold cache in every process.
+
+Each process also reports how much of its time was spent handling messages.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Generator, Iterable
+from contextlib import contextmanager
+
+from sentry import options
+from sentry.models.organization import Organization
+from sentry.models.project import Project
+from sentry.utils import metrics
+from sentry.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+HOT_PROJECTS_CACHE_KEY = "ingest-consumer:hot-projects"
+HOT_PROJECTS_CACHE_TTL = 3600
+MAX_HOT_PROJECTS = 1000
+REPORT_INTERVAL = 10
+
+
+class ProjectCache:
+    def __init__(self, ttl: float, max_size: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._projects: OrderedDict[int, tuple[Project, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._projects)
+
+    def get(self, project_id: int) -> Project:
+        """
+        Returns the project with its organization loaded. Raises
+        `Project.DoesNotExist` like `Project.objects.get_from_cache`.
+        """
+        with self._lock:
+            entry = self._projects.get(project_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._projects.move_to_end(project_id)
+                metrics.incr("ingest_consumer.project_cache", tags={"result": "hit"})
+                return entry[0]
+
+        metrics.incr("ingest_consumer.project_cache", tags={"result": "miss"})
+        project = Project.objects.get_from_cache(id=project_id)
+        self._add(project)
+        return project
+
+    def warm(self, project_ids: Iterable[int]) -> None:
+        for project in Project.objects.get_many_from_cache(list(project_ids)):
+            self._add(project)
+
+    def project_ids(self) -> list[int]:
+        """
+        Returns the ids of the cached projects, the most recently used first.
+        """
+        with self._lock:
+            return list(reversed(self._projects))
+
+    def _add(self, project: Project) -> None:
+        try:
+            project.set_cached_field_value(
+                "organization", Organization.objects.get_from_cache(id=project.organization_id)
+            )
+        except Organization.DoesNotExist:
+            pass
+
+        with self._lock:
+            self._projects[project.id] = (project, time.monotonic() + self.ttl)
+            self._projects.move_to_end(project.id)
+            while len(self._projects) > self.max_size:
+                self._projects.popitem(last=False)
+
+
+class UtilizationTracker:
+    """
+    Measures the share of wall-clock time the process spent handling messages,
+    reported every `interval` seconds.
+    """
+
+    def __init__(self, interval: float = REPORT_INTERVAL) -> None:
+        self.interval = interval
+        self._period_start = time.monotonic()
+        self._busy = 0.0
+        self._messages = 0
+
+    @contextmanager
+    def track(self) -> Generator[None, None, None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+            self._busy += end - start
+            self._messages += 1
+            if end - self._period_start >= self.interval:
+                self._report(end)
+
+    def _report(self, now: float) -> None:
+        elapsed = now - self._period_start
+        metrics.distribution("ingest_consumer.worker.utilization", self._busy / elapsed)
+        metrics.distribution("ingest_consumer.worker.messages", self._messages)
+        self._period_start = now
+        self._busy = 0.0
+        self._messages = 0
+        publish_hot_projects()
+
+
+_project_cache: ProjectCache | None = None
+_utilization = UtilizationTracker()
+
+
+def get_project_cache() -> ProjectCache | None:
+    global _project_cache
+
+    ttl = options.get("ingest-consumer.project-cache.ttl-seconds")
+    if not ttl:
+        return None
+    if _project_cache is None or _project_cache.ttl != ttl:
+        _project_cache = ProjectCache(ttl=ttl)
+    return _project_cache
+
+
+def get_project(project_id: int) -> Project:
+    project_cache = get_project_cache()
+    if project_cache is None:
+        return Project.objects.get_from_cache(id=project_id)
+    return project_cache.get(project_id)
+
+
+@contextmanager
+def track_utilization() -> Generator[None, None, None]:
+    with _utilization.track():
+        yield
+
+
+def publish_hot_projects() -> None:
+    project_cache = get_project_cache()
+    if project_cache is None or not len(project_cache):
+        return
+
+    try:
+        hot_project_ids = cache.get(HOT_PROJECTS_CACHE_KEY) or []
+        # The processes of a consumer mostly see the same projects, so the
+        # projects of this process go first and the rest is kept for others.
+        project_ids = project_cache.project_ids() + list(hot_project_ids)
+        project_ids = list(dict.fromkeys(project_ids))[:MAX_HOT_PROJECTS]
+        cache.set(HOT_PROJECTS_CACHE_KEY, project_ids, HOT_PROJECTS_CACHE_TTL)
+    except Exception:
+        logger.exception("Failed to publish hot projects")
+
+
+def initialize_worker() -> None:
+    """
+    Initializer of the processes of the consumer's pool, which loads the
+    projects recently seen by the consumer before handling any messages.
+    """
+    project_cache = get_project_cache()
+    if project_cache is None:
+        return
+
+    try:
+        with metrics.timer("ingest_consumer.worker.warm_up"):
+            project_cache.warm(cache.get(HOT_PROJECTS_CACHE_KEY) or [])
+    except Exception:
+        logger.exception("Failed to warm up the project cache")
@@ -45,6 +45,7 @@ from sentry.sentry_apps.api.serializers.platform_external_issue import (
 )
 from sentry.sentry_apps.models.platformexternalissue import PlatformExternalIssue
 from sentry.tasks.post_process import fetch_buffered_group_stats
+from sentry.tsdb.base import RangeQuery
 from sentry.types.ratelimit import RateLimit, RateLimitCategory
 from sentry.users.services.user.service import user_service
 from sentry.utils import metrics
@@ -108,28 +109,29 @@ class GroupDetailsEndpoint(GroupEndpoint, EnvironmentMixin):
     def __group_hourly_daily_stats(group: Group, environment_ids: Sequence[int]):
         model = get_issue_tsdb_group_model(group.issue_category)
         now = timezone.now()
-        hourly_stats = tsdb.backend.rollup(
-            tsdb.backend.get_range(
-                model=model,
-                keys=[group.id],
-                end=now,
-                start=now - timedelta(days=1),
-                environment_ids=environment_ids,
-                tenant_ids={"organization_id": group.project.organization_id},
-            ),
-            3600,
-        )[group.id]
-        daily_stats = tsdb.backend.rollup(
-            tsdb.backend.get_range(
-                model=model,
-                keys=[group.id],
-                end=now,
-                start=now - timedelta(days=30),
-                environment_ids=environment_ids,
-                tenant_ids={"organization_id": group.project.organization_id},
-            ),
-            3600 * 24,
-        )[group.id]
+        tenant_ids = {"organization_id": group.project.organization_id}
+        hourly, daily = tsdb.backend.execute_batch(
+            [
+                RangeQuery(
+                    model=model,
+                    keys=[group.id],
+                    start=now - timedelta(days=1),
+                    end=now,
+                    environment_ids=environment_ids,
+                    tenant_ids=tenant_ids,
+                ),
+                RangeQuery(
+                    model=model,
+                    keys=[group.id],
+                    start=now - timedelta(days=30),
+                    end=now,
+                    environment_ids=environment_ids,
+                    tenant_ids=tenant_ids,
+                ),
+            ]
+        ).results
+        hourly_stats = tsdb.backend.rollup(hourly, 3600)[group.id]
+        daily_stats = tsdb.backend.rollup(daily, 3600 * 24)[group.id]
 
         return hourly_stats, daily_stats
 
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import mimetypes
+import tempfile
 from dataclasses import dataclass
 from hashlib import sha1
 from io import BytesIO
@@ -17,11 +18,19 @@ from sentry.backup.scopes import RelocationScope
 from sentry.db.models import BoundedBigIntegerField, Model, region_silo_model, sane_repr
 from sentry.db.models.fields.bounded import BoundedIntegerField
 from sentry.db.models.manager.base_query_set import BaseQuerySet
-from sentry.models.files.utils import get_size_and_checksum, get_storage
+from sentry.models.files.utils import get_storage
 
 # Attachment file types that are considered a crash report (PII relevant)
 CRASH_REPORT_TYPES = ("event.minidump", "event.applecrashreport")
 
+# Attachments shorter than this may be stored inline, see `can_store_inline`.
+MAX_INLINE_SIZE = 192
+# Size of the reads from the attachment cache when storing attachments.
+READ_SIZE = 1024 * 1024
+# Compressed attachments larger than this are buffered on disk before they are
+# uploaded.
+MAX_SPOOLED_SIZE = 8 * 1024 * 1024
+
 
 def get_crashreport_key(group_id: int) -> str:
     """
@@ -59,7 +68,7 @@ def can_store_inline(data: bytes) -> bool:
     That is the case when it is shorter than 192 bytes,
     and all the bytes are non-NULL ASCII.
     """
-    return len(data) < 192 and all(byte > 0x00 and byte < 0x7F for byte in data)
+    return len(data) < MAX_INLINE_SIZE and all(byte > 0x00 and byte < 0x7F for byte in data)
 
 
 @region_silo_model
@@ -168,29 +177,49 @@ class EventAttachment(Model):
 
     @classmethod
     def putfile(cls, project_id: int, attachment: CachedAttachment) -> PutfileResult:
+        """
+        Stores the data of `attachment`, streaming it from the attachment cache.
+
+        Raises `MissingAttachmentChunks` if the data has expired from the cache, in
+        which case nothing is stored.
+        """
         from sentry.models.files import FileBlob
 
         content_type = normalize_content_type(attachment.content_type, attachment.name)
-        data = attachment.data
-
-        if len(data) == 0:
-            return PutfileResult(content_type=content_type, size=0, sha1=sha1().hexdigest())
 
-        blob = BytesIO(data)
+        with attachment.open() as reader:
+            head = reader.read(MAX_INLINE_SIZE)
+            if len(head) == 0:
+                return PutfileResult(content_type=content_type, size=0, sha1=sha1().hexdigest())
 
-        size, checksum = get_size_and_checksum(blob)
+            if can_store_inline(head):
+                return PutfileResult(
+                    content_type=content_type,
+                    size=len(head),
+                    sha1=sha1(head).hexdigest(),
+                    blob_path=":" + head.decode(),
+                )
 
-        if can_store_inline(data):
-            blob_path = ":" + data.decode()
-        else:
             blob_path = "eventattachments/v1/" + FileBlob.generate_unique_path()
-
-            storage = get_storage()
-            compressed_blob = BytesIO(zstandard.compress(data))
-            storage.save(blob_path, compressed_blob)
+            size = 0
+            checksum = sha1()
+            with tempfile.SpooledTemporaryFile(max_size=MAX_SPOOLED_SIZE) as compressed_blob:
+                with zstandard.ZstdCompressor().stream_writer(
+                    compressed_blob, closefd=False
+                ) as compressor:
+                    chunk = head
+                    while chunk:
+                        size += len(chunk)
+                        checksum.update(chunk)
+                        compressor.write(chunk)
+                        chunk = reader.read(READ_SIZE)
+
+                compressed_blob.seek(0)
+                storage = get_storage()
+                storage.save(blob_path, compressed_blob)
 
         return PutfileResult(
-            content_type=content_type, size=size, sha1=checksum, blob_path=blob_path
+            content_type=content_type, size=size, sha1=checksum.hexdigest(), blob_path=blob_path
         )
 
 
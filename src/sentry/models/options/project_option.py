@@ -134,6 +134,38 @@ class ProjectOptionManager(OptionManager["ProjectOption"]):
 
         return self._option_cache.get(cache_key, {})
 
+    def get_all_values_bulk(
+        self, projects: Sequence[Project | int]
+    ) -> Mapping[int, Mapping[str, Any]]:
+        """
+        Like `get_all_values` for many projects, with one cache lookup for all projects
+        missing from the local cache and one query for all projects missing from the cache.
+        """
+        project_ids = [
+            project.id if isinstance(project, models.Model) else project for project in projects
+        ]
+        cache_keys = {project_id: self._make_key(project_id) for project_id in project_ids}
+
+        missing = [key for key in cache_keys.values() if key not in self._option_cache]
+        if missing:
+            self._option_cache.update(cache.get_many(missing))
+
+        missing_ids = [
+            project_id for project_id, key in cache_keys.items() if key not in self._option_cache
+        ]
+        if missing_ids:
+            results: dict[str, dict[str, Any]] = {
+                cache_keys[project_id]: {} for project_id in missing_ids
+            }
+            for option in self.filter(project__in=missing_ids):
+                results[cache_keys[option.project_id]][option.key] = option.value
+            cache.set_many(results)
+            self._option_cache.update(results)
+
+        return {
+            project_id: self._option_cache.get(key, {}) for project_id, key in cache_keys.items()
+        }
+
     def reload_cache(self, project_id: int, update_reason: str) -> Mapping[str, Any]:
         from sentry.tasks.relay import schedule_invalidate_project_config
 
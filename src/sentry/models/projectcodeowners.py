@@ -13,6 +13,7 @@ from sentry.backup.scopes import RelocationScope
 from sentry.db.models import FlexibleForeignKey, JSONField, Model, region_silo_model, sane_repr
 from sentry.models.organization import Organization
 from sentry.ownership.grammar import convert_codeowners_syntax, create_schema_from_issue_owners
+from sentry.ownership.index import new_schema_version, set_schema_version
 from sentry.utils.cache import cache
 
 logger = logging.getLogger(__name__)
@@ -60,6 +61,8 @@ class ProjectCodeOwners(Model):
         if code_owners is None:
             query = self.objects.filter(project_id=project_id).order_by("-date_added") or ()
             code_owners = self.merge_code_owners_list(code_owners_list=query) if query else query
+            if code_owners:
+                set_schema_version(code_owners, new_schema_version())
             cache.set(cache_key, code_owners, READ_CACHE_DURATION)
 
         return code_owners or None
@@ -18,6 +18,13 @@ from sentry.models.activity import Activity
 from sentry.models.group import Group
 from sentry.models.groupowner import OwnerRuleType
 from sentry.ownership.grammar import Matcher, Rule, load_schema, resolve_actors
+from sentry.ownership.index import (
+    MIN_INDEXED_RULES,
+    get_ownership_index,
+    get_schema_version,
+    new_schema_version,
+    set_schema_version,
+)
 from sentry.types.activity import ActivityType
 from sentry.types.actor import Actor
 from sentry.utils import metrics
@@ -101,6 +108,8 @@ class ProjectOwnership(Model):
                 ownership = cls.objects.get(project_id=project_id)
             except cls.DoesNotExist:
                 ownership = False
+            else:
+                set_schema_version(ownership, new_schema_version())
             cache.set(cache_key, ownership, READ_CACHE_DURATION)
         return ownership or None
 
@@ -125,6 +134,15 @@ class ProjectOwnership(Model):
             ownership = cls(project_id=project_id)
 
         codeowners = ProjectCodeOwners.get_codeowners_cached(project_id)
+        if codeowners and codeowners.schema:
+            ownership_version = get_schema_version(ownership)
+            codeowners_version = get_schema_version(codeowners)
+            combined_version = None
+            if ownership_version and codeowners_version:
+                combined_version = f"{ownership_version}:{codeowners_version}"
+            elif not ownership.schema:
+                combined_version = codeowners_version
+            set_schema_version(ownership, combined_version)
         ownership.schema = cls.get_combined_schema(ownership, codeowners)
 
         rules = cls._matching_ownership_rules(ownership, data)
@@ -361,6 +379,13 @@ class ProjectOwnership(Model):
     ) -> Sequence[Rule]:
         rules = []
         if ownership.schema is not None:
+            if (
+                options.get("ownership.compiled-index.enabled")
+                and len(ownership.schema["rules"]) >= MIN_INDEXED_RULES
+            ):
+                index = get_ownership_index(ownership.schema, get_schema_version(ownership))
+                return index.matching_rules(data)
+
             munged_data = None
             if options.get("ownership.munge_data_for_performance"):
                 munged_data = Matcher.munge_if_needed(data)
@@ -375,6 +400,8 @@ def process_resource_change(instance, change, **kwargs):
     from sentry.models.groupowner import GroupOwner
     from sentry.models.projectownership import ProjectOwnership
 
+    if change == "updated":
+        set_schema_version(instance, new_schema_version())
     cache.set(
         ProjectOwnership.get_cache_key(instance.project_id),
         instance if change == "updated" else None,
@@ -10,6 +10,8 @@ from django.core.cache import BaseCache, InvalidCacheBackendError, caches
 from django.utils.functional import cached_property
 
 from sentry import options
+from sentry.nodestore.compression import get_compressor, get_decompressor
+from sentry.nodestore.local_cache import get_local_cache, publish_invalidations
 from sentry.utils import json, metrics
 from sentry.utils.services import Service
 
@@ -125,7 +127,7 @@ class NodeStorage(local, Service):
         >>> nodestore._get_bytes('key1')
         b'{"message": "hello world"}'
         """
-        return self._get_bytes(id)
+        return self._decompress(self._get_bytes(id))
 
     def _get_bytes(self, id: str) -> bytes | None:
         raise NotImplementedError
@@ -148,10 +150,13 @@ class NodeStorage(local, Service):
 
             span.set_tag("subkey", str(subkey))
             bytes_data = self._get_bytes(id)
-            rv = self._decode(bytes_data, subkey=subkey)
+            decompressed = self._decompress(bytes_data)
+            rv = self._decode(decompressed, subkey=subkey)
             if subkey is None:
                 # set cache item only after we know decoding did not fail
                 self._set_cache_item(id, rv)
+                if rv:
+                    self._set_local_cache_item(id, decompressed)
 
             span.set_tag("result", "from_service")
             if bytes_data:
@@ -194,12 +199,17 @@ class NodeStorage(local, Service):
                 uncached_ids = id_list
 
             with sentry_sdk.start_span(op="nodestore._get_bytes_multi_and_decode") as span:
-                items = {
-                    id: self._decode(value, subkey=subkey)
-                    for id, value in self._get_bytes_multi(uncached_ids).items()
-                }
+                items = {}
+                encoded = {}
+                for id, value in self._get_bytes_multi(uncached_ids).items():
+                    decompressed = self._decompress(value)
+                    items[id] = self._decode(decompressed, subkey=subkey)
+                    if items[id]:
+                        encoded[id] = decompressed
             if subkey is None:
                 self._set_cache_items(items)
+                for id, value in encoded.items():
+                    self._set_local_cache_item(id, value)
                 items.update(cache_items)
 
             span.set_tag("result", "from_service")
@@ -224,10 +234,24 @@ class NodeStorage(local, Service):
 
         return b"\n".join(lines)
 
+    def _compress(self, data: bytes) -> bytes:
+        """
+        Compresses an encoded payload with the configured zstd dictionary, see
+        `sentry.nodestore.compression`. Payloads are left untouched if no
+        dictionary is enabled for writes.
+        """
+        return get_compressor().compress(data)
+
+    def _decompress(self, value: bytes | None) -> bytes | None:
+        if value is None:
+            return None
+        return get_decompressor().decompress(value)
+
     def set_bytes(self, item_id: str, data: bytes, ttl: timedelta | None = None) -> None:
         """
         >>> nodestore.set_bytes('key1', b"{'foo': 'bar'}")
         """
+        data = self._compress(data)
         metrics.distribution("nodestore.set_bytes", len(data))
         return self._set_bytes(item_id, data, ttl)
 
@@ -261,11 +285,16 @@ class NodeStorage(local, Service):
         {'foo': 'bam'}
         """
         cache_item = data.get(None)
-        bytes_data = self._encode(data)
-        self.set_bytes(item_id, bytes_data, ttl=ttl)
+        encoded = self._encode(data)
+        self.set_bytes(item_id, encoded, ttl=ttl)
         # set cache only after encoding and write to nodestore has succeeded
         if options.get("nodestore.set-subkeys.enable-set-cache-item"):
             self._set_cache_item(item_id, cache_item)
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            publish_invalidations([item_id])
+            # The encoded payload is a copy, the writer may keep mutating `data`
+            self._set_local_cache_item(item_id, encoded)
 
     def cleanup(self, cutoff_timestamp: datetime) -> None:
         raise NotImplementedError
@@ -274,15 +303,69 @@ class NodeStorage(local, Service):
         raise NotImplementedError
 
     def _get_cache_item(self, item_id: str) -> Any | None:
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            rv = self._decode(local_cache.get(item_id), subkey=None)
+            metrics.incr(
+                "nodestore.cache",
+                tags={"tier": "local", "result": "miss" if rv is None else "hit"},
+            )
+            if rv is not None:
+                return rv
+
         if self.cache:
-            return self.cache.get(item_id)
+            rv = self.cache.get(item_id)
+            metrics.incr(
+                "nodestore.cache",
+                tags={"tier": "django", "result": "miss" if rv is None else "hit"},
+            )
+            if rv and local_cache is not None:
+                self._set_local_cache_item(item_id, json_dumps(rv).encode("utf8"))
+            return rv
         return None
 
     @sentry_sdk.tracing.trace
     def _get_cache_items(self, id_list: list[str]) -> dict[str, Any]:
+        items: dict[str, Any] = {}
+
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            items = {
+                id: self._decode(value, subkey=None)
+                for id, value in local_cache.get_many(id_list).items()
+            }
+            self._record_cache_lookups("local", len(id_list), len(items))
+            if len(items) == len(id_list):
+                return items
+            id_list = [id for id in id_list if id not in items]
+
         if self.cache:
-            return self.cache.get_many(id_list)
-        return {}
+            cache_items = self.cache.get_many(id_list)
+            self._record_cache_lookups("django", len(id_list), len(cache_items))
+            items.update(cache_items)
+            if local_cache is not None:
+                for id, value in cache_items.items():
+                    if value:
+                        self._set_local_cache_item(id, json_dumps(value).encode("utf8"))
+        return items
+
+    def _record_cache_lookups(self, tier: str, lookups: int, hits: int) -> None:
+        if hits:
+            metrics.incr("nodestore.cache", amount=hits, tags={"tier": tier, "result": "hit"})
+        if lookups > hits:
+            metrics.incr(
+                "nodestore.cache", amount=lookups - hits, tags={"tier": tier, "result": "miss"}
+            )
+
+    def _set_local_cache_item(self, item_id: str, decompressed: bytes) -> None:
+        """
+        Payloads are added to the process-local tier on writes and on reads from
+        the backend or the Django cache. Only the encoded default payload is
+        kept, without the subkeys.
+        """
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_cache.set(item_id, decompressed.split(b"\n", 1)[0])
 
     def _set_cache_item(self, item_id: str, data: Any) -> None:
         if self.cache and data:
@@ -294,12 +377,22 @@ class NodeStorage(local, Service):
             self.cache.set_many(items)
 
     def _delete_cache_item(self, item_id: str) -> None:
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_cache.delete(item_id)
         if self.cache:
             self.cache.delete(item_id)
+        if local_cache is not None:
+            publish_invalidations([item_id])
 
     def _delete_cache_items(self, id_list: list[str]) -> None:
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_cache.delete_many(id_list)
         if self.cache:
             self.cache.delete_many([item_id for item_id in id_list])
+        if local_cache is not None:
+            publish_invalidations(id_list)
 
     @cached_property
     def cache(self) -> BaseCache | None:
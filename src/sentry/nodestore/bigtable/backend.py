@@ -7,6 +7,7 @@ from typing import Any
 import sentry_sdk
 
 from sentry.nodestore.base import NodeStorage
+from sentry.nodestore.compression import is_dictionary_compressed
 from sentry.utils.kvstore.bigtable import BigtableKVStorage
 
 
@@ -73,7 +74,7 @@ class BigtableNodeStorage(NodeStorage):
         return rv
 
     def _set_bytes(self, id: str, data: Any, ttl: timedelta | None = None) -> None:
-        self.store.set(id, data, ttl)
+        self.store.set(id, data, ttl, compress=not is_dictionary_compressed(data))
 
     def delete(self, id: str) -> None:
         if self.skip_deletes:
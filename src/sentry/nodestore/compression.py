@@ -0,0 +1,187 @@
+"""
+Dictionary-based zstd compression for nodestore payloads.
+
+Event payloads of one installation are highly repetitive (SDK metadata,
+contexts, module lists, ...), which makes them a good fit for zstd with a
+pre-trained dictionary: small blobs compress much better than they do on
+their own, and decompression gets faster as well.
+
+Compressed blobs are framed with a small header that carries the id of the
+dictionary that was used::
+
+    b"\\x00zd" | dictionary id (uint32, big endian) | zstd frame
+
+Neither JSON payloads (``{``) nor legacy pickled payloads can start with a NUL
+byte, so blobs without the header are returned unchanged. This means enabling,
+switching or disabling dictionaries never breaks reading existing data, as
+long as every dictionary that was ever written with stays listed in
+``SENTRY_NODESTORE_COMPRESSION_DICTIONARIES``.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+import threading
+from collections.abc import Iterable, Mapping, Sequence
+from functools import lru_cache
+
+import zstandard
+from django.conf import settings
+
+from sentry import options
+from sentry.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"\x00zd"
+HEADER = struct.Struct(">3sI")
+
+DEFAULT_DICTIONARY_SIZE = 110 * 1024
+DEFAULT_COMPRESSION_LEVEL = 3
+
+
+class UnknownDictionary(Exception):
+    pass
+
+
+def is_dictionary_compressed(value: bytes) -> bool:
+    """
+    Whether `value` was written by `DictionaryCompressor.compress`. Such blobs
+    don't shrink any further, so backends store them without compressing them
+    again.
+    """
+    return value.startswith(MAGIC)
+
+
+def train_dictionary(
+    samples: Iterable[bytes],
+    dict_id: int,
+    dict_size: int = DEFAULT_DICTIONARY_SIZE,
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+) -> bytes:
+    """
+    Trains a zstd dictionary from sampled nodestore payloads (as returned by
+    `NodeStorage._encode`). `dict_id` must be unique across all dictionaries
+    that have ever been used to write data.
+    """
+    assert dict_id > 0, "dictionary id 0 is reserved by zstd"
+    return zstandard.train_dictionary(
+        dict_size, list(samples), dict_id=dict_id, level=level
+    ).as_bytes()
+
+
+@lru_cache(maxsize=8)
+def _load_dictionaries(paths: tuple[str, ...]) -> Mapping[int, zstandard.ZstdCompressionDict]:
+    dictionaries = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            dictionary = zstandard.ZstdCompressionDict(f.read())
+        dictionaries[dictionary.dict_id()] = dictionary
+    return dictionaries
+
+
+class DictionaryCompressor:
+    """
+    Compresses blobs with the dictionary `write_dict_id` (or leaves them
+    alone if it is `None`) and decompresses blobs written with any of the
+    known `dictionaries`.
+
+    zstd (de)compressor objects are not thread-safe, so they are kept per
+    thread.
+    """
+
+    def __init__(
+        self,
+        dictionaries: Mapping[int, zstandard.ZstdCompressionDict],
+        write_dict_id: int | None = None,
+        level: int = DEFAULT_COMPRESSION_LEVEL,
+    ) -> None:
+        if write_dict_id is not None and write_dict_id not in dictionaries:
+            raise UnknownDictionary(write_dict_id)
+        self.dictionaries = dictionaries
+        self.write_dict_id = write_dict_id
+        self.level = level
+        self._local = threading.local()
+
+    def _compressor(self, dict_id: int) -> zstandard.ZstdCompressor:
+        compressors = self._local.__dict__.setdefault("compressors", {})
+        if dict_id not in compressors:
+            compressors[dict_id] = zstandard.ZstdCompressor(
+                level=self.level, dict_data=self.dictionaries[dict_id]
+            )
+        return compressors[dict_id]
+
+    def _decompressor(self, dict_id: int) -> zstandard.ZstdDecompressor:
+        decompressors = self._local.__dict__.setdefault("decompressors", {})
+        if dict_id not in decompressors:
+            try:
+                dictionary = self.dictionaries[dict_id]
+            except KeyError:
+                raise UnknownDictionary(dict_id)
+            decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return decompressors[dict_id]
+
+    def compress(self, data: bytes) -> bytes:
+        if self.write_dict_id is None:
+            return data
+        compressed = HEADER.pack(MAGIC, self.write_dict_id) + self._compressor(
+            self.write_dict_id
+        ).compress(data)
+        metrics.distribution(
+            "nodestore.dictionary_compression.ratio",
+            len(data) / len(compressed),
+            tags={"dict_id": self.write_dict_id},
+        )
+        return compressed
+
+    def decompress(self, value: bytes) -> bytes:
+        if not is_dictionary_compressed(value):
+            return value
+        _, dict_id = HEADER.unpack_from(value)
+        return self._decompressor(dict_id).decompress(value[HEADER.size :])
+
+
+_compressors: dict[tuple[tuple[str, ...], int | None], DictionaryCompressor] = {}
+
+
+def _get_paths(paths: Sequence[str] | None) -> tuple[str, ...]:
+    if paths is None:
+        paths = settings.SENTRY_NODESTORE_COMPRESSION_DICTIONARIES
+    return tuple(paths)
+
+
+def get_compressor(paths: Sequence[str] | None = None) -> DictionaryCompressor:
+    """
+    Returns the compressor for the configured dictionaries. New blobs are
+    written with the dictionary selected by the
+    ``nodestore.zstd-dictionary.write-id`` option (0 disables dictionary
+    compression for writes).
+    """
+    key_paths = _get_paths(paths)
+    write_dict_id = options.get("nodestore.zstd-dictionary.write-id") or None
+
+    key = (key_paths, write_dict_id)
+    if key not in _compressors:
+        dictionaries = _load_dictionaries(key_paths)
+        if write_dict_id is not None and write_dict_id not in dictionaries:
+            # Never fail writes over a misconfigured option, just don't use a dictionary.
+            logger.error(
+                "nodestore.dictionary_compression.unknown_dictionary",
+                extra={"dict_id": write_dict_id},
+            )
+            write_dict_id = None
+        _compressors[key] = DictionaryCompressor(dictionaries, write_dict_id)
+    return _compressors[key]
+
+
+def get_decompressor(paths: Sequence[str] | None = None) -> DictionaryCompressor:
+    """
+    Returns a compressor that can decompress blobs written with any of the
+    configured dictionaries. Unlike `get_compressor` it doesn't depend on the
+    write option, so reads never look it up.
+    """
+    key = (_get_paths(paths), None)
+    if key not in _compressors:
+        _compressors[key] = DictionaryCompressor(_load_dictionaries(key[0]))
+    return _compressors[key]
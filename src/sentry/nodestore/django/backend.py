@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import base64
 import logging
 import math
 import pickle
+import zlib
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -10,13 +12,30 @@ from django.utils import timezone
 
 from sentry.db.models.query import create_or_update
 from sentry.nodestore.base import NodeStorage
-from sentry.utils.strings import compress, decompress
+from sentry.nodestore.compression import is_dictionary_compressed
+from sentry.nodestore.local_cache import get_local_cache
+from sentry.utils.strings import compress
 
 from .models import Node
 
 logger = logging.getLogger("sentry")
 
 
+def _compress(data: bytes) -> str:
+    # Dictionary-compressed payloads are only base64 encoded. A zlib stream never
+    # starts with the NUL byte of their header, which tells them apart on reads.
+    if is_dictionary_compressed(data):
+        return base64.b64encode(data).decode("utf-8")
+    return compress(data)
+
+
+def _decompress(value: str) -> bytes:
+    data = base64.b64decode(value)
+    if is_dictionary_compressed(data):
+        return data
+    return zlib.decompress(data)
+
+
 class DjangoNodeStorage(NodeStorage):
     def delete(self, id: str) -> None:
         Node.objects.filter(id=id).delete()
@@ -41,19 +60,19 @@ class DjangoNodeStorage(NodeStorage):
     def _get_bytes(self, id: str) -> bytes | None:
         try:
             data = Node.objects.get(id=id).data
-            return decompress(data)
+            return _decompress(data)
         except Node.DoesNotExist:
             return None
 
     def _get_bytes_multi(self, id_list: list[str]) -> dict[str, bytes | None]:
-        return {n.id: decompress(n.data) for n in Node.objects.filter(id__in=id_list)}
+        return {n.id: _decompress(n.data) for n in Node.objects.filter(id__in=id_list)}
 
     def delete_multi(self, id_list: list[str]) -> None:
         Node.objects.filter(id__in=id_list).delete()
         self._delete_cache_items(id_list)
 
     def _set_bytes(self, id: str, data: Any, ttl: timedelta | None = None) -> None:
-        create_or_update(Node, id=id, values={"data": compress(data), "timestamp": timezone.now()})
+        create_or_update(Node, id=id, values={"data": _compress(data), "timestamp": timezone.now()})
 
     def cleanup(self, cutoff_timestamp: datetime) -> None:
         from sentry.db.deletion import BulkDeleteQuery
@@ -64,6 +83,9 @@ class DjangoNodeStorage(NodeStorage):
         BulkDeleteQuery(model=Node, dtfield="timestamp", days=days).execute()
         if self.cache:
             self.cache.clear()
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_cache.clear()
 
     def bootstrap(self) -> None:
         # Nothing for Django backend to do during bootstrap
@@ -0,0 +1,243 @@
+"""
+Process-local read-through cache for nodestore payloads.
+
+post_process, reprocessing and the issue details endpoints tend to read the
+same events several times within seconds, and every one of those reads
+crosses the network to the `nodedata` Django cache (or the backend). This
+tier keeps recently read and written payloads in memory, bounded by their
+encoded size and by a TTL.
+
+Payloads are kept encoded and decoded again on every hit, so callers never
+share (and can freely mutate) what they get back.
+
+Nodes are rewritten in place (e.g. by reprocessing) and deleted by other
+processes, so writes and deletes append the ids they touch to an invalidation
+log in Redis. Every process polls the log at most every
+``INVALIDATIONS_POLL_INTERVAL`` seconds and drops the ids appended since its
+last poll, which bounds how long it may serve a stale node. Whenever a process
+can't tell what it missed (polling failed, or the log was trimmed or reset in
+the meantime) it drops its whole cache instead.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Collection, Iterable
+from typing import NamedTuple
+
+from django.conf import settings
+
+from sentry import options
+from sentry.utils import metrics, redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATIONS_KEY = "nodestore:local-cache:invalidations"
+INVALIDATIONS_MAX_SIZE = 100_000
+INVALIDATIONS_POLL_INTERVAL = 1.0
+
+invalidate_script = redis.load_redis_script("nodestore/invalidate.lua")
+
+
+class _Entry(NamedTuple):
+    value: bytes
+    expires_at: float
+
+
+class LocalNodeCache:
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        poll_invalidations: Callable[[int | None], tuple[int, list[str] | None]] | None = None,
+    ) -> None:
+        assert max_bytes > 0
+        assert ttl > 0
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self.poll_invalidations = poll_invalidations
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._polled_at: float | None = None
+        # The last sequence number of the invalidation log seen
+        self._sequence: int | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: str, now: float) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            self._remove(key)
+            metrics.incr("nodestore.local_cache.evictions", tags={"reason": "ttl"})
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def get(self, key: str) -> bytes | None:
+        self._apply_invalidations()
+        with self._lock:
+            return self._get(key, time.monotonic())
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, bytes]:
+        self._apply_invalidations()
+        rv = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                value = self._get(key, now)
+                if value is not None:
+                    rv[key] = value
+        return rv
+
+    def set(self, key: str, value: bytes) -> None:
+        if not value:
+            return
+        size = len(value)
+        if size > self.max_bytes:
+            # Don't flush the entire cache for one huge payload
+            self.delete(key)
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(value, time.monotonic() + self.ttl)
+            self.current_bytes += size
+
+            evicted = 0
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                evicted += 1
+
+        if evicted:
+            metrics.incr("nodestore.local_cache.evictions", amount=evicted, tags={"reason": "size"})
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= len(entry.value)
+
+    def _apply_invalidations(self) -> None:
+        if self.poll_invalidations is None:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if self._polled_at is not None and now - self._polled_at < INVALIDATIONS_POLL_INTERVAL:
+                return
+            self._polled_at = now
+            after = self._sequence
+
+        try:
+            sequence, keys = self.poll_invalidations(after)
+        except Exception:
+            logger.exception("nodestore.local_cache.poll-failed")
+            self.clear()
+            return
+
+        with self._lock:
+            self._sequence = sequence
+            if keys is None:
+                invalidated = len(self._entries)
+                self._entries.clear()
+                self.current_bytes = 0
+            else:
+                invalidated = 0
+                for key in keys:
+                    if key in self._entries:
+                        self._remove(key)
+                        invalidated += 1
+
+        if invalidated:
+            metrics.incr(
+                "nodestore.local_cache.evictions",
+                amount=invalidated,
+                tags={"reason": "invalidated"},
+            )
+
+
+def _get_redis_client():
+    return redis.redis_clusters.get(settings.SENTRY_NODESTORE_LOCAL_CACHE_REDIS_CLUSTER)
+
+
+def _poll_invalidations(after: int | None) -> tuple[int, list[str] | None]:
+    """
+    Returns the latest sequence number of the invalidation log and the ids
+    appended after the `after` sequence number, or `None` instead of the ids
+    if some of them may be missing from the log.
+    """
+    with _get_redis_client().pipeline(transaction=False) as pipeline:
+        pipeline.zrange(INVALIDATIONS_KEY, 0, 0, withscores=True)
+        pipeline.zrange(INVALIDATIONS_KEY, -1, -1, withscores=True)
+        if after is not None:
+            pipeline.zrangebyscore(INVALIDATIONS_KEY, f"({after}", "+inf")
+        results = pipeline.execute()
+
+    oldest, newest = results[0], results[1]
+    sequence = int(newest[0][1]) if newest else 0
+    if after is None or sequence < after or (oldest and int(oldest[0][1]) > after + 1):
+        return sequence, None
+    return sequence, results[2]
+
+
+def publish_invalidations(keys: Collection[str]) -> None:
+    """
+    Makes the other processes drop `keys` from their local cache.
+    """
+    if not keys:
+        return
+
+    try:
+        invalidate_script([INVALIDATIONS_KEY], [INVALIDATIONS_MAX_SIZE, *keys], _get_redis_client())
+    except Exception:
+        # Other processes keep serving the previous payload until it expires
+        logger.exception("nodestore.local_cache.publish-failed")
+
+
+_local_cache: LocalNodeCache | None = None
+_local_cache_lock = threading.Lock()
+
+
+def get_local_cache() -> LocalNodeCache | None:
+    """
+    Returns the process-wide cache, or `None` if it is disabled through the
+    ``nodestore.local-cache.max-bytes`` option. The cache is recreated when its
+    options change.
+    """
+    global _local_cache
+
+    max_bytes = options.get("nodestore.local-cache.max-bytes")
+    if not max_bytes:
+        return None
+    ttl = options.get("nodestore.local-cache.ttl-seconds")
+
+    cache = _local_cache
+    if cache is None or cache.max_bytes != max_bytes or cache.ttl != ttl:
+        with _local_cache_lock:
+            cache = _local_cache
+            if cache is None or cache.max_bytes != max_bytes or cache.ttl != ttl:
+                cache = _local_cache = LocalNodeCache(
+                    max_bytes=max_bytes, ttl=ttl, poll_invalidations=_poll_invalidations
+                )
+    return cache
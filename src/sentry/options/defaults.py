@@ -655,6 +655,30 @@ register(
     flags=FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
 )
 
+# Referrers whose identical queries are coalesced: while one caller runs a
+# query, concurrent callers wait for its result instead of querying Snuba.
+register(
+    "snuba.coalescing.referrers",
+    type=Sequence,
+    default=[],
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Seconds the result of a coalesced query is shared with callers that arrive
+# after it completed.
+register("snuba.coalescing.result-ttl-seconds", default=5, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Seconds callers wait for the result of a coalesced query before running it
+# themselves.
+register("snuba.coalescing.timeout-seconds", default=10, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Seconds per referrer during which an expired result of a coalesced query is
+# still served, while one caller refreshes it,
+# e.g. {"api.dashboards.widget.line-chart": 60}.
+register(
+    "snuba.coalescing.stale-while-revalidate",
+    type=Dict,
+    default={},
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Kafka Publisher
 register("kafka-publisher.raw-event-sample-rate", default=0.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
@@ -1073,6 +1097,13 @@ register("relay.drop-transaction-metrics", default=[], flags=FLAG_AUTOMATOR_MODI
 # Relay should emit a usage metric to track total spans.
 register("relay.span-usage-metric", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
+# Cache the sections of project configs, so that invalidations only recompute
+# the sections affected by their trigger (see `sentry.relay.config.sections`).
+register("relay.project-config.sections.enabled", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Seconds a cached section is reused for. This adds to the time a change that
+# doesn't invalidate project configs takes to reach Relay.
+register("relay.project-config.sections.ttl-seconds", default=3600, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
 # Killswitch for the Relay cardinality limiter, one of `enabled`, `disabled`, `passive`.
 # In `passive` mode Relay's cardinality limiter is active but it does not enforce the limits.
 register("relay.cardinality-limiter.mode", default="enabled", flags=FLAG_AUTOMATOR_MODIFIABLE)
@@ -1256,6 +1287,32 @@ for mabq in build_metric_abuse_quotas():
 
 # END ABUSE QUOTAS
 
+# Share of a quota's limit that processes may lease from Redis and admit
+# locally in `RedisQuota.is_rate_limited`. Leased items that are not used are
+# counted as used until they are returned, so events may be rejected early by
+# up to this share of the limit, which caps the items leased out by all
+# processes together. 0 disables leases.
+register(
+    "quotas.redis.lease.max-error",
+    type=Float,
+    default=0.0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Maximum number of items leased at once, which also applies to quotas without a limit.
+register(
+    "quotas.redis.lease.max-size",
+    type=Int,
+    default=100,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Seconds after which the unused items of a lease are returned.
+register(
+    "quotas.redis.lease.ttl-seconds",
+    type=Int,
+    default=10,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Send event messages for specific project IDs to random partitions in Kafka
 # contents are a list of project IDs to message types to be randomly assigned
 # e.g. [{"project_id": 2, "message_type": "error"}, {"project_id": 3, "message_type": "transaction"}]
@@ -1913,6 +1970,21 @@ register(
     default=4,
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
+# Outbox draining controls
+# Number of threads draining the shards of an outbox batch concurrently. 1 drains
+# the shards one at a time.
+register(
+    "hybridcloud.outbox.drain-worker-threads",
+    default=1,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Maximum number of coalesced messages sent at once to the batch receivers of a
+# category. 1 disables batching.
+register(
+    "hybridcloud.outbox.batch-size",
+    default=1,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
 
 # Break glass controls
 register("hybrid_cloud.rpc.disabled-service-methods", default=[], flags=FLAG_AUTOMATOR_MODIFIABLE)
@@ -1926,6 +1998,30 @@ register("txnames.bump-lifetime-sample-rate", default=0.1, flags=FLAG_AUTOMATOR_
 register(
     "nodestore.set-subkeys.enable-set-cache-item", default=True, flags=FLAG_AUTOMATOR_MODIFIABLE
 )
+# Size (in bytes of encoded payloads) of the process-local nodestore cache that
+# sits in front of the nodedata cache. 0 disables it.
+register(
+    "nodestore.local-cache.max-bytes",
+    type=Int,
+    default=0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Other processes may serve a node for up to this long after it was rewritten if
+# their invalidation couldn't be published (see `sentry.nodestore.local_cache`).
+register(
+    "nodestore.local-cache.ttl-seconds",
+    type=Float,
+    default=30.0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Id of the zstd dictionary (from SENTRY_NODESTORE_COMPRESSION_DICTIONARIES) to
+# compress new nodestore payloads with. 0 disables dictionary compression.
+register(
+    "nodestore.zstd-dictionary.write-id",
+    type=Int,
+    default=0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
 
 # === Backpressure related runtime options ===
 
@@ -2483,6 +2579,20 @@ register(
     default=300,  # 5 minutes
     flags=FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
 )
+# Store buffered spans as compressed chunks and index segments by their deadline
+# in a sorted set, so that flushes only read expired segments.
+register(
+    "standalone-spans.buffer.sorted-set-index.enable",
+    type=Bool,
+    default=False,
+    flags=FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "standalone-spans.buffer.max-segments-per-flush",
+    type=Int,
+    default=1000,
+    flags=FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
+)
 register(
     "standalone-spans.detect-performance-issues-consumer.enable",
     default=True,
@@ -2727,6 +2837,15 @@ register(
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
 
+# Match large ownership schemas through a compiled index of their rules (see
+# `sentry.ownership.index`) instead of testing every rule.
+register(
+    "ownership.compiled-index.enabled",
+    type=Bool,
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Restrict uptime issue creation for specific host provider identifiers. Items
 # in this list map to the `host_provider_id` column in the UptimeSubscription
 # table.
@@ -2746,3 +2865,91 @@ register(
     default=False,
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
+
+# Flush buffered counters in large batches using multi-row UPDATE statements
+# instead of one process_incr call per key.
+register(
+    "buffer.bulk-flush.enabled",
+    type=Bool,
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "buffer.bulk-flush.batch-size",
+    type=Int,
+    default=500,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
+# Merge buffer increments in-process before handing them to the buffer backend.
+register(
+    "buffer.write-combining.enabled",
+    type=Bool,
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "buffer.write-combining.window-seconds",
+    type=Float,
+    default=1.0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "buffer.write-combining.max-keys",
+    type=Int,
+    default=10000,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
+# Cache the hashes produced by the grouping component tree, keyed on a digest of
+# the grouping inputs of the event.
+register(
+    "grouping.hash_cache.enabled",
+    type=Bool,
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Maximum number of entries in the process-local tier, 0 disables it.
+register(
+    "grouping.hash_cache.local_max_entries",
+    type=Int,
+    default=10000,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "grouping.hash_cache.shared_enabled",
+    type=Bool,
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "grouping.hash_cache.ttl_seconds",
+    type=Int,
+    default=3600,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
+# Save error events that don't need to be processed in batches of up to this
+# many events in the ingest consumer, instead of in `save_event` tasks. Batches
+# are saved by a separate pool of `--processes` processes. Disabled when set to
+# 0 or 1. Only read when partitions are assigned.
+register(
+    "ingest-consumer.save-batch.max-size",
+    type=Int,
+    default=0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register(
+    "ingest-consumer.save-batch.max-time-ms",
+    type=Int,
+    default=100,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# How long the processes of the ingest consumer cache projects locally, 0
+# disables the cache.
+register(
+    "ingest-consumer.project-cache.ttl-seconds",
+    type=Int,
+    default=0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
@@ -0,0 +1,277 @@
+"""
+Compiled index over the rules of an ownership schema.
+
+Testing every rule of a schema against every frame of an event is expensive for
+projects with large CODEOWNERS files. The index narrows the rules down to the
+candidates that can possibly match an event, which are then tested as usual, so
+the result is always the same as testing every rule:
+
+- Path, codeowners and module rules are indexed by a literal that every value
+  matched by their pattern contains (e.g. ``utils`` for ``src/*/utils/*.py``).
+  The literals of each type of rule are combined into an Aho-Corasick automaton,
+  so one pass over every frame value finds the candidates among all rules.
+- Tag rules are indexed by their tag key.
+- Rules that can't be indexed (URL rules, rules matching on the user interface,
+  patterns without a usable literal) are always candidates, and so are all
+  rules of a type when a value of the event can't be searched reliably.
+
+Indexes are cached per process by the version of their schema, which is
+stamped on the instances in the read caches of `ProjectOwnership` and
+`ProjectCodeOwners`, or by the digest of schemas without a version.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from sentry.eventstore.models import EventSubjectTemplateData
+from sentry.ownership.grammar import CODEOWNERS, MODULE, PATH, Matcher, Rule, load_schema
+from sentry.utils import json, metrics
+from sentry.utils.event_frames import find_stack_frames
+from sentry.utils.safe import get_path
+
+# Characters that make a glob more than a sequence of literals and wildcards
+_UNINDEXABLE_PATTERN_RE = re.compile(r"[\[\]{}!\\]")
+# Literals don't span path separators, which path normalization may rewrite.
+_LITERAL_RE = re.compile(r"[a-z0-9._-]+")
+# Literals are truncated to keep the automatons small; any part of a required
+# literal is required as well.
+MAX_LITERAL_LENGTH = 12
+
+MAX_CACHED_INDEXES = 50
+# Smaller schemas are cheap enough to test rule by rule.
+MIN_INDEXED_RULES = 50
+# Attribute of cached instances holding the version of their schema. It is
+# pickled along with the instance, so all processes share it.
+SCHEMA_VERSION_ATTR = "_ownership_schema_version"
+
+
+def _required_literal(pattern: str) -> str | None:
+    """
+    Returns a lowercase literal that every value matching `pattern` contains, or
+    `None` if there is none that can be relied on.
+    """
+    if not pattern.isascii() or _UNINDEXABLE_PATTERN_RE.search(pattern):
+        return None
+    # Runs of dots can be removed by path normalization, e.g. `./` and `../`
+    literals = [literal for literal in _LITERAL_RE.findall(pattern.lower()) if literal.strip(".")]
+    if not literals:
+        return None
+    return max(literals, key=len)[:MAX_LITERAL_LENGTH]
+
+
+class LiteralAutomaton:
+    """
+    Aho-Corasick automaton finding the rules whose literal occurs in a value.
+    """
+
+    def __init__(self, literals: Iterable[tuple[str, int]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[int, ...]] = [()]
+
+        for literal, rule_index in literals:
+            node = 0
+            for char in literal:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                node = next_node
+            self._output[node] += (rule_index,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_node] = self._goto[fail].get(char, 0)
+                self._output[next_node] += self._output[self._fail[next_node]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def search(self, value: str, found: set[int]) -> None:
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for char in value:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+
+
+class _FrameRules:
+    """
+    The indexed rules of one type that match on frame values.
+    """
+
+    def __init__(self) -> None:
+        self.literals: list[tuple[str, int]] = []
+        self.all: list[int] = []
+        self.unindexed: list[int] = []
+        self.automaton: LiteralAutomaton | None = None
+
+    def add(self, pattern: str, rule_index: int) -> None:
+        self.all.append(rule_index)
+        literal = _required_literal(pattern)
+        if literal is None:
+            self.unindexed.append(rule_index)
+        else:
+            self.literals.append((literal, rule_index))
+
+    def compile(self) -> None:
+        self.automaton = LiteralAutomaton(self.literals)
+
+    def find_candidates(self, values: Iterable[Any], found: set[int]) -> None:
+        if not self.all:
+            return
+        found.update(self.unindexed)
+        assert self.automaton is not None
+        for value in values:
+            if not isinstance(value, str) or not value.isascii():
+                # Case-insensitive matching can match non-ASCII characters to
+                # the ASCII ones of a literal.
+                found.update(self.all)
+                return
+            self.automaton.search(value.lower(), found)
+
+
+def _frame_values(
+    frames: Sequence[Any], keys: Sequence[str], in_app_only: bool = False
+) -> list[Any]:
+    # The same values `Matcher.test_frames` tests patterns against
+    values = []
+    for frame in frames:
+        if not isinstance(frame, Mapping):
+            continue
+        if in_app_only and frame.get("in_app") is False:
+            continue
+        for key in keys:
+            value = frame.get(key)
+            if value:
+                values.append(value)
+    return values
+
+
+class OwnershipIndex:
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.rules = rules
+        self._always: list[int] = []
+        self._frame_rules = {PATH: _FrameRules(), CODEOWNERS: _FrameRules(), MODULE: _FrameRules()}
+        self._tag_rules: dict[str, list[int]] = {}
+        self._all_tag_rules: list[int] = []
+
+        for i, rule in enumerate(rules):
+            matcher_type, pattern = rule.matcher.type, rule.matcher.pattern
+            if matcher_type in self._frame_rules:
+                self._frame_rules[matcher_type].add(pattern, i)
+            elif matcher_type.startswith("tags.") and not matcher_type.startswith("tags.user."):
+                tag = matcher_type[5:]
+                self._all_tag_rules.append(i)
+                for key in {tag, EventSubjectTemplateData.tag_aliases.get(tag, tag)}:
+                    self._tag_rules.setdefault(key, []).append(i)
+            else:
+                self._always.append(i)
+
+        for frame_rules in self._frame_rules.values():
+            frame_rules.compile()
+
+    def _find_tag_candidates(self, data: Mapping[str, Any], found: set[int]) -> None:
+        if not self._all_tag_rules:
+            return
+        try:
+            for key, _ in get_path(data, "tags", filter=True) or ():
+                found.update(self._tag_rules.get(key, ()))
+        except (TypeError, ValueError):
+            found.update(self._all_tag_rules)
+
+    def matching_rules(
+        self,
+        data: Mapping[str, Any],
+        munged_data: tuple[Sequence[Mapping[str, Any]], Sequence[str]] | None = None,
+    ) -> list[Rule]:
+        """
+        Returns the rules matching the event `data`, in the order of the schema.
+        """
+        if munged_data is None:
+            munged_data = Matcher.munge_if_needed(data)
+        frames, keys = munged_data
+
+        candidates = set(self._always)
+        self._frame_rules[PATH].find_candidates(_frame_values(frames, keys), candidates)
+        self._frame_rules[CODEOWNERS].find_candidates(
+            _frame_values(frames, keys, in_app_only=True), candidates
+        )
+        if self._frame_rules[MODULE].all:
+            self._frame_rules[MODULE].find_candidates(
+                _frame_values(find_stack_frames(data), ["module"]), candidates
+            )
+        self._find_tag_candidates(data, candidates)
+
+        return [self.rules[i] for i in sorted(candidates) if self.rules[i].test(data, munged_data)]
+
+
+def get_schema_digest(schema: Mapping[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(schema).encode()).hexdigest()
+
+
+def get_schema_version(instance: object) -> str | None:
+    return getattr(instance, SCHEMA_VERSION_ATTR, None)
+
+
+def set_schema_version(instance: object, version: str | None) -> None:
+    setattr(instance, SCHEMA_VERSION_ATTR, version)
+
+
+def new_schema_version() -> str:
+    """
+    Returns a new schema version, which must be set on instances whenever their
+    schema is written to a read cache.
+    """
+    return uuid.uuid4().hex
+
+
+_index_cache: OrderedDict[str, OwnershipIndex] = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def get_ownership_index(schema: Mapping[str, Any], version: str | None = None) -> OwnershipIndex:
+    """
+    Returns the index of the rules of `schema`, compiled on first use and cached
+    per process by `version`, or by the digest of `schema` if there is none.
+    """
+    key = f"v:{version}" if version is not None else f"d:{get_schema_digest(schema)}"
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            metrics.incr("ownership.index.cache", tags={"result": "hit"}, sample_rate=0.1)
+            return index
+
+    metrics.incr("ownership.index.cache", tags={"result": "miss"})
+    with metrics.timer("ownership.index.compile"):
+        index = OwnershipIndex(load_schema(schema))
+    with _index_cache_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > MAX_CACHED_INDEXES:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def clear_index_cache() -> None:
+    with _index_cache_lock:
+        _index_cache.clear()
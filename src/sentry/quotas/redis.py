@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
-from time import time
+import logging
+import threading
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from time import monotonic, time
 
 import rb
 import sentry_sdk
@@ -12,6 +15,7 @@ from sentry.constants import DataCategory
 from sentry.models.project import Project
 from sentry.models.projectkey import ProjectKey
 from sentry.quotas.base import NotRateLimited, Quota, QuotaConfig, QuotaScope, RateLimited
+from sentry.utils import metrics
 from sentry.utils.redis import (
     get_dynamic_cluster_from_options,
     is_instance_rb_cluster,
@@ -21,6 +25,26 @@ from sentry.utils.redis import (
 )
 
 is_rate_limited = load_redis_script("quotas/is_rate_limited.lua")
+lease_quotas = load_redis_script("quotas/lease.lua")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QuotaLease:
+    """
+    Items of a quota counter that a process has leased from Redis and can
+    admit without checking the counter.
+    """
+
+    key: str
+    #: Unix timestamp at which the counter expires
+    expiry: int
+    remaining: int
+    #: Leased items counted as outstanding in Redis, released with the lease
+    held: int
+    #: Value of ``time.monotonic()`` after which unused items are returned
+    expires_at: float
 
 
 class RedisQuota(Quota):
@@ -43,6 +67,10 @@ class RedisQuota(Quota):
 
         super().__init__(**options)
         self.namespace = "quota"
+        # Quota leases by organization and quota counter key
+        self._leases: dict[int, dict[str, QuotaLease]] = {}
+        self._leases_lock = threading.Lock()
+        self._next_lease_sweep = 0.0
 
     def validate(self) -> None:
         validate_dynamic_cluster(self.is_redis_cluster, self.cluster)
@@ -209,6 +237,9 @@ class RedisQuota(Quota):
     def get_refunded_quota_key(self, key: str) -> str:
         return f"r:{key}"
 
+    def get_leased_quota_key(self, key: str) -> str:
+        return f"l:{key}"
+
     @sentry_sdk.tracing.trace
     def refund(
         self,
@@ -286,6 +317,7 @@ class RedisQuota(Quota):
 
         keys: list[str] = []
         args: list[int] = []
+        limits: list[int | None] = []
         for quota in quotas:
             if quota.limit == 0:
                 # A zero-sized quota is the absolute worst-case. Do not call
@@ -307,12 +339,16 @@ class RedisQuota(Quota):
             # limit=None is represented as limit=-1 in lua
             lua_quota = quota.limit if quota.limit is not None else -1
             args.extend((lua_quota, int(expiry)))
+            limits.append(quota.limit)
 
         if not keys or not args:
             return NotRateLimited()
 
-        client = self.__get_redis_client(str(project.organization_id))
-        rejections = is_rate_limited(keys, args, client)
+        if options.get("quotas.redis.lease.max-error") > 0:
+            rejections = self._admit_from_leases(project.organization_id, keys, args, limits)
+        else:
+            client = self.__get_redis_client(str(project.organization_id))
+            rejections = is_rate_limited(keys, args, client)
 
         if not any(rejections):
             return NotRateLimited()
@@ -328,3 +364,166 @@ class RedisQuota(Quota):
                 worst_case = (delay, quota.reason_code)
 
         return RateLimited(retry_after=worst_case[0], reason_code=worst_case[1])
+
+    def _admit_from_leases(
+        self,
+        organization_id: int,
+        keys: Sequence[str],
+        args: Sequence[int],
+        limits: Sequence[int | None],
+    ) -> list[bool]:
+        """
+        Equivalent to the ``is_rate_limited`` script, but admits the item
+        against quota leased by this process and only calls into Redis to
+        renew leases.
+
+        Leases of a quota with a limit never hold more than the share of the
+        limit set by ``quotas.redis.lease.max-error`` across all processes:
+        ``lease.lua`` counts the outstanding items of all leases next to the
+        quota counter and leases no more than that share. Leased items are
+        counted as used in Redis right away, so leases never admit more items
+        than the limit allows, and other processes reject items early by at
+        most ``max-error * limit`` items.
+
+        Unused items are returned as refunds once the lease expires, and the
+        items of a used up lease are released with its next renewal. Leases of
+        the organization are checked on every call, and the leases of all
+        organizations at least once per TTL, so the items of organizations
+        that stopped sending events are returned as well.
+        """
+        max_error = options.get("quotas.redis.lease.max-error")
+        max_size = options.get("quotas.redis.lease.max-size")
+        ttl = options.get("quotas.redis.lease.ttl-seconds")
+        now = monotonic()
+
+        with self._leases_lock:
+            if now >= self._next_lease_sweep:
+                self._next_lease_sweep = now + ttl
+                swept_organization_ids = [*self._leases, organization_id]
+            else:
+                swept_organization_ids = [organization_id]
+            renewals_by_org = self._take_expired_leases(swept_organization_ids, now)
+
+            leases = self._leases.get(organization_id, {})
+            renewals = renewals_by_org.setdefault(organization_id, {})
+            for i, (key, limit) in enumerate(zip(keys[::2], limits)):
+                lease = leases.get(key)
+                if lease is not None and lease.remaining > 0:
+                    continue
+                if limit is None:
+                    size, max_leased = max_size, -1
+                else:
+                    max_leased = int(limit * max_error)
+                    size = min(max_size, max_leased)
+                returned, released = renewals[key][3:5] if key in renewals else (0, 0)
+                if lease is not None:
+                    # Release the items of the used up lease along with the renewal
+                    del leases[key]
+                    released += lease.held
+                renewals[key] = (
+                    args[i * 2],
+                    args[i * 2 + 1],
+                    max(1, size),
+                    returned,
+                    released,
+                    max_leased,
+                )
+
+        # Redis is called without holding the lock. Threads that renew the
+        # same lease concurrently just add up the items they leased.
+        leased: Sequence[int] = []
+        for renewal_organization_id, org_renewals in renewals_by_org.items():
+            if not org_renewals:
+                continue
+            try:
+                result = self._lease_quotas(renewal_organization_id, org_renewals)
+            except Exception:
+                if renewal_organization_id == organization_id:
+                    raise
+                # Another organization's unused items are returned with its next renewal
+                logger.exception(
+                    "quotas.redis.lease.return_failed",
+                    extra={"organization_id": renewal_organization_id},
+                )
+                continue
+            if renewal_organization_id == organization_id:
+                leased = result
+
+        with self._leases_lock:
+            leases = self._leases.setdefault(organization_id, {})
+            for (key, (_, expiry, _, _, _, max_leased)), count in zip(renewals.items(), leased):
+                if count <= 0:
+                    continue
+                # The first item is not counted as outstanding by ``lease.lua``
+                held = int(count) - 1 if max_leased >= 0 else 0
+                if key in leases:
+                    leases[key].remaining += int(count)
+                    leases[key].held += held
+                else:
+                    leases[key] = QuotaLease(
+                        key=key,
+                        expiry=expiry,
+                        remaining=int(count),
+                        held=held,
+                        expires_at=now + ttl,
+                    )
+
+            rejections = [key not in leases or leases[key].remaining <= 0 for key in keys[::2]]
+            if not any(rejections):
+                for key in keys[::2]:
+                    lease = leases[key]
+                    lease.remaining -= 1
+                    # Used up leases are kept until they are released
+                    if lease.remaining <= 0 and lease.held <= 0:
+                        del leases[key]
+
+            if not leases:
+                del self._leases[organization_id]
+
+        return rejections
+
+    def _take_expired_leases(
+        self, organization_ids: Iterable[int], now: float
+    ) -> dict[int, dict[str, tuple[int, int, int, int, int, int]]]:
+        """
+        Removes the expired leases of the given organizations and returns the
+        ``lease.lua`` arguments that return their unused items and release
+        them, by organization. Must be called with ``_leases_lock`` held.
+        """
+        renewals_by_org: dict[int, dict[str, tuple[int, int, int, int, int, int]]] = {}
+        for organization_id in organization_ids:
+            leases = self._leases.get(organization_id)
+            if not leases:
+                continue
+            renewals = renewals_by_org.setdefault(organization_id, {})
+            for lease in list(leases.values()):
+                if lease.expires_at <= now:
+                    del leases[lease.key]
+                    # Return the unused items, even of counters of past windows
+                    renewals[lease.key] = (
+                        -1,
+                        lease.expiry,
+                        0,
+                        lease.remaining,
+                        lease.held,
+                        -1,
+                    )
+            if not leases:
+                del self._leases[organization_id]
+        return renewals_by_org
+
+    def _lease_quotas(
+        self, organization_id: int, renewals: dict[str, tuple[int, int, int, int, int, int]]
+    ) -> Sequence[int]:
+        lease_keys: list[str] = []
+        lease_args: list[int] = []
+        for key, renewal in renewals.items():
+            lease_keys.extend(
+                (key, self.get_refunded_quota_key(key), self.get_leased_quota_key(key))
+            )
+            lease_args.extend(renewal)
+
+        client = self.__get_redis_client(str(organization_id))
+        leased = lease_quotas(lease_keys, lease_args, client)
+        metrics.incr("quotas.redis.lease.renewals", amount=len(renewals))
+        return leased
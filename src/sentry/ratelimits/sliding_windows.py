@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import time
 from collections.abc import Sequence
 from typing import Any
 
+from redis.exceptions import NoScriptError
 from sentry_redis_tools.clients import RedisCluster, StrictRedis
 from sentry_redis_tools.sliding_windows_rate_limiter import GrantedQuota, Quota
 from sentry_redis_tools.sliding_windows_rate_limiter import (
@@ -16,6 +18,12 @@ from sentry.utils.services import Service
 
 __all__ = ["Quota", "GrantedQuota", "RequestedQuota", "Timestamp"]
 
+sliding_window = redis.load_redis_script("ratelimits/sliding_window.lua")
+
+# (request index, requested quota, indices of the request's quotas) for the
+# quotas of a request that share a prefix
+_PrefixRequest = tuple[int, int, list[int]]
+
 
 class SlidingWindowRateLimiter(Service):
     def __init__(self, **options: Any) -> None:
@@ -158,3 +166,131 @@ class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
         timestamp: Timestamp,
     ) -> None:
         return self.impl.use_quotas(requests, grants, timestamp)
+
+
+class RedisBatchedSlidingWindowRateLimiter(RedisSlidingWindowRateLimiter):
+    """
+    Sliding window rate limiter that evaluates all quotas sharing a prefix
+    with a single Lua script invocation, which sums up the granules of each
+    window within Redis. The invocations of a batch are pipelined, so that
+    checking any number of requests takes one round trip per Redis node.
+
+    Requests whose quotas all share one prefix are checked and used
+    atomically by `check_and_use_quotas`. Requests that also have quotas with
+    a `prefix_override` are checked and used in two steps, like with
+    `RedisSlidingWindowRateLimiter`.
+
+    The counters are stored in different keys than the ones of
+    `RedisSlidingWindowRateLimiter`, so switching between the two resets all
+    quotas.
+    """
+
+    key_prefix = "sliding-window-rate-limit"
+
+    def check_within_quotas(
+        self, requests: Sequence[RequestedQuota], timestamp: Timestamp | None = None
+    ) -> tuple[Timestamp, Sequence[GrantedQuota]]:
+        if timestamp is None:
+            timestamp = int(time.time())
+        amounts = [request.requested for request in requests]
+        return timestamp, self._evaluate("check", requests, amounts, timestamp)
+
+    def use_quotas(
+        self,
+        requests: Sequence[RequestedQuota],
+        grants: Sequence[GrantedQuota],
+        timestamp: Timestamp,
+    ) -> None:
+        amounts = [grant.granted for grant in grants]
+        self._evaluate("use", requests, amounts, timestamp)
+
+    def check_and_use_quotas(
+        self, requests: Sequence[RequestedQuota], timestamp: Timestamp | None = None
+    ) -> Sequence[GrantedQuota]:
+        for request in requests:
+            if any(
+                quota.prefix_override is not None and quota.prefix_override != request.prefix
+                for quota in request.quotas
+            ):
+                return super().check_and_use_quotas(requests, timestamp)
+
+        if timestamp is None:
+            timestamp = int(time.time())
+        amounts = [request.requested for request in requests]
+        return self._evaluate("check_and_use", requests, amounts, timestamp)
+
+    def _evaluate(
+        self,
+        mode: str,
+        requests: Sequence[RequestedQuota],
+        amounts: Sequence[int],
+        timestamp: Timestamp,
+    ) -> list[GrantedQuota]:
+        by_prefix: dict[str, list[_PrefixRequest]] = {}
+        for index, (request, amount) in enumerate(zip(requests, amounts)):
+            if mode == "use" and amount <= 0:
+                continue
+            quotas_by_prefix: dict[str, list[int]] = {}
+            for quota_index, quota in enumerate(request.quotas):
+                prefix = quota.prefix_override or request.prefix
+                quotas_by_prefix.setdefault(prefix, []).append(quota_index)
+            for prefix, quota_indices in quotas_by_prefix.items():
+                by_prefix.setdefault(prefix, []).append((index, amount, quota_indices))
+
+        results = self._run_script(mode, requests, by_prefix, timestamp)
+        if mode == "use":
+            return []
+
+        remaining = [[0] * len(request.quotas) for request in requests]
+        for prefix_requests, result in zip(by_prefix.values(), results):
+            offset = 0
+            for index, _, quota_indices in prefix_requests:
+                for i, quota_index in enumerate(quota_indices):
+                    remaining[index][quota_index] = int(result[offset + i + 1])
+                offset += len(quota_indices) + 1
+
+        grants = []
+        for request, remaining_quotas in zip(requests, remaining):
+            granted_quota = request.requested
+            reached_quotas = []
+            for quota, remaining_quota in zip(request.quotas, remaining_quotas):
+                if remaining_quota < granted_quota:
+                    granted_quota = remaining_quota
+                    reached_quotas.append(quota)
+            grants.append(
+                GrantedQuota(
+                    prefix=request.prefix, granted=granted_quota, reached_quotas=reached_quotas
+                )
+            )
+        return grants
+
+    def _run_script(
+        self,
+        mode: str,
+        requests: Sequence[RequestedQuota],
+        by_prefix: dict[str, list[_PrefixRequest]],
+        timestamp: Timestamp,
+    ) -> list[list[int]]:
+        calls = []
+        for prefix, prefix_requests in by_prefix.items():
+            args: list[Any] = [mode, timestamp, len(prefix_requests)]
+            for index, amount, quota_indices in prefix_requests:
+                args += [amount, len(quota_indices)]
+                for quota_index in quota_indices:
+                    quota = requests[index].quotas[quota_index]
+                    args += [quota.window_seconds, quota.granularity_seconds, quota.limit]
+            calls.append((f"{self.key_prefix}:{{{prefix}}}", args))
+
+        pipe = self.client.pipeline(transaction=False)
+        for key, args in calls:
+            pipe.evalsha(sliding_window.sha, 1, key, *args)
+        results = pipe.execute(raise_on_error=False)
+
+        for i, result in enumerate(results):
+            if isinstance(result, NoScriptError):
+                # Calling the script directly loads it into the node's script cache.
+                key, args = calls[i]
+                results[i] = sliding_window([key], args, self.client)
+            elif isinstance(result, Exception):
+                raise result
+        return results
@@ -49,6 +49,7 @@ See https://www.notion.so/sentry/Async-cross-region-updates-outbox-9330293c8d2f4
 """
 from __future__ import annotations
 
+from collections.abc import Sequence
 from typing import TypeVar
 
 from sentry.db.models import Model
@@ -68,6 +69,26 @@ def maybe_process_tombstone(
     if instance := model.objects.filter(id=object_identifier).last():
         return instance
 
+    _record_tombstone(model, object_identifier, region_name)
+    return None
+
+
+def maybe_process_tombstones(
+    model: type[T], object_identifiers: Sequence[int], region_name: str | None = None
+) -> list[T]:
+    """
+    Like `maybe_process_tombstone` for many objects at once, returning the ones
+    that still exist.
+    """
+    instances = list(model.objects.filter(id__in=object_identifiers))
+    existing = {instance.id for instance in instances}
+    for object_identifier in object_identifiers:
+        if object_identifier not in existing:
+            _record_tombstone(model, object_identifier, region_name)
+    return instances
+
+
+def _record_tombstone(model: type[T], object_identifier: int, region_name: str | None) -> None:
     tombstone = RpcTombstone(table_name=model._meta.db_table, identifier=object_identifier)
     # tombstones sent from control must have a region name, and monolith needs to provide a region_name
     if region_name or SiloMode.get_current_mode() == SiloMode.CONTROL:
@@ -76,4 +97,3 @@ def maybe_process_tombstone(
         )
     else:
         control_tombstone_service.record_remote_tombstone(tombstone=tombstone)
-    return None
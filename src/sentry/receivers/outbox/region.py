@@ -8,7 +8,8 @@ and perform RPC calls to propagate changes to Control Silo.
 
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
 
 from django.dispatch import receiver
 
@@ -16,7 +17,7 @@ from sentry.audit_log.services.log import AuditLogEvent, UserIpEvent, log_rpc_se
 from sentry.auth.services.auth import auth_service
 from sentry.auth.services.orgauthtoken import orgauthtoken_rpc_service
 from sentry.hybridcloud.outbox.category import OutboxCategory
-from sentry.hybridcloud.outbox.signals import process_region_outbox
+from sentry.hybridcloud.outbox.signals import process_region_outbox, process_region_outbox_batch
 from sentry.hybridcloud.services.organization_mapping import organization_mapping_service
 from sentry.hybridcloud.services.organization_mapping.model import CustomerId
 from sentry.hybridcloud.services.organization_mapping.serial import (
@@ -26,10 +27,13 @@ from sentry.models.authproviderreplica import AuthProviderReplica
 from sentry.models.files.utils import get_relocation_storage
 from sentry.models.organization import Organization
 from sentry.models.project import Project
-from sentry.receivers.outbox import maybe_process_tombstone
+from sentry.receivers.outbox import maybe_process_tombstone, maybe_process_tombstones
 from sentry.relocation.services.relocation_export.service import control_relocation_export_service
 from sentry.types.region import get_local_region
 
+if TYPE_CHECKING:
+    from sentry.hybridcloud.models.outbox import RegionOutboxBase
+
 
 @receiver(process_region_outbox, sender=OutboxCategory.AUDIT_LOG_EVENT)
 def process_audit_log_event(payload: Any, **kwds: Any):
@@ -56,6 +60,11 @@ def process_project_updates(object_identifier: int, **kwds: Any):
     proj
 
 
+@receiver(process_region_outbox_batch, sender=OutboxCategory.PROJECT_UPDATE)
+def process_project_updates_batch(messages: Sequence[RegionOutboxBase], **kwds: Any):
+    maybe_process_tombstones(Project, [message.object_identifier for message in messages])
+
+
 @receiver(process_region_outbox, sender=OutboxCategory.ORGANIZATION_MAPPING_CUSTOMER_ID_UPDATE)
 def process_organization_mapping_customer_id_update(
     object_identifier: int, payload: Any, **kwds: Any
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import logging
 import uuid
-from collections.abc import Iterable, Mapping, MutableMapping, Sequence
+from collections import defaultdict
+from collections.abc import Collection, Iterable, Mapping, MutableMapping, Sequence
 from datetime import datetime, timezone
+from functools import cached_property
 from typing import Any, Literal, NotRequired, TypedDict
 
 import sentry_sdk
@@ -29,6 +31,7 @@ from sentry.ingest.transaction_clusterer.rules import (
     get_sorted_rules,
 )
 from sentry.interfaces.security import DEFAULT_DISALLOWED_SOURCES
+from sentry.models.options.project_option import ProjectOption
 from sentry.models.organization import Organization
 from sentry.models.project import Project
 from sentry.models.projectkey import ProjectKey
@@ -37,6 +40,12 @@ from sentry.relay.config.metric_extraction import (
     get_metric_conditional_tagging_rules,
     get_metric_extraction_config,
 )
+from sentry.relay.config.sections import (
+    ConfigSection,
+    build_sections,
+    delete_cached_sections,
+    get_sections_for_trigger,
+)
 from sentry.relay.utils import to_camel_case_name
 from sentry.sentry_metrics.use_case_id_registry import CARDINALITY_LIMIT_USE_CASES
 from sentry.sentry_metrics.visibility import get_metrics_blocking_state_for_relay_config
@@ -91,19 +100,56 @@ def get_exposed_features(project: Project) -> Sequence[str]:
         else:
             raise RuntimeError("EXPOSABLE_FEATURES must start with 'organizations:' or 'projects:'")
 
-        if has_feature:
-            metrics.incr(
-                "sentry.relay.config.features", tags={"outcome": "enabled", "feature": feature}
-            )
+        if _record_exposed_feature(feature, has_feature):
             active_features.append(feature)
-        else:
-            metrics.incr(
-                "sentry.relay.config.features", tags={"outcome": "disabled", "feature": feature}
-            )
 
     return active_features
 
 
+def get_exposed_features_bulk(
+    organization: Organization, projects: Sequence[Project]
+) -> Mapping[int, Sequence[str]]:
+    """
+    Like `get_exposed_features` for all `projects` of `organization`, with the
+    features checked in one batch for the organization and one for the projects.
+    """
+    org_features = [f for f in EXPOSABLE_FEATURES if f.startswith("organizations:")]
+    project_features = [f for f in EXPOSABLE_FEATURES if f.startswith("projects:")]
+
+    org_results = (features.batch_has(org_features, organization=organization) or {}).get(
+        f"organization:{organization.id}", {}
+    )
+    project_results = (
+        features.batch_has(project_features, projects=projects, organization=organization) or {}
+    )
+
+    exposed_features: dict[int, Sequence[str]] = {}
+    for project in projects:
+        active_features = []
+        results = project_results.get(f"project:{project.id}", {})
+        for feature in EXPOSABLE_FEATURES:
+            if feature.startswith("organizations:"):
+                has_feature = org_results.get(feature)
+                if has_feature is None:
+                    has_feature = features.has(feature, organization)
+            else:
+                has_feature = results.get(feature)
+                if has_feature is None:
+                    has_feature = features.has(feature, project)
+
+            if _record_exposed_feature(feature, has_feature):
+                active_features.append(feature)
+        exposed_features[project.id] = active_features
+
+    return exposed_features
+
+
+def _record_exposed_feature(feature: str, has_feature: bool) -> bool:
+    outcome = "enabled" if has_feature else "disabled"
+    metrics.incr("sentry.relay.config.features", tags={"outcome": outcome, "feature": feature})
+    return has_feature
+
+
 def get_public_key_configs(
     project_keys: Iterable[ProjectKey] | None = None,
 ) -> list[Mapping[str, Any]]:
@@ -281,7 +327,9 @@ def get_metrics_config(timeout: TimeChecker, project: Project) -> Mapping[str, A
 
 
 def get_project_config(
-    project: Project, project_keys: Iterable[ProjectKey] | None = None
+    project: Project,
+    project_keys: Iterable[ProjectKey] | None = None,
+    invalidated_sections: Collection[str] | None = None,
 ) -> ProjectConfig:
     """Constructs the ProjectConfig information.
     :param project: The project to load configuration for. Ensure that
@@ -291,6 +339,9 @@ def get_project_config(
         no project keys are provided it is assumed that the config does not
         need to contain auth information (this is the case when used in
         python's StoreView)
+    :param invalidated_sections: The names of the config sections to recompute,
+        see :func:`get_invalidated_sections`. The other sections are read from the
+        cache if possible. By default, all sections are recomputed.
     :return: a ProjectConfig object for the given project
     """
     with sentry_sdk.isolation_scope() as scope:
@@ -299,7 +350,9 @@ def get_project_config(
             sentry_sdk.start_transaction(name="get_project_config"),
             metrics.timer("relay.config.get_project_config.duration"),
         ):
-            return _get_project_config(project, project_keys=project_keys)
+            return _get_project_config(
+                project, project_keys=project_keys, invalidated_sections=invalidated_sections
+            )
 
 
 def get_dynamic_sampling_config(timeout: TimeChecker, project: Project) -> Mapping[str, Any] | None:
@@ -1000,48 +1053,94 @@ def _get_mobile_performance_profiles(organization: Organization) -> list[dict[st
     ]
 
 
-def _get_project_config(
-    project: Project, project_keys: Iterable[ProjectKey] | None = None
-) -> ProjectConfig:
-    if project.status != ObjectStatus.ACTIVE:
-        return ProjectConfig(project, disabled=True)
-
-    public_keys = get_public_key_configs(project_keys=project_keys)
+class OrganizationConfigInputs:
+    """
+    The inputs of project configs that only depend on the organization, or that are
+    fetched for all `projects` of the organization at once, computed when first used
+    and shared by the configs of all its projects.
+    """
 
-    with sentry_sdk.start_span(op="get_public_config"):
-        now = datetime.now(timezone.utc)
-        cfg = {
-            "disabled": False,
-            "slug": project.slug,
-            "lastFetch": now,
-            "lastChange": now,
-            "rev": uuid.uuid4().hex,
-            "publicKeys": public_keys,
-            "config": {
-                "allowedDomains": list(get_origins(project)),
-                "trustedRelays": [
-                    r["public_key"]
-                    for r in project.organization.get_option("sentry:trusted-relays", [])
-                    if r
-                ],
-                "piiConfig": get_pii_config(project),
-                "datascrubbingSettings": get_datascrubbing_settings(project),
-            },
-            "organizationId": project.organization_id,
-            "projectId": project.id,  # XXX: Unused by Relay, required by Python store
-        }
+    def __init__(self, organization: Organization, projects: Sequence[Project]) -> None:
+        self.organization = organization
+        self.projects = projects
+
+    @cached_property
+    def event_retention(self) -> int | None:
+        with sentry_sdk.start_span(op="get_event_retention"):
+            return quotas.backend.get_event_retention(self.organization)
+
+    @cached_property
+    def performance_score_profiles(self) -> list[dict[str, Any]]:
+        return [
+            *_get_desktop_browser_performance_profiles(self.organization),
+            *_get_mobile_browser_performance_profiles(self.organization),
+            *_get_mobile_performance_profiles(self.organization),
+            *_get_default_browser_performance_profiles(self.organization),
+        ]
 
-    config = cfg["config"]
+    @cached_property
+    def _exposed_features(self) -> Mapping[int, Sequence[str]]:
+        return get_exposed_features_bulk(self.organization, self.projects)
+
+    def get_exposed_features(self, project: Project) -> Sequence[str]:
+        if len(self.projects) <= 1 or project.id not in self._exposed_features:
+            return get_exposed_features(project)
+        return self._exposed_features[project.id]
+
+
+def _get_general_config(
+    project: Project, inputs: OrganizationConfigInputs
+) -> MutableMapping[str, Any]:
+    config: MutableMapping[str, Any] = {
+        "allowedDomains": list(get_origins(project)),
+        "trustedRelays": [
+            r["public_key"]
+            for r in project.organization.get_option("sentry:trusted-relays", [])
+            if r
+        ],
+        "piiConfig": get_pii_config(project),
+        "datascrubbingSettings": get_datascrubbing_settings(project),
+    }
 
     with sentry_sdk.start_span(op="get_exposed_features"):
-        if exposed_features := get_exposed_features(project):
+        if exposed_features := inputs.get_exposed_features(project):
             config["features"] = exposed_features
 
+    config["breakdownsV2"] = project.get_option("sentry:breakdowns")
+
+    config["sessionMetrics"] = {
+        "version": (
+            EXTRACT_ABNORMAL_MECHANISM_VERSION
+            if _should_extract_abnormal_mechanism(project)
+            else EXTRACT_METRICS_VERSION
+        ),
+    }
+
+    with sentry_sdk.start_span(op="get_grouping_config_dict_for_project"):
+        grouping_config = get_grouping_config_dict_for_project(project)
+        if grouping_config is not None:
+            config["groupingConfig"] = grouping_config
+    if inputs.event_retention is not None:
+        config["eventRetention"] = inputs.event_retention
+
+    return config
+
+
+def _get_sampling_config(
+    project: Project, inputs: OrganizationConfigInputs
+) -> MutableMapping[str, Any]:
+    config: MutableMapping[str, Any] = {}
     # NOTE: Omitting dynamicSampling because of a failure increases the number
     # of events forwarded by Relay, because dynamic sampling will stop filtering
     # anything.
     add_experimental_config(config, "sampling", get_dynamic_sampling_config, project)
+    return config
+
 
+def _get_transaction_name_config(
+    project: Project, inputs: OrganizationConfigInputs
+) -> MutableMapping[str, Any]:
+    config: MutableMapping[str, Any] = {}
     # Rules to replace high cardinality transaction names
     add_experimental_config(config, "txNameRules", get_transaction_names_config, project)
 
@@ -1049,18 +1148,28 @@ def _get_project_config(
     # This prevents projects from prematurely marking all URL transactions as sanitized.
     if get_clusterer_meta(ClustererNamespace.TRANSACTIONS, project)["runs"] >= MIN_CLUSTERER_RUNS:
         config["txNameReady"] = True
+    return config
 
-    config["breakdownsV2"] = project.get_option("sentry:breakdowns")
 
+def _get_metrics_config(
+    project: Project, inputs: OrganizationConfigInputs
+) -> MutableMapping[str, Any]:
+    config: MutableMapping[str, Any] = {}
     add_experimental_config(config, "metrics", get_metrics_config, project)
+    return config
+
 
+def _get_metric_extraction_config(
+    project: Project, inputs: OrganizationConfigInputs
+) -> MutableMapping[str, Any]:
+    config: MutableMapping[str, Any] = {}
     if _should_extract_transaction_metrics(project):
         add_experimental_config(
             config,
             "transactionMetrics",
             get_transaction_metrics_settings,
             project,
-            config.get("breakdownsV2"),
+            project.get_option("sentry:breakdowns"),
         )
 
         # This config key is technically not specific to _transaction_ metrics,
@@ -1072,35 +1181,170 @@ def _get_project_config(
 
         if metric_extraction := get_metric_extraction_config(project):
             config["metricExtraction"] = metric_extraction
+    return config
 
-    config["sessionMetrics"] = {
-        "version": (
-            EXTRACT_ABNORMAL_MECHANISM_VERSION
-            if _should_extract_abnormal_mechanism(project)
-            else EXTRACT_METRICS_VERSION
-        ),
-    }
 
-    performance_score_profiles = [
-        *_get_desktop_browser_performance_profiles(project.organization),
-        *_get_mobile_browser_performance_profiles(project.organization),
-        *_get_mobile_performance_profiles(project.organization),
-        *_get_default_browser_performance_profiles(project.organization),
-    ]
-    if performance_score_profiles:
-        config["performanceScore"] = {"profiles": performance_score_profiles}
+def _get_performance_score_config(
+    project: Project, inputs: OrganizationConfigInputs
+) -> MutableMapping[str, Any]:
+    if performance_score_profiles := inputs.performance_score_profiles:
+        return {"performanceScore": {"profiles": performance_score_profiles}}
+    return {}
 
+
+def _get_filter_config(
+    project: Project, inputs: OrganizationConfigInputs
+) -> MutableMapping[str, Any]:
     with sentry_sdk.start_span(op="get_filter_settings"):
         if filter_settings := get_filter_settings(project):
-            config["filterSettings"] = filter_settings
-    with sentry_sdk.start_span(op="get_grouping_config_dict_for_project"):
-        grouping_config = get_grouping_config_dict_for_project(project)
-        if grouping_config is not None:
-            config["groupingConfig"] = grouping_config
-    with sentry_sdk.start_span(op="get_event_retention"):
-        event_retention = quotas.backend.get_event_retention(project.organization)
-        if event_retention is not None:
-            config["eventRetention"] = event_retention
+            return {"filterSettings": filter_settings}
+    return {}
+
+
+#: The sections of the ``config`` of a project config, see `sentry.relay.config.sections`.
+CONFIG_SECTIONS = [
+    ConfigSection(name="general", version=1, compute=_get_general_config),
+    ConfigSection(
+        name="sampling",
+        version=1,
+        compute=_get_sampling_config,
+        triggers=(
+            "dynamic_sampling",
+            "releaseproject.",
+            "releaseprojectenvironment.",
+            "teamkeytransaction.",
+        ),
+    ),
+    # The clusterer doesn't invalidate project configs when it updates the rules.
+    ConfigSection(
+        name="transactionNames",
+        version=1,
+        compute=_get_transaction_name_config,
+        cacheable=False,
+    ),
+    ConfigSection(
+        name="metrics", version=1, compute=_get_metrics_config, triggers=("metrics_blocking",)
+    ),
+    ConfigSection(
+        name="metricExtraction",
+        version=1,
+        compute=_get_metric_extraction_config,
+        triggers=(
+            "alerts:create-on-demand-metric",
+            "dashboards:create-on-demand-metric",
+            "killswitches.relay.drop-transaction-metrics",
+        ),
+    ),
+    ConfigSection(name="performanceScore", version=1, compute=_get_performance_score_config),
+    ConfigSection(name="filters", version=1, compute=_get_filter_config),
+]
+
+#: Triggers of invalidations that only change the parts of the config computed for
+#: each project key (public keys and quotas), which are never cached.
+PROJECT_KEY_TRIGGERS = ("projectkey.", "monitors:monitor_created")
+
+
+def get_invalidated_sections(trigger: str | None) -> frozenset[str] | None:
+    """
+    Returns the names of the config sections an invalidation with `trigger` can
+    change, or `None` if it can change any part of the config.
+    """
+    if trigger and trigger.startswith(PROJECT_KEY_TRIGGERS):
+        return frozenset()
+    return get_sections_for_trigger(CONFIG_SECTIONS, trigger)
+
+
+def delete_cached_config_sections(project_ids: Iterable[int]) -> None:
+    """
+    Deletes the cached config sections of the given projects, which makes the next
+    partial rebuild of their configs a full one.
+    """
+    delete_cached_sections(CONFIG_SECTIONS, project_ids)
+
+
+def get_project_configs(
+    organization: Organization,
+    projects: Sequence[Project],
+    project_keys: Iterable[ProjectKey],
+    invalidated_sections: Collection[str] | None = None,
+) -> dict[str, ProjectConfig]:
+    """Constructs the ProjectConfig of many project keys of an organization at once.
+
+    Unlike calling :func:`get_project_config` for every key, the inputs shared by the
+    projects of the organization are computed once, the features and options of all
+    projects are fetched in bulk, and the config sections of a project are computed
+    once for all its keys.
+
+    :param projects: The projects of the keys, with their organization bound.
+    :param project_keys: The keys to construct configs for, with their project bound.
+    :param invalidated_sections: See :func:`get_project_config`.
+    :return: The config of every key, by public key.
+    """
+    keys_by_project: dict[int, list[ProjectKey]] = defaultdict(list)
+    for key in project_keys:
+        keys_by_project[key.project_id].append(key)
+    projects = [project for project in projects if project.id in keys_by_project]
+
+    configs: dict[str, ProjectConfig] = {}
+    with metrics.timer("relay.config.get_project_configs.duration"):
+        with sentry_sdk.start_span(op="get_all_project_options"):
+            ProjectOption.objects.get_all_values_bulk(projects)
+
+        inputs = OrganizationConfigInputs(organization, projects)
+        for project in projects:
+            keys = keys_by_project[project.id]
+            if project.status != ObjectStatus.ACTIVE:
+                for key in keys:
+                    configs[key.public_key] = ProjectConfig(project, disabled=True)
+                continue
+
+            section_config = build_sections(
+                project, inputs, CONFIG_SECTIONS, invalidated_sections=invalidated_sections
+            )
+            for key in keys:
+                configs[key.public_key] = _build_project_config(project, [key], section_config)
+
+    return configs
+
+
+def _get_project_config(
+    project: Project,
+    project_keys: Iterable[ProjectKey] | None = None,
+    invalidated_sections: Collection[str] | None = None,
+) -> ProjectConfig:
+    if project.status != ObjectStatus.ACTIVE:
+        return ProjectConfig(project, disabled=True)
+
+    inputs = OrganizationConfigInputs(project.organization, [project])
+    section_config = build_sections(
+        project, inputs, CONFIG_SECTIONS, invalidated_sections=invalidated_sections
+    )
+    return _build_project_config(project, project_keys, section_config)
+
+
+def _build_project_config(
+    project: Project,
+    project_keys: Iterable[ProjectKey] | None,
+    section_config: Mapping[str, Any],
+) -> ProjectConfig:
+    public_keys = get_public_key_configs(project_keys=project_keys)
+
+    with sentry_sdk.start_span(op="get_public_config"):
+        now = datetime.now(timezone.utc)
+        cfg = {
+            "disabled": False,
+            "slug": project.slug,
+            "lastFetch": now,
+            "lastChange": now,
+            "rev": uuid.uuid4().hex,
+            "publicKeys": public_keys,
+            "config": dict(section_config),
+            "organizationId": project.organization_id,
+            "projectId": project.id,  # XXX: Unused by Relay, required by Python store
+        }
+
+    config = cfg["config"]
+
     with sentry_sdk.start_span(op="get_all_quotas"):
         if quotas_config := get_quotas(project, keys=project_keys):
             config["quotas"] = quotas_config
@@ -0,0 +1,127 @@
+"""
+Sections of the project config that are computed and cached independently.
+
+Every section produces a part of the ``config`` of a project config, only depends
+on the project (not on its keys) and the inputs shared by the projects of its
+organization, and declares the invalidation triggers that can
+change it. When a project config is invalidated with a trigger that is declared by
+some sections, only those sections are recomputed and the other sections are read
+from the cache, where they were stored by the last computation of the config.
+
+Triggers that are not declared by any section (e.g. ``projectoption.post_save``,
+which can change anything) recompute the whole config, as do configs built
+because they were missing from the cache. Sections that change without an
+invalidation, like the transaction name rules, are not cached at all.
+
+Cached sections are keyed by their version, which must be bumped whenever the
+output of a section changes for unchanged inputs.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Collection, Iterable, MutableMapping, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import sentry_sdk
+
+from sentry import options
+from sentry.utils import metrics
+from sentry.utils.cache import cache
+
+if TYPE_CHECKING:
+    from sentry.models.project import Project
+    from sentry.relay.config import OrganizationConfigInputs
+
+CACHE_KEY_PREFIX = "relayconfig-section"
+
+
+@dataclass(frozen=True)
+class ConfigSection:
+    name: str
+    version: int
+    compute: Callable[[Project, OrganizationConfigInputs], MutableMapping[str, Any]]
+    # Prefixes of the invalidation triggers that can change the section.
+    triggers: tuple[str, ...] = ()
+    cacheable: bool = True
+
+    def cache_key(self, project_id: int) -> str:
+        return f"{CACHE_KEY_PREFIX}:{self.name}:{self.version}:{project_id}"
+
+
+def get_sections_for_trigger(
+    sections: Iterable[ConfigSection], trigger: str | None
+) -> frozenset[str] | None:
+    """
+    Returns the names of the sections that can be changed by an invalidation with
+    `trigger`, or `None` if the whole config needs to be recomputed.
+    """
+    if not trigger:
+        return None
+    invalidated = frozenset(
+        section.name for section in sections if trigger.startswith(section.triggers)
+    )
+    return invalidated or None
+
+
+def delete_cached_sections(sections: Iterable[ConfigSection], project_ids: Iterable[int]) -> None:
+    """
+    Deletes the cached `sections` of the given projects, so that the next build of
+    their configs recomputes them whatever it was invalidated for.
+    """
+    keys = [
+        section.cache_key(project_id)
+        for project_id in project_ids
+        for section in sections
+        if section.cacheable
+    ]
+    if keys:
+        cache.delete_many(keys)
+
+
+def build_sections(
+    project: Project,
+    inputs: OrganizationConfigInputs,
+    sections: Sequence[ConfigSection],
+    invalidated_sections: Collection[str] | None = None,
+) -> MutableMapping[str, Any]:
+    """
+    Returns the config made of all `sections`, recomputing only the ones in
+    `invalidated_sections` (or all of them if `None`) and the ones missing from the
+    cache.
+    """
+    enabled = options.get("relay.project-config.sections.enabled")
+
+    cached: dict[str, MutableMapping[str, Any]] = {}
+    if enabled and invalidated_sections is not None:
+        keys = {
+            section.name: section.cache_key(project.id)
+            for section in sections
+            if section.cacheable and section.name not in invalidated_sections
+        }
+        found = cache.get_many(list(keys.values()))
+        cached = {name: found[key] for name, key in keys.items() if key in found}
+
+    config: MutableMapping[str, Any] = {}
+    to_cache: dict[str, MutableMapping[str, Any]] = {}
+    for section in sections:
+        value = cached.get(section.name)
+        if value is None:
+            with (
+                sentry_sdk.start_span(op=f"get_config_section.{section.name}"),
+                metrics.timer("relay.config.section.duration", tags={"section": section.name}),
+            ):
+                value = section.compute(project, inputs)
+            if enabled and section.cacheable:
+                to_cache[section.cache_key(project.id)] = value
+        config.update(value)
+
+    if to_cache:
+        cache.set_many(to_cache, options.get("relay.project-config.sections.ttl-seconds"))
+
+    metrics.incr(
+        "relay.config.sections.rebuild",
+        tags={"type": "incremental" if cached else "full"},
+    )
+    metrics.incr("relay.config.sections.cache_hit", amount=len(cached))
+    return config
@@ -2,7 +2,7 @@ from sentry.utils.services import Service
 
 
 class ProjectConfigCache(Service):
-    __all__ = ("set_many", "delete_many", "get")
+    __all__ = ("set_many", "delete_many", "get", "get_cached_public_keys")
 
     def __init__(self, **options):
         pass
@@ -15,3 +15,7 @@ class ProjectConfigCache(Service):
 
     def get(self, public_key):
         raise NotImplementedError()
+
+    def get_cached_public_keys(self, public_keys):
+        """Returns the subset of ``public_keys`` that have a config in the cache."""
+        return {public_key for public_key in public_keys if self.get(public_key) is not None}
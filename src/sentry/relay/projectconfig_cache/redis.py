@@ -82,6 +82,13 @@ class RedisProjectConfigCache(ProjectConfigCache):
             return json.loads(rv)
         return None
 
+    def get_cached_public_keys(self, public_keys):
+        public_keys = list(public_keys)
+        p = self.cluster_read.pipeline(transaction=False)
+        for public_key in public_keys:
+            p.exists(self.__get_redis_key(public_key))
+        return {public_key for public_key, exists in zip(public_keys, p.execute()) if exists}
+
     def get_rev(self, public_key) -> str | None:
         if value := self.cluster_read.get(self.__get_redis_rev_key(public_key)):
             return value.decode()
@@ -0,0 +1,21 @@
+-- Appends node ids to the invalidation log of the process-local nodestore
+-- caches. The log is a sorted set of ids scored by a sequence number that is
+-- incremented on every call, capped to its most recent entries.
+assert(#KEYS == 1, "provide exactly one log key")
+assert(#ARGV >= 2, "provide the maximum size of the log and at least one id")
+
+local key = KEYS[1]
+local max_size = tonumber(ARGV[1])
+
+local sequence = 1
+local newest = redis.call("ZRANGE", key, -1, -1, "WITHSCORES")
+if #newest == 2 then
+    sequence = tonumber(newest[2]) + 1
+end
+
+for i = 2, #ARGV do
+    redis.call("ZADD", key, sequence, ARGV[i])
+end
+redis.call("ZREMRANGEBYRANK", key, 0, -max_size - 1)
+
+return sequence
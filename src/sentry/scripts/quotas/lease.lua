@@ -0,0 +1,74 @@
+-- Lease a number of items from a collection of quota counters, so that the
+-- items can be admitted locally without checking the counters for each item.
+-- Values provided as ``KEYS`` specify, for each counter, the key of the
+-- counter, the key of the counter to subtract and the key of the counter of
+-- leased items that are not used yet. Values provided as ``ARGV`` specify, for
+-- each counter, the maximum value (quota limit, -1 for no limit), the
+-- expiration time, the number of items to lease, the number of items of a
+-- previous lease that are returned unused, the number of items of previous
+-- leases that are no longer outstanding, and the maximum number of
+-- outstanding leased items (-1 for no maximum).
+--
+-- For example, to lease 10 items from a quota ``foo`` with a limit of 100
+-- items that expires at the Unix timestamp ``100`` with at most 20 items
+-- leased out, and return 3 items of a lease of 5 items to a quota ``bar``
+-- without leasing any, the ``KEYS`` and ``ARGV`` values would be as follows:
+--
+--   KEYS = {"foo", "subtract_from_foo", "leased_from_foo",
+--           "bar", "subtract_from_bar", "leased_from_bar"}
+--   ARGV = {100, 100, 10, 0, 0, 20, -1, 100, 0, 3, 5, -1}
+--
+-- Returned items are added to the counter to subtract, like refunds. The
+-- counters are incremented by the leased items, which can be less than
+-- requested if the quota is (almost) exhausted or the maximum of outstanding
+-- items is reached. The first item of a lease is admitted right away by the
+-- caller and is not counted as outstanding, so at least one item is leased as
+-- long as the quota is not exhausted. The result is a Lua table/array (Redis
+-- multi bulk reply) with the number of leased items per counter.
+assert(#KEYS * 2 == #ARGV, "incorrect number of keys and arguments provided")
+assert(#KEYS % 3 == 0, "there must be three keys per counter")
+
+local results = {}
+for i=1, #KEYS, 3 do
+    local arg = i * 2 - 1
+    local limit = tonumber(ARGV[arg])
+    local expiry = ARGV[arg + 1]
+    local requested = tonumber(ARGV[arg + 2])
+    local returned = tonumber(ARGV[arg + 3])
+    local released = tonumber(ARGV[arg + 4])
+    local max_leased = tonumber(ARGV[arg + 5])
+
+    if returned > 0 then
+        redis.call('INCRBY', KEYS[i + 1], returned)
+        redis.call('EXPIREAT', KEYS[i + 1], expiry)
+    end
+
+    if released > 0 then
+        if redis.call('DECRBY', KEYS[i + 2], released) <= 0 then
+            redis.call('DEL', KEYS[i + 2])
+        end
+    end
+
+    local leased = requested
+    -- limit=-1 means "no limit"
+    if limit >= 0 then
+        local used = (redis.call('GET', KEYS[i]) or 0) - (redis.call('GET', KEYS[i + 1]) or 0)
+        leased = math.max(0, math.min(leased, limit - used))
+    end
+    if max_leased >= 0 and leased > 1 then
+        local outstanding = tonumber(redis.call('GET', KEYS[i + 2]) or 0)
+        leased = math.min(leased, 1 + math.max(0, max_leased - outstanding))
+    end
+
+    if leased > 0 then
+        redis.call('INCRBY', KEYS[i], leased)
+        redis.call('EXPIREAT', KEYS[i], expiry)
+    end
+    if max_leased >= 0 and leased > 1 then
+        redis.call('INCRBY', KEYS[i + 2], leased - 1)
+        redis.call('EXPIREAT', KEYS[i + 2], expiry)
+    end
+    results[(i + 2) / 3] = leased
+end
+
+return results
@@ -0,0 +1,93 @@
+-- sliding window rate limiter evaluating many requests against many quotas in one call
+--
+-- Every quota counts the quota used in buckets ("granules") of `granularity`
+-- seconds, and the used quota of a window is the sum of the granules within
+-- `window` seconds of the current timestamp. Granules are stored in keys
+-- derived from the prefix key, all in the same hash slot:
+--
+--   <prefix key>:<window>:<granularity>:<granule>
+--
+-- Requests are evaluated in order, and the quota granted to a request counts
+-- against the requests after it, also when nothing is used.
+--
+-- Input:
+-- keys:
+--   * prefix key (hash-tagged by the prefix of the quotas)
+-- args:
+--   * mode ("check", "use" or "check_and_use")
+--   * timestamp (current time in seconds according to the application server)
+--   * number of requests
+--   * per request:
+--     * requested quota (the quota to use as is for "use")
+--     * number of quotas
+--     * per quota: window, granularity and limit (all in seconds but the limit)
+--
+-- Output, per request:
+--   * granted quota
+--   * per quota: the remaining quota before this request (0 for "use")
+
+local prefix_key = KEYS[1]
+local mode = ARGV[1]
+local timestamp = tonumber(ARGV[2])
+local num_requests = tonumber(ARGV[3])
+
+local check = mode ~= "use"
+local use = mode ~= "check"
+
+-- quota granted by "check" to earlier requests, per granule key
+local pending = {}
+
+local result = {}
+local arg = 4
+
+for _ = 1, num_requests do
+    local requested = tonumber(ARGV[arg])
+    local num_quotas = tonumber(ARGV[arg + 1])
+    arg = arg + 2
+
+    local granted = requested
+    local remaining = {}
+    local granule_keys = {}
+    local ttls = {}
+
+    for i = 1, num_quotas do
+        local window = tonumber(ARGV[arg])
+        local granularity = tonumber(ARGV[arg + 1])
+        local limit = tonumber(ARGV[arg + 2])
+        arg = arg + 3
+
+        local key_prefix = prefix_key .. ":" .. window .. ":" .. granularity .. ":"
+        local granule = math.floor(timestamp / granularity)
+        granule_keys[i] = key_prefix .. granule
+        ttls[i] = window + granularity
+
+        remaining[i] = 0
+        if check then
+            local used = 0
+            for g = granule - window / granularity + 1, granule do
+                local key = key_prefix .. g
+                used = used + tonumber(redis.call("GET", key) or 0) + (pending[key] or 0)
+            end
+            remaining[i] = math.max(0, limit - used)
+            granted = math.min(granted, remaining[i])
+        end
+    end
+
+    if granted > 0 then
+        for i = 1, num_quotas do
+            if use then
+                redis.call("INCRBY", granule_keys[i], granted)
+                redis.call("EXPIRE", granule_keys[i], ttls[i])
+            else
+                pending[granule_keys[i]] = (pending[granule_keys[i]] or 0) + granted
+            end
+        end
+    end
+
+    table.insert(result, granted)
+    for i = 1, num_quotas do
+        table.insert(result, remaining[i])
+    end
+end
+
+return result
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 import dataclasses
+import time
 from collections.abc import Mapping
 from typing import NamedTuple
 
 import sentry_sdk
+import zstandard
 from django.conf import settings
 from sentry_redis_tools.clients import RedisCluster, StrictRedis
 
 from sentry import options
-from sentry.utils import redis
+from sentry.utils import metrics, redis
 from sentry.utils.iterators import chunked
 
+# Spans are JSON objects, so a value starting with the zstd frame magic number
+# is always a compressed chunk of spans.
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
 
 @dataclasses.dataclass
 class ProcessSegmentsContext:
@@ -42,6 +48,25 @@ def get_unprocessed_segments_key(partition_index: int) -> str:
     return f"performance-issues:unprocessed-segments:partition-2:{partition_index}"
 
 
+def get_segment_deadlines_key(partition_index: int) -> str:
+    return f"performance-issues:segment-deadlines:partition:{partition_index}"
+
+
+def compress_spans(spans: list[bytes]) -> bytes:
+    """
+    Packs a batch of spans into a single compressed chunk. Chunks hold the
+    spans joined by commas, so that decompressed chunks can be joined exactly
+    like individual spans when building the segment payload.
+    """
+    return zstandard.ZstdCompressor().compress(b",".join(spans))
+
+
+def decompress_spans(value: bytes) -> bytes:
+    if value.startswith(ZSTD_MAGIC):
+        return zstandard.ZstdDecompressor().decompress(value)
+    return value
+
+
 class RedisSpansBuffer:
     def __init__(self):
         self.client: RedisCluster | StrictRedis = get_redis_client()
@@ -59,23 +84,47 @@ class RedisSpansBuffer:
         3. If it is the first time we see a particular segment, push the segment id and first seen
             timestamp to a bucket so we know when it is ready to be processed.
         3. Checks if 1 second has passed since the last time segments were processed for a partition.
+
+        With `standalone-spans.buffer.sorted-set-index.enable`, the spans of a segment written in
+        one batch are stored as a single compressed chunk, and new segments are indexed in a
+        sorted set scored by their first seen timestamp instead of the bucket list.
         """
+        start = time.process_time()
         keys = list(spans_map.keys())
         spans_written_per_segment = []
         ttl = options.get("standalone-spans.buffer-ttl.seconds")
+        use_index = options.get("standalone-spans.buffer.sorted-set-index.enable")
 
         # Batch write spans in a segment
+        num_spans = 0
+        num_bytes = 0
         with self.client.pipeline() as p:
             for key in keys:
                 segment_id, project_id, partition = key
                 spans = spans_map[key]
                 segment_key = get_segment_key(project_id, segment_id)
+                num_spans += len(spans)
                 # RPUSH is atomic
-                p.rpush(segment_key, *spans)
-                spans_written_per_segment.append(len(spans))
+                if use_index:
+                    chunk = compress_spans(spans)
+                    num_bytes += len(chunk)
+                    p.rpush(segment_key, chunk)
+                    spans_written_per_segment.append(1)
+                else:
+                    num_bytes += sum(len(span) for span in spans)
+                    p.rpush(segment_key, *spans)
+                    spans_written_per_segment.append(len(spans))
 
             results = p.execute()
 
+        if num_spans:
+            metrics.distribution(
+                "spans.buffer.bytes_per_span",
+                num_bytes / num_spans,
+                tags={"index": str(use_index).lower()},
+                unit="byte",
+            )
+
         partitions = list(latest_ts_by_partition.keys())
         with self.client.pipeline() as p:
             # Get last processed timestamp for each partition processed
@@ -92,11 +141,16 @@ class RedisSpansBuffer:
                 if num_written == num_total:
                     segment_id, project_id, partition = key
                     segment_key = get_segment_key(project_id, segment_id)
-                    bucket = get_unprocessed_segments_key(partition)
 
                     timestamp = segment_first_seen_ts[key]
                     p.expire(segment_key, ttl)
-                    p.rpush(bucket, timestamp, segment_key)
+                    if use_index:
+                        p.zadd(
+                            get_segment_deadlines_key(partition), {segment_key: timestamp}, nx=True
+                        )
+                    else:
+                        bucket = get_unprocessed_segments_key(partition)
+                        p.rpush(bucket, timestamp, segment_key)
 
             timestamp_results = p.execute()
 
@@ -113,9 +167,20 @@ class RedisSpansBuffer:
                 )
             )
 
+        metrics.distribution(
+            "spans.buffer.cpu_time",
+            (time.process_time() - start) * 1000,
+            tags={"operation": "write", "index": str(use_index).lower()},
+            unit="millisecond",
+        )
         return process_segments_contexts
 
     def read_and_expire_many_segments(self, keys: list[str]) -> list[list[str | bytes]]:
+        """
+        Returns the buffered spans of each segment and deletes the segments. Compressed chunks
+        are decompressed into comma-separated spans, which can be joined like single spans.
+        """
+        start = time.process_time()
         values = []
         with self.client.pipeline() as p:
             for key in keys:
@@ -125,11 +190,44 @@ class RedisSpansBuffer:
             response = p.execute()
 
         for value in response[:-1]:
-            values.append(value)
-
+            values.append([decompress_spans(item) for item in value])
+
+        metrics.distribution(
+            "spans.buffer.cpu_time",
+            (time.process_time() - start) * 1000,
+            tags={"operation": "read"},
+            unit="millisecond",
+        )
         return values
 
     def get_unprocessed_segments_and_prune_bucket(self, now: int, partition: int) -> list[str]:
+        """
+        Returns the keys of the segments of a partition whose buffer window has passed, and
+        removes them from the bucket list and the sorted set index. Both are always drained so
+        that no segments are lost when the index option is toggled.
+        """
+        segment_keys = self._pop_expired_segments_from_index(now, partition)
+        return segment_keys + self._prune_bucket(now, partition)
+
+    def _pop_expired_segments_from_index(self, now: int, partition: int) -> list[str]:
+        """
+        Only reads the expired segments of the partition, at most
+        `standalone-spans.buffer.max-segments-per-flush` of them, oldest first. The remaining
+        ones are picked up on the next flush.
+        """
+        key = get_segment_deadlines_key(partition)
+        buffer_window = options.get("standalone-spans.buffer-window.seconds")
+        limit = options.get("standalone-spans.buffer.max-segments-per-flush")
+
+        results = self.client.zrangebyscore(key, "-inf", now - buffer_window, start=0, num=limit)
+        if not results:
+            return []
+
+        self.client.zrem(key, *results)
+        metrics.distribution("spans.buffer.flushed_segments", len(results))
+        return [segment_key.decode("utf-8") for segment_key in results]
+
+    def _prune_bucket(self, now: int, partition: int) -> list[str]:
         key = get_unprocessed_segments_key(partition)
         results = self.client.lrange(key, 0, -1) or []
 
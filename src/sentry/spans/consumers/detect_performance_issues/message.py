@@ -1,6 +1,6 @@
 import logging
 import uuid
-from collections.abc import Mapping, Sequence, Set
+from collections.abc import Sequence
 from copy import deepcopy
 from typing import Any
 
@@ -57,60 +57,71 @@ def _send_occurrence_to_platform(jobs: Sequence[Job], projects: ProjectsMapping)
             )
 
 
-def build_tree(spans):
-    span_tree = {}
+def build_tree(
+    spans: Sequence[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], list[list[int]], int | None]:
+    """
+    Indexes the spans of a segment by position. Returns the deduplicated spans
+    (the first span with a given id wins), the indices of the children of
+    each span in the order they appear in the segment, and the index of the
+    segment span.
+    """
+    index: dict[str, int] = {}
+    unique_spans: list[dict[str, Any]] = []
     root_span_id = None
 
     for span in spans:
         span_id = span["span_id"]
-        is_root = span["is_segment"]
-        if is_root:
+        if span["is_segment"]:
             root_span_id = span_id
-        if span_id not in span_tree:
-            span_tree[span_id] = span
-            span_tree[span_id]["children"] = []
-
-    for span in span_tree.values():
-        parent_id = span.get("parent_span_id")
-        if parent_id is not None and parent_id in span_tree:
-            parent_span = span_tree[parent_id]
-            children = parent_span["children"]
-            children.append(span)
-
-    return span_tree, root_span_id
-
-
-def dfs(visited, flattened_spans, tree, span_id):
-    stack = [span_id]
-
-    while len(stack):
-        span_id = stack.pop()
-
-        span = deepcopy(tree[span_id])
-        children = span.pop("children")
-
-        if span_id not in visited:
-            flattened_spans.append(span)
-            tree.pop(span_id)
-            visited.add(span_id)
-
-        for child in sorted(children, key=lambda span: span["start_timestamp"], reverse=True):
-            if child["span_id"] not in visited:
-                stack.append(child["span_id"])
-
-
-def flatten_tree(tree, root_span_id):
-    visited: Set[str] = set()
-    flattened_spans: list[Mapping[str, Any]] = []
+        if span_id not in index:
+            index[span_id] = len(unique_spans)
+            unique_spans.append(span)
+
+    children: list[list[int]] = [[] for _ in unique_spans]
+    for i, span in enumerate(unique_spans):
+        parent = index.get(span.get("parent_span_id"))
+        if parent is not None:
+            children[parent].append(i)
+
+    root = index[root_span_id] if root_span_id else None
+    return unique_spans, children, root
+
+
+def flatten_tree(
+    spans: list[dict[str, Any]], children: list[list[int]], root: int | None
+) -> list[dict[str, Any]]:
+    """
+    Orders the spans depth first starting at the segment span, with siblings
+    ordered by start timestamp. Spans that aren't reachable from the segment
+    span follow, each starting a traversal of its own in start timestamp
+    order. The span dicts are returned as is, not copied.
+    """
+    start_timestamps = [span["start_timestamp"] for span in spans]
+    visited = bytearray(len(spans))
+    flattened_spans: list[dict[str, Any]] = []
+
+    def visit(i: int) -> None:
+        stack = [i]
+        while stack:
+            i = stack.pop()
+            if visited[i]:
+                continue
+            visited[i] = 1
+            flattened_spans.append(spans[i])
+            stack.extend(
+                child
+                for child in sorted(children[i], key=start_timestamps.__getitem__, reverse=True)
+                if not visited[child]
+            )
 
-    if root_span_id:
-        dfs(visited, flattened_spans, tree, root_span_id)
+    if root is not None:
+        visit(root)
 
     # Catch all for orphan spans
-    remaining = sorted(tree.items(), key=lambda span: span[1]["start_timestamp"])
-    for span_id, _ in remaining:
-        if span_id not in visited:
-            dfs(visited, flattened_spans, tree, span_id)
+    for i in sorted(range(len(spans)), key=start_timestamps.__getitem__):
+        if not visited[i]:
+            visit(i)
 
     return flattened_spans
 
@@ -168,8 +179,7 @@ def transform_spans_to_event_dict(spans):
     # So we build a tree and flatten it depth first.
     # TODO: See if we can update the detectors to work without this assumption so we can
     # just pass it a list of spans.
-    tree, root_span_id = build_tree(processed_spans)
-    flattened_spans = flatten_tree(tree, root_span_id)
+    flattened_spans = flatten_tree(*build_tree(processed_spans))
     event["spans"] = flattened_spans
 
     root_span = flattened_spans[0]
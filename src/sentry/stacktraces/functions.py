@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 from collections.abc import Callable
+from functools import lru_cache
 from typing import Any
 from urllib.parse import urlparse
 
@@ -111,10 +112,22 @@ def trim_function_name(function, platform, normalize_lambdas=True):
     if platform == "csharp":
         return trim_csharp_function_name(function)
     if get_behavior_family_for_platform(platform) == "native":
+        if isinstance(function, str):
+            return _trim_native_function_name_cached(function, platform, normalize_lambdas)
         return trim_native_function_name(function, platform, normalize_lambdas=normalize_lambdas)
     return function
 
 
+@lru_cache(maxsize=4096)
+def _trim_native_function_name_cached(
+    function: str, platform: str | None, normalize_lambdas: bool
+) -> str:
+    # Parsing native symbols is expensive, and the same symbols are trimmed
+    # many times per event (processing, every enhancer pass, every grouping
+    # variant) as well as across events.
+    return trim_native_function_name(function, platform, normalize_lambdas=normalize_lambdas)
+
+
 def trim_csharp_function_name(function):
     """This trims off signatures from C# frames.  This takes advantage of the
     Unity not emitting any return values and using a space before the argument
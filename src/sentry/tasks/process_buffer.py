@@ -70,13 +70,41 @@ def buffer_incr(model, *args, **kwargs):
     Call `buffer.incr` as a task on the given model, either directly or via celery depending on
     `settings.SENTRY_BUFFER_INCR_AS_CELERY_TASK`.
 
+    If the `buffer.write-combining.enabled` option is set, increments are first merged in-process
+    (see `sentry.buffer.combining`) and only the combined increment is passed on.
+
     See `Buffer.incr` for an explanation of the args and kwargs to pass here.
     """
+    from sentry import options
+
+    if options.get("buffer.write-combining.enabled"):
+        from sentry.buffer.combining import get_write_combiner
+
+        get_write_combiner(_flush_combined_incr).incr(model, *args, **kwargs)
+        return
+
+    _buffer_incr(model, args, kwargs)
+
+
+def _buffer_incr(model, args, kwargs):
     (buffer_incr_task.delay if settings.SENTRY_BUFFER_INCR_AS_CELERY_TASK else buffer_incr_task)(
         app_label=model._meta.app_label, model_name=model._meta.model_name, args=args, kwargs=kwargs
     )
 
 
+def _flush_combined_incr(entry):
+    _buffer_incr(
+        entry.model,
+        (),
+        {
+            "columns": entry.columns,
+            "filters": entry.filters,
+            "extra": entry.extra,
+            "signal_only": entry.signal_only,
+        },
+    )
+
+
 @instrumented_task(
     name="sentry.tasks.process_buffer.buffer_incr_task",
     queue="buffers.incr",
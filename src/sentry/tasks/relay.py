@@ -4,6 +4,7 @@ import time
 import sentry_sdk
 from django.db import router, transaction
 
+from sentry import options
 from sentry.models.organization import Organization
 from sentry.relay import projectconfig_cache, projectconfig_debounce_cache
 from sentry.silo.base import SiloMode
@@ -102,18 +103,24 @@ def validate_args(organization_id=None, project_id=None, public_key=None):
         raise TypeError("Must provide exactly one of organzation_id, project_id or public_key")
 
 
-def compute_configs(organization_id=None, project_id=None, public_key=None):
+def compute_configs(organization_id=None, project_id=None, public_key=None, trigger=None):
     """Computes all configs for the org, project or single public key.
 
     You must only provide one single argument, not all.
 
+    :param trigger: The reason for the invalidation. Triggers that only affect some
+       sections of the config only recompute those, see
+       :func:`sentry.relay.config.get_invalidated_sections`.
+
     :returns: A dict mapping all affected public keys to their config.  The dict will not
        contain keys which should be retained in the cache unchanged.
     """
     from sentry.models.project import Project
     from sentry.models.projectkey import ProjectKey
+    from sentry.relay.config import get_invalidated_sections
 
     validate_args(organization_id, project_id, public_key)
+    invalidated_sections = get_invalidated_sections(trigger)
     configs = {}
 
     if organization_id:
@@ -124,38 +131,19 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
         # it could be possible that refrequent invalidations cause the task to take excessive time
         # to complete.
         for organization in Organization.objects.filter(id=organization_id):
-            for project in Project.objects.filter(organization_id=organization_id):
-                project.set_cached_field_value("organization", organization)
-                for key in ProjectKey.objects.filter(project_id=project.id):
-                    key.set_cached_field_value("project", project)
-                    # If we find the config in the cache it means it was active.  As such we want to
-                    # recalculate it.  If the config was not there at all, we leave it and avoid the
-                    # cost of re-computation.
-                    if projectconfig_cache.backend.get(key.public_key) is not None:
-                        configs[key.public_key] = compute_projectkey_config(key)
-                        action = "recompute"
-                    else:
-                        action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "organization"},
-                    )
+            projects = list(Project.objects.filter(organization_id=organization_id))
+            configs.update(
+                _compute_batched_configs(
+                    organization, projects, invalidated_sections, "organization"
+                )
+            )
     elif project_id:
         for project in Project.objects.filter(id=project_id):
-            for key in ProjectKey.objects.filter(project_id=project_id):
-                key.set_cached_field_value("project", project)
-                # If we find the config in the cache it means it was active.  As such we want to
-                # recalculate it.  If the config was not there at all, we leave it and avoid the
-                # cost of re-computation.
-                if projectconfig_cache.backend.get(key.public_key) is not None:
-                    configs[key.public_key] = compute_projectkey_config(key)
-                    action = "recompute"
-                else:
-                    action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "project"},
-                    )
+            configs.update(
+                _compute_batched_configs(
+                    project.organization, [project], invalidated_sections, "project"
+                )
+            )
     elif public_key:
         try:
             key = ProjectKey.objects.get(public_key=public_key)
@@ -170,7 +158,7 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
             # bug was fixed in https://github.com/getsentry/sentry/pull/35671
             configs[public_key] = {"disabled": True}
         else:
-            configs[public_key] = compute_projectkey_config(key)
+            configs[public_key] = compute_projectkey_config(key, invalidated_sections)
 
     else:
         raise TypeError("One of the arguments must not be None")
@@ -178,9 +166,60 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
     return configs
 
 
-def compute_projectkey_config(key):
+def _compute_batched_configs(organization, projects, invalidated_sections, scope):
+    """Computes the configs of all keys of the given projects of an organization that are
+    in the cache, with the inputs shared by the projects fetched once.
+
+    :returns: A dict mapping the affected public keys to their config.
+    """
+    from sentry.models.projectkey import ProjectKey, ProjectKeyStatus
+    from sentry.relay.config import get_project_configs
+
+    projects_by_id = {project.id: project for project in projects}
+    for project in projects:
+        project.set_cached_field_value("organization", organization)
+    keys = list(ProjectKey.objects.filter(project_id__in=list(projects_by_id)))
+
+    # If we find the config in the cache it means it was active.  As such we want to
+    # recalculate it.  If the config was not there at all, we leave it and avoid the
+    # cost of re-computation.
+    cached_public_keys = projectconfig_cache.backend.get_cached_public_keys(
+        [key.public_key for key in keys]
+    )
+    metrics.incr(
+        "relay.projectconfig_cache.invalidation.recompute",
+        amount=len(cached_public_keys),
+        tags={"action": "recompute", "scope": scope},
+    )
+    metrics.incr(
+        "relay.projectconfig_cache.invalidation.recompute",
+        amount=len(keys) - len(cached_public_keys),
+        tags={"action": "not-cached", "scope": scope},
+    )
+
+    configs = {}
+    active_keys = []
+    for key in keys:
+        if key.public_key not in cached_public_keys:
+            continue
+        key.set_cached_field_value("project", projects_by_id[key.project_id])
+        if key.status != ProjectKeyStatus.ACTIVE:
+            configs[key.public_key] = {"disabled": True}
+        else:
+            active_keys.append(key)
+
+    project_configs = get_project_configs(
+        organization, projects, active_keys, invalidated_sections=invalidated_sections
+    )
+    for public_key, config in project_configs.items():
+        configs[public_key] = config.to_dict()
+    return configs
+
+
+def compute_projectkey_config(key, invalidated_sections=None):
     """Computes a single config for the given :class:`ProjectKey`.
 
+    :param invalidated_sections: The config sections to recompute, all of them by default.
     :returns: A dict with the project config.
     """
     from sentry.models.projectkey import ProjectKeyStatus
@@ -189,7 +228,9 @@ def compute_projectkey_config(key):
     if key.status != ProjectKeyStatus.ACTIVE:
         return {"disabled": True}
     else:
-        return get_project_config(key.project, project_keys=[key]).to_dict()
+        return get_project_config(
+            key.project, project_keys=[key], invalidated_sections=invalidated_sections
+        ).to_dict()
 
 
 @instrumented_task(
@@ -239,7 +280,10 @@ def invalidate_project_config(
     sentry_sdk.set_context("kwargs", kwargs)
 
     updated_configs = compute_configs(
-        organization_id=organization_id, project_id=project_id, public_key=public_key
+        organization_id=organization_id,
+        project_id=project_id,
+        public_key=public_key,
+        trigger=trigger,
     )
     projectconfig_cache.backend.set_many(updated_configs)
 
@@ -326,6 +370,7 @@ def _schedule_invalidate_project_config(
     """For param docs, see :func:`schedule_invalidate_project_config`."""
     from sentry.models.project import Project
     from sentry.models.projectkey import ProjectKey
+    from sentry.relay.config import delete_cached_config_sections, get_invalidated_sections
 
     validate_args(organization_id, project_id, public_key)
 
@@ -357,6 +402,23 @@ def _schedule_invalidate_project_config(
             check_debounce_keys["organization_id"] = org_id
 
     if projectconfig_debounce_cache.invalidation.is_debounced(**check_debounce_keys):
+        if (
+            options.get("relay.project-config.sections.enabled")
+            and get_invalidated_sections(trigger) is None
+        ):
+            # The queued task may only recompute some sections of the config and read
+            # the others from the cache. Drop the cached sections so that it picks up
+            # this invalidation as well.
+            if organization_id:
+                project_ids = list(
+                    Project.objects.filter(organization_id=organization_id).values_list(
+                        "id", flat=True
+                    )
+                )
+            else:
+                project_ids = [check_debounce_keys["project_id"]]
+            delete_cached_config_sections(pid for pid in project_ids if pid)
+
         # If this task is already in the queue, do not schedule another task.
         metrics.incr(
             "relay.projectconfig_cache.skipped",
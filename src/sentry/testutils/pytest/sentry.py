@@ -367,6 +367,10 @@ def pytest_runtest_teardown(item: pytest.Item) -> None:
     ProjectOption.objects.clear_local_cache()
     UserOption.objects.clear_local_cache()
 
+    from sentry.api.event_search import parse_cache
+
+    parse_cache.clear()
+
     sentry_sdk.Scope.get_global_scope().set_client(None)
 
 
@@ -1,7 +1,8 @@
 from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, TypedDict, TypeVar
+from typing import Any, TypedDict, TypeVar, Union
 
 from django.conf import settings
 from django.utils import timezone
@@ -110,6 +111,64 @@ class TSDBModel(Enum):
     sentry_app_component_interacted = 801
 
 
+@dataclass(frozen=True)
+class RangeQuery:
+    """
+    A ``get_range`` call, to be run as part of ``execute_batch``.
+    """
+
+    model: TSDBModel
+    keys: Sequence[int | str]
+    start: datetime
+    end: datetime
+    rollup: int | None = None
+    environment_ids: Sequence[int] | None = None
+    tenant_ids: dict[str, str | int] | None = None
+
+
+@dataclass(frozen=True)
+class DistinctCountsSeriesQuery:
+    """
+    A ``get_distinct_counts_series`` call, to be run as part of ``execute_batch``.
+    """
+
+    model: TSDBModel
+    keys: Sequence[int]
+    start: datetime
+    end: datetime | None = None
+    rollup: int | None = None
+    environment_ids: Sequence[int] | None = None
+    tenant_ids: dict[str, str | int] | None = None
+
+
+@dataclass(frozen=True)
+class FrequencySeriesQuery:
+    """
+    A ``get_frequency_series`` call, to be run as part of ``execute_batch``.
+    """
+
+    model: TSDBModel
+    items: Mapping[int | str, Sequence[int | str]]
+    start: datetime
+    end: datetime | None = None
+    rollup: int | None = None
+    environment_ids: Sequence[int] | None = None
+    tenant_ids: dict[str, str | int] | None = None
+
+
+TSDBQuery = Union[RangeQuery, DistinctCountsSeriesQuery, FrequencySeriesQuery]
+
+
+@dataclass
+class BatchResult:
+    #: Results of the queries, in the order the queries were passed in.
+    results: list[Any]
+    #: Round trips to the storage it took to run the batch.
+    round_trips: int
+    #: Round trips it would have taken to run each query on its own.
+    unbatched_round_trips: int
+
+
 class BaseTSDB(Service):
     __read_methods__ = frozenset(
         [
@@ -149,6 +208,7 @@ class BaseTSDB(Service):
                 "get_optimal_rollup",
                 "get_optimal_rollup_series",
                 "get_rollups",
+                "execute_batch",
                 "make_series",
                 "models_with_environment_support",
                 "normalize_to_epoch",
@@ -732,6 +792,66 @@ class BaseTSDB(Service):
         """
         raise NotImplementedError
 
+    def _get_environment_id(self, query: TSDBQuery) -> int | None:
+        """
+        The single environment of a query, for backends that store series per
+        environment and can't combine several of them.
+        """
+        if query.environment_ids is None:
+            return None
+        if len(query.environment_ids) > 1:
+            raise NotImplementedError("Querying multiple environments is not supported.")
+        return query.environment_ids[0] if query.environment_ids else None
+
+    def _execute_query(self, query: TSDBQuery) -> Any:
+        if isinstance(query, RangeQuery):
+            return self.get_range(
+                query.model,
+                query.keys,
+                query.start,
+                query.end,
+                rollup=query.rollup,
+                environment_ids=query.environment_ids,
+                tenant_ids=query.tenant_ids,
+            )
+        elif isinstance(query, DistinctCountsSeriesQuery):
+            return self.get_distinct_counts_series(
+                query.model,
+                query.keys,
+                query.start,
+                query.end,
+                rollup=query.rollup,
+                environment_id=self._get_environment_id(query),
+                tenant_ids=query.tenant_ids,
+            )
+        elif isinstance(query, FrequencySeriesQuery):
+            return self.get_frequency_series(
+                query.model,
+                query.items,
+                query.start,
+                query.end,
+                rollup=query.rollup,
+                environment_id=self._get_environment_id(query),
+                tenant_ids=query.tenant_ids,
+            )
+        else:
+            raise TypeError(f"unsupported query: {query!r}")
+
+    def execute_batch(self, queries: Sequence[TSDBQuery]) -> BatchResult:
+        """
+        Run several (possibly heterogeneous) read queries at once. Results are
+        returned in the same order as ``queries``, together with the number of
+        round trips to the storage that were needed.
+
+        Backends that are able to plan queries together override this, the
+        default runs every query on its own.
+        """
+        return BatchResult(
+            results=[self._execute_query(query) for query in queries],
+            round_trips=len(queries),
+            unbatched_round_trips=len(queries),
+        )
+
     def flush(self) -> None:
         """
         Delete all data.
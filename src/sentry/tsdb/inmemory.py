@@ -0,0 +1,983 @@
+"""
+In-memory time-series storage.
+
+`InMemoryTSDB` keeps every rollup of every model in fixed-size ring buffers,
+which makes it suitable for single-node installs, tests and as a
+deterministic reference when benchmarking the other backends:
+
+- counters are stored column-major, with one array of 64-bit integers per
+  ring slot that is indexed by the row assigned to each key, so range and
+  sum queries resolve the slots of a series once and then only index arrays;
+- distinct counters are HyperLogLog registers, so, as with Redis, counts
+  are estimates (exact for small cardinalities). Registers are kept sparse
+  until they fill up, as most keys only ever see a handful of values;
+- frequency tables are exact, i.e. scores are never over-estimated as they
+  can be with the Count-Min sketches used by Redis.
+
+Rows of keys which haven't been written to for a whole ring are dropped.
+
+Data can optionally be snapshotted to ``snapshot_path`` to survive restarts.
+Only one process can own a snapshot path at a time, see `InMemoryTSDB`.
+"""
+
+from __future__ import annotations
+
+import atexit
+import fcntl
+import hashlib
+import logging
+import math
+import os
+import pickle
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from datetime import datetime
+from typing import Any, TypeVar
+
+from django.utils import timezone
+
+from sentry.tsdb.base import BaseTSDB, IncrMultiOptions, TSDBItem, TSDBKey, TSDBModel
+
+logger = logging.getLogger(__name__)
+
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+_HLL_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+_HLL_VALUE_BITS = 64 - HLL_PRECISION
+
+# Bumped whenever the layout of the pickled tables changes.
+SNAPSHOT_VERSION = 2
+
+
+def _hll_position(value: str | bytes) -> tuple[int, int]:
+    if not isinstance(value, bytes):
+        value = str(value).encode("utf-8")
+    h = int.from_bytes(hashlib.md5(value).digest()[:8], "big")
+    index = h >> _HLL_VALUE_BITS
+    rank = _HLL_VALUE_BITS - (h & ((1 << _HLL_VALUE_BITS) - 1)).bit_length() + 1
+    return index, rank
+
+
+def _hll_count(registers: bytearray) -> int:
+    return _hll_estimate(registers, registers.count(0))
+
+
+def _hll_estimate(ranks: Iterable[int], zeros: int) -> int:
+    # `ranks` may leave out the zero registers, they're accounted for by `zeros`.
+    if zeros == HLL_REGISTERS:
+        return 0
+    harmonic = sum(2.0**-r for r in ranks if r) + zeros
+    estimate = _HLL_ALPHA * HLL_REGISTERS * HLL_REGISTERS / harmonic
+    if estimate <= 2.5 * HLL_REGISTERS and zeros:
+        # Linear counting is much more accurate for small cardinalities.
+        estimate = HLL_REGISTERS * math.log(HLL_REGISTERS / zeros)
+    return int(round(estimate))
+
+
+class _HyperLogLog:
+    """
+    The registers of a HyperLogLog. They start out sparse, as a sorted array
+    of ``index << 8 | rank`` for the non-zero registers only, and are converted
+    to a dense array once the sparse one would take up as much memory.
+    """
+
+    __slots__ = ("sparse", "dense")
+
+    SPARSE_LIMIT = HLL_REGISTERS // 4
+
+    def __init__(self) -> None:
+        self.sparse: array[int] | None = array("I")
+        self.dense: bytearray | None = None
+
+    def add(self, index: int, rank: int) -> None:
+        if self.sparse is None:
+            assert self.dense is not None
+            if rank > self.dense[index]:
+                self.dense[index] = rank
+            return
+
+        i = bisect_left(self.sparse, index << 8)
+        if i < len(self.sparse) and self.sparse[i] >> 8 == index:
+            if rank > self.sparse[i] & 0xFF:
+                self.sparse[i] = index << 8 | rank
+            return
+
+        self.sparse.insert(i, index << 8 | rank)
+        if len(self.sparse) > self.SPARSE_LIMIT:
+            self.dense = bytearray(HLL_REGISTERS)
+            for entry in self.sparse:
+                self.dense[entry >> 8] = entry & 0xFF
+            self.sparse = None
+
+    def update(self, other: _HyperLogLog) -> None:
+        for index, rank in other.registers():
+            self.add(index, rank)
+
+    def registers(self) -> Iterator[tuple[int, int]]:
+        """
+        The index and rank of the non-zero registers.
+        """
+        if self.sparse is not None:
+            return ((entry >> 8, entry & 0xFF) for entry in self.sparse)
+        assert self.dense is not None
+        return ((index, rank) for index, rank in enumerate(self.dense) if rank)
+
+    def merge_into(self, registers: bytearray) -> None:
+        for index, rank in self.registers():
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def count(self) -> int:
+        if self.sparse is not None:
+            return _hll_estimate(
+                (entry & 0xFF for entry in self.sparse), HLL_REGISTERS - len(self.sparse)
+            )
+        assert self.dense is not None
+        return _hll_count(self.dense)
+
+
+class _Ring:
+    """
+    Tracks which rollup interval currently owns each of the `samples` slots
+    of a ring buffer. Interval ``i`` lives in slot ``i % samples``: writing a
+    newer interval recycles the slot, while writes to intervals older than
+    the one currently in the slot have already expired and are dropped.
+
+    Slots holding intervals which fell out of the ring, because no newer
+    interval was written to them in the meantime, are dropped as well.
+    """
+
+    def __init__(self, samples: int) -> None:
+        self.samples = samples
+        self.intervals = array("q", [-1]) * samples
+        self.newest = -1
+
+    def read_slot(self, interval: int) -> int | None:
+        slot = interval % self.samples
+        return slot if self.intervals[slot] == interval else None
+
+    def write_slot(self, interval: int) -> int | None:
+        if interval <= self.newest - self.samples:
+            return None
+        slot = interval % self.samples
+        current = self.intervals[slot]
+        if current == interval:
+            return slot
+        if current > interval:
+            return None
+        self.intervals[slot] = interval
+        self._recycle(slot)
+        if interval > self.newest:
+            self.newest = interval
+            for expired, expired_interval in enumerate(self.intervals):
+                if 0 <= expired_interval <= interval - self.samples:
+                    self.intervals[expired] = -1
+                    self._drop(expired)
+        return slot
+
+    def valid_slots(self) -> Iterator[int]:
+        return (slot for slot, interval in enumerate(self.intervals) if interval >= 0)
+
+    def _recycle(self, slot: int) -> None:
+        raise NotImplementedError
+
+    def _drop(self, slot: int) -> None:
+        raise NotImplementedError
+
+
+class _CounterTable(_Ring):
+    """
+    Counters, stored column-major. Every key gets a row in every column, so
+    once per ring rotation the rows of keys whose last write fell out of the
+    ring are dropped.
+    """
+
+    def __init__(self, samples: int) -> None:
+        super().__init__(samples)
+        self.rows: dict[TSDBKey, int] = {}
+        self.columns = [array("q") for _ in range(samples)]
+        # The last interval written to each row
+        self.last_intervals = array("q")
+        self.pruned = -1
+
+    def _recycle(self, slot: int) -> None:
+        self.columns[slot] = array("q", [0]) * len(self.rows)
+        interval = self.intervals[slot]
+        if interval >= self.pruned + self.samples:
+            self.pruned = interval
+            self._prune(interval - self.samples)
+
+    def _drop(self, slot: int) -> None:
+        # Columns are reallocated when their slot is reused, and the rows of
+        # keys which aren't written to anymore are pruned.
+        pass
+
+    def _prune(self, expired: int) -> None:
+        live = [(key, row) for key, row in self.rows.items() if self.last_intervals[row] > expired]
+        if len(live) == len(self.rows):
+            return
+        rows = [row for _, row in live]
+        self.rows = {key: i for i, (key, _) in enumerate(live)}
+        self.last_intervals = array("q", (self.last_intervals[row] for row in rows))
+        self.columns = [array("q", (column[row] for row in rows)) for column in self.columns]
+
+    def row(self, key: TSDBKey) -> int:
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = len(self.rows)
+            self.last_intervals.append(-1)
+            for column in self.columns:
+                column.append(0)
+        return row
+
+    def touch(self, row: int, interval: int) -> None:
+        if interval > self.last_intervals[row]:
+            self.last_intervals[row] = interval
+
+    def incr(self, key: TSDBKey, interval: int, count: int) -> None:
+        slot = self.write_slot(interval)
+        if slot is not None:
+            row = self.row(key)
+            self.columns[slot][row] += count
+            self.touch(row, interval)
+
+
+class _ObjectTable(_Ring):
+    def __init__(self, samples: int) -> None:
+        super().__init__(samples)
+        self.columns: list[dict[TSDBKey, Any]] = [{} for _ in range(samples)]
+
+    def _recycle(self, slot: int) -> None:
+        self.columns[slot] = {}
+
+    def _drop(self, slot: int) -> None:
+        self.columns[slot] = {}
+
+    def read(self, key: TSDBKey, interval: int) -> Any | None:
+        slot = self.read_slot(interval)
+        return self.columns[slot].get(key) if slot is not None else None
+
+
+_TableKey = tuple[TSDBModel, int, int | None]
+T = TypeVar("T", bound=_Ring)
+
+
+def _environment_ids(environment_ids: Iterable[int | None] | None) -> set[int | None]:
+    return (set(environment_ids) if environment_ids is not None else set()) | {None}
+
+
+class InMemoryTSDB(BaseTSDB):
+    """
+    A time-series storage that keeps all data in process memory.
+
+    All data is lost when the process exits, unless ``snapshot_path`` is
+    given: in that case the data is written there when the process exits (or
+    whenever `snapshot` is called) and loaded again on startup.
+
+    Every process keeps its own data, so snapshots are only taken by the
+    process that owns the snapshot path, i.e. the first one to lock
+    ``<snapshot_path>.lock``. Other processes, including processes forked from
+    the owner, neither restore nor write the snapshot. Snapshots are thus only
+    useful for installs that run the TSDB in a single process.
+    """
+
+    def __init__(self, snapshot_path: str | None = None, **options: Any) -> None:
+        super().__init__(**options)
+        self.snapshot_path = snapshot_path
+        self._lock = threading.RLock()
+        self._counters: dict[_TableKey, _CounterTable] = {}
+        self._distinct_counters: dict[_TableKey, _ObjectTable] = {}
+        self._frequencies: dict[_TableKey, _ObjectTable] = {}
+        self._snapshot_lock_file: Any = None
+        self._snapshot_owner_pid: int | None = None
+
+        if snapshot_path is not None and self._lock_snapshot_path():
+            self._restore()
+            atexit.register(self._snapshot_at_exit)
+
+    def _table(
+        self,
+        tables: dict[_TableKey, T],
+        factory: Callable[[int], T],
+        model: TSDBModel,
+        rollup: int,
+        environment_id: int | None,
+    ) -> T:
+        key = (model, rollup, environment_id)
+        table = tables.get(key)
+        if table is None:
+            table = tables[key] = factory(self.rollups[rollup])
+        return table
+
+    def _intervals(
+        self, start: datetime, end: datetime | None, rollup: int | None
+    ) -> tuple[int, list[int], list[int]]:
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        return rollup, series, [timestamp // rollup for timestamp in series]
+
+    def _active_intervals(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        timestamp: datetime | None = None,
+    ) -> dict[int, list[int]]:
+        return {
+            rollup: [int(dt.timestamp()) // rollup for dt in series]
+            for rollup, series in self.get_active_series(start, end, timestamp).items()
+        }
+
+    def incr(
+        self,
+        model: TSDBModel,
+        key: TSDBKey,
+        timestamp: datetime | None = None,
+        count: int = 1,
+        environment_id: int | None = None,
+    ) -> None:
+        self.incr_multi([(model, key)], timestamp, count, environment_id)
+
+    def incr_multi(
+        self,
+        items: Sequence[tuple[TSDBModel, TSDBKey] | tuple[TSDBModel, TSDBKey, IncrMultiOptions]],
+        timestamp: datetime | None = None,
+        count: int = 1,
+        environment_id: int | None = None,
+    ) -> None:
+        self.validate_arguments([item[0] for item in items], [environment_id])
+
+        if timestamp is None:
+            timestamp = timezone.now()
+
+        with self._lock:
+            for item in items:
+                if len(item) == 2:
+                    model, key = item
+                    _timestamp, _count = timestamp, count
+                else:
+                    model, key, options = item
+                    _timestamp = options.get("timestamp", timestamp) or timestamp
+                    _count = options.get("count", count) or count
+
+                epoch = int(_timestamp.timestamp())
+                for rollup in self.rollups:
+                    for _environment_id in {None, environment_id}:
+                        table = self._table(
+                            self._counters, _CounterTable, model, rollup, _environment_id
+                        )
+                        table.incr(key, epoch // rollup, _count)
+
+    def merge(
+        self,
+        model: TSDBModel,
+        destination: int,
+        sources: list[int],
+        timestamp: datetime | None = None,
+        environment_ids: Iterable[int] | None = None,
+    ) -> None:
+        ids = _environment_ids(environment_ids)
+        self.validate_arguments([model], ids)
+
+        with self._lock:
+            for rollup in self.rollups:
+                for environment_id in ids:
+                    table = self._counters.get((model, rollup, environment_id))
+                    if table is None:
+                        continue
+                    source_rows = [table.rows[s] for s in sources if s in table.rows]
+                    if not source_rows:
+                        continue
+                    destination_row = table.row(destination)
+                    for row in source_rows:
+                        table.touch(destination_row, table.last_intervals[row])
+                    for slot in table.valid_slots():
+                        column = table.columns[slot]
+                        for row in source_rows:
+                            column[destination_row] += column[row]
+                            column[row] = 0
+
+    def delete(
+        self,
+        models: list[TSDBModel],
+        keys: list[int],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        timestamp: datetime | None = None,
+        environment_ids: Iterable[int | None] | None = None,
+    ) -> None:
+        ids = _environment_ids(environment_ids)
+        self.validate_arguments(models, ids)
+
+        with self._lock:
+            for rollup, intervals in self._active_intervals(start, end, timestamp).items():
+                for model in models:
+                    for environment_id in ids:
+                        table = self._counters.get((model, rollup, environment_id))
+                        if table is None:
+                            continue
+                        rows = [table.rows[key] for key in keys if key in table.rows]
+                        for interval in intervals:
+                            slot = table.read_slot(interval)
+                            if slot is None:
+                                continue
+                            for row in rows:
+                                table.columns[slot][row] = 0
+
+    def _get_counter_series(
+        self,
+        model: TSDBModel,
+        keys: Iterable[TSDBKey],
+        rollup: int,
+        intervals: Sequence[int],
+        environment_ids: Sequence[int | None],
+    ) -> dict[TSDBKey, list[int]]:
+        results = {key: [0] * len(intervals) for key in keys}
+        for environment_id in environment_ids:
+            table = self._counters.get((model, rollup, environment_id))
+            if table is None:
+                continue
+            # Resolve the slots once for all keys, the per-key work then only
+            # indexes into the slot arrays.
+            columns = [
+                (i, table.columns[slot])
+                for i, slot in enumerate(map(table.read_slot, intervals))
+                if slot is not None
+            ]
+            for key, counts in results.items():
+                row = table.rows.get(key)
+                if row is None:
+                    continue
+                for i, column in columns:
+                    counts[i] += column[row]
+        return results
+
+    def get_range(
+        self,
+        model: TSDBModel,
+        keys: Sequence[TSDBKey],
+        start: datetime,
+        end: datetime,
+        rollup: int | None = None,
+        environment_ids: Sequence[int] | None = None,
+        conditions=None,
+        use_cache: bool = False,
+        jitter_value: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+        referrer_suffix: str | None = None,
+    ) -> dict[TSDBKey, list[tuple[int, int]]]:
+        _environment_ids: Sequence[int | None] = environment_ids or [None]
+        self.validate_arguments([model], _environment_ids)
+
+        rollup, series, intervals = self._intervals(start, end, rollup)
+        with self._lock:
+            counts = self._get_counter_series(model, keys, rollup, intervals, _environment_ids)
+        return {key: list(zip(series, values)) for key, values in counts.items()}
+
+    def get_sums(
+        self,
+        model: TSDBModel,
+        keys: list[int],
+        start: datetime,
+        end: datetime,
+        rollup: int | None = None,
+        environment_id: int | None = None,
+        use_cache: bool = False,
+        jitter_value: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+        referrer_suffix: str | None = None,
+    ) -> dict[int, int]:
+        self.validate_arguments([model], [environment_id])
+
+        rollup, _, intervals = self._intervals(start, end, rollup)
+        with self._lock:
+            counts = self._get_counter_series(model, keys, rollup, intervals, [environment_id])
+        return {key: sum(values) for key, values in counts.items()}
+
+    def record(
+        self,
+        model: TSDBModel,
+        key: int,
+        values: Iterable[str],
+        timestamp: datetime | None = None,
+        environment_id: int | None = None,
+    ) -> None:
+        self.record_multi(((model, key, values),), timestamp, environment_id)
+
+    def record_multi(
+        self,
+        items: Iterable[tuple[TSDBModel, int, Iterable[str]]],
+        timestamp: datetime | None = None,
+        environment_id: int | None = None,
+    ) -> None:
+        items = [(model, key, [_hll_position(v) for v in values]) for model, key, values in items]
+        self.validate_arguments([model for model, _, _ in items], [environment_id])
+
+        if timestamp is None:
+            timestamp = timezone.now()
+        epoch = int(timestamp.timestamp())
+
+        with self._lock:
+            for model, key, positions in items:
+                for rollup in self.rollups:
+                    for _environment_id in {None, environment_id}:
+                        table = self._table(
+                            self._distinct_counters, _ObjectTable, model, rollup, _environment_id
+                        )
+                        slot = table.write_slot(epoch // rollup)
+                        if slot is None:
+                            continue
+                        registers = table.columns[slot].get(key)
+                        if registers is None:
+                            registers = table.columns[slot][key] = _HyperLogLog()
+                        for index, rank in positions:
+                            registers.add(index, rank)
+
+    def _union_registers(
+        self,
+        model: TSDBModel,
+        keys: Iterable[int],
+        rollup: int,
+        intervals: Sequence[int],
+        environment_id: int | None,
+    ) -> bytearray:
+        union = bytearray(HLL_REGISTERS)
+        table = self._distinct_counters.get((model, rollup, environment_id))
+        if table is not None:
+            for key in keys:
+                for interval in intervals:
+                    registers = table.read(key, interval)
+                    if registers is not None:
+                        registers.merge_into(union)
+        return union
+
+    def get_distinct_counts_series(
+        self,
+        model: TSDBModel,
+        keys: Sequence[int],
+        start: datetime,
+        end: datetime | None = None,
+        rollup: int | None = None,
+        environment_id: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+    ) -> dict[int, list[tuple[int, Any]]]:
+        self.validate_arguments([model], [environment_id])
+
+        rollup, series, intervals = self._intervals(start, end, rollup)
+        with self._lock:
+            table = self._distinct_counters.get((model, rollup, environment_id))
+            results = {}
+            for key in keys:
+                results[key] = []
+                for timestamp, interval in zip(series, intervals):
+                    registers = table.read(key, interval) if table is not None else None
+                    results[key].append(
+                        (timestamp, registers.count() if registers is not None else 0)
+                    )
+        return results
+
+    def get_distinct_counts_totals(
+        self,
+        model: TSDBModel,
+        keys: Sequence[int],
+        start: datetime,
+        end: datetime | None = None,
+        rollup: int | None = None,
+        environment_id: int | None = None,
+        use_cache: bool = False,
+        jitter_value: int | None = None,
+        tenant_ids: dict[str, int | str] | None = None,
+        referrer_suffix: str | None = None,
+    ) -> dict[int, Any]:
+        self.validate_arguments([model], [environment_id])
+
+        rollup, _, intervals = self._intervals(start, end, rollup)
+        with self._lock:
+            return {
+                key: _hll_count(
+                    self._union_registers(model, [key], rollup, intervals, environment_id)
+                )
+                for key in keys
+            }
+
+    def get_distinct_counts_union(
+        self,
+        model: TSDBModel,
+        keys: list[int] | None,
+        start: datetime,
+        end: datetime | None = None,
+        rollup: int | None = None,
+        environment_id: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+    ) -> int:
+        self.validate_arguments([model], [environment_id])
+
+        if not keys:
+            return 0
+
+        rollup, _, intervals = self._intervals(start, end, rollup)
+        with self._lock:
+            return _hll_count(self._union_registers(model, keys, rollup, intervals, environment_id))
+
+    def merge_distinct_counts(
+        self,
+        model: TSDBModel,
+        destination: int,
+        sources: list[int],
+        timestamp: datetime | None = None,
+        environment_ids: Iterable[int] | None = None,
+    ) -> None:
+        ids = _environment_ids(environment_ids)
+        self.validate_arguments([model], ids)
+
+        with self._lock:
+            for rollup in self.rollups:
+                for environment_id in ids:
+                    table = self._distinct_counters.get((model, rollup, environment_id))
+                    if table is None:
+                        continue
+                    for slot in table.valid_slots():
+                        column = table.columns[slot]
+                        for source in sources:
+                            registers = column.pop(source, None)
+                            if registers is None:
+                                continue
+                            if destination in column:
+                                column[destination].update(registers)
+                            else:
+                                column[destination] = registers
+
+    def delete_distinct_counts(
+        self,
+        models: list[TSDBModel],
+        keys: list[int],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        timestamp: datetime | None = None,
+        environment_ids: Iterable[int] | None = None,
+    ) -> None:
+        ids = _environment_ids(environment_ids)
+        self.validate_arguments(models, ids)
+
+        with self._lock:
+            self._delete_objects(self._distinct_counters, models, keys, ids, start, end, timestamp)
+
+    def _delete_objects(
+        self,
+        tables: dict[_TableKey, _ObjectTable],
+        models: list[TSDBModel],
+        keys: Iterable[TSDBKey],
+        environment_ids: set[int | None],
+        start: datetime | None,
+        end: datetime | None,
+        timestamp: datetime | None,
+    ) -> None:
+        keys = list(keys)
+        for rollup, intervals in self._active_intervals(start, end, timestamp).items():
+            for model in models:
+                for environment_id in environment_ids:
+                    table = tables.get((model, rollup, environment_id))
+                    if table is None:
+                        continue
+                    for interval in intervals:
+                        slot = table.read_slot(interval)
+                        if slot is None:
+                            continue
+                        for key in keys:
+                            table.columns[slot].pop(key, None)
+
+    def record_frequency_multi(
+        self,
+        requests: Sequence[tuple[TSDBModel, Mapping[str, Mapping[str, int | float]]]],
+        timestamp: datetime | None = None,
+        environment_id: int | None = None,
+    ) -> None:
+        self.validate_arguments([model for model, request in requests], [environment_id])
+
+        if timestamp is None:
+            timestamp = timezone.now()
+        epoch = int(timestamp.timestamp())
+
+        with self._lock:
+            for model, request in requests:
+                for rollup in self.rollups:
+                    for _environment_id in {None, environment_id}:
+                        table = self._table(
+                            self._frequencies, _ObjectTable, model, rollup, _environment_id
+                        )
+                        slot = table.write_slot(epoch // rollup)
+                        if slot is None:
+                            continue
+                        column = table.columns[slot]
+                        for key, items in request.items():
+                            scores = column.get(key)
+                            if scores is None:
+                                scores = column[key] = defaultdict(float)
+                            for member, score in items.items():
+                                scores[member] += score
+
+    def _get_frequency_tables(
+        self,
+        model: TSDBModel,
+        key: TSDBKey,
+        rollup: int,
+        intervals: Sequence[int],
+        environment_id: int | None,
+    ) -> list[Mapping[str, float]]:
+        table = self._frequencies.get((model, rollup, environment_id))
+        if table is None:
+            return [{} for _ in intervals]
+        return [table.read(key, interval) or {} for interval in intervals]
+
+    @staticmethod
+    def _rank(scores: Mapping[str, float], limit: int | None) -> list[tuple[str, float]]:
+        ranked = sorted(
+            ((member, float(score)) for member, score in scores.items() if score > 0),
+            key=lambda item: (-item[1], item[0]),
+        )
+        return ranked[:limit] if limit is not None else ranked
+
+    def get_most_frequent(
+        self,
+        model: TSDBModel,
+        keys: Sequence[TSDBKey],
+        start: datetime,
+        end: datetime | None = None,
+        rollup: int | None = None,
+        limit: int | None = None,
+        environment_id: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+    ) -> dict[TSDBKey, list[tuple[str, float]]]:
+        self.validate_arguments([model], [environment_id])
+
+        rollup, _, intervals = self._intervals(start, end, rollup)
+        results = {}
+        with self._lock:
+            for key in keys:
+                totals: dict[str, float] = defaultdict(float)
+                for scores in self._get_frequency_tables(
+                    model, key, rollup, intervals, environment_id
+                ):
+                    for member, score in scores.items():
+                        totals[member] += score
+                results[key] = self._rank(totals, limit)
+        return results
+
+    def get_most_frequent_series(
+        self,
+        model: TSDBModel,
+        keys: Iterable[str],
+        start: datetime,
+        end: datetime | None = None,
+        rollup: int | None = None,
+        limit: int | None = None,
+        environment_id: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+    ) -> dict[str, list[tuple[int, dict[str, float]]]]:
+        self.validate_arguments([model], [environment_id])
+
+        rollup, series, intervals = self._intervals(start, end, rollup)
+        results = {}
+        with self._lock:
+            for key in keys:
+                tables = self._get_frequency_tables(model, key, rollup, intervals, environment_id)
+                results[key] = [
+                    (timestamp, dict(self._rank(scores, limit)))
+                    for timestamp, scores in zip(series, tables)
+                ]
+        return results
+
+    def get_frequency_series(
+        self,
+        model: TSDBModel,
+        items: Mapping[TSDBKey, Sequence[TSDBItem]],
+        start: datetime,
+        end: datetime | None = None,
+        rollup: int | None = None,
+        environment_id: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+    ) -> dict[TSDBKey, list[tuple[float, dict[TSDBItem, float]]]]:
+        self.validate_arguments([model], [environment_id])
+
+        rollup, series, intervals = self._intervals(start, end, rollup)
+        results: dict[TSDBKey, list[tuple[float, dict[TSDBItem, float]]]] = {}
+        with self._lock:
+            for key, members in items.items():
+                tables = self._get_frequency_tables(model, key, rollup, intervals, environment_id)
+                results[key] = [
+                    (timestamp, {member: float(scores.get(member, 0.0)) for member in members})
+                    for timestamp, scores in zip(series, tables)
+                ]
+        return results
+
+    def get_frequency_totals(
+        self,
+        model: TSDBModel,
+        items: Mapping[TSDBKey, Sequence[TSDBItem]],
+        start: datetime,
+        end: datetime | None = None,
+        rollup: int | None = None,
+        environment_id: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+    ) -> dict[TSDBKey, dict[TSDBItem, float]]:
+        results: dict[TSDBKey, dict[TSDBItem, float]] = {}
+        for key, series in self.get_frequency_series(
+            model, items, start, end, rollup, environment_id
+        ).items():
+            totals = results[key] = {member: 0.0 for member in items[key]}
+            for _, scores in series:
+                for member, score in scores.items():
+                    totals[member] += score
+        return results
+
+    def merge_frequencies(
+        self,
+        model: TSDBModel,
+        destination: str,
+        sources: Sequence[TSDBKey],
+        timestamp: datetime | None = None,
+        environment_ids: Iterable[int] | None = None,
+    ) -> None:
+        ids = _environment_ids(environment_ids)
+        self.validate_arguments([model], ids)
+
+        with self._lock:
+            for rollup in self.rollups:
+                for environment_id in ids:
+                    table = self._frequencies.get((model, rollup, environment_id))
+                    if table is None:
+                        continue
+                    for slot in table.valid_slots():
+                        column = table.columns[slot]
+                        for source in sources:
+                            scores = column.pop(source, None)
+                            if scores is None:
+                                continue
+                            merged = column.setdefault(destination, defaultdict(float))
+                            for member, score in scores.items():
+                                merged[member] += score
+
+    def delete_frequencies(
+        self,
+        models: list[TSDBModel],
+        keys: Iterable[str],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        timestamp: datetime | None = None,
+        environment_ids: Iterable[int] | None = None,
+    ) -> None:
+        ids = _environment_ids(environment_ids)
+        self.validate_arguments(models, ids)
+
+        with self._lock:
+            self._delete_objects(self._frequencies, models, keys, ids, start, end, timestamp)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._distinct_counters.clear()
+            self._frequencies.clear()
+
+    def _lock_snapshot_path(self) -> bool:
+        assert self.snapshot_path is not None
+        lock_file = open(f"{self.snapshot_path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            logger.warning(
+                "tsdb.inmemory.snapshot-disabled",
+                extra={"path": self.snapshot_path, "reason": "locked by another process"},
+            )
+            return False
+
+        self._snapshot_lock_file = lock_file
+        self._snapshot_owner_pid = os.getpid()
+        return True
+
+    def owns_snapshot(self) -> bool:
+        return self._snapshot_owner_pid is not None and self._snapshot_owner_pid == os.getpid()
+
+    def close(self) -> None:
+        """
+        Takes a final snapshot and releases the snapshot path, so that another
+        instance can take it over.
+        """
+        if not self.owns_snapshot():
+            return
+        atexit.unregister(self._snapshot_at_exit)
+        try:
+            self.snapshot()
+        finally:
+            self._snapshot_lock_file.close()
+            self._snapshot_lock_file = None
+            self._snapshot_owner_pid = None
+
+    def snapshot(self) -> None:
+        """
+        Atomically writes all data to ``snapshot_path``.
+        """
+        if self.snapshot_path is None:
+            raise ValueError("snapshot_path is not configured")
+        if not self.owns_snapshot():
+            raise ValueError("snapshot_path is owned by another process")
+
+        with self._lock:
+            data = pickle.dumps(
+                {
+                    "version": SNAPSHOT_VERSION,
+                    "rollups": self.rollups,
+                    "counters": self._counters,
+                    "distinct_counters": self._distinct_counters,
+                    "frequencies": self._frequencies,
+                },
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        fd, path = tempfile.mkstemp(dir=directory, prefix=".tsdb-snapshot-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(path, self.snapshot_path)
+        except BaseException:
+            os.unlink(path)
+            raise
+
+    def _snapshot_at_exit(self) -> None:
+        if not self.owns_snapshot():
+            # Forked processes inherit the exit handler, but not the data
+            return
+        try:
+            self.snapshot()
+        except Exception:
+            logger.exception("tsdb.inmemory.snapshot-failed", extra={"path": self.snapshot_path})
+
+    def _restore(self) -> None:
+        assert self.snapshot_path is not None
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+
+        if data.get("version") != SNAPSHOT_VERSION:
+            logger.warning(
+                "tsdb.inmemory.snapshot-discarded",
+                extra={"path": self.snapshot_path, "reason": "format changed"},
+            )
+            return
+
+        # The ring buffers are sized for the rollups they were created with.
+        if data["rollups"] != self.rollups:
+            logger.warning(
+                "tsdb.inmemory.snapshot-discarded",
+                extra={"path": self.snapshot_path, "reason": "rollups changed"},
+            )
+            return
+
+        self._counters = data["counters"]
+        self._distinct_counters = data["distinct_counters"]
+        self._frequencies = data["frequencies"]
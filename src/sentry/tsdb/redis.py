@@ -14,8 +14,21 @@ import rb
 from django.utils import timezone
 from django.utils.encoding import force_bytes
 from redis.client import Script
-
-from sentry.tsdb.base import BaseTSDB, IncrMultiOptions, TSDBItem, TSDBKey, TSDBModel
+from redis.exceptions import NoScriptError
+
+from sentry.tsdb.base import (
+    BaseTSDB,
+    BatchResult,
+    DistinctCountsSeriesQuery,
+    FrequencySeriesQuery,
+    IncrMultiOptions,
+    RangeQuery,
+    TSDBItem,
+    TSDBKey,
+    TSDBModel,
+    TSDBQuery,
+)
+from sentry.utils import metrics
 from sentry.utils.dates import to_datetime
 from sentry.utils.redis import (
     check_cluster_versions,
@@ -66,6 +79,40 @@ class SuppressionWrapper(Generic[T]):
         return True
 
 
+class _BatchPipeline:
+    """\
+    Routes the commands of several queries through a single fanout client, so
+    that they end up in one pipeline per host, and keeps track of the hosts
+    that were involved.
+
+    Lua scripts are loaded as part of the same pipeline on hosts where they
+    have not been loaded yet by this process (as opposed to
+    ``Cluster.execute_commands``, which checks for them in a separate round
+    trip every time.)
+    """
+
+    def __init__(self, cluster: rb.Cluster, client: Any, loaded_scripts: set[tuple[Any, ...]]):
+        self.cluster = cluster
+        self.client = client
+        self.router = cluster.get_router()
+        self.loaded_scripts = loaded_scripts
+        self.hosts: set[int] = set()
+        self.pending_scripts: set[tuple[Any, ...]] = set()
+
+    def target_key(self, key: Any, hosts: set[int], script: Script | None = None) -> Any:
+        host_id = self.router.get_host_for_key(key)
+        self.hosts.add(host_id)
+        hosts.add(host_id)
+
+        if script is not None:
+            script_key = (self.cluster, host_id, script.sha)
+            if script_key not in self.loaded_scripts and script_key not in self.pending_scripts:
+                self.client.target([host_id]).execute_command("SCRIPT LOAD", script.script)
+                self.pending_scripts.add(script_key)
+
+        return self.client.target_key(key)
+
+
 class RedisTSDB(BaseTSDB):
     """
     A time series storage backend for Redis.
@@ -129,6 +176,7 @@ class RedisTSDB(BaseTSDB):
         self.prefix = prefix
         self.vnodes = vnodes
         self.enable_frequency_sketches = options.pop("enable_frequency_sketches", False)
+        self._loaded_scripts: set[tuple[Any, ...]] = set()
         super().__init__(**options)
 
     def validate(self) -> None:
@@ -1100,3 +1148,142 @@ class RedisTSDB(BaseTSDB):
                                         model, rollup, timestamp.timestamp(), key, environment_id
                                     ):
                                         c.delete(k)
+
+    def execute_batch(self, queries: Sequence[TSDBQuery]) -> BatchResult:
+        """
+        Runs all ``queries`` using a single pipeline per host, instead of
+        one ``map`` or ``fanout`` per query (plus a round trip to check for
+        the Count-Min script for every frequency table query.)
+        """
+        environment_ids = [self._get_environment_id(query) for query in queries]
+        for query, environment_id in zip(queries, environment_ids):
+            self.validate_arguments([query.model], [environment_id])
+            if isinstance(query, FrequencySeriesQuery) and not self.enable_frequency_sketches:
+                raise NotImplementedError("Frequency sketches are disabled.")
+
+        queries_by_cluster: dict[rb.Cluster, list[int]] = defaultdict(list)
+        for i, environment_id in enumerate(environment_ids):
+            cluster, _ = self.get_cluster(environment_id)
+            queries_by_cluster[cluster].append(i)
+
+        results: list[Any] = [None] * len(queries)
+        round_trips = 0
+        unbatched_round_trips = 0
+        for cluster, indexes in queries_by_cluster.items():
+            for attempt in range(2):
+                pipeline = None
+                try:
+                    with cluster.fanout() as client:
+                        pipeline = _BatchPipeline(cluster, client, self._loaded_scripts)
+                        resolvers = [self._plan_batch_query(pipeline, queries[i]) for i in indexes]
+                except NoScriptError:
+                    # Scripts have been flushed from a host since we loaded
+                    # them, so forget about all of them and try once more.
+                    assert pipeline is not None
+                    round_trips += len(pipeline.hosts)
+                    self._loaded_scripts.clear()
+                    if attempt:
+                        raise
+                    continue
+
+                self._loaded_scripts.update(pipeline.pending_scripts)
+                round_trips += len(pipeline.hosts)
+                for i, (resolve, unbatched) in zip(indexes, resolvers):
+                    results[i] = resolve()
+                    unbatched_round_trips += unbatched
+                break
+
+        metrics.distribution("tsdb.batch.queries", len(queries))
+        metrics.distribution("tsdb.batch.round_trips", round_trips)
+        metrics.distribution("tsdb.batch.unbatched_round_trips", unbatched_round_trips)
+
+        return BatchResult(
+            results=results,
+            round_trips=round_trips,
+            unbatched_round_trips=unbatched_round_trips,
+        )
+
+    def _plan_batch_query(
+        self, pipeline: _BatchPipeline, query: TSDBQuery
+    ) -> tuple[Callable[[], Any], int]:
+        """
+        Queues the commands for ``query`` and returns a function that
+        assembles its result once the pipeline has been executed, together
+        with the number of round trips the query would have taken on its own.
+        """
+        rollup, series = self.get_optimal_rollup_series(query.start, query.end, query.rollup)
+        environment_id = self._get_environment_id(query)
+        hosts: set[int] = set()
+
+        if isinstance(query, RangeQuery):
+            counters: dict[TSDBKey, list[tuple[int, rb.Promise]]] = {}
+            for key in query.keys:
+                points = counters[key] = []
+                for timestamp in series:
+                    hash_key, hash_field = self.make_counter_key(
+                        query.model, rollup, timestamp, key, environment_id
+                    )
+                    points.append(
+                        (timestamp, pipeline.target_key(hash_key, hosts).hget(hash_key, hash_field))
+                    )
+
+            def resolve_range() -> dict[TSDBKey, list[tuple[int, int]]]:
+                return {
+                    key: [(timestamp, int(promise.value or 0)) for timestamp, promise in points]
+                    for key, points in counters.items()
+                }
+
+            return resolve_range, len(hosts)
+
+        elif isinstance(query, DistinctCountsSeriesQuery):
+            distinct_counts: dict[int, list[tuple[int, rb.Promise]]] = {}
+            for key in query.keys:
+                c = pipeline.target_key(key, hosts)
+                distinct_counts[key] = [
+                    (
+                        timestamp,
+                        c.pfcount(
+                            self.make_key(query.model, rollup, timestamp, key, environment_id)
+                        ),
+                    )
+                    for timestamp in series
+                ]
+
+            def resolve_distinct_counts() -> dict[int, list[tuple[int, Any]]]:
+                return {
+                    key: [(timestamp, promise.value) for timestamp, promise in points]
+                    for key, points in distinct_counts.items()
+                }
+
+            return resolve_distinct_counts, len(hosts)
+
+        elif isinstance(query, FrequencySeriesQuery):
+            items = {k: list(members) for k, members in query.items.items()}
+            arguments = ["ESTIMATE"] + list(self.DEFAULT_SKETCH_PARAMETERS)
+            estimates: dict[TSDBKey, rb.Promise] = {}
+            for item_key, members in items.items():
+                ks: list[str] = []
+                for timestamp in series:
+                    ks.extend(
+                        self.make_frequency_table_keys(
+                            query.model, rollup, timestamp, item_key, environment_id
+                        )
+                    )
+                estimates[item_key] = pipeline.target_key(
+                    item_key, hosts, script=CountMinScript
+                ).execute_command("EVALSHA", CountMinScript.sha, len(ks), *ks, *arguments, *members)
+
+            def resolve_frequencies() -> dict[TSDBKey, list[tuple[float, dict[TSDBItem, float]]]]:
+                return {
+                    item_key: [
+                        (timestamp, dict(zip(items[item_key], (float(s) for s in scores))))
+                        for timestamp, scores in zip(series, promise.value)
+                    ]
+                    for item_key, promise in estimates.items()
+                }
+
+            # ``execute_commands`` checks for scripts in a separate fanout.
+            return resolve_frequencies, 2 * len(hosts)
+
+        else:
+            raise TypeError(f"unsupported query: {query!r}")
@@ -1,9 +1,19 @@
 import inspect
 import time
+from collections.abc import Sequence
+from typing import Any
 
 import sentry_sdk
 
-from sentry.tsdb.base import BaseTSDB, TSDBModel
+from sentry.tsdb.base import (
+    BaseTSDB,
+    BatchResult,
+    DistinctCountsSeriesQuery,
+    FrequencySeriesQuery,
+    RangeQuery,
+    TSDBModel,
+    TSDBQuery,
+)
 from sentry.tsdb.dummy import DummyTSDB
 from sentry.tsdb.redis import RedisTSDB
 from sentry.tsdb.snuba import SnubaTSDB
@@ -78,6 +88,13 @@ def selector_func(method, callargs, switchover_timestamp=None):
     return backends.pop()
 
 
+query_methods = {
+    RangeQuery: "get_range",
+    DistinctCountsSeriesQuery: "get_distinct_counts_series",
+    FrequencySeriesQuery: "get_frequency_series",
+}
+
+
 def make_method(key):
     def method(self, *a, **kw):
         callargs = inspect.getcallargs(getattr(BaseTSDB, key), self, *a, **kw)
@@ -127,3 +144,37 @@ class RedisSnubaTSDB(BaseTSDB, metaclass=RedisSnubaTSDBMeta):
             "snuba": SnubaTSDB(**options.pop("snuba", {})),
         }
         super().__init__(**options)
+
+    def execute_batch(self, queries: Sequence[TSDBQuery]) -> BatchResult:
+        """
+        Queries that are answered by Redis are run as one batch, the
+        remaining ones are run against their backend one by one.
+        """
+        results: list[Any] = [None] * len(queries)
+        round_trips = 0
+        unbatched_round_trips = 0
+
+        redis_queries: list[tuple[int, TSDBQuery]] = []
+        for i, query in enumerate(queries):
+            backend = selector_func(
+                query_methods[type(query)], {"model": query.model}, self.switchover_timestamp
+            )
+            if backend == "redis":
+                redis_queries.append((i, query))
+            else:
+                results[i] = self.backends[backend]._execute_query(query)
+                round_trips += 1
+                unbatched_round_trips += 1
+
+        if redis_queries:
+            batch = self.backends["redis"].execute_batch([query for _, query in redis_queries])
+            for (i, _), result in zip(redis_queries, batch.results):
+                results[i] = result
+            round_trips += batch.round_trips
+            unbatched_round_trips += batch.unbatched_round_trips
+
+        return BatchResult(
+            results=results,
+            round_trips=round_trips,
+            unbatched_round_trips=unbatched_round_trips,
+        )
@@ -28,7 +28,15 @@ from sentry.constants import DataCategory
 from sentry.ingest.inbound_filters import FILTER_STAT_KEYS_TO_VALUES
 from sentry.issues.query import manual_group_on_time_aggregation
 from sentry.snuba.dataset import Dataset
-from sentry.tsdb.base import BaseTSDB, TSDBItem, TSDBKey, TSDBModel
+from sentry.tsdb.base import (
+    BaseTSDB,
+    DistinctCountsSeriesQuery,
+    FrequencySeriesQuery,
+    TSDBItem,
+    TSDBKey,
+    TSDBModel,
+    TSDBQuery,
+)
 from sentry.utils import outcomes, snuba
 from sentry.utils.dates import to_datetime
 from sentry.utils.snuba import (
@@ -703,6 +711,30 @@ class SnubaTSDB(BaseTSDB):
                     else:
                         self.unnest(val, aggregated_as)
 
+    def _execute_query(self, query: TSDBQuery) -> Any:
+        # Snuba filters on any number of environments at once
+        if isinstance(query, DistinctCountsSeriesQuery):
+            return self._get_distinct_counts_series(
+                query.model,
+                query.keys,
+                query.start,
+                query.end,
+                query.rollup,
+                query.environment_ids,
+                tenant_ids=query.tenant_ids,
+            )
+        elif isinstance(query, FrequencySeriesQuery):
+            return self._get_frequency_series(
+                query.model,
+                query.items,
+                query.start,
+                query.end,
+                query.rollup,
+                query.environment_ids,
+                tenant_ids=query.tenant_ids,
+            )
+        return super()._execute_query(query)
+
     def get_range(
         self,
         model: TSDBModel,
@@ -756,13 +788,33 @@ class SnubaTSDB(BaseTSDB):
         environment_id=None,
         tenant_ids=None,
     ):
-        result = self.get_data(
+        return self._get_distinct_counts_series(
             model,
             keys,
             start,
             end,
             rollup,
             [environment_id] if environment_id is not None else None,
+            tenant_ids=tenant_ids,
+        )
+
+    def _get_distinct_counts_series(
+        self,
+        model,
+        keys: Sequence[int],
+        start,
+        end=None,
+        rollup=None,
+        environment_ids=None,
+        tenant_ids=None,
+    ):
+        result = self.get_data(
+            model,
+            keys,
+            start,
+            end,
+            rollup,
+            environment_ids,
             aggregation="uniq",
             group_on_time=True,
             tenant_ids=tenant_ids,
@@ -892,13 +944,33 @@ class SnubaTSDB(BaseTSDB):
         environment_id: int | None = None,
         tenant_ids: dict[str, str | int] | None = None,
     ) -> dict[TSDBKey, list[tuple[float, dict[TSDBItem, float]]]]:
-        result = self.get_data(
+        return self._get_frequency_series(
             model,
             items,
             start,
             end,
             rollup,
             [environment_id] if environment_id is not None else None,
+            tenant_ids=tenant_ids,
+        )
+
+    def _get_frequency_series(
+        self,
+        model: TSDBModel,
+        items: Mapping[TSDBKey, Sequence[TSDBItem]],
+        start: datetime,
+        end: datetime | None = None,
+        rollup: int | None = None,
+        environment_ids: Sequence[int] | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+    ) -> dict[TSDBKey, list[tuple[float, dict[TSDBItem, float]]]]:
+        result = self.get_data(
+            model,
+            items,
+            start,
+            end,
+            rollup,
+            environment_ids,
             aggregation="count()",
             group_on_time=True,
             tenant_ids=tenant_ids,
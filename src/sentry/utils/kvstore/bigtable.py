@@ -170,9 +170,15 @@ class BigtableKVStorage(KVStorage[str, bytes]):
 
         return value
 
-    def set(self, key: str, value: bytes, ttl: timedelta | None = None) -> None:
+    def set(
+        self, key: str, value: bytes, ttl: timedelta | None = None, *, compress: bool = True
+    ) -> None:
+        """
+        Pass ``compress=False`` for values that are compressed already, they are
+        then stored as they are regardless of the configured compression.
+        """
         try:
-            return self._set(key, value, ttl)
+            return self._set(key, value, ttl, compress=compress)
         except (exceptions.InternalServerError, exceptions.ServiceUnavailable):
             # Delete cached client before retry
             with self.__table_lock:
@@ -180,9 +186,11 @@ class BigtableKVStorage(KVStorage[str, bytes]):
             # Retry once on InternalServerError or ServiceUnavailable
             # 500 Received RST_STREAM with error code 2
             # SENTRY-S6D
-            return self._set(key, value, ttl)
+            return self._set(key, value, ttl, compress=compress)
 
-    def _set(self, key: str, value: bytes, ttl: timedelta | None = None) -> None:
+    def _set(
+        self, key: str, value: bytes, ttl: timedelta | None = None, *, compress: bool = True
+    ) -> None:
         # XXX: There is a type mismatch here -- ``direct_row`` expects
         # ``bytes`` but we are providing it with ``str``.
         row = self._get_table().direct_row(key)
@@ -224,7 +232,7 @@ class BigtableKVStorage(KVStorage[str, bytes]):
         # tracking now is whether compression is on or not for the data column.
         flags = self.Flags(0)
 
-        if self.compression:
+        if self.compression and compress:
             compression_flag, strategy = self.compression_strategies[self.compression]
             flags |= compression_flag
             value = strategy.encode(value)
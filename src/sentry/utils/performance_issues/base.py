@@ -4,6 +4,9 @@ import hashlib
 import random
 import re
 from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import timedelta
 from enum import Enum
 from typing import Any, ClassVar
@@ -168,12 +171,45 @@ def does_overlap_previous_span(previous_span: Span, current_span: Span):
     return previous_span_ends > current_span_begins
 
 
-def get_span_duration(span: Span) -> timedelta:
+# Durations of the spans of the event that is being run through the detectors, keyed by the id of
+# the span object. See `precomputed_span_durations`.
+_span_durations: ContextVar[dict[int, timedelta] | None] = ContextVar(
+    "performance_issues_span_durations", default=None
+)
+
+
+def _compute_span_duration(span: Span) -> timedelta:
     return timedelta(seconds=span.get("timestamp", 0)) - timedelta(
         seconds=span.get("start_timestamp", 0)
     )
 
 
+@contextmanager
+def precomputed_span_durations(spans: Sequence[Span]) -> Iterator[None]:
+    """
+    Computes the duration of each of the given spans once, and serves `get_span_duration` for them
+    from that table inside the block. Most detectors look at the duration of every span they visit.
+
+    The spans must not be modified inside the block.
+    """
+    token = _span_durations.set(
+        {id(span): _compute_span_duration(span) for span in spans if isinstance(span, dict)}
+    )
+    try:
+        yield
+    finally:
+        _span_durations.reset(token)
+
+
+def get_span_duration(span: Span) -> timedelta:
+    durations = _span_durations.get()
+    if durations is not None:
+        duration = durations.get(id(span))
+        if duration is not None:
+            return duration
+    return _compute_span_duration(span)
+
+
 def get_duration_between_spans(first_span: Span, second_span: Span):
     first_span_ends = first_span.get("timestamp", 0)
     second_span_begins = second_span.get("start_timestamp", 0)
@@ -19,7 +19,7 @@ from sentry.utils.event import is_event_from_browser_javascript_sdk
 from sentry.utils.event_frames import get_sdk_name
 from sentry.utils.safe import get_path
 
-from .base import DetectorType, PerformanceDetector
+from .base import DetectorType, PerformanceDetector, precomputed_span_durations
 from .detectors.consecutive_db_detector import ConsecutiveDBSpanDetector
 from .detectors.consecutive_http_detector import ConsecutiveHTTPSpanDetector
 from .detectors.http_overhead_detector import HTTPOverheadDetector
@@ -348,11 +348,8 @@ def _detect_performance_problems(
             if detector_class.is_detector_enabled()
         ]
 
-    for detector in detectors:
-        with sentry_sdk.start_span(
-            op="function", description=f"run_detector_on_data.{detector.type.value}"
-        ):
-            run_detector_on_data(detector, data)
+    with sentry_sdk.start_span(op="function", description="run_detectors_on_data"):
+        run_detectors_on_data(detectors, data)
 
     with sentry_sdk.start_span(op="function", description="report_metrics_for_detectors"):
         # Metrics reporting only for detection, not created issues.
@@ -411,6 +408,28 @@ def run_detector_on_data(detector: PerformanceDetector, data: dict[str, Any]) ->
     detector.on_complete()
 
 
+def run_detectors_on_data(detectors: Sequence[PerformanceDetector], data: dict[str, Any]) -> None:
+    """
+    Equivalent to calling `run_detector_on_data` for each of the detectors, but walks the spans
+    only once, handing each span to all eligible detectors in turn. Detectors only keep state of
+    their own and never modify spans, so interleaving them doesn't change what they detect.
+    """
+    detectors = [detector for detector in detectors if detector.is_event_eligible(data)]
+    if not detectors:
+        return
+
+    spans = data.get("spans", [])
+    visitors = [detector.visit_span for detector in detectors]
+
+    with precomputed_span_durations(spans):
+        for span in spans:
+            for visit_span in visitors:
+                visit_span(span)
+
+        for detector in detectors:
+            detector.on_complete()
+
+
 # Reports metrics and creates spans for detection
 def report_metrics_for_detectors(
     event: dict[str, Any],
@@ -27,6 +27,8 @@ from google.protobuf.message import Message as ProtobufMessage
 from snuba_sdk import DeleteQuery, MetricsQuery, Request
 from snuba_sdk.legacy import json_to_snql
 
+from sentry import options
+from sentry.locks import locks
 from sentry.models.environment import Environment
 from sentry.models.group import Group
 from sentry.models.grouprelease import GroupRelease
@@ -42,6 +44,7 @@ from sentry.snuba.query_sources import QuerySource
 from sentry.snuba.referrer import validate_referrer
 from sentry.utils import json, metrics
 from sentry.utils.dates import outside_retention_with_modified_start
+from sentry.utils.locking import UnableToAcquireLock
 
 logger = logging.getLogger(__name__)
 
@@ -1029,6 +1032,9 @@ def bulk_raw_query(
     return _apply_cache_and_build_results(snuba_requests, use_cache=use_cache)
 
 
+COALESCING_POLL_INTERVAL = 0.05
+
+
 def get_cache_key(query: Request) -> str:
     if isinstance(query, Request):
         hashable = str(query)
@@ -1077,7 +1083,7 @@ def _apply_cache_and_build_results(
             to_query.append((query_pos, snuba_request, None))
 
     if to_query:
-        query_results = _bulk_snuba_query([item[1] for item in to_query])
+        query_results = _bulk_snuba_query_coalesced([item[1] for item in to_query])
         for result, (query_pos, _, opt_cache_key) in zip(query_results, to_query):
             if opt_cache_key:
                 cache.set(
@@ -1091,6 +1097,108 @@ def _apply_cache_and_build_results(
     return [result[1] for result in results]
 
 
+def _bulk_snuba_query_coalesced(snuba_requests: Sequence[SnubaRequest]) -> ResultSet:
+    """
+    Like `_bulk_snuba_query`, except that identical queries of the referrers in
+    ``snuba.coalescing.referrers`` only run once at a time across all processes: the
+    first caller takes a lock and runs the query, and concurrent callers wait for its
+    result. Results are shared for ``snuba.coalescing.result-ttl-seconds``, after which
+    they are still served for the stale-while-revalidate window of the referrer while
+    the caller that takes the lock refreshes them.
+    """
+    referrers = options.get("snuba.coalescing.referrers")
+    if not referrers or not any(r.referrer in referrers for r in snuba_requests):
+        return _bulk_snuba_query(snuba_requests)
+
+    ttl = options.get("snuba.coalescing.result-ttl-seconds")
+    timeout = options.get("snuba.coalescing.timeout-seconds")
+    stale_windows = options.get("snuba.coalescing.stale-while-revalidate")
+
+    results: list[Mapping[str, Any] | None] = [None] * len(snuba_requests)
+    to_run: list[int] = []
+    leaders: dict[int, tuple[str, Any]] = {}
+    followers: dict[int, tuple[str, Any]] = {}
+
+    now = time.time()
+    for i, snuba_request in enumerate(snuba_requests):
+        referrer = snuba_request.referrer
+        if referrer not in referrers:
+            to_run.append(i)
+            continue
+
+        key = f"{get_cache_key(snuba_request.request)}:coalesced"
+        cached = cache.get(key)
+        entry = json.loads(cached) if cached is not None else None
+        if entry is not None and now - entry["timestamp"] < ttl:
+            metrics.incr("snuba.coalescing.saved", tags={"referrer": referrer, "reason": "fresh"})
+            results[i] = entry["result"]
+            continue
+
+        lock = locks.get(f"{key}:lock", duration=timeout, name="snuba_query_coalescing")
+        try:
+            lock.acquire()
+        except UnableToAcquireLock:
+            if entry is not None:
+                # The result is expired but within the stale-while-revalidate window,
+                # since it would have been evicted from the cache otherwise.
+                metrics.incr(
+                    "snuba.coalescing.saved", tags={"referrer": referrer, "reason": "stale"}
+                )
+                results[i] = entry["result"]
+            else:
+                followers[i] = (key, lock)
+            continue
+
+        metrics.incr("snuba.coalescing.leader", tags={"referrer": referrer})
+        leaders[i] = (key, lock)
+        to_run.append(i)
+
+    try:
+        if to_run:
+            query_results = _bulk_snuba_query([snuba_requests[i] for i in to_run])
+            for i, result in zip(to_run, query_results):
+                results[i] = result
+                if i in leaders:
+                    cache.set(
+                        leaders[i][0],
+                        json.dumps({"timestamp": time.time(), "result": result}),
+                        ttl + stale_windows.get(snuba_requests[i].referrer, 0),
+                    )
+    finally:
+        for _, lock in leaders.values():
+            lock.release()
+
+    deadline = time.monotonic() + timeout
+    while followers and time.monotonic() < deadline:
+        time.sleep(COALESCING_POLL_INTERVAL)
+        # Checked before reading the results, so that a lock released after storing the
+        # result is never mistaken for a failed query.
+        running = any(lock.locked() for _, lock in followers.values())
+        cached_results = cache.get_many([key for key, _ in followers.values()])
+        for i, (key, _) in list(followers.items()):
+            cached = cached_results.get(key)
+            if cached is not None:
+                metrics.incr(
+                    "snuba.coalescing.saved",
+                    tags={"referrer": snuba_requests[i].referrer, "reason": "coalesced"},
+                )
+                results[i] = json.loads(cached)["result"]
+                del followers[i]
+        if not running:
+            # The callers holding the locks failed to run the queries, so no results are
+            # coming for the remaining ones.
+            break
+
+    if followers:
+        for i in followers:
+            metrics.incr("snuba.coalescing.timeout", tags={"referrer": snuba_requests[i].referrer})
+        query_results = _bulk_snuba_query([snuba_requests[i] for i in followers])
+        for i, result in zip(followers, query_results):
+            results[i] = result
+
+    return results  # type: ignore[return-value]
+
+
 def _is_rejected_query(body: Any) -> bool:
     return (
         "quota_allowance" in body
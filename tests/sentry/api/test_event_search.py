@@ -1,5 +1,6 @@
 import datetime
 import os
+import random
 from datetime import timedelta
 from unittest.mock import patch
 
@@ -14,7 +15,12 @@ from sentry.api.event_search import (
     SearchFilter,
     SearchKey,
     SearchValue,
+    SearchVisitor,
+    default_config,
+    event_search_grammar,
+    parse_cache,
     parse_search_query,
+    parse_simple_search_query,
 )
 from sentry.constants import MODULE_ROOT
 from sentry.exceptions import InvalidSearchQuery
@@ -739,3 +745,158 @@ def test_search_value_classify_and_format_wildcard(value, expected_kind, expecte
     kind = search_value.classify_wildcard()
     assert kind == expected_kind
     assert search_value.format_wildcard(kind) == expected_value
+
+
+def load_fixture_queries() -> list[str]:
+    queries = []
+    for file in sorted(os.listdir(abs_fixtures_path)):
+        with open(os.path.join(abs_fixtures_path, file)) as fp:
+            queries.extend(case["query"] for case in json.load(fp))
+    return queries
+
+
+DIFFERENTIAL_CONFIGS = [
+    default_config,
+    SearchConfig(
+        is_filter_translation={"unresolved": ("status", 0), "linked": ("linked", [True])},
+        key_mappings={"target": ["source", "has", "is"]},
+        numeric_keys={"times_seen"},
+    ),
+    SearchConfig(
+        allowed_keys={"a", "b", "has", "is", "start", "error.handled"},
+        blocked_keys={"c"},
+        text_operator_keys={"a"},
+    ),
+    SearchConfig(blocked_keys={"has", "is"}),
+]
+DIFFERENTIAL_KEYS = [
+    "a",
+    "b",
+    "c",
+    "has",
+    "is",
+    "HAS",
+    "source",
+    "target",
+    "tags",
+    "times_seen",
+    "transaction.duration",
+    "measurements.lcp",
+    "spans.db",
+    "start",
+    "error.handled",
+    "project.id",
+    "x-y_z.w",
+    "OR",
+]
+DIFFERENTIAL_VALUES = [
+    "foo",
+    "Foo*",
+    "*bar",
+    "true",
+    "FALSE",
+    "1",
+    "0",
+    "12",
+    "-5",
+    "+1h",
+    "5ms",
+    "3kb",
+    "2020-01-01",
+    "2020-01-01T00:00:00",
+    "a:b",
+    "x,y",
+    "[a,b]",
+    '"quoted"',
+    'a"b',
+    "(x)",
+    ">5",
+    "<=3",
+    "!x",
+    "=y",
+    "unresolved",
+    "ab)",
+    "\\*",
+    "é",
+    "",
+    ":",
+    "k-1",
+    "k.1",
+    "5m",
+    "a%",
+]
+
+
+def random_query(rng: random.Random) -> str:
+    terms = []
+    for _ in range(rng.randint(0, 4)):
+        if rng.random() < 0.9:
+            negation = rng.choice(["", "", "!"])
+            key = rng.choice(DIFFERENTIAL_KEYS)
+            terms.append(f"{negation}{key}:{rng.choice(DIFFERENTIAL_VALUES)}")
+        else:
+            terms.append(rng.choice(["foo", "OR", "AND", "(a:b)", "count():>5", "a:b\tc:d"]))
+        terms.append(rng.choice([" ", " ", "  "]))
+    return "".join(terms)
+
+
+def parse_with(parser, query, visitor):
+    try:
+        if parser == "simple":
+            return parse_simple_search_query(query, visitor)
+        return visitor.visit(event_search_grammar.parse(query))
+    except InvalidSearchQuery as e:
+        return InvalidSearchQuery, str(e)
+
+
+@freeze_time("2024-01-01")
+def test_simple_parser_matches_grammar():
+    rng = random.Random(42)
+    queries = load_fixture_queries() + [random_query(rng) for _ in range(2000)]
+    visitors = [SearchVisitor(config) for config in DIFFERENTIAL_CONFIGS]
+
+    parsed = 0
+    for query in queries:
+        for visitor in visitors:
+            result = parse_with("simple", query, visitor)
+            if result is None:
+                continue
+            parsed += 1
+            assert result == parse_with("grammar", query, visitor), query
+
+    assert parsed > 500
+    assert parse_simple_search_query("a:b (c:d)", SearchVisitor(default_config)) is None
+
+
+class ParseCacheTest(SimpleTestCase):
+    def setUp(self):
+        parse_cache.clear()
+
+    def test_cached(self):
+        query = "transaction:foo (count():>5 OR user.email:*@example.com)"
+        expected = parse_search_query(query)
+        assert len(parse_cache) == 1
+
+        with patch("sentry.api.event_search.event_search_grammar") as grammar:
+            result = parse_search_query(query)
+            assert not grammar.parse.called
+        assert result == expected
+
+        # Results are copied, so that they can be modified
+        result[1].children.pop()
+        result.pop()
+        assert parse_search_query(query) == expected
+
+        # The config is part of the key
+        config = SearchConfig.create_from(default_config)
+        assert parse_search_query(query, config=config) == expected
+        assert len(parse_cache) == 2
+
+    def test_not_cached(self):
+        parse_search_query("transaction:foo", config_overrides={"free_text_key": "foo"})
+        with freeze_time("2024-01-01"):
+            relative = parse_search_query("timestamp:-24h")
+        assert len(parse_cache) == 0
+
+        with freeze_time("2024-01-02"):
+            assert parse_search_query("timestamp:-24h") != relative
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Callable
+
+import pytest
+
+from sentry.api.event_search import (
+    SearchVisitor,
+    default_config,
+    event_search_grammar,
+    parse_cache,
+    parse_search_query,
+)
+from sentry.constants import MODULE_ROOT
+from sentry.exceptions import InvalidSearchQuery
+from sentry.utils import json
+
+fixtures_path = os.path.join(MODULE_ROOT, os.pardir, os.pardir, "fixtures/search-syntax")
+
+
+def benchmark_available() -> bool:
+    try:
+        __import__("pytest_benchmark")
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+def load_corpus() -> list[str]:
+    """
+    The queries of the search syntax fixtures, which cover the query shapes
+    used by saved searches, dashboards and alerts.
+    """
+    queries = []
+    for file in sorted(os.listdir(fixtures_path)):
+        with open(os.path.join(fixtures_path, file)) as fp:
+            queries.extend(case["query"] for case in json.load(fp))
+    return queries
+
+
+def parse_with_grammar(query: str) -> None:
+    SearchVisitor(default_config).visit(event_search_grammar.parse(query))
+
+
+def parse_uncached(query: str) -> None:
+    parse_cache.clear()
+    parse_search_query(query)
+
+
+PARSERS: dict[str, Callable[[str], object]] = {
+    "grammar": parse_with_grammar,
+    "uncached": parse_uncached,
+    "cached": parse_search_query,
+}
+
+
+def parse_corpus(parse: Callable[[str], object], corpus: list[str]) -> list[float]:
+    latencies = []
+    for query in corpus:
+        start = time.perf_counter()
+        try:
+            parse(query)
+        except InvalidSearchQuery:
+            pass
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("parser", list(PARSERS))
+def test_benchmark_parse_search_query(parser, benchmark):
+    corpus = load_corpus()
+    parse = PARSERS[parser]
+    parse_corpus(parse, corpus)
+
+    latencies = sorted(parse_corpus(parse, corpus))
+    for percentile in (50, 90, 99):
+        index = min(len(latencies) - 1, len(latencies) * percentile // 100)
+        benchmark.extra_info[f"p{percentile}_us"] = latencies[index] * 1e6
+
+    benchmark(parse_corpus, parse, corpus)
@@ -1,6 +1,8 @@
 import copy
 
-from sentry.attachments.base import BaseAttachmentCache, CachedAttachment
+import pytest
+
+from sentry.attachments.base import BaseAttachmentCache, CachedAttachment, MissingAttachmentChunks
 
 
 class InMemoryCache:
@@ -128,3 +130,40 @@ def test_basic_rate_limited():
     assert att2.id == att.id == 0
     assert att2.data == att.data == b"Hello World! Bye."
     assert att2.rate_limited is True
+
+
+def test_stream_data():
+    data = InMemoryCache()
+    cache = BaseAttachmentCache(data)
+
+    cache.set_chunk("c:foo", 123, 0, b"Hello World! ")
+    cache.set_chunk("c:foo", 123, 1, b"")
+    cache.set_chunk("c:foo", 123, 2, b"Bye.")
+
+    att = cache.get_from_chunks(key="c:foo", id=123, chunks=3)
+    assert list(att.stream_data()) == [b"Hello World! ", b"", b"Bye."]
+
+    with att.open() as reader:
+        assert reader.read(5) == b"Hello"
+        assert reader.read(10) == b" World! By"
+        assert reader.read() == b"e."
+        assert reader.read() == b""
+
+    unchunked = CachedAttachment(key="c:bar", id=456, data=b"Hello World! Bye.")
+    assert list(unchunked.stream_data()) == [b"Hello World! Bye."]
+    assert unchunked.open().read() == b"Hello World! Bye."
+
+    assert list(CachedAttachment(data=b"").stream_data()) == []
+
+
+def test_stream_data_missing_chunks():
+    data = InMemoryCache()
+    cache = BaseAttachmentCache(data)
+
+    cache.set_chunk("c:foo", 123, 0, b"Hello World! ")
+
+    att = cache.get_from_chunks(key="c:foo", id=123, chunks=2)
+    stream = att.stream_data()
+    assert next(stream) == b"Hello World! "
+    with pytest.raises(MissingAttachmentChunks):
+        next(stream)
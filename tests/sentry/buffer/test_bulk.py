@@ -0,0 +1,107 @@
+from unittest import mock
+
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from sentry.buffer.bulk import BufferedUpdate, apply_bulk_updates, partition_updates
+from sentry.models.group import Group
+from sentry.models.grouprelease import GroupRelease
+from sentry.testutils.cases import TestCase
+
+
+class PartitionUpdatesTest(TestCase):
+    def test_groups_by_model_and_columns(self):
+        a = BufferedUpdate(Group, {"times_seen": 1}, {"id": 1})
+        b = BufferedUpdate(Group, {"times_seen": 2}, {"pk": 2})
+        c = BufferedUpdate(Group, {"times_seen": 2}, {"id": 3}, {"last_seen": timezone.now()})
+        d = BufferedUpdate(GroupRelease, {}, {"id": 1}, {"last_seen": timezone.now()})
+
+        grouped, fallback = partition_updates([a, b, c, d])
+
+        assert fallback == []
+        assert grouped == {
+            (Group, ("times_seen",), ()): [a, b],
+            (Group, ("times_seen",), ("last_seen",)): [c],
+            (GroupRelease, (), ("last_seen",)): [d],
+        }
+
+    def test_ineligible_updates_fall_back(self):
+        signal_only = BufferedUpdate(Group, {"times_seen": 1}, {"id": 1}, signal_only=True)
+        compound = BufferedUpdate(Group, {"times_seen": 1}, {"id": 1, "project_id": 1})
+        empty = BufferedUpdate(Group, {}, {"id": 1})
+
+        grouped, fallback = partition_updates([signal_only, compound, empty])
+
+        assert grouped == {}
+        assert fallback == [signal_only, compound, empty]
+
+
+class ApplyBulkUpdatesTest(TestCase):
+    def test_updates_rows(self):
+        groups = [self.create_group() for _ in range(3)]
+        last_seen = timezone.now()
+        rows = [
+            BufferedUpdate(Group, {"times_seen": i + 1}, {"id": group.id}, {"last_seen": last_seen})
+            for i, group in enumerate(groups)
+        ]
+
+        updated = apply_bulk_updates(Group, rows)
+
+        assert updated == {group.id for group in groups}
+        for i, group in enumerate(groups):
+            group_ = Group.objects.get(id=group.id)
+            assert group_.times_seen == group.times_seen + i + 1
+            assert group_.last_seen == last_seen
+            assert group_.score != group.score
+
+    def test_merges_duplicate_rows(self):
+        group = self.create_group()
+        rows = [
+            BufferedUpdate(Group, {"times_seen": 2}, {"id": group.id}),
+            BufferedUpdate(Group, {"times_seen": 3}, {"id": group.id}),
+        ]
+
+        apply_bulk_updates(Group, rows)
+
+        assert Group.objects.get(id=group.id).times_seen == group.times_seen + 5
+
+    def test_missing_rows_are_skipped(self):
+        group = self.create_group()
+        rows = [
+            BufferedUpdate(Group, {"times_seen": 1}, {"id": group.id}),
+            BufferedUpdate(Group, {"times_seen": 1}, {"id": group.id + 1000}),
+        ]
+
+        assert apply_bulk_updates(Group, rows) == {group.id}
+
+    def test_sends_post_save_for_groups(self):
+        group = self.create_group()
+        last_seen = timezone.now()
+        rows = [
+            BufferedUpdate(Group, {"times_seen": 1}, {"id": group.id}, {"last_seen": last_seen})
+        ]
+        receiver = mock.Mock()
+        post_save.connect(receiver, sender=Group, weak=False)
+        try:
+            apply_bulk_updates(Group, rows)
+        finally:
+            post_save.disconnect(receiver, sender=Group)
+
+        ((_, kwargs),) = receiver.call_args_list
+        assert kwargs["instance"].id == group.id
+        assert kwargs["instance"].times_seen == group.times_seen + 1
+        assert kwargs["created"] is False
+        assert set(kwargs["update_fields"]) == {"times_seen", "last_seen", "score"}
+
+    def test_missing_rows_do_not_signal(self):
+        group = self.create_group()
+        rows = [
+            BufferedUpdate(Group, {"times_seen": 1}, {"id": group.id}),
+            BufferedUpdate(Group, {"times_seen": 1}, {"id": group.id + 1000}),
+        ]
+
+        with mock.patch("sentry.buffer.bulk.buffer_incr_complete") as buffer_incr_complete:
+            apply_bulk_updates(Group, rows)
+
+        ((_, kwargs),) = buffer_incr_complete.send_robust.call_args_list
+        assert kwargs["filters"] == {"id": group.id}
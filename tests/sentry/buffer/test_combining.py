@@ -0,0 +1,140 @@
+import os
+import threading
+from unittest import mock
+
+from celery.signals import worker_process_shutdown
+
+from sentry.buffer.combining import WriteCombiningBuffer
+from sentry.models.group import Group
+from sentry.models.project import Project
+
+
+def _combiner(**kwargs):
+    flushed = []
+    combiner = WriteCombiningBuffer(flushed.append, **kwargs)
+    # Don't start the background flusher, the tests flush explicitly.
+    combiner._ensure_flusher = mock.Mock()  # type: ignore[method-assign]
+    return combiner, flushed
+
+
+def test_merges_increments_by_key():
+    combiner, flushed = _combiner(window=60)
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1}, {"last_seen": 1})
+    combiner.incr(Group, {"times_seen": 2}, {"id": 1}, {"last_seen": 2, "level": 40})
+    combiner.incr(Group, {"times_seen": 1}, {"id": 2})
+    assert flushed == []
+
+    combiner.flush()
+
+    assert len(flushed) == 2
+    first, second = flushed
+    assert first.model is Group
+    assert first.filters == {"id": 1}
+    assert first.columns == {"times_seen": 3}
+    assert first.extra == {"last_seen": 2, "level": 40}
+    assert first.calls == 2
+    assert second.filters == {"id": 2}
+    assert second.columns == {"times_seen": 1}
+    assert second.extra is None
+    assert len(combiner) == 0
+
+
+def test_model_filters_are_keyed_by_pk():
+    combiner, flushed = _combiner(window=60)
+    combiner.incr(Project, {"x": 1}, {"project": Project(id=1)})
+    combiner.incr(Project, {"x": 1}, {"project": Project(id=1)})
+    combiner.flush()
+    assert len(flushed) == 1
+    assert flushed[0].columns == {"x": 2}
+
+
+def test_signal_only_is_not_merged():
+    combiner, flushed = _combiner(window=60)
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1})
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1}, signal_only=True)
+    combiner.flush()
+    assert [entry.signal_only for entry in flushed] == [None, True]
+
+
+def test_wakes_flusher_when_full():
+    combiner, flushed = _combiner(window=60, max_keys=2)
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1})
+    assert not combiner._wakeup.is_set()
+    combiner.incr(Group, {"times_seen": 1}, {"id": 2})
+    assert combiner._wakeup.is_set()
+    # The flush itself is left to the flusher thread
+    assert flushed == []
+    assert len(combiner) == 2
+
+
+def test_new_keys_bypass_combining_past_hard_limit():
+    combiner, flushed = _combiner(window=60, max_keys=1)
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1})
+    combiner.incr(Group, {"times_seen": 1}, {"id": 2})
+    # The flusher is behind, new keys are flushed right away
+    combiner.incr(Group, {"times_seen": 1}, {"id": 3})
+    assert [entry.filters for entry in flushed] == [{"id": 3}]
+    # Pending keys are still combined
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1})
+    assert len(combiner) == 2
+    assert len(flushed) == 1
+
+
+def test_flushed_on_worker_shutdown():
+    combiner, flushed = _combiner(window=60)
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1})
+    with mock.patch("sentry.buffer.combining._combiner", combiner):
+        worker_process_shutdown.send(sender=None, pid=os.getpid(), exitcode=0)
+    assert len(flushed) == 1
+
+
+@mock.patch("sentry.buffer.combining.time.monotonic")
+def test_wakes_flusher_when_window_expires(monotonic):
+    combiner, flushed = _combiner(window=1)
+    monotonic.return_value = 100.0
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1})
+    assert not combiner._wakeup.is_set()
+    monotonic.return_value = 101.5
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1})
+    assert combiner._wakeup.is_set()
+    assert flushed == []
+
+
+def test_flusher_thread():
+    flushed = threading.Event()
+    combiner = WriteCombiningBuffer(lambda entry: flushed.set(), window=60, max_keys=1)
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1})
+    assert flushed.wait(timeout=5)
+    assert len(combiner) == 0
+
+
+def test_settings_are_reloaded_on_flush():
+    settings = (1.0, 10)
+    combiner, _ = _combiner(window=60, max_keys=2)
+    combiner.get_settings = lambda: settings
+    combiner.flush()
+    assert (combiner.window, combiner.max_keys) == (1.0, 10)
+
+
+def test_flush_errors_do_not_drop_other_entries():
+    flushed = []
+
+    def flush(entry):
+        if entry.filters == {"id": 1}:
+            raise Exception("boom")
+        flushed.append(entry)
+
+    combiner = WriteCombiningBuffer(flush, window=60)
+    combiner._ensure_flusher = mock.Mock()  # type: ignore[method-assign]
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1})
+    combiner.incr(Group, {"times_seen": 1}, {"id": 2})
+    combiner.flush()
+    assert [entry.filters for entry in flushed] == [{"id": 2}]
+
+
+def test_entries_inherited_across_fork_are_dropped():
+    combiner, flushed = _combiner(window=60)
+    combiner.incr(Group, {"times_seen": 1}, {"id": 1})
+    with mock.patch.object(os, "getpid", return_value=os.getpid() + 1):
+        combiner.flush()
+    assert flushed == []
@@ -21,6 +21,7 @@ from sentry.models.project import Project
 from sentry.rules.processing.delayed_processing import process_delayed_alert_conditions
 from sentry.rules.processing.processor import PROJECT_ID_BUFFER_LIST_KEY
 from sentry.testutils.helpers.datetime import freeze_time
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
 from sentry.utils import json
 from sentry.utils.redis import get_cluster_routing_client
@@ -626,6 +627,74 @@ class TestRedisBuffer:
         # signal_only should not increment the times_seen column
         assert group.times_seen == orig_times_seen
 
+    @django_db_all
+    @freeze_time()
+    def test_process_bulk_updates_groups(self, default_project, task_runner):
+        groups = [Group.objects.create(project=default_project) for _ in range(3)]
+        now = timezone.now()
+        for i, group in enumerate(groups):
+            # Populate the cache so we can check that the bulk path invalidates it
+            Group.objects.get_from_cache(id=group.id)
+            self.buf.incr(Group, {"times_seen": i + 1}, {"pk": group.id}, {"last_seen": now})
+
+        with (
+            override_options({"buffer.bulk-flush.enabled": True}),
+            task_runner(),
+            mock.patch("sentry.buffer", self.buf),
+        ):
+            self.buf.process_pending()
+
+        for i, group in enumerate(groups):
+            updated = Group.objects.get_from_cache(id=group.id)
+            assert updated.times_seen == group.times_seen + i + 1
+            assert updated.last_seen == now
+
+        client = get_cluster_routing_client(self.buf.cluster, self.buf.is_redis_cluster)
+        assert client.zrange("b:p", 0, -1) == []
+
+    @django_db_all
+    @freeze_time()
+    def test_process_bulk_falls_back_for_signal_only(self, default_project, task_runner):
+        groups = [Group.objects.create(project=default_project) for _ in range(2)]
+        self.buf.incr(Group, {"times_seen": 5}, {"pk": groups[0].id})
+        self.buf.incr(Group, {"times_seen": 5}, {"pk": groups[1].id}, signal_only=True)
+
+        with (
+            override_options({"buffer.bulk-flush.enabled": True}),
+            mock.patch("sentry.buffer.base.Buffer.process") as process,
+        ):
+            self.buf.process(
+                batch_keys=[
+                    self.buf._make_key(Group, {"pk": groups[0].id}),
+                    self.buf._make_key(Group, {"pk": groups[1].id}),
+                ]
+            )
+
+        process.assert_called_once_with(Group, {"times_seen": 5}, {"pk": groups[1].id}, {}, True)
+        assert Group.objects.get(id=groups[0].id).times_seen == groups[0].times_seen + 5
+
+    @django_db_all
+    @freeze_time()
+    def test_process_bulk_falls_back_for_missing_rows(self, default_project, task_runner):
+        groups = [Group.objects.create(project=default_project) for _ in range(2)]
+        missing_id = groups[1].id + 1000
+        self.buf.incr(Group, {"times_seen": 5}, {"pk": groups[0].id})
+        self.buf.incr(Group, {"times_seen": 5}, {"pk": missing_id})
+
+        with (
+            override_options({"buffer.bulk-flush.enabled": True}),
+            mock.patch("sentry.buffer.base.Buffer.process") as process,
+        ):
+            self.buf.process(
+                batch_keys=[
+                    self.buf._make_key(Group, {"pk": groups[0].id}),
+                    self.buf._make_key(Group, {"pk": missing_id}),
+                ]
+            )
+
+        process.assert_called_once_with(Group, {"times_seen": 5}, {"pk": missing_id}, {}, None)
+        assert Group.objects.get(id=groups[0].id).times_seen == groups[0].times_seen + 5
+
 
 @pytest.mark.parametrize(
     "value",
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest import mock
+
+import pytest
+
+from sentry import eventstore
+from sentry.event_manager import EventManager
+from sentry.grouping.api import get_default_grouping_config_dict, load_grouping_config
+from sentry.grouping.ingest import hash_cache
+from sentry.stacktraces.processing import normalize_stacktraces_for_grouping
+from sentry.testutils.helpers.options import override_options
+from sentry.testutils.pytest.fixtures import django_db_all
+
+GROUPING_CONFIG = get_default_grouping_config_dict()
+
+
+def make_event(**kwargs: Any):
+    data = {
+        "platform": "python",
+        "exception": {
+            "values": [
+                {
+                    "type": "ValueError",
+                    "value": "invalid literal for int()",
+                    "stacktrace": {
+                        "frames": [
+                            {
+                                "function": "main",
+                                "module": "app.main",
+                                "filename": "app/main.py",
+                                "lineno": 10,
+                                "context_line": "parse(value)",
+                                "vars": {"value": "'foo'"},
+                                "in_app": True,
+                            },
+                        ]
+                    },
+                }
+            ]
+        },
+        **kwargs,
+    }
+    manager = EventManager(data=data, grouping_config=GROUPING_CONFIG)
+    manager.normalize()
+    data = manager.get_data()
+    normalize_stacktraces_for_grouping(data, load_grouping_config(GROUPING_CONFIG))
+    return eventstore.backend.create_event(project_id=1, data=data)
+
+
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    local_cache = hash_cache.get_local_cache()
+    if local_cache is not None:
+        local_cache.clear()
+
+
+def test_cache_key() -> None:
+    event = make_event()
+    key = hash_cache.get_cache_key(1, event, GROUPING_CONFIG)
+    assert key is not None
+    assert key.startswith(hash_cache.CACHE_KEY_PREFIX)
+
+    # Frame variables are not used for grouping
+    frame = event.data["exception"]["values"][0]["stacktrace"]["frames"][0]
+    frame["vars"] = {"value": "'bar'"}
+    assert hash_cache.get_cache_key(1, event, GROUPING_CONFIG) == key
+
+    frame["lineno"] = 11
+    assert hash_cache.get_cache_key(1, event, GROUPING_CONFIG) != key
+
+    assert hash_cache.get_cache_key(2, make_event(), GROUPING_CONFIG) != key
+    assert (
+        hash_cache.get_cache_key(1, make_event(), {**GROUPING_CONFIG, "enhancements": "x"}) != key
+    )
+    assert hash_cache.get_cache_key(1, make_event(fingerprint=["foo"]), GROUPING_CONFIG) != key
+
+    # Fingerprint variables can reference anything in the event
+    event = make_event(fingerprint=["{{ default }}", "{{ transaction }}"])
+    assert hash_cache.get_cache_key(1, event, GROUPING_CONFIG) is None
+
+
+def test_local_cache_eviction() -> None:
+    local_cache = hash_cache.LocalHashCache(max_entries=2, ttl=60)
+    for key in ("a", "b", "c"):
+        local_cache.set(key, {"hashes": [key], "main_exception_id": None, "duration": 0.0})
+    assert len(local_cache) == 2
+    assert local_cache.get("a") is None
+    assert local_cache.get("c") == {"hashes": ["c"], "main_exception_id": None, "duration": 0.0}
+
+    with mock.patch("time.monotonic", return_value=10**9):
+        assert local_cache.get("c") is None
+
+
+@django_db_all
+@override_options({"grouping.hash_cache.enabled": True})
+def test_get_hashes() -> None:
+    loaded_config = load_grouping_config(GROUPING_CONFIG)
+    expected = make_event().get_hashes(loaded_config)
+
+    event = make_event()
+    with mock.patch.object(type(event), "get_hashes", autospec=True) as get_hashes:
+        get_hashes.side_effect = lambda self, config: ["hash"]
+        assert hash_cache.get_hashes(1, event, GROUPING_CONFIG, loaded_config) == ["hash"]
+        assert hash_cache.get_hashes(1, event, GROUPING_CONFIG, loaded_config) == ["hash"]
+        assert get_hashes.call_count == 1
+
+    event = make_event(tags={"foo": "bar"})
+    assert hash_cache.get_hashes(2, event, GROUPING_CONFIG, loaded_config) == expected
+
+    event = make_event(tags={"foo": "baz"})
+    with mock.patch.object(type(event), "get_hashes") as get_hashes:
+        assert hash_cache.get_hashes(2, event, GROUPING_CONFIG, loaded_config) == expected
+        assert not get_hashes.called
+    assert event.data["hashes"] == expected
+
+
+@django_db_all
+@override_options(
+    {
+        "grouping.hash_cache.enabled": True,
+        "grouping.hash_cache.local_max_entries": 0,
+        "grouping.hash_cache.shared_enabled": True,
+    }
+)
+def test_get_hashes_shared_cache() -> None:
+    loaded_config = load_grouping_config(GROUPING_CONFIG)
+    expected = hash_cache.get_hashes(3, make_event(), GROUPING_CONFIG, loaded_config)
+
+    event = make_event()
+    with mock.patch.object(type(event), "get_hashes") as get_hashes:
+        assert hash_cache.get_hashes(3, event, GROUPING_CONFIG, loaded_config) == expected
+        assert not get_hashes.called
+
+
+@django_db_all
+def test_get_hashes_disabled() -> None:
+    loaded_config = load_grouping_config(GROUPING_CONFIG)
+    event = make_event()
+    with mock.patch.object(type(event), "get_hashes", return_value=["hash"]) as get_hashes:
+        hash_cache.get_hashes(1, event, GROUPING_CONFIG, loaded_config)
+        hash_cache.get_hashes(1, event, GROUPING_CONFIG, loaded_config)
+        assert get_hashes.call_count == 2
@@ -8,10 +8,15 @@ from sentry.grouping.ingest.hashing import (
     _calculate_background_grouping,
     _calculate_event_grouping,
     _calculate_secondary_hashes,
+    get_or_create_grouphashes,
+    get_or_create_grouphashes_many,
 )
 from sentry.models.group import Group
+from sentry.models.grouphash import GroupHash
+from sentry.models.grouphashmetadata import GroupHashMetadata
 from sentry.projectoptions.defaults import LEGACY_GROUPING_CONFIG
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.features import Feature
 from sentry.testutils.skips import requires_snuba
 
 pytestmark = [requires_snuba]
@@ -169,3 +174,66 @@ class SecondaryGroupingTest(TestCase):
             mock_capture_exception.assert_called_with(secondary_grouping_error)
             # This proves the secondary grouping crash didn't crash the overall grouping process
             assert event.group
+
+
+class GetOrCreateGroupHashesTest(TestCase):
+    def test_get_or_create_grouphashes_many(self):
+        other_project = self.create_project(organization=self.organization)
+        existing = GroupHash.objects.create(project=self.project, hash="a" * 32)
+
+        with (
+            self.options({"grouping.grouphash_metadata.ingestion_writes_enabled": False}),
+            self.assertNumQueries(3),
+        ):
+            result = get_or_create_grouphashes_many(
+                [
+                    (self.project, ["b" * 32, "a" * 32]),
+                    (other_project, ["a" * 32]),
+                    (self.project, ["b" * 32]),
+                ]
+            )
+
+        assert [[grouphash.hash for grouphash in grouphashes] for grouphashes in result] == [
+            ["b" * 32, "a" * 32],
+            ["a" * 32],
+            ["b" * 32],
+        ]
+        assert result[0][1] == existing
+        assert result[1][0].project_id == other_project.id
+        assert result[1][0] != existing
+        assert result[0][0] is result[2][0]
+        assert GroupHash.objects.filter(hash__in=["a" * 32, "b" * 32]).count() == 3
+
+    @patch("sentry.grouping.ingest.hashing.metrics.incr")
+    def test_get_or_create_grouphashes_many_counts_inserted(self, mock_incr: MagicMock) -> None:
+        GroupHash.objects.create(project=self.project, hash="a" * 32)
+
+        get_or_create_grouphashes_many([(self.project, ["a" * 32, "b" * 32, "c" * 32])])
+        mock_incr.assert_any_call("grouping.grouphashes.created", amount=2)
+
+        mock_incr.reset_mock()
+        # Rows the fallback finds rather than creates aren't counted
+        with patch("sentry.grouping.ingest.hashing._fetch_grouphashes", side_effect=[{}, {}]):
+            get_or_create_grouphashes_many([(self.project, ["a" * 32, "b" * 32])])
+        mock_incr.assert_any_call("grouping.grouphashes.created", amount=0)
+
+    def test_get_or_create_grouphashes_many_nothing_missing(self):
+        grouphash = GroupHash.objects.create(project=self.project, hash="a" * 32)
+
+        with self.assertNumQueries(1):
+            assert get_or_create_grouphashes_many([(self.project, ["a" * 32])]) == [[grouphash]]
+
+        with self.assertNumQueries(0):
+            assert get_or_create_grouphashes_many([(self.project, [])]) == [[]]
+
+    def test_get_or_create_grouphashes_creates_metadata(self):
+        existing = GroupHash.objects.create(project=self.project, hash="a" * 32)
+
+        with Feature({"organizations:grouphash-metadata-creation": True}):
+            existing_grouphash, new_grouphash = get_or_create_grouphashes(
+                self.project, ["a" * 32, "b" * 32]
+            )
+
+        assert existing_grouphash == existing
+        assert not GroupHashMetadata.objects.filter(grouphash=existing).exists()
+        assert GroupHashMetadata.objects.filter(grouphash=new_grouphash).exists()
@@ -1,6 +1,12 @@
+import random
+import re
+
 import pytest
 
 from sentry.grouping.api import get_default_grouping_config_dict
+from sentry.grouping.component import GroupingComponent
+from sentry.grouping.enhancer import ENHANCEMENT_BASES
+from sentry.grouping.parameterization import DEFAULT_PARAMETERIZATION_REGEXES_MAP, Parameterizer
 from sentry.grouping.strategies.configurations import CONFIGURATIONS
 from tests.sentry.grouping import grouping_input as grouping_inputs
 
@@ -37,3 +43,173 @@ def run_configuration(grouping_input, config):
     event.project = None
 
     event.get_hashes()
+
+
+NATIVE_FRAMES = [
+    {
+        "function": (
+            f"std::__1::__function::__func<lambda_{i % 7}, std::__1::allocator<lambda_{i % 7}>, "
+            f"void (Worker{i % 13}&)>::operator()(Worker{i % 13}&) const"
+        ),
+        "package": "/usr/lib/libsystem_pthread.dylib" if i % 3 else f"/app/libengine{i % 5}.so",
+        "instruction_addr": hex(0x1000 + i),
+    }
+    for i in range(250)
+]
+
+JAVASCRIPT_FRAMES = [
+    {
+        "function": f"Module.render{i % 17}",
+        "abs_path": (
+            f"webpack:///./node_modules/react-dom/cjs/react-dom.development.js?v={i % 3}"
+            if i % 2
+            else f"https://example.com/static/js/main.{i % 11}.chunk.js"
+        ),
+        "lineno": i,
+        "colno": i % 80,
+    }
+    for i in range(250)
+]
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("base_id", sorted(ENHANCEMENT_BASES), ids=lambda x: x.replace(":", "_"))
+@pytest.mark.parametrize(
+    "platform,frames", [("native", NATIVE_FRAMES), ("javascript", JAVASCRIPT_FRAMES)]
+)
+def test_benchmark_enhancements(base_id, platform, frames, benchmark):
+    enhancements = ENHANCEMENT_BASES[base_id]
+
+    def setup():
+        return ([dict(frame) for frame in frames],), {}
+
+    def run(frames):
+        enhancements.apply_modifications_to_frame(frames, platform, {})
+        # the stacktrace component is assembled once per variant
+        for _ in ("system", "app"):
+            components = [GroupingComponent(id="frame", contributes=True) for _ in frames]
+            enhancements.assemble_stacktrace_component(components, frames, platform)
+
+    benchmark.pedantic(run, setup=setup, rounds=50)
+
+
+PARAMETERIZATION_KEYS = (
+    "email",
+    "url",
+    "hostname",
+    "ip",
+    "uuid",
+    "sha1",
+    "md5",
+    "date",
+    "duration",
+    "hex",
+    "float",
+    "int",
+    "quoted_str",
+    "bool",
+)
+
+MESSAGE_TEMPLATES = (
+    "Connection to {ip}:{port} failed after {seconds}s",
+    "GET {url} returned {status} in {ms}ms",
+    "User {email} is not allowed to access project {id}",
+    "Could not resolve host {host} (attempt {n} of 3)",
+    "Job {uuid} failed at {iso}: worker exited with code -{n}",
+    "Invalid checksum {sha1} for upload, expected {md5}",
+    "Segmentation fault at address {hex} in thread {n}",
+    "query took {float} seconds, threshold is 1.5",
+    "Retrying task with args key='{word}' force={bool}",
+    "Cache miss for key user:{id}:profile on {date}",
+    "Something went wrong",
+    "KeyError: '{word}'",
+    "Deadlock detected\nProcess {n} waits for ShareLock on transaction {id}",
+    "Request to {host} timed out at {kitchen}",
+)
+
+WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot")
+HOSTS = ("db-1.prod.example.com", "api.sentry.io", "cache.internal", "localhost", "cdn.example.org")
+
+
+def make_message(rng: random.Random) -> str:
+    return rng.choice(MESSAGE_TEMPLATES).format(
+        ip=f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}",
+        port=rng.choice((80, 443, 5432, 6379)),
+        seconds=rng.randrange(1, 60),
+        url=f"https://{rng.choice(HOSTS)}/api/0/issues/{rng.randrange(10**6)}/?cursor=0:100:0",
+        status=rng.choice((400, 404, 500, 502)),
+        ms=rng.randrange(1000),
+        email=f"{rng.choice(WORDS)}.{rng.randrange(100)}@example.com",
+        id=rng.randrange(10**9),
+        host=rng.choice(HOSTS),
+        n=rng.randrange(1, 10),
+        uuid="%08x-%04x-4%03x-a%03x-%012x"
+        % tuple(rng.getrandbits(bits) for bits in (32, 16, 12, 12, 48)),
+        iso=f"2024-0{rng.randrange(1, 10)}-1{rng.randrange(10)}T12:{rng.randrange(10, 60)}:00Z",
+        sha1="%040x" % rng.getrandbits(160),
+        md5="%032x" % rng.getrandbits(128),
+        hex=hex(rng.getrandbits(48)),
+        float=f"{rng.random() * 100:.3f}",
+        word=rng.choice(WORDS),
+        bool=rng.choice(("true", "False")),
+        date=f"Mon Jan 0{rng.randrange(1, 10)}, 2024",
+        kitchen=f"{rng.randrange(1, 13)}:{rng.randrange(10, 60)} PM",
+    )
+
+
+# Log-heavy projects send the same messages over and over again
+_rng = random.Random(42)
+_distinct_messages = [make_message(_rng) for _ in range(500)]
+MESSAGES = [_rng.choice(_distinct_messages) for _ in range(2000)]
+
+
+def reference_parameterize(content: str) -> str:
+    """
+    Straightforward implementation of `Parameterizer.parametrize_w_regex`, without any of its
+    caching, to make sure the optimized version produces identical output.
+    """
+    regex = re.compile(
+        rf"(?x){'|'.join(DEFAULT_PARAMETERIZATION_REGEXES_MAP[k] for k in PARAMETERIZATION_KEYS)}"
+    )
+
+    def _handle_regex_match(match: re.Match[str]) -> str:
+        for key, value in match.groupdict().items():
+            if value is not None:
+                return f"<{key}>"
+        return ""
+
+    return regex.sub(_handle_regex_match, content)
+
+
+def test_parameterize_matches_reference():
+    expected = [reference_parameterize(message) for message in MESSAGES]
+
+    parameterizer = Parameterizer(PARAMETERIZATION_KEYS)
+    assert [parameterizer.parameterize_all(message) for message in MESSAGES] == expected
+    # Second round is served from the memoized results
+    assert [parameterizer.parameterize_all(message) for message in MESSAGES] == expected
+
+    batch_parameterizer = Parameterizer(PARAMETERIZATION_KEYS)
+    assert batch_parameterizer.parameterize_all_many(MESSAGES) == expected
+    assert batch_parameterizer.matches_counter == {
+        key: count // 2 for key, count in parameterizer.matches_counter.items()
+    }
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+def test_benchmark_parameterize_reference(benchmark):
+    benchmark(lambda: [reference_parameterize(message) for message in MESSAGES])
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+def test_benchmark_parameterize(benchmark):
+    def run():
+        parameterizer = Parameterizer(PARAMETERIZATION_KEYS)
+        return [parameterizer.parameterize_all(message) for message in MESSAGES]
+
+    benchmark(run)
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+def test_benchmark_parameterize_many(benchmark):
+    benchmark(lambda: Parameterizer(PARAMETERIZATION_KEYS).parameterize_all_many(MESSAGES))
@@ -22,6 +22,7 @@ from sentry.models.organization import Organization
 from sentry.models.organizationmember import OrganizationMember
 from sentry.models.organizationmemberteam import OrganizationMemberTeam
 from sentry.models.organizationmemberteamreplica import OrganizationMemberTeamReplica
+from sentry.models.project import Project
 from sentry.silo.base import SiloMode
 from sentry.testutils.cases import TestCase, TransactionTestCase
 from sentry.testutils.factories import Factories
@@ -304,6 +305,76 @@ class OutboxDrainTest(TransactionTestCase):
 
         assert mock_process_region_outbox.call_count == 2
 
+    @patch("sentry.hybridcloud.models.outbox.process_region_outbox_batch.send")
+    @patch("sentry.hybridcloud.models.outbox.process_region_outbox.send")
+    def test_drain_shard_batched(self, mock_send: Mock, mock_send_batch: Mock) -> None:
+        sent: list[tuple[str, list[int]]] = []
+        mock_send.side_effect = lambda object_identifier, **kwds: sent.append(
+            ("single", [object_identifier])
+        )
+        mock_send_batch.side_effect = lambda messages, **kwds: sent.append(
+            ("batch", [message.object_identifier for message in messages])
+        )
+
+        with outbox_context(flush=False):
+            Project.outbox_for_update(1, 1).save()
+            Project.outbox_for_update(2, 1).save()
+            Project.outbox_for_update(1, 1).save()
+            Organization(id=1).outbox_for_update().save()
+            Project.outbox_for_update(3, 1).save()
+            Project.outbox_for_update(4, 1).save()
+            Project.outbox_for_update(5, 1).save()
+
+        with self.options({"hybridcloud.outbox.batch-size": 2}):
+            RegionOutbox(
+                shard_scope=OutboxScope.ORGANIZATION_SCOPE, shard_identifier=1
+            ).drain_shard(flush_all=True)
+
+        # Batches don't reorder messages across categories
+        assert sent == [
+            ("batch", [1, 2]),
+            ("single", [1]),
+            ("batch", [3, 4]),
+            ("batch", [5]),
+        ]
+        assert not RegionOutbox.objects.exists()
+
+    @patch("sentry.hybridcloud.models.outbox.process_region_outbox_batch.send")
+    def test_drain_shard_batched_failure(self, mock_send_batch: Mock) -> None:
+        mock_send_batch.side_effect = ValueError("This is just a test mock exception")
+
+        with outbox_context(flush=False):
+            Project.outbox_for_update(1, 1).save()
+            Project.outbox_for_update(1, 1).save()
+            Project.outbox_for_update(2, 1).save()
+
+        with self.options({"hybridcloud.outbox.batch-size": 10}):
+            with pytest.raises(OutboxFlushError):
+                RegionOutbox(
+                    shard_scope=OutboxScope.ORGANIZATION_SCOPE, shard_identifier=1
+                ).drain_shard(flush_all=True)
+
+        # None of the coalesced messages of the batch are marked as completed
+        assert RegionOutbox.objects.count() == 3
+
+    @patch("sentry.hybridcloud.models.outbox.process_region_outbox.send")
+    def test_parallel_drain(self, mock_send: Mock) -> None:
+        with outbox_context(flush=False):
+            for org_id in range(1, 11):
+                Organization(id=org_id).outbox_for_update().save()
+                Organization(id=org_id).outbox_for_update().save()
+
+        with (
+            self.options({"hybridcloud.outbox.drain-worker-threads": 4}),
+            self.tasks(),
+        ):
+            enqueue_outbox_jobs(concurrency=1, process_outbox_backfills=False)
+
+        assert sorted(c.kwargs["object_identifier"] for c in mock_send.call_args_list) == list(
+            range(1, 11)
+        )
+        assert not RegionOutbox.objects.exists()
+
 
 class RegionOutboxTest(TestCase):
     def test_creating_org_outboxes(self) -> None:
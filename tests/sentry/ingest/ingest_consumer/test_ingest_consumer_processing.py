@@ -15,15 +15,18 @@ from arroyo.backends.local.backend import LocalBroker
 from arroyo.backends.local.storages.memory import MemoryMessageStorage
 from arroyo.types import Partition, Topic
 from django.conf import settings
+from django.core.cache import cache
 
 from sentry import eventstore
 from sentry.event_manager import EventManager
 from sentry.ingest.consumer.processors import (
+    BatchedEvent,
     collect_span_metrics,
     process_attachment_chunk,
     process_event,
     process_individual_attachment,
     process_userreport,
+    save_event_batch,
 )
 from sentry.models.debugfile import create_files_from_dif_zip
 from sentry.models.eventattachment import EventAttachment
@@ -109,6 +112,149 @@ def test_deduplication_works(default_project, task_runner, preprocess_event):
     }
 
 
+@django_db_all
+def test_batch_save(default_project, factories, task_runner, preprocess_event):
+    other_project = factories.create_project(organization=default_project.organization)
+    start_time = time.time() - 3600
+
+    batched_events = []
+    for project, message in [
+        (default_project, "hello world"),
+        (default_project, "hello world"),
+        (other_project, "hello world"),
+    ]:
+        payload = get_normalized_event({"message": message}, project)
+        batched_event = process_event(
+            {
+                "payload": orjson.dumps(payload).decode(),
+                "start_time": start_time,
+                "event_id": payload["event_id"],
+                "project_id": project.id,
+                "remote_addr": "127.0.0.1",
+            },
+            project=project,
+            batch_save=True,
+        )
+        assert isinstance(batched_event, BatchedEvent)
+        batched_events.append(batched_event)
+
+    # A duplicate of an event that is still waiting to be saved
+    batched_events.append(batched_events[0])
+
+    with patch("sentry.ingest.consumer.processors.event_accepted") as event_accepted:
+        save_event_batch(batched_events)
+    assert event_accepted.send_robust.call_count == 3
+    assert not preprocess_event
+
+    events = [
+        eventstore.backend.get_event_by_id(e.project_id, e.data["event_id"])
+        for e in batched_events[:3]
+    ]
+    assert all(events)
+    assert events[0].group_id == events[1].group_id
+    assert events[2].group.project_id == other_project.id
+
+    # Saved events are deduplicated
+    payload = get_normalized_event({"message": "hello world"}, default_project)
+    payload["event_id"] = batched_events[0].data["event_id"]
+    assert (
+        process_event(
+            {
+                "payload": orjson.dumps(payload).decode(),
+                "start_time": start_time,
+                "event_id": payload["event_id"],
+                "project_id": default_project.id,
+                "remote_addr": "127.0.0.1",
+            },
+            project=default_project,
+            batch_save=True,
+        )
+        is None
+    )
+
+
+@django_db_all
+def test_batch_save_falls_back_to_save_event(default_project, task_runner, preprocess_event):
+    start_time = time.time() - 3600
+
+    batched_events = []
+    for message in ["hello world", "goodbye world"]:
+        payload = get_normalized_event({"message": message}, default_project)
+        batched_events.append(
+            process_event(
+                {
+                    "payload": orjson.dumps(payload).decode(),
+                    "start_time": start_time,
+                    "event_id": payload["event_id"],
+                    "project_id": default_project.id,
+                    "remote_addr": "127.0.0.1",
+                },
+                project=default_project,
+                batch_save=True,
+            )
+        )
+
+    with (
+        patch("sentry.event_manager.save_error_events_many", side_effect=ValueError("poison")),
+        patch("sentry.tasks.store.save_event.delay") as save_event,
+        patch("sentry.ingest.consumer.processors.event_accepted") as event_accepted,
+    ):
+        save_event_batch(batched_events)
+
+    assert [call.kwargs for call in save_event.call_args_list] == [
+        {
+            "cache_key": e.cache_key,
+            "data": None,
+            "start_time": start_time,
+            "event_id": e.data["event_id"],
+            "project_id": default_project.id,
+        }
+        for e in batched_events
+    ]
+    assert event_accepted.send_robust.call_count == 2
+
+    # Events passed on to `save_event` are deduplicated
+    assert all(cache.get(e.deduplication_key) is not None for e in batched_events)
+
+
+@django_db_all
+def test_batch_save_skips_events_with_stacktraces_to_process(
+    default_project, task_runner, preprocess_event
+):
+    payload = get_normalized_event(
+        {
+            "platform": "native",
+            "exception": {
+                "values": [
+                    {
+                        "type": "SIGSEGV",
+                        "stacktrace": {
+                            "frames": [{"instruction_addr": "0x1000", "platform": "native"}]
+                        },
+                    }
+                ]
+            },
+        },
+        default_project,
+    )
+
+    assert (
+        process_event(
+            {
+                "payload": orjson.dumps(payload).decode(),
+                "start_time": time.time(),
+                "event_id": payload["event_id"],
+                "project_id": default_project.id,
+                "remote_addr": "127.0.0.1",
+            },
+            project=default_project,
+            batch_save=True,
+        )
+        is None
+    )
+    assert len(preprocess_event) == 1
+
+
 @django_db_all
 def test_transactions_spawn_save_event_transaction(
     default_project,
@@ -0,0 +1,73 @@
+from unittest import mock
+
+import pytest
+
+from sentry.ingest.consumer import worker
+from sentry.models.project import Project
+from sentry.testutils.helpers.options import override_options
+from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.utils.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def reset_worker_state():
+    worker._project_cache = None
+    cache.delete(worker.HOT_PROJECTS_CACHE_KEY)
+
+
+@django_db_all
+def test_get_project_without_cache(default_project):
+    with mock.patch.object(Project.objects, "get_from_cache", wraps=Project.objects.get_from_cache):
+        worker.get_project(default_project.id)
+        worker.get_project(default_project.id)
+        assert Project.objects.get_from_cache.call_count == 2
+
+
+@django_db_all
+@override_options({"ingest-consumer.project-cache.ttl-seconds": 60})
+def test_get_project_cached(default_project):
+    project = worker.get_project(default_project.id)
+    assert project == default_project
+    assert worker.get_project(default_project.id) is project
+
+    with pytest.raises(Project.DoesNotExist):
+        worker.get_project(default_project.id + 1000)
+
+    with mock.patch("time.monotonic", return_value=10**9):
+        assert worker.get_project(default_project.id) is not project
+
+
+@django_db_all
+@override_options({"ingest-consumer.project-cache.ttl-seconds": 60})
+def test_warm_up(default_project, factories):
+    other_project = factories.create_project(organization=default_project.organization)
+    worker.get_project(default_project.id)
+    worker.get_project(other_project.id)
+    worker.publish_hot_projects()
+    assert cache.get(worker.HOT_PROJECTS_CACHE_KEY) == [other_project.id, default_project.id]
+
+    # A new process
+    worker._project_cache = None
+    worker.initialize_worker()
+    project_cache = worker.get_project_cache()
+    assert project_cache is not None
+    assert sorted(project_cache.project_ids()) == sorted([default_project.id, other_project.id])
+
+
+def test_utilization_tracker():
+    tracker = worker.UtilizationTracker(interval=10)
+    with (
+        mock.patch("time.monotonic", side_effect=[1, 2, 4, 11]),
+        mock.patch("sentry.ingest.consumer.worker.metrics") as metrics,
+        mock.patch("sentry.ingest.consumer.worker.publish_hot_projects") as publish_hot_projects,
+    ):
+        tracker._period_start = 0
+        with tracker.track():
+            pass
+        assert not metrics.distribution.called
+        with tracker.track():
+            pass
+
+    metrics.distribution.assert_any_call("ingest_consumer.worker.utilization", 8 / 11)
+    metrics.distribution.assert_any_call("ingest_consumer.worker.messages", 2)
+    assert publish_hot_projects.call_count == 1
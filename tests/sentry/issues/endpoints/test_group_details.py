@@ -131,13 +131,16 @@ class GroupDetailsTest(APITestCase, SnubaTestCase):
         url = f"/api/0/issues/{group.id}/"
 
         with mock.patch(
-            "sentry.tsdb.backend.get_range", side_effect=tsdb.backend.get_range
-        ) as get_range:
+            "sentry.tsdb.backend.execute_batch", side_effect=tsdb.backend.execute_batch
+        ) as execute_batch:
             response = self.client.get(url, {"environment": "production"}, format="json")
             assert response.status_code == 200
-            assert get_range.call_count == 2
-            for args, kwargs in get_range.call_args_list:
-                assert kwargs["environment_ids"] == [environment.id]
+            # hourly and daily stats are fetched as one batch
+            assert execute_batch.call_count == 1
+            (queries,), _ = execute_batch.call_args
+            assert len(queries) == 2
+            for query in queries:
+                assert query.environment_ids == [environment.id]
 
         response = self.client.get(url, {"environment": "invalid"}, format="json")
         assert response.status_code == 404
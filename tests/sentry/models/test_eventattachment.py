@@ -0,0 +1,55 @@
+from hashlib import sha1
+
+import pytest
+
+from sentry.attachments import MissingAttachmentChunks, attachment_cache
+from sentry.attachments.base import CachedAttachment
+from sentry.models.eventattachment import EventAttachment
+
+
+def putfile_roundtrip(attachment: CachedAttachment) -> tuple[EventAttachment, bytes]:
+    file = EventAttachment.putfile(1, attachment)
+    stored = EventAttachment(
+        size=file.size, sha1=file.sha1, file_id=file.file_id, blob_path=file.blob_path
+    )
+    with stored.getfile() as fp:
+        return stored, fp.read()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"Hello World!", b"Hello\x00World!", b"a" * 191, b"a" * 192],
+    ids=["empty", "inline", "binary", "longest_inline", "shortest_blob"],
+)
+def test_putfile(data):
+    attachment = CachedAttachment(name="hello.txt", content_type="text/plain", data=data)
+    stored, stored_data = putfile_roundtrip(attachment)
+
+    assert stored_data == data
+    assert stored.size == len(data)
+    assert stored.sha1 == sha1(data).hexdigest()
+    if data and len(data) < 192 and b"\x00" not in data:
+        assert stored.blob_path == ":" + data.decode()
+
+
+def test_putfile_chunked(django_cache):
+    chunks = [b"Hello World! " * 100_000, b"", b"Bye." * 100_000]
+    for chunk_index, chunk in enumerate(chunks):
+        attachment_cache.set_chunk("c:foo", 123, chunk_index, chunk)
+    attachment = attachment_cache.get_from_chunks(key="c:foo", id=123, chunks=len(chunks))
+
+    stored, stored_data = putfile_roundtrip(attachment)
+
+    data = b"".join(chunks)
+    assert stored_data == data
+    assert stored.size == len(data)
+    assert stored.sha1 == sha1(data).hexdigest()
+    assert stored.blob_path.startswith("eventattachments/v1/")
+
+
+def test_putfile_missing_chunks(django_cache):
+    attachment_cache.set_chunk("c:foo", 123, 0, b"Hello World! " * 100)
+    attachment = attachment_cache.get_from_chunks(key="c:foo", id=123, chunks=2)
+
+    with pytest.raises(MissingAttachmentChunks):
+        EventAttachment.putfile(1, attachment)
@@ -5,8 +5,10 @@ from sentry.models.groupowner import GroupOwner, GroupOwnerType, OwnerRuleType
 from sentry.models.projectownership import ProjectOwnership
 from sentry.models.repository import Repository
 from sentry.ownership.grammar import Matcher, Owner, Rule, dump_schema, resolve_actors
+from sentry.ownership.index import MIN_INDEXED_RULES
 from sentry.testutils.cases import TestCase
 from sentry.testutils.helpers.datetime import before_now, iso_format
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.silo import assume_test_silo_mode_of
 from sentry.testutils.skips import requires_snuba
 from sentry.types.actor import Actor, ActorType
@@ -145,6 +147,45 @@ class ProjectOwnershipTestCase(TestCase):
             ),
         )
 
+    @override_options({"ownership.compiled-index.enabled": True})
+    def test_get_owners_compiled_index(self):
+        rules = [
+            Rule(Matcher("path", f"src/module{i}/*"), [Owner("user", self.user.email)])
+            for i in range(MIN_INDEXED_RULES)
+        ]
+        rules.append(Rule(Matcher("path", "*.py"), [Owner("team", self.team.slug)]))
+
+        ownership = ProjectOwnership.objects.create(
+            project_id=self.project.id, schema=dump_schema(rules), fallthrough=True
+        )
+
+        self.assert_ownership_equals(
+            ProjectOwnership.get_owners(
+                self.project.id, {"stacktrace": {"frames": [{"filename": "src/module7/foo.py"}]}}
+            ),
+            (
+                [
+                    Actor(id=self.team.id, actor_type=ActorType.TEAM),
+                    Actor(id=self.user.id, actor_type=ActorType.USER),
+                ],
+                [rules[7], rules[-1]],
+            ),
+        )
+        assert ProjectOwnership.get_owners(
+            self.project.id, {"stacktrace": {"frames": [{"filename": "xxxx"}]}}
+        ) == ([], None)
+
+        # The cached index is replaced along with the schema
+        rules[-1] = Rule(Matcher("path", "xxxx"), [Owner("team", self.team.slug)])
+        ownership.schema = dump_schema(rules)
+        ownership.save()
+        self.assert_ownership_equals(
+            ProjectOwnership.get_owners(
+                self.project.id, {"stacktrace": {"frames": [{"filename": "xxxx"}]}}
+            ),
+            ([Actor(id=self.team.id, actor_type=ActorType.TEAM)], [rules[-1]]),
+        )
+
     def test_get_owners_when_codeowners_exists_and_no_issueowners(self):
         # This case will never exist bc we create a ProjectOwnership record if none exists when creating a ProjectCodeOwner record.
         # We have this testcase for potential corrupt data.
@@ -1,13 +1,18 @@
+import base64
 import pickle
 from datetime import timedelta
 from unittest import mock
 
 import pytest
+import zstandard
 from django.utils import timezone
 
 from sentry.nodestore.base import json_dumps
+from sentry.nodestore.compression import MAGIC, DictionaryCompressor
 from sentry.nodestore.django.backend import DjangoNodeStorage
 from sentry.nodestore.django.models import Node
+from sentry.nodestore.local_cache import get_local_cache, publish_invalidations
+from sentry.testutils.helpers import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
 from sentry.utils.strings import compress
 
@@ -52,6 +57,25 @@ class TestDjangoNodeStorage:
             b'{"foo":"bar"}'
         )
 
+    def test_set_bytes_dictionary_compressed(self):
+        dictionary = zstandard.ZstdCompressionDict(
+            b'{"foo":"bar","platform":"python"}' * 20, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+        )
+        compressor = DictionaryCompressor({0: dictionary}, write_dict_id=0)
+        node_id = "d2502ebbd7df41ceba8d3275595cac33"
+
+        with (
+            mock.patch("sentry.nodestore.base.get_compressor", return_value=compressor),
+            mock.patch("sentry.nodestore.base.get_decompressor", return_value=compressor),
+        ):
+            self.ns.set_bytes(node_id, b'{"foo":"bar"}')
+            assert self.ns.get_bytes(node_id) == b'{"foo":"bar"}'
+            assert self.ns.get(node_id) == {"foo": "bar"}
+
+        # Dictionary-compressed payloads are not compressed with zlib again
+        stored = base64.b64decode(Node.objects.get(id=node_id).data)
+        assert stored.startswith(MAGIC)
+
     def test_delete(self):
         node = Node.objects.create(id="d2502ebbd7df41ceba8d3275595cac33", data='{"foo": "bar"}')
 
@@ -133,3 +157,74 @@ class TestDjangoNodeStorage:
             self.ns.get("node_4")
             self.ns.get("node_4")
             assert mock_get.call_count == 2
+
+    @override_options({"nodestore.local-cache.max-bytes": 1024 * 1024})
+    def test_local_cache(self):
+        node_1 = ("a" * 32, {"foo": {"bar": "a"}})
+        node_2 = ("b" * 32, {"foo": {"bar": "b"}})
+
+        for node_id, data in [node_1, node_2]:
+            Node.objects.create(id=node_id, data=compress(json_dumps(data).encode("utf8")))
+
+        assert self.ns.get(node_1[0]) == node_1[1]
+        assert self.ns.get_multi([node_2[0]]) == {node_2[0]: node_2[1]}
+
+        # Both the django cache and the backend are skipped on local hits
+        with (
+            mock.patch.object(self.ns, "cache") as mock_cache,
+            mock.patch.object(Node.objects, "get") as mock_get,
+            mock.patch.object(Node.objects, "filter") as mock_filter,
+        ):
+            assert self.ns.get(node_1[0]) == node_1[1]
+            assert self.ns.get_multi([node_1[0], node_2[0]]) == {
+                node_1[0]: node_1[1],
+                node_2[0]: node_2[1],
+            }
+            assert mock_cache.get.call_count == 0
+            assert mock_cache.get_many.call_count == 0
+            assert mock_get.call_count == 0
+            assert mock_filter.call_count == 0
+
+        # Callers get their own copy of the payload
+        self.ns.get(node_1[0])["foo"]["bar"] = "changed"
+        assert self.ns.get(node_1[0]) == node_1[1]
+
+        # Writes replace the payload in the local tier, deletes drop it
+        self.ns.set(node_1[0], {"foo": "new"})
+        with mock.patch.object(self.ns, "cache") as mock_cache:
+            assert self.ns.get(node_1[0]) == {"foo": "new"}
+            assert mock_cache.get.call_count == 0
+        self.ns.delete(node_2[0])
+        assert self.ns.get_multi([node_2[0]]) == {}
+
+    @override_options({"nodestore.local-cache.max-bytes": 1024 * 1024})
+    def test_local_cache_filled_from_django_cache(self):
+        node_id = "a" * 32
+        self.ns.cache.set(node_id, {"foo": "bar"})
+
+        assert self.ns.get(node_id) == {"foo": "bar"}
+        with mock.patch.object(self.ns, "cache") as mock_cache:
+            assert self.ns.get(node_id) == {"foo": "bar"}
+            assert self.ns.get_multi([node_id]) == {node_id: {"foo": "bar"}}
+            assert mock_cache.get.call_count == 0
+            assert mock_cache.get_many.call_count == 0
+
+    @override_options({"nodestore.local-cache.max-bytes": 1024 * 1024})
+    def test_local_cache_invalidated_by_other_processes(self):
+        node_id = "a" * 32
+        self.ns.set(node_id, {"foo": "bar"})
+        local_cache = get_local_cache()
+        assert local_cache is not None
+
+        # Catch up with the invalidation log, this drops the write above
+        local_cache._polled_at = None
+        assert self.ns.get(node_id) == {"foo": "bar"}
+
+        # Another process rewrites the node
+        Node.objects.filter(id=node_id).update(data=compress(b'{"foo":"new"}'))
+        self.ns.cache.delete(node_id)
+        publish_invalidations([node_id])
+        assert self.ns.get(node_id) == {"foo": "bar"}
+
+        local_cache._polled_at = None
+        assert self.ns.get(node_id) == {"foo": "new"}
@@ -97,3 +97,33 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+@override_options({"nodestore.set-subkeys.enable-set-cache-item": False})
+def test_dictionary_compression(ns, tmp_path):
+    from django.test import override_settings
+
+    from sentry.nodestore.compression import MAGIC, train_dictionary
+
+    samples = [
+        ns._encode({None: {"sdk": {"name": "sentry.python", "version": f"1.{i}.0"}, "n": i}})
+        for i in range(200)
+    ]
+    path = tmp_path / "nodestore.dict"
+    path.write_bytes(train_dictionary(samples, dict_id=1, dict_size=1024))
+
+    ns.set("node_plain", {"foo": "a"})
+    with override_settings(SENTRY_NODESTORE_COMPRESSION_DICTIONARIES=[str(path)]):
+        with override_options({"nodestore.zstd-dictionary.write-id": 1}):
+            ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+            assert ns._get_bytes("node_1").startswith(MAGIC)
+
+        # Reads keep working once the dictionary is no longer used for writes,
+        # and blobs written before it was introduced are unaffected.
+        with override_options({"nodestore.zstd-dictionary.write-id": 0}):
+            assert ns.get("node_1") == {"foo": "a"}
+            assert ns.get("node_1", subkey="other") == {"foo": "b"}
+            assert ns.get_multi(["node_1", "node_plain"]) == {
+                "node_1": {"foo": "a"},
+                "node_plain": {"foo": "a"},
+            }
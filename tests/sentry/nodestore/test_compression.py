@@ -0,0 +1,166 @@
+import os
+import time
+from unittest import mock
+
+import pytest
+import zstandard
+from django.test import override_settings
+
+from sentry.nodestore.base import NodeStorage
+from sentry.nodestore.compression import (
+    HEADER,
+    MAGIC,
+    DictionaryCompressor,
+    UnknownDictionary,
+    get_compressor,
+    get_decompressor,
+    train_dictionary,
+)
+from sentry.testutils.helpers import override_options
+from sentry.utils import json
+
+GROUPING_INPUTS_DIR = os.path.join(os.path.dirname(__file__), "../grouping/grouping_inputs")
+
+
+def load_corpus() -> list[bytes]:
+    """
+    The grouping inputs are real-looking event payloads from a range of SDKs and
+    platforms, encoded the same way nodestore encodes them.
+    """
+    corpus = []
+    for filename in sorted(os.listdir(GROUPING_INPUTS_DIR)):
+        with open(os.path.join(GROUPING_INPUTS_DIR, filename), "rb") as f:
+            corpus.append(NodeStorage()._encode({None: json.loads(f.read())}))
+    return corpus
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    corpus = load_corpus()
+    # Train on one half of the corpus and measure on the other
+    return corpus[::2], corpus[1::2]
+
+
+@pytest.fixture(scope="module")
+def dictionary(corpus):
+    training, _ = corpus
+    return zstandard.ZstdCompressionDict(train_dictionary(training, dict_id=7, dict_size=16384))
+
+
+def test_train_dictionary_sets_id(dictionary):
+    assert dictionary.dict_id() == 7
+
+
+def test_roundtrip(corpus, dictionary):
+    _, samples = corpus
+    compressor = DictionaryCompressor({7: dictionary}, write_dict_id=7)
+    for sample in samples:
+        compressed = compressor.compress(sample)
+        assert compressed.startswith(MAGIC)
+        assert HEADER.unpack_from(compressed) == (MAGIC, 7)
+        assert compressor.decompress(compressed) == sample
+
+
+def test_passthrough_without_dictionary(dictionary):
+    compressor = DictionaryCompressor({7: dictionary})
+    assert compressor.compress(b'{"foo":"bar"}') == b'{"foo":"bar"}'
+    assert compressor.decompress(b'{"foo":"bar"}') == b'{"foo":"bar"}'
+
+
+def test_old_dictionaries_still_decode(corpus, dictionary):
+    _, samples = corpus
+    newer = zstandard.ZstdCompressionDict(train_dictionary(samples, dict_id=8, dict_size=16384))
+
+    old_blob = DictionaryCompressor({7: dictionary}, write_dict_id=7).compress(samples[0])
+    compressor = DictionaryCompressor({7: dictionary, 8: newer}, write_dict_id=8)
+
+    assert compressor.decompress(old_blob) == samples[0]
+    assert HEADER.unpack_from(compressor.compress(samples[0])) == (MAGIC, 8)
+
+
+def test_unknown_dictionary(dictionary):
+    blob = DictionaryCompressor({7: dictionary}, write_dict_id=7).compress(b'{"foo":"bar"}')
+    with pytest.raises(UnknownDictionary):
+        DictionaryCompressor({}).decompress(blob)
+    with pytest.raises(UnknownDictionary):
+        DictionaryCompressor({}, write_dict_id=7)
+
+
+def test_dictionary_beats_plain_zstd(corpus, dictionary):
+    _, samples = corpus
+    plain = zstandard.ZstdCompressor(level=3)
+    compressor = DictionaryCompressor({7: dictionary}, write_dict_id=7)
+
+    plain_size = sum(len(plain.compress(sample)) for sample in samples)
+    dictionary_size = sum(len(compressor.compress(sample)) for sample in samples)
+
+    assert dictionary_size < plain_size
+
+
+def test_get_compressor(tmp_path, dictionary):
+    path = tmp_path / "nodestore-7.dict"
+    path.write_bytes(dictionary.as_bytes())
+
+    with override_settings(SENTRY_NODESTORE_COMPRESSION_DICTIONARIES=[str(path)]):
+        with override_options({"nodestore.zstd-dictionary.write-id": 0}):
+            assert get_compressor().write_dict_id is None
+        with override_options({"nodestore.zstd-dictionary.write-id": 7}):
+            assert get_compressor().write_dict_id == 7
+        # Misconfigured ids disable dictionary writes rather than failing them
+        with override_options({"nodestore.zstd-dictionary.write-id": 9}):
+            assert get_compressor().write_dict_id is None
+
+
+def test_get_decompressor(tmp_path, dictionary):
+    path = tmp_path / "nodestore-7.dict"
+    path.write_bytes(dictionary.as_bytes())
+    blob = DictionaryCompressor({7: dictionary}, write_dict_id=7).compress(b'{"foo":"bar"}')
+
+    with (
+        override_settings(SENTRY_NODESTORE_COMPRESSION_DICTIONARIES=[str(path)]),
+        mock.patch("sentry.nodestore.compression.options.get") as options_get,
+    ):
+        decompressor = get_decompressor()
+        assert decompressor.write_dict_id is None
+        assert decompressor.decompress(blob) == b'{"foo":"bar"}'
+        assert get_decompressor() is decompressor
+        assert not options_get.called
+
+
+def benchmark_available() -> bool:
+    try:
+        __import__("pytest_benchmark")
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("codec", ["zlib", "zstd", "zstd-dictionary"])
+def test_benchmark_compression(codec, corpus, dictionary, benchmark):
+    """
+    Compares compression ratio and round trip throughput of the codecs
+    nodestore backends use today against dictionary compression.
+    """
+    import zlib
+
+    _, samples = corpus
+    if codec == "zlib":
+        compress, decompress = zlib.compress, zlib.decompress
+    elif codec == "zstd":
+        compress = zstandard.ZstdCompressor(level=3).compress
+        decompress = zstandard.ZstdDecompressor().decompress
+    else:
+        compressor = DictionaryCompressor({7: dictionary}, write_dict_id=7)
+        compress, decompress = compressor.compress, compressor.decompress
+
+    def roundtrip():
+        for sample in samples:
+            decompress(compress(sample))
+
+    start = time.perf_counter()
+    compressed_size = sum(len(compress(sample)) for sample in samples)
+    benchmark.extra_info["ratio"] = sum(len(sample) for sample in samples) / compressed_size
+    benchmark.extra_info["compress_seconds"] = time.perf_counter() - start
+    benchmark(roundtrip)
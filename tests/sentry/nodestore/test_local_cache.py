@@ -0,0 +1,130 @@
+from unittest import mock
+
+from sentry.nodestore.local_cache import (
+    LocalNodeCache,
+    _poll_invalidations,
+    get_local_cache,
+    publish_invalidations,
+)
+from sentry.testutils.helpers import override_options
+
+
+def test_get_set():
+    cache = LocalNodeCache(max_bytes=100, ttl=10)
+    cache.set("a", b'{"foo":"a"}')
+    assert cache.get("a") == b'{"foo":"a"}'
+    assert cache.get("b") is None
+    assert cache.get_many(["a", "b"]) == {"a": b'{"foo":"a"}'}
+    assert cache.current_bytes == 11
+
+
+def test_empty_values_are_not_cached():
+    cache = LocalNodeCache(max_bytes=100, ttl=10)
+    cache.set("a", b"")
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used():
+    cache = LocalNodeCache(max_bytes=30, ttl=10)
+    cache.set("a", b"a" * 10)
+    cache.set("b", b"b" * 10)
+    cache.set("c", b"c" * 10)
+    # Touch "a" so that "b" is the least recently used
+    assert cache.get("a")
+
+    cache.set("d", b"d" * 10)
+
+    assert cache.get("b") is None
+    assert set(cache.get_many(["a", "c", "d"])) == {"a", "c", "d"}
+    assert cache.current_bytes == 30
+
+
+def test_oversized_values_are_not_cached():
+    cache = LocalNodeCache(max_bytes=30, ttl=10)
+    cache.set("a", b"a" * 10)
+    cache.set("a", b"a" * 31)
+    assert cache.get("a") is None
+    assert cache.current_bytes == 0
+
+
+@mock.patch("sentry.nodestore.local_cache.time.monotonic")
+def test_ttl(monotonic):
+    cache = LocalNodeCache(max_bytes=100, ttl=10)
+    monotonic.return_value = 100
+    cache.set("a", b"a" * 10)
+    monotonic.return_value = 109
+    assert cache.get("a")
+    monotonic.return_value = 110
+    assert cache.get("a") is None
+    assert cache.current_bytes == 0
+
+
+def test_delete():
+    cache = LocalNodeCache(max_bytes=100, ttl=10)
+    cache.set("a", b"a" * 10)
+    cache.set("b", b"b" * 10)
+    cache.set("c", b"c" * 10)
+    cache.delete("a")
+    cache.delete_many(["b", "x"])
+    assert cache.get_many(["a", "b", "c"]) == {"c": b"c" * 10}
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.current_bytes == 0
+
+
+@mock.patch("sentry.nodestore.local_cache.time.monotonic")
+def test_invalidations(monotonic):
+    poll = mock.Mock(return_value=(3, None))
+    cache = LocalNodeCache(max_bytes=100, ttl=10, poll_invalidations=poll)
+    monotonic.return_value = 100
+    cache.set("a", b"a")
+    cache.set("b", b"b")
+
+    # Without a sequence number to start from, everything is dropped
+    assert cache.get("a") is None
+    poll.assert_called_once_with(None)
+
+    cache.set("a", b"a")
+    cache.set("b", b"b")
+    poll.return_value = (5, ["a", "x"])
+    # Polled at most once per interval
+    assert cache.get("a") == b"a"
+    assert poll.call_count == 1
+
+    monotonic.return_value = 101
+    assert cache.get_many(["a", "b"]) == {"b": b"b"}
+    poll.assert_called_with(3)
+
+    monotonic.return_value = 102
+    poll.side_effect = Exception("boom")
+    assert cache.get("b") is None
+    assert cache.current_bytes == 0
+
+
+def test_publish_and_poll_invalidations():
+    sequence, keys = _poll_invalidations(None)
+    assert keys is None
+
+    publish_invalidations(["a", "b"])
+    publish_invalidations(["c"])
+    assert _poll_invalidations(sequence) == (sequence + 2, ["a", "b", "c"])
+    assert _poll_invalidations(sequence + 2) == (sequence + 2, [])
+
+    # Pollers that fell behind the capped log can't tell what they missed
+    with mock.patch("sentry.nodestore.local_cache.INVALIDATIONS_MAX_SIZE", 1):
+        publish_invalidations(["d"])
+        publish_invalidations(["e"])
+    assert _poll_invalidations(sequence + 2) == (sequence + 4, None)
+    assert _poll_invalidations(sequence + 3) == (sequence + 4, ["e"])
+
+
+def test_get_local_cache():
+    with override_options({"nodestore.local-cache.max-bytes": 0}):
+        assert get_local_cache() is None
+    with override_options({"nodestore.local-cache.max-bytes": 100}):
+        cache = get_local_cache()
+        assert cache is not None
+        assert cache.max_bytes == 100
+        assert get_local_cache() is cache
+    with override_options({"nodestore.local-cache.max-bytes": 200}):
+        assert get_local_cache() is not cache
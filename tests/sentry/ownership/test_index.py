@@ -0,0 +1,145 @@
+import random
+
+import pytest
+
+from sentry.ownership.grammar import dump_schema, parse_rules
+from sentry.ownership.index import (
+    LiteralAutomaton,
+    OwnershipIndex,
+    _required_literal,
+    clear_index_cache,
+    get_ownership_index,
+    new_schema_version,
+)
+
+fixture_data = """
+*.js                    #frontend
+url:http://google.com/* #backend
+path:src/sentry/*       david@sentry.io
+path:src/*/utils/*.py   #utils
+path:*                  #everyone
+path:../*.py            #parent
+tags.foo:bar            tagperson@sentry.io
+tags.environment:prod   #prod
+tags.user.email:*@sentry.io  #staff
+module:foo.bar          #workflow
+module:"foo bar"        meow@sentry.io
+codeowners:/src/components/  githubuser@sentry.io
+codeowners:frontend/*.ts     githubmod@sentry.io
+codeowners:*.TSX             githubmod@sentry.io
+codeowners:[a-z]*/main.go    gopher@sentry.io
+"""
+
+
+def make_event(frames, tags=(), user=None, url=None):
+    return {
+        "platform": "python",
+        "exception": {"values": [{"stacktrace": {"frames": frames}}]},
+        "tags": list(tags),
+        "user": user or {},
+        "request": {"url": url},
+    }
+
+
+EVENTS = [
+    make_event([{"filename": "foo.js"}]),
+    make_event([{"filename": "src/sentry/models.py"}, {"filename": "src/app/utils/dates.py"}]),
+    make_event([{"abs_path": "/usr/src/app/Src/Components/button.tsx", "in_app": True}]),
+    make_event([{"filename": "src/components/button.tsx", "in_app": False}]),
+    make_event([{"filename": "frontend/index.ts"}, {"module": "foo.bar"}]),
+    make_event([{"filename": "../setup.py"}], tags=[("foo", "bar"), ("environment", "prod")]),
+    make_event([], tags=[("environment", "dev")], user={"email": "someone@sentry.io"}),
+    make_event([{"module": "foo bar"}], url="http://google.com/search"),
+    make_event([{"filename": "app/main.go"}, {"filename": "src/ünicode/utils/x.py"}]),
+    make_event([{"filename": 1}, {"filename": None}, "not a frame"]),
+]
+
+
+def test_required_literal():
+    assert _required_literal("src/*/utils/*.py") == "utils"
+    assert _required_literal("*.js") == ".js"
+    assert _required_literal("/src/Components/") == "components"
+    assert _required_literal("src/sentry/some_long_module_name.py") == "some_long_mo"
+    assert _required_literal("*") is None
+    assert _required_literal("../*") is None
+    assert _required_literal("[a-z]*/main.go") is None
+    assert _required_literal("src/ünicode/*") is None
+
+
+def test_literal_automaton():
+    automaton = LiteralAutomaton([("he", 0), ("she", 1), ("hers", 2), ("his", 3)])
+    found: set[int] = set()
+    automaton.search("ushers", found)
+    assert found == {0, 1, 2}
+
+    found = set()
+    automaton.search("this", found)
+    assert found == {3}
+
+
+@pytest.mark.parametrize("data", EVENTS)
+def test_matching_rules(data):
+    rules = parse_rules(fixture_data)
+    expected = [rule for rule in rules if rule.test(data, None)]
+    assert OwnershipIndex(rules).matching_rules(data) == expected
+
+
+def test_matching_rules_random():
+    rng = random.Random(0)
+    segments = ["src", "app", "Utils", "models", "components", "api", "..", "foo", "bar"]
+    extensions = [".py", ".js", ".ts", ".tsx", ""]
+
+    def random_path():
+        path = "/".join(rng.choice(segments) for _ in range(rng.randint(1, 4)))
+        return path + rng.choice(extensions)
+
+    def random_pattern():
+        pattern = "/".join(rng.choice(segments + ["*", "**", "?"]) for _ in range(3))
+        return pattern + rng.choice(extensions + ["*"])
+
+    rules = parse_rules(
+        "\n".join(
+            f"{rng.choice(['path', 'codeowners', 'module'])}:{random_pattern()} #team"
+            for _ in range(200)
+        )
+    )
+    index = OwnershipIndex(rules)
+
+    for _ in range(200):
+        frames = [
+            {
+                "filename": random_path(),
+                "abs_path": "/" + random_path(),
+                "module": random_path().replace("/", "."),
+                "in_app": rng.choice([True, False, None]),
+            }
+            for _ in range(rng.randint(1, 5))
+        ]
+        data = make_event(frames)
+        assert index.matching_rules(data) == [rule for rule in rules if rule.test(data, None)]
+
+
+def test_get_ownership_index():
+    clear_index_cache()
+    schema = dump_schema(parse_rules(fixture_data))
+
+    index = get_ownership_index(schema)
+    assert get_ownership_index(schema) is index
+    assert get_ownership_index(dump_schema(parse_rules(fixture_data))) is index
+
+    other = get_ownership_index(dump_schema(parse_rules("path:*.py #python")))
+    assert other is not index
+    assert [rule.matcher.pattern for rule in other.rules] == ["*.py"]
+
+
+def test_get_ownership_index_by_version():
+    clear_index_cache()
+    schema = dump_schema(parse_rules(fixture_data))
+    version = new_schema_version()
+
+    index = get_ownership_index(schema, version)
+    assert get_ownership_index(schema, version) is index
+    # The schema is not looked at once its version is known
+    assert get_ownership_index({}, version) is index
+    assert get_ownership_index(schema, new_schema_version()) is not index
+    assert get_ownership_index(schema) is not index
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+import pytest
+
+from sentry.ownership.grammar import Matcher, Rule, dump_schema, parse_rules
+from sentry.ownership.index import clear_index_cache, get_ownership_index
+
+CODEOWNERS_LINES = 5000
+
+
+def benchmark_available() -> bool:
+    try:
+        __import__("pytest_benchmark")
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+def make_codeowners_schema() -> dict[str, Any]:
+    """
+    The schema of a CODEOWNERS file of a large monorepo, mostly made of
+    directory rules with a few extension and path glob rules.
+    """
+    lines = []
+    for i in range(CODEOWNERS_LINES):
+        if i % 10 == 0:
+            lines.append(f"codeowners:*.ext{i} #team{i % 50}")
+        elif i % 10 == 1:
+            lines.append(f"path:src/team{i % 200}/**/module{i}.py #team{i % 50}")
+        else:
+            lines.append(f"codeowners:/src/team{i % 200}/module{i}/ #team{i % 50}")
+    return dump_schema(parse_rules("\n".join(lines)))
+
+
+def make_events(count: int) -> list[dict[str, Any]]:
+    rng = random.Random(0)
+    events = []
+    for _ in range(count):
+        frames = []
+        for _ in range(20):
+            i = rng.randrange(CODEOWNERS_LINES * 2)
+            frames.append(
+                {
+                    "filename": f"src/team{i % 200}/module{i}/views.py",
+                    "abs_path": f"/app/src/team{i % 200}/module{i}/views.py",
+                    "module": f"src.team{i % 200}.module{i}.views",
+                    "in_app": True,
+                }
+            )
+        events.append(
+            {"platform": "python", "exception": {"values": [{"stacktrace": {"frames": frames}}]}}
+        )
+    return events
+
+
+def match_naive(schema: Mapping[str, Any], events: Sequence[Mapping[str, Any]]) -> list:
+    rules = [Rule.load(rule) for rule in schema["rules"]]
+    results = []
+    for data in events:
+        munged_data = Matcher.munge_if_needed(data)
+        results.append([rule for rule in rules if rule.test(data, munged_data)])
+    return results
+
+
+def match_indexed(schema: Mapping[str, Any], events: Sequence[Mapping[str, Any]]) -> list:
+    return [get_ownership_index(schema).matching_rules(data) for data in events]
+
+
+MATCHERS: dict[str, Callable[[Mapping[str, Any], Sequence[Mapping[str, Any]]], list]] = {
+    "naive": match_naive,
+    "indexed": match_indexed,
+}
+
+
+def test_indexed_matches_naive():
+    clear_index_cache()
+    schema = make_codeowners_schema()
+    events = make_events(5)
+    results = match_indexed(schema, events)
+    assert results == match_naive(schema, events)
+    assert all(results)
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("matcher", list(MATCHERS))
+def test_benchmark_ownership_matching(matcher, benchmark):
+    clear_index_cache()
+    schema = make_codeowners_schema()
+    events = make_events(10)
+    # Compiles the index outside of the measured runs
+    match_indexed(schema, events[:1])
+
+    benchmark(MATCHERS[matcher], schema, events)
@@ -6,9 +6,10 @@ import pytest
 
 from sentry.constants import DataCategory
 from sentry.quotas.base import QuotaConfig, QuotaScope, build_metric_abuse_quotas
-from sentry.quotas.redis import RedisQuota, is_rate_limited
+from sentry.quotas.redis import RedisQuota, is_rate_limited, lease_quotas
 from sentry.sentry_metrics.use_case_id_registry import CARDINALITY_LIMIT_USE_CASES, UseCaseID
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.redis import clusters
 
 
@@ -65,6 +66,63 @@ def test_is_rate_limited_script():
     assert list(map(bool, is_rate_limited(("orange", "apple"), (1, now + 60), client))) == [False]
 
 
+def test_lease_script():
+    now = int(time.time())
+
+    cluster = clusters.get("default")
+    client = cluster.get_local_client(next(iter(cluster.hosts)))
+
+    keys = (
+        "lease-foo",
+        "r:lease-foo",
+        "l:lease-foo",
+        "lease-bar",
+        "r:lease-bar",
+        "l:lease-bar",
+    )
+    args = (10, now + 60, 4, 0, 0, -1, -1, now + 120, 4, 0, 0, -1)
+    assert lease_quotas(keys, args, client) == [4, 4]
+    assert lease_quotas(keys, args, client) == [4, 4]
+    # Only what is left of the limit is leased
+    args = (10, now + 60, 4, 0, 0, -1, -1, now + 120, 0, 0, 0, -1)
+    assert lease_quotas(keys, args, client) == [2, 0]
+    assert lease_quotas(keys, args, client) == [0, 0]
+
+    assert client.get("lease-foo") == b"10"
+    assert 59 <= client.ttl("lease-foo") <= 60
+    assert client.get("lease-bar") == b"8"
+
+    # Returned items can be leased again
+    args = (10, now + 60, 4, 3, 0, -1, -1, now + 120, 0, 1, 0, -1)
+    assert lease_quotas(keys, args, client) == [3, 0]
+    assert client.get("r:lease-foo") == b"3"
+    assert client.get("r:lease-bar") == b"1"
+
+
+def test_lease_script_max_leased():
+    now = int(time.time())
+
+    cluster = clusters.get("default")
+    client = cluster.get_local_client(next(iter(cluster.hosts)))
+
+    keys = ("lease-baz", "r:lease-baz", "l:lease-baz")
+    assert lease_quotas(keys, (100, now + 60, 4, 0, 0, 5), client) == [4]
+    assert client.get("l:lease-baz") == b"3"
+    # Leases are capped by the outstanding items of other leases, but the
+    # first item is leased as long as the quota is not exhausted
+    assert lease_quotas(keys, (100, now + 60, 4, 0, 0, 5), client) == [3]
+    assert lease_quotas(keys, (100, now + 60, 4, 0, 0, 5), client) == [1]
+    assert client.get("l:lease-baz") == b"5"
+    assert 59 <= client.ttl("l:lease-baz") <= 60
+
+    # Released items can be leased out again
+    assert lease_quotas(keys, (100, now + 60, 4, 1, 3, 5), client) == [4]
+    assert client.get("l:lease-baz") == b"5"
+    assert client.get("r:lease-baz") == b"1"
+    assert lease_quotas(keys, (-1, now + 60, 0, 0, 5, -1), client) == [0]
+    assert client.get("l:lease-baz") is None
+
+
 class RedisQuotaTest(TestCase):
     @cached_property
     def quota(self):
@@ -562,3 +620,96 @@ class RedisQuotaTest(TestCase):
             0,  # unlimited quota was not consumed
             0,  # dummy quota was not consumed
         ]
+
+    @override_options(
+        {
+            "quotas.redis.lease.max-error": 0.25,
+            "quotas.redis.lease.max-size": 100,
+            "quotas.redis.lease.ttl-seconds": 10,
+        }
+    )
+    def test_is_rate_limited_with_leases(self):
+        timestamp = time.time()
+
+        self.get_project_quota.return_value = (20, 60)
+        self.get_organization_quota.return_value = (1000, 60)
+        self.get_monitor_quota.return_value = (15, 60)
+        quotas = self.quota.get_quotas(self.project)
+
+        with mock.patch("sentry.quotas.redis.lease_quotas", wraps=lease_quotas) as lease:
+            for _ in range(20):
+                assert not self.quota.is_rate_limited(self.project, timestamp=timestamp).is_limited
+
+            # The project quota is leased 5 at a time, and the organization
+            # quota is capped by the maximum lease size
+            assert lease.call_count == 4
+            assert self.quota.get_usage(
+                self.project.organization_id, quotas, timestamp=timestamp
+            ) == [20, 100, 0]
+
+            assert self.quota.is_rate_limited(self.project, timestamp=timestamp).is_limited
+            assert lease.call_count == 5
+
+            # The unused items of expired leases are returned
+            with mock.patch("sentry.quotas.redis.monotonic", return_value=time.monotonic() + 11):
+                assert self.quota.is_rate_limited(self.project, timestamp=timestamp).is_limited
+            assert self.quota.get_usage(
+                self.project.organization_id, quotas, timestamp=timestamp
+            ) == [20, 120, 0]
+
+    @override_options(
+        {
+            "quotas.redis.lease.max-error": 0.25,
+            "quotas.redis.lease.max-size": 100,
+            "quotas.redis.lease.ttl-seconds": 10,
+        }
+    )
+    def test_leases_are_capped_across_processes(self):
+        timestamp = time.time()
+
+        self.get_project_quota.return_value = (20, 60)
+        self.get_organization_quota.return_value = (1000, 60)
+        self.get_monitor_quota.return_value = (15, 60)
+        quotas = self.quota.get_quotas(self.project)
+
+        # Each instance holds its own leases, like separate processes. The
+        # project quota has at most 5 items leased out that are not used yet.
+        for _ in range(3):
+            assert not RedisQuota().is_rate_limited(self.project, timestamp=timestamp).is_limited
+        assert self.quota.get_usage(self.project.organization_id, quotas, timestamp=timestamp) == [
+            8,
+            201,
+            0,
+        ]
+
+    @override_options(
+        {
+            "quotas.redis.lease.max-error": 0.25,
+            "quotas.redis.lease.max-size": 100,
+            "quotas.redis.lease.ttl-seconds": 10,
+        }
+    )
+    def test_leases_of_idle_organizations_are_returned(self):
+        timestamp = time.time()
+
+        self.get_project_quota.return_value = (20, 60)
+        self.get_organization_quota.return_value = (1000, 60)
+        self.get_monitor_quota.return_value = (15, 60)
+        quotas = self.quota.get_quotas(self.project)
+        other_project = self.create_project(organization=self.create_organization())
+
+        assert not self.quota.is_rate_limited(self.project, timestamp=timestamp).is_limited
+        assert self.quota.get_usage(self.project.organization_id, quotas, timestamp=timestamp) == [
+            5,
+            100,
+            0,
+        ]
+
+        # Only events of another organization are checked once the lease expired
+        with mock.patch("sentry.quotas.redis.monotonic", return_value=time.monotonic() + 11):
+            assert not self.quota.is_rate_limited(other_project, timestamp=timestamp).is_limited
+        assert self.quota.get_usage(self.project.organization_id, quotas, timestamp=timestamp) == [
+            1,
+            1,
+            0,
+        ]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+
+from sentry.ratelimits.sliding_windows import (
+    Quota,
+    RedisBatchedSlidingWindowRateLimiter,
+    RedisSlidingWindowRateLimiter,
+    RequestedQuota,
+)
+
+
+def benchmark_available() -> bool:
+    try:
+        __import__("pytest_benchmark")
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+# The quotas of the metrics indexer: per organization, and a global one
+QUOTAS = [
+    Quota(window_seconds=10, granularity_seconds=10, limit=1000),
+    Quota(window_seconds=3600, granularity_seconds=60, limit=10000),
+    Quota(window_seconds=10, granularity_seconds=10, limit=100000, prefix_override="global"),
+]
+
+
+def make_requests(count: int, organizations: int) -> list[RequestedQuota]:
+    return [
+        RequestedQuota(prefix=f"org:{i % organizations}", requested=1, quotas=QUOTAS)
+        for i in range(count)
+    ]
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize(
+    "limiter_cls",
+    [RedisSlidingWindowRateLimiter, RedisBatchedSlidingWindowRateLimiter],
+    ids=["sentry_redis_tools", "batched"],
+)
+def test_benchmark_check_and_use_quotas(limiter_cls, benchmark):
+    limiter = limiter_cls()
+    # One second worth of requests at 10k requests/s
+    requests = make_requests(count=10000, organizations=1000)
+
+    def check_and_use() -> None:
+        timestamp, grants = limiter.check_within_quotas(requests)
+        limiter.use_quotas(requests, grants, timestamp)
+
+    benchmark(check_and_use)
@@ -3,14 +3,15 @@ import pytest
 from sentry.ratelimits.sliding_windows import (
     GrantedQuota,
     Quota,
+    RedisBatchedSlidingWindowRateLimiter,
     RedisSlidingWindowRateLimiter,
     RequestedQuota,
 )
 
 
-@pytest.fixture
-def limiter():
-    return RedisSlidingWindowRateLimiter()
+@pytest.fixture(params=[RedisSlidingWindowRateLimiter, RedisBatchedSlidingWindowRateLimiter])
+def limiter(request):
+    return request.param()
 
 
 TIMESTAMP_OFFSET = 100
@@ -71,3 +72,65 @@ def test_basic(limiter):
         )
 
         assert resp == [GrantedQuota(prefix="foo", granted=0, reached_quotas=quotas)]
+
+
+def test_prefix_override(limiter):
+    global_quota = Quota(
+        window_seconds=10, granularity_seconds=5, limit=5, prefix_override="global"
+    )
+    org_quota = Quota(window_seconds=10, granularity_seconds=1, limit=3)
+
+    timestamp, grants = limiter.check_within_quotas(
+        [
+            RequestedQuota(prefix="org:1", requested=2, quotas=[org_quota, global_quota]),
+            RequestedQuota(prefix="org:2", requested=4, quotas=[org_quota, global_quota]),
+        ],
+        timestamp=TIMESTAMP_OFFSET,
+    )
+    assert grants == [
+        GrantedQuota(prefix="org:1", granted=2, reached_quotas=[]),
+        GrantedQuota(prefix="org:2", granted=3, reached_quotas=[org_quota]),
+    ]
+    limiter.use_quotas(
+        [
+            RequestedQuota(prefix="org:1", requested=2, quotas=[org_quota, global_quota]),
+            RequestedQuota(prefix="org:2", requested=4, quotas=[org_quota, global_quota]),
+        ],
+        grants,
+        timestamp,
+    )
+
+    resp = limiter.check_and_use_quotas(
+        [RequestedQuota(prefix="org:1", requested=2, quotas=[org_quota, global_quota])],
+        timestamp=TIMESTAMP_OFFSET + 1,
+    )
+    assert resp == [
+        GrantedQuota(prefix="org:1", granted=0, reached_quotas=[org_quota, global_quota])
+    ]
+
+
+def test_batched_check_and_use():
+    limiter = RedisBatchedSlidingWindowRateLimiter()
+    quotas = [
+        Quota(window_seconds=10, granularity_seconds=1, limit=3),
+        Quota(window_seconds=60, granularity_seconds=10, limit=5),
+    ]
+
+    resp = limiter.check_and_use_quotas(
+        [RequestedQuota(prefix=f"org:{i % 2}", requested=2, quotas=quotas) for i in range(4)],
+        timestamp=TIMESTAMP_OFFSET,
+    )
+    # Quota granted to a request counts against the requests after it
+    assert resp == [
+        GrantedQuota(prefix="org:0", granted=2, reached_quotas=[]),
+        GrantedQuota(prefix="org:1", granted=2, reached_quotas=[]),
+        GrantedQuota(prefix="org:0", granted=1, reached_quotas=[quotas[0]]),
+        GrantedQuota(prefix="org:1", granted=1, reached_quotas=[quotas[0]]),
+    ]
+
+    # The first quota's window has moved on, the second one's hasn't
+    resp = limiter.check_and_use_quotas(
+        [RequestedQuota(prefix="org:0", requested=3, quotas=quotas)],
+        timestamp=TIMESTAMP_OFFSET + 10,
+    )
+    assert resp == [GrantedQuota(prefix="org:0", granted=2, reached_quotas=[quotas[1]])]
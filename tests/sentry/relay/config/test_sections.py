@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+from sentry.models.projectkey import ProjectKey
+from sentry.relay.config import (
+    OrganizationConfigInputs,
+    get_invalidated_sections,
+    get_project_config,
+)
+from sentry.relay.config.sections import ConfigSection, build_sections
+from sentry.testutils.helpers.options import override_options
+from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.testutils.silo import region_silo_test
+
+
+def test_get_invalidated_sections():
+    assert get_invalidated_sections(None) is None
+    assert get_invalidated_sections("projectoption.post_save") is None
+    assert get_invalidated_sections("dynamic_sampling:boost_release") == {"sampling"}
+    assert get_invalidated_sections("dynamic_sampling_boost_low_volume_projects") == {"sampling"}
+    assert get_invalidated_sections("metrics_blocking") == {"metrics"}
+    assert get_invalidated_sections("projectkey.post_save") == frozenset()
+
+
+def make_sections(computed):
+    def compute(name):
+        def inner(project, inputs):
+            computed.append(name)
+            return {name: len(computed)}
+
+        return inner
+
+    return [
+        ConfigSection(name="a", version=1, compute=compute("a"), triggers=("a:",)),
+        ConfigSection(name="b", version=1, compute=compute("b")),
+        ConfigSection(name="c", version=1, compute=compute("c"), cacheable=False),
+    ]
+
+
+@django_db_all
+@override_options({"relay.project-config.sections.enabled": True})
+def test_build_sections(default_project):
+    computed: list[str] = []
+    sections = make_sections(computed)
+    inputs = OrganizationConfigInputs(default_project.organization, [default_project])
+
+    assert build_sections(default_project, inputs, sections) == {"a": 1, "b": 2, "c": 3}
+    assert build_sections(default_project, inputs, sections, invalidated_sections={"a"}) == {
+        "a": 4,
+        "b": 2,
+        "c": 5,
+    }
+    assert computed == ["a", "b", "c", "a", "c"]
+
+    # Bumping the version of a section invalidates it
+    sections[1] = ConfigSection(name="b", version=2, compute=sections[1].compute)
+    assert build_sections(default_project, inputs, sections, invalidated_sections=set()) == {
+        "a": 4,
+        "b": 6,
+        "c": 7,
+    }
+
+
+@django_db_all
+def test_build_sections_disabled(default_project):
+    computed: list[str] = []
+    sections = make_sections(computed)
+    inputs = OrganizationConfigInputs(default_project.organization, [default_project])
+
+    build_sections(default_project, inputs, sections)
+    build_sections(default_project, inputs, sections, invalidated_sections={"a"})
+    assert computed == ["a", "b", "c"] * 2
+
+
+@django_db_all
+@region_silo_test
+@override_options({"relay.project-config.sections.enabled": True})
+def test_incremental_project_config(default_project):
+    keys = ProjectKey.objects.filter(project=default_project)
+    full = get_project_config(default_project, project_keys=keys).to_dict()
+
+    with patch("sentry.relay.config.get_filter_settings") as get_filter_settings:
+        incremental = get_project_config(
+            default_project,
+            project_keys=keys,
+            invalidated_sections=get_invalidated_sections("dynamic_sampling:boost_release"),
+        ).to_dict()
+        assert not get_filter_settings.called
+
+    assert incremental["config"] == full["config"]
+    assert incremental["publicKeys"] == full["publicKeys"]
@@ -20,7 +20,13 @@ from sentry.dynamic_sampling.rules.base import NEW_MODEL_THRESHOLD_IN_MINUTES
 from sentry.models.projectkey import ProjectKey
 from sentry.models.projectteam import ProjectTeam
 from sentry.models.transaction_threshold import TransactionMetric
-from sentry.relay.config import ProjectConfig, get_project_config
+from sentry.relay.config import (
+    ProjectConfig,
+    get_exposed_features,
+    get_exposed_features_bulk,
+    get_project_config,
+    get_project_configs,
+)
 from sentry.sentry_metrics.visibility import block_metric, block_tags_of_metric
 from sentry.snuba.dataset import Dataset
 from sentry.testutils.factories import Factories
@@ -1241,3 +1247,41 @@ def test_project_config_with_generic_filters(default_project):
     _validate_project_config(config["config"])
 
     assert config["config"]["filterSettings"]["generic"]["filters"]
+
+
+@django_db_all
+@region_silo_test
+def test_get_project_configs(default_project):
+    organization = default_project.organization
+    other_project = Factories.create_project(organization=organization)
+    Factories.create_project_key(other_project)
+    ProjectKey.objects.create(project=default_project)
+    other_project.update_option("sentry:breakdowns", {})
+    projects = [default_project, other_project]
+    keys = list(ProjectKey.objects.filter(project__in=projects))
+    assert len(keys) >= 3
+
+    with Feature({"organizations:custom-metrics": True, "projects:span-metrics-extraction": True}):
+        configs = get_project_configs(organization, projects, keys)
+        assert set(configs) == {key.public_key for key in keys}
+
+        for key in keys:
+            expected = get_project_config(key.project, project_keys=[key]).to_dict()
+            config = configs[key.public_key].to_dict()
+            for field in ("lastChange", "lastFetch", "rev"):
+                expected.pop(field)
+                config.pop(field)
+            assert config == expected
+
+
+@django_db_all
+@region_silo_test
+def test_get_exposed_features_bulk(default_project):
+    other_project = Factories.create_project(organization=default_project.organization)
+    projects = [default_project, other_project]
+
+    with Feature({"organizations:profiling": True, "projects:discard-transaction": True}):
+        exposed_features = get_exposed_features_bulk(default_project.organization, projects)
+        for project in projects:
+            assert exposed_features[project.id] == get_exposed_features(project)
+        assert "organizations:profiling" in exposed_features[default_project.id]
@@ -34,3 +34,15 @@ def test_read_write():
 
     assert cache.get_rev(dsn1) == "my_rev_123"
     assert cache.get_rev(dsn2) is None
+
+
+@django_db_all
+def test_get_cached_public_keys():
+    cache = redis.RedisProjectConfigCache()
+    cache.set_many({"cached-dsn-1": {"my-value": "foo"}, "cached-dsn-2": {"disabled": True}})
+
+    assert cache.get_cached_public_keys(["cached-dsn-1", "cached-dsn-2", "missing-dsn"]) == {
+        "cached-dsn-1",
+        "cached-dsn-2",
+    }
+    assert cache.get_cached_public_keys([]) == set()
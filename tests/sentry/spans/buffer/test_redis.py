@@ -1,4 +1,11 @@
-from sentry.spans.buffer.redis import ProcessSegmentsContext, RedisSpansBuffer, SegmentKey
+from sentry.spans.buffer.redis import (
+    ProcessSegmentsContext,
+    RedisSpansBuffer,
+    SegmentKey,
+    get_segment_deadlines_key,
+)
+from sentry.spans.consumers.process.factory import prepare_buffered_segment_payload
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
 
 
@@ -148,3 +155,66 @@ class TestRedisSpansBuffer:
             b"1710280892",
             b"segment:segment_3:1:process-segment",
         ]
+
+    @django_db_all
+    @override_options({"standalone-spans.buffer.sorted-set-index.enable": True})
+    def test_batch_write_with_index(self):
+        buffer = RedisSpansBuffer()
+        key = SegmentKey("segment_1", 1, 1)
+        buffer.batch_write_and_check_processing(
+            spans_map={key: [b'{"a": 1}', b'{"a": 2}']},
+            segment_first_seen_ts={key: 1710280889},
+            latest_ts_by_partition={1: 1710280889},
+        )
+        buffer.batch_write_and_check_processing(
+            spans_map={key: [b'{"a": 3}']},
+            segment_first_seen_ts={key: 1710280891},
+            latest_ts_by_partition={1: 1710280891},
+        )
+
+        # One compressed chunk per written batch
+        assert buffer.client.llen("segment:segment_1:1:process-segment") == 2
+        assert buffer.client.ttl("segment:segment_1:1:process-segment") == 300
+        assert buffer.client.zrange(get_segment_deadlines_key(1), 0, -1, withscores=True) == [
+            (b"segment:segment_1:1:process-segment", 1710280889.0)
+        ]
+        assert not buffer.client.exists("performance-issues:unprocessed-segments:partition-2:1")
+
+        (segment,) = buffer.read_and_expire_many_segments(["segment:segment_1:1:process-segment"])
+        assert prepare_buffered_segment_payload(segment) == (
+            b'{"spans": [{"a": 1},{"a": 2},{"a": 3}]}'
+        )
+
+    @django_db_all
+    def test_get_unprocessed_segments_from_index(self):
+        buffer = RedisSpansBuffer()
+        spans_map = {SegmentKey(f"segment_{i}", 1, 1): [b"span data"] for i in range(4)}
+        timestamp_map = {key: 1710280890 + i for i, key in enumerate(spans_map)}
+
+        with override_options({"standalone-spans.buffer.sorted-set-index.enable": True}):
+            buffer.batch_write_and_check_processing(
+                spans_map=spans_map,
+                segment_first_seen_ts=timestamp_map,
+                latest_ts_by_partition={1: 1710280893},
+            )
+        # Segments buffered before the option was enabled are still flushed
+        legacy_key = SegmentKey("segment_legacy", 1, 1)
+        buffer.batch_write_and_check_processing(
+            spans_map={legacy_key: [b"span data"]},
+            segment_first_seen_ts={legacy_key: 1710280890},
+            latest_ts_by_partition={1: 1710280893},
+        )
+
+        with override_options({"standalone-spans.buffer.max-segments-per-flush": 2}):
+            assert buffer.get_unprocessed_segments_and_prune_bucket(1710281012, 1) == [
+                "segment:segment_0:1:process-segment",
+                "segment:segment_1:1:process-segment",
+                "segment:segment_legacy:1:process-segment",
+            ]
+            assert buffer.get_unprocessed_segments_and_prune_bucket(1710281012, 1) == [
+                "segment:segment_2:1:process-segment",
+            ]
+
+        assert buffer.client.zrange(get_segment_deadlines_key(1), 0, -1) == [
+            b"segment:segment_3:1:process-segment"
+        ]
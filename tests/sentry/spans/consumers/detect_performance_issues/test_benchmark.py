@@ -0,0 +1,49 @@
+import pytest
+
+from sentry.spans.consumers.detect_performance_issues.message import build_tree, flatten_tree
+
+
+def benchmark_available() -> bool:
+    try:
+        __import__("pytest_benchmark")
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+def make_deep_segment(size):
+    spans = [
+        {
+            "span_id": f"{i:016x}",
+            "parent_span_id": f"{i - 1:016x}" if i else None,
+            "start_timestamp": i,
+            "is_segment": i == 0,
+        }
+        for i in range(size)
+    ]
+    spans.reverse()
+    return spans
+
+
+def make_wide_segment(size, fanout=10):
+    return [
+        {
+            "span_id": f"{i:016x}",
+            "parent_span_id": f"{(i - 1) // fanout:016x}" if i else None,
+            "start_timestamp": -i,
+            "is_segment": i == 0,
+        }
+        for i in range(size)
+    ]
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize(
+    "make_segment", [make_deep_segment, make_wide_segment], ids=["deep", "wide"]
+)
+def test_benchmark_flatten_tree(make_segment, benchmark):
+    spans = make_segment(10000)
+    flattened = benchmark(lambda: flatten_tree(*build_tree(spans)))
+    assert len(flattened) == len(spans)
+    assert flattened[0]["is_segment"]
@@ -3,7 +3,11 @@ from hashlib import md5
 from unittest import mock
 
 from sentry.issues.grouptype import PerformanceStreamedSpansGroupTypeExperimental
-from sentry.spans.consumers.detect_performance_issues.message import process_segment
+from sentry.spans.consumers.detect_performance_issues.message import (
+    build_tree,
+    flatten_tree,
+    process_segment,
+)
 from sentry.testutils.cases import TestCase
 from sentry.testutils.helpers.options import override_options
 from tests.sentry.spans.consumers.process.test_factory import build_mock_span
@@ -125,3 +129,38 @@ class TestSpansTask(TestCase):
         )
 
         assert job["performance_problems"][0].type == PerformanceStreamedSpansGroupTypeExperimental
+
+
+def make_span(span_id, parent_span_id=None, start_timestamp=0, is_segment=False):
+    return {
+        "span_id": span_id,
+        "parent_span_id": parent_span_id,
+        "start_timestamp": start_timestamp,
+        "is_segment": is_segment,
+    }
+
+
+def test_flatten_tree():
+    spans = [
+        make_span("c", "a", start_timestamp=2),
+        make_span("a", "root", start_timestamp=1),
+        make_span("orphan", "missing", start_timestamp=0),
+        make_span("b", "root", start_timestamp=0),
+        make_span("root", is_segment=True),
+        make_span("d", "a", start_timestamp=1),
+        # Duplicates are dropped
+        make_span("b", "a", start_timestamp=5),
+    ]
+
+    flattened = flatten_tree(*build_tree(spans))
+    assert [span["span_id"] for span in flattened] == ["root", "b", "a", "d", "c", "orphan"]
+    # Spans aren't copied
+    assert flattened[1] is spans[3]
+
+
+def test_flatten_deep_tree():
+    spans = [make_span(str(i), str(i - 1), start_timestamp=i) for i in range(1, 10000)]
+    spans.append(make_span("0", is_segment=True))
+
+    flattened = flatten_tree(*build_tree(spans))
+    assert [span["span_id"] for span in flattened] == [str(i) for i in range(10000)]
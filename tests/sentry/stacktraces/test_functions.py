@@ -2,6 +2,7 @@ import pytest
 
 from sentry.interfaces.stacktrace import Frame
 from sentry.stacktraces.functions import (
+    _trim_native_function_name_cached,
     get_source_link_for_frame,
     replace_enclosed_string,
     split_func_tokens,
@@ -230,6 +231,21 @@ def test_trim_function_name_cocoa():
     assert trim_function_name("foo::bar::foo(int)", "native") == "foo::bar::foo"
 
 
+def test_trim_native_function_name_cached():
+    function = "std::vector<int>::push_back(int const&) const"
+    _trim_native_function_name_cached.cache_clear()
+
+    assert trim_function_name(function, "native") == "std::vector<T>::push_back"
+    assert trim_function_name(function, "native") == "std::vector<T>::push_back"
+    assert trim_function_name(function, "native", normalize_lambdas=False) == (
+        "std::vector<T>::push_back"
+    )
+
+    cache_info = _trim_native_function_name_cached.cache_info()
+    assert cache_info.hits == 1
+    assert cache_info.misses == 2
+
+
 @pytest.mark.parametrize(
     "input,output",
     [
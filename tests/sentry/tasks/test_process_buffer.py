@@ -2,6 +2,7 @@ from unittest import mock
 
 from django.test import override_settings
 
+from sentry.buffer.combining import reset_write_combiner
 from sentry.models.group import Group
 from sentry.tasks.process_buffer import (
     buffer_incr,
@@ -11,6 +12,7 @@ from sentry.tasks.process_buffer import (
     process_pending_batch,
 )
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
 
 
 class ProcessIncrTest(TestCase):
@@ -83,3 +85,26 @@ class BufferIncrTest(TestCase):
             "args": (),
             "kwargs": {},
         }
+
+    @override_settings(SENTRY_BUFFER_INCR_AS_CELERY_TASK=False)
+    @override_options({"buffer.write-combining.enabled": True})
+    @mock.patch("sentry.tasks.process_buffer.buffer_incr_task")
+    def test_buffer_incr_write_combining(self, mock_buffer_incr_task):
+        reset_write_combiner()
+        buffer_incr(Group, {"times_seen": 1}, {"id": 1})
+        buffer_incr(Group, {"times_seen": 1}, {"id": 1}, {"level": 40})
+        assert len(mock_buffer_incr_task.mock_calls) == 0
+
+        reset_write_combiner()
+        assert len(mock_buffer_incr_task.mock_calls) == 1
+        assert mock_buffer_incr_task.mock_calls[0].kwargs == {
+            "app_label": "sentry",
+            "model_name": "group",
+            "args": (),
+            "kwargs": {
+                "columns": {"times_seen": 2},
+                "filters": {"id": 1},
+                "extra": {"level": 40},
+                "signal_only": None,
+            },
+        }
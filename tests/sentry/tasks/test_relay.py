@@ -18,6 +18,7 @@ from sentry.tasks.relay import (
     schedule_build_project_config,
     schedule_invalidate_project_config,
 )
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.helpers.task_runner import BurstTaskRunner
 from sentry.testutils.hybrid_cloud import simulated_transaction_watermarks
 from sentry.testutils.pytest.fixtures import django_db_all
@@ -416,6 +417,53 @@ class TestInvalidationTask:
             },
         ]
 
+    def test_debounced_full_invalidation_drops_cached_sections(
+        self,
+        monkeypatch,
+        default_project,
+        invalidation_debounce_cache,
+        django_cache,
+    ):
+        from sentry.relay.config import CONFIG_SECTIONS
+        from sentry.utils.cache import cache
+
+        tasks = []
+
+        def apply_async(args=None, kwargs=None, countdown=None):
+            tasks.append(kwargs)
+
+        monkeypatch.setattr("sentry.tasks.relay.invalidate_project_config.apply_async", apply_async)
+
+        invalidation_debounce_cache.mark_task_done(
+            public_key=None, project_id=default_project.id, organization_id=None
+        )
+        schedule_invalidate_project_config(
+            project_id=default_project.id, trigger="metrics_blocking"
+        )
+
+        keys = [s.cache_key(default_project.id) for s in CONFIG_SECTIONS if s.cacheable]
+        cache.set_many({key: {"cached": True} for key in keys})
+
+        # Nothing to drop while section caching is disabled
+        schedule_invalidate_project_config(
+            project_id=default_project.id, trigger="projectoption.post_save"
+        )
+        assert cache.get_many(keys) == {key: {"cached": True} for key in keys}
+
+        with override_options({"relay.project-config.sections.enabled": True}):
+            # Only recomputes some sections, the queued task takes care of it
+            schedule_invalidate_project_config(
+                project_id=default_project.id, trigger="releaseproject.post_save"
+            )
+            assert cache.get_many(keys) == {key: {"cached": True} for key in keys}
+
+            # The queued task must recompute the whole config
+            schedule_invalidate_project_config(
+                project_id=default_project.id, trigger="projectoption.post_save"
+            )
+            assert cache.get_many(keys) == {}
+        assert len(tasks) == 1
+
     def test_invalidate(
         self,
         monkeypatch,
@@ -0,0 +1,322 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from sentry.tsdb.base import (
+    ONE_DAY,
+    ONE_HOUR,
+    ONE_MINUTE,
+    DistinctCountsSeriesQuery,
+    RangeQuery,
+    TSDBModel,
+)
+from sentry.tsdb.inmemory import InMemoryTSDB
+
+ROLLUPS = (
+    # time in seconds, samples to keep
+    (10, 30),  # 5 minutes at 10 seconds
+    (ONE_MINUTE, 120),  # 2 hours at 1 minute
+    (ONE_HOUR, 24),  # 1 days at 1 hour
+    (ONE_DAY, 30),  # 30 days at 1 day
+)
+
+
+def timestamp(d: datetime, rollup: int = ONE_HOUR) -> int:
+    t = int(d.timestamp())
+    return t - (t % rollup)
+
+
+@pytest.fixture
+def db():
+    return InMemoryTSDB(rollups=ROLLUPS)
+
+
+@pytest.fixture
+def dts():
+    now = datetime.now(timezone.utc) - timedelta(hours=4)
+    return [now + timedelta(hours=i) for i in range(4)]
+
+
+def test_counters(db, dts):
+    db.incr(TSDBModel.project, 1, dts[0])
+    db.incr(TSDBModel.project, 1, dts[1], count=2)
+    db.incr(TSDBModel.project, 1, dts[1], environment_id=1)
+    db.incr_multi(
+        [(TSDBModel.project, 1), (TSDBModel.project, 2)], dts[3], count=3, environment_id=1
+    )
+
+    assert db.get_range(TSDBModel.project, [1, 2, 3], dts[0], dts[-1]) == {
+        1: [
+            (timestamp(dts[0]), 1),
+            (timestamp(dts[1]), 3),
+            (timestamp(dts[2]), 0),
+            (timestamp(dts[3]), 3),
+        ],
+        2: [(timestamp(dts[i]), 0) for i in range(3)] + [(timestamp(dts[3]), 3)],
+        3: [(timestamp(dts[i]), 0) for i in range(4)],
+    }
+    assert db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1]) == {1: 7, 2: 3}
+    assert db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1) == {
+        1: 4,
+        2: 3,
+    }
+    assert db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=0) == {
+        1: 0,
+        2: 0,
+    }
+
+    db.merge(TSDBModel.project, 1, [2], dts[0], environment_ids=[1])
+    assert db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1]) == {1: 10, 2: 0}
+    assert db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1) == {
+        1: 7,
+        2: 0,
+    }
+
+    db.delete([TSDBModel.project], [1], dts[0], dts[-1], environment_ids=[1])
+    assert db.get_sums(TSDBModel.project, [1], dts[0], dts[-1]) == {1: 0}
+    assert db.get_sums(TSDBModel.project, [1], dts[0], dts[-1], environment_id=1) == {1: 0}
+
+
+def test_counters_expire(db):
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    db.incr(TSDBModel.project, 1, now)
+    # 30 samples at 10 seconds, so this recycles the slot used above
+    db.incr(TSDBModel.project, 1, now + timedelta(seconds=300), count=2)
+
+    assert db.get_range(TSDBModel.project, [1], now, now, rollup=10) == {1: [(timestamp(now), 0)]}
+    assert db.get_range(TSDBModel.project, [1], now, now, rollup=ONE_HOUR) == {
+        1: [(timestamp(now), 3)]
+    }
+
+    # writes to intervals that have already been recycled are dropped
+    db.incr(TSDBModel.project, 1, now, count=5)
+    assert db.get_range(TSDBModel.project, [1], now, now, rollup=10) == {1: [(timestamp(now), 0)]}
+
+
+def test_counter_rows_are_pruned(db):
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    db.incr(TSDBModel.project, 1, now)
+    db.incr(TSDBModel.project, 2, now)
+    table = db._counters[(TSDBModel.project, 10, None)]
+    assert set(table.rows) == {1, 2}
+
+    # Keep writing to key 2 for a whole rotation of the 10 second ring
+    for i in range(1, 31):
+        db.incr(TSDBModel.project, 2, now + timedelta(seconds=10 * i))
+
+    assert set(table.rows) == {2}
+    assert all(len(column) == 1 for column in table.columns)
+    assert db.get_sums(TSDBModel.project, [1, 2], now, now + timedelta(seconds=300), rollup=10) == {
+        1: 0,
+        2: 30,
+    }
+    # Coarser rollups still have both keys
+    assert db.get_sums(TSDBModel.project, [1, 2], now, now, rollup=ONE_HOUR) == {1: 1, 2: 31}
+
+
+def test_expired_slots_are_dropped(db):
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    model = TSDBModel.users_affected_by_group
+    db.record(model, 1, ("foo",), now)
+    table = db._distinct_counters[(model, 10, None)]
+
+    # Skips over the slot used above, which expires all the same
+    db.record(model, 1, ("bar",), now + timedelta(seconds=305))
+    assert [len(column) for column in table.columns].count(1) == 1
+    db.record(model, 1, ("baz",), now)
+    assert [len(column) for column in table.columns].count(1) == 1
+
+
+def test_environment_validation(db, dts):
+    with pytest.raises(ValueError):
+        db.incr(TSDBModel.organization_total_received, 1, dts[0], environment_id=1)
+
+
+def test_distinct_counts(db, dts):
+    model = TSDBModel.users_affected_by_group
+
+    db.record(model, 1, ("foo", "bar"), dts[0])
+    db.record(model, 1, ("baz",), dts[1], environment_id=1)
+    db.record_multi(((model, 1, ("foo", "bar")), (model, 2, ("bar",))), dts[2])
+
+    assert db.get_distinct_counts_series(model, [1], dts[0], dts[-1], rollup=ONE_HOUR) == {
+        1: [
+            (timestamp(dts[0]), 2),
+            (timestamp(dts[1]), 1),
+            (timestamp(dts[2]), 2),
+            (timestamp(dts[3]), 0),
+        ]
+    }
+    assert db.get_distinct_counts_totals(model, [1, 2], dts[0], dts[-1], rollup=ONE_HOUR) == {
+        1: 3,
+        2: 1,
+    }
+    assert db.get_distinct_counts_totals(
+        model, [1, 2], dts[0], dts[-1], rollup=ONE_HOUR, environment_id=1
+    ) == {1: 1, 2: 0}
+    assert db.get_distinct_counts_union(model, [], dts[0], dts[-1], rollup=ONE_HOUR) == 0
+    assert db.get_distinct_counts_union(model, [1, 2], dts[0], dts[-1], rollup=ONE_HOUR) == 3
+
+    db.record(model, 2, ("qux",), dts[3])
+    db.merge_distinct_counts(model, 1, [2], dts[0])
+    assert db.get_distinct_counts_totals(model, [1, 2], dts[0], dts[-1], rollup=ONE_HOUR) == {
+        1: 4,
+        2: 0,
+    }
+
+    db.delete_distinct_counts([model], [1], dts[0], dts[-1], environment_ids=[1])
+    assert db.get_distinct_counts_totals(model, [1], dts[0], dts[-1]) == {1: 0}
+
+
+def test_distinct_counts_estimate(db, dts):
+    model = TSDBModel.users_affected_by_group
+    db.record(model, 1, (f"user:{i}" for i in range(50000)), dts[0])
+
+    (total,) = db.get_distinct_counts_totals(model, [1], dts[0], dts[0]).values()
+    # the standard error for 4096 registers is ~1.6%
+    assert abs(total - 50000) / 50000 < 0.05
+
+
+def test_distinct_counts_sparse(db, dts):
+    model = TSDBModel.users_affected_by_group
+    db.record(model, 1, (f"user:{i}" for i in range(100)), dts[0], environment_id=1)
+    db.record(model, 2, (f"user:{i}" for i in range(5000)), dts[0])
+
+    column = db._distinct_counters[(model, ONE_HOUR, 1)].columns[timestamp(dts[0]) // ONE_HOUR % 24]
+    assert column[1].dense is None
+
+    # Sparse and dense registers estimate the same way and can be merged
+    (small,) = db.get_distinct_counts_totals(model, [1], dts[0], dts[0]).values()
+    assert small == 100
+    assert abs(db.get_distinct_counts_union(model, [1, 2], dts[0], dts[0]) - 5000) < 250
+    db.merge_distinct_counts(model, 2, [1], dts[0])
+    assert db.get_distinct_counts_totals(model, [2], dts[0], dts[0]) == {
+        2: db.get_distinct_counts_union(model, [2], dts[0], dts[0])
+    }
+
+
+def test_frequency_tables(db):
+    now = datetime.now(timezone.utc)
+    model = TSDBModel.frequent_issues_by_project
+    rollup = ONE_HOUR
+
+    db.record_frequency_multi(
+        ((model, {"organization:1": {"project:1": 1, "project:2": 2, "project:3": 3}}),), now
+    )
+    db.record_frequency_multi(
+        (
+            (
+                model,
+                {"organization:1": {"project:1": 1, "project:4": 4}, "organization:2": {"p": 1.5}},
+            ),
+        ),
+        now - timedelta(hours=1),
+    )
+
+    assert db.get_most_frequent(
+        model, ("organization:1", "organization:2"), now - timedelta(hours=1), now, rollup=rollup
+    ) == {
+        "organization:1": [
+            ("project:4", 4.0),
+            ("project:3", 3.0),
+            ("project:1", 2.0),
+            ("project:2", 2.0),
+        ],
+        "organization:2": [("p", 1.5)],
+    }
+    assert db.get_most_frequent(
+        model, ("organization:1",), now - timedelta(hours=1), now, limit=1, rollup=rollup
+    ) == {"organization:1": [("project:4", 4.0)]}
+
+    assert db.get_most_frequent_series(
+        model, ("organization:2",), now - timedelta(hours=1), now, rollup=rollup
+    ) == {"organization:2": [(timestamp(now) - rollup, {"p": 1.5}), (timestamp(now), {})]}
+
+    assert db.get_frequency_series(
+        model,
+        {"organization:1": ("project:1", "project:4")},
+        now - timedelta(hours=1),
+        now,
+        rollup=rollup,
+    ) == {
+        "organization:1": [
+            (timestamp(now) - rollup, {"project:1": 1.0, "project:4": 4.0}),
+            (timestamp(now), {"project:1": 1.0, "project:4": 0.0}),
+        ]
+    }
+
+    db.merge_frequencies(model, "organization:1", ["organization:2"], now)
+    assert db.get_frequency_totals(
+        model,
+        {"organization:1": ("project:1", "p"), "organization:2": ("p",)},
+        now - timedelta(hours=1),
+        now,
+        rollup=rollup,
+    ) == {"organization:1": {"project:1": 2.0, "p": 1.5}, "organization:2": {"p": 0.0}}
+
+    db.delete_frequencies([model], ["organization:1"], now - timedelta(hours=1), now)
+    assert db.get_most_frequent(model, ("organization:1",), now) == {"organization:1": []}
+
+
+def test_flush(db, dts):
+    db.incr(TSDBModel.project, 1, dts[0])
+    db.flush()
+    assert db.get_sums(TSDBModel.project, [1], dts[0], dts[-1]) == {1: 0}
+
+
+def test_snapshot(tmp_path, dts):
+    path = str(tmp_path / "tsdb.snapshot")
+    model = TSDBModel.users_affected_by_group
+
+    db = InMemoryTSDB(rollups=ROLLUPS, snapshot_path=path)
+    db.incr(TSDBModel.project, 1, dts[0], count=3)
+    db.record(model, 1, ("foo", "bar"), dts[0])
+    db.close()
+
+    restored = InMemoryTSDB(rollups=ROLLUPS, snapshot_path=path)
+    assert restored.get_sums(TSDBModel.project, [1], dts[0], dts[-1]) == {1: 3}
+    assert restored.get_distinct_counts_totals(model, [1], dts[0], dts[-1]) == {1: 2}
+    restored.close()
+
+    # ring buffers can't be reused with different rollups
+    restored = InMemoryTSDB(rollups=ROLLUPS[:2], snapshot_path=path)
+    assert restored.get_sums(TSDBModel.project, [1], dts[0], dts[-1], rollup=10) == {1: 0}
+    restored.close()
+
+
+def test_snapshot_single_owner(tmp_path, dts):
+    path = str(tmp_path / "tsdb.snapshot")
+
+    owner = InMemoryTSDB(rollups=ROLLUPS, snapshot_path=path)
+    owner.incr(TSDBModel.project, 1, dts[0], count=3)
+    owner.snapshot()
+
+    # Only the owner of the path restores and writes snapshots
+    other = InMemoryTSDB(rollups=ROLLUPS, snapshot_path=path)
+    assert not other.owns_snapshot()
+    assert other.get_sums(TSDBModel.project, [1], dts[0], dts[-1]) == {1: 0}
+    with pytest.raises(ValueError):
+        other.snapshot()
+
+    owner.close()
+    new_owner = InMemoryTSDB(rollups=ROLLUPS, snapshot_path=path)
+    assert new_owner.owns_snapshot()
+    assert new_owner.get_sums(TSDBModel.project, [1], dts[0], dts[-1]) == {1: 3}
+    new_owner.close()
+
+
+def test_execute_batch(db, dts):
+    db.incr(TSDBModel.project, 1, dts[0], count=3)
+    db.record(TSDBModel.users_affected_by_group, 1, ("foo",), dts[0])
+
+    batch = db.execute_batch(
+        [
+            RangeQuery(TSDBModel.project, [1], dts[0], dts[-1]),
+            DistinctCountsSeriesQuery(TSDBModel.users_affected_by_group, [1], dts[0], dts[-1]),
+        ]
+    )
+    assert batch.results == [
+        db.get_range(TSDBModel.project, [1], dts[0], dts[-1]),
+        db.get_distinct_counts_series(TSDBModel.users_affected_by_group, [1], dts[0], dts[-1]),
+    ]
+    assert batch.round_trips == batch.unbatched_round_trips == 2
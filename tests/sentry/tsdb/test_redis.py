@@ -5,7 +5,15 @@ import pytest
 
 from sentry.testutils.cases import TestCase
 from sentry.testutils.helpers.options import override_options
-from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, TSDBModel
+from sentry.tsdb.base import (
+    ONE_DAY,
+    ONE_HOUR,
+    ONE_MINUTE,
+    DistinctCountsSeriesQuery,
+    FrequencySeriesQuery,
+    RangeQuery,
+    TSDBModel,
+)
 from sentry.tsdb.redis import CountMinScript, RedisTSDB, SuppressionWrapper
 from sentry.utils.dates import to_datetime
 
@@ -590,6 +598,77 @@ class RedisTSDBTest(TestCase):
             model, ("organization:1", "organization:2"), now, environment_id=1
         ) == {"organization:1": [], "organization:2": []}
 
+    def test_execute_batch(self):
+        now = datetime.now(timezone.utc)
+        start = now - timedelta(hours=2)
+        distinct_model = TSDBModel.users_affected_by_group
+        frequency_model = TSDBModel.frequent_releases_by_group
+
+        for key in range(10):
+            self.db.incr(TSDBModel.group, key, now - timedelta(hours=1), count=key)
+            self.db.incr(TSDBModel.group, key, now, environment_id=1)
+            self.db.record(distinct_model, key, [f"user:{i}" for i in range(key)], now)
+        self.db.record_frequency_multi(
+            [(frequency_model, {"1": {"a": 1, "b": 2}, "2": {"c": 3}})], now - timedelta(hours=1)
+        )
+
+        keys = list(range(10))
+        queries = [
+            RangeQuery(TSDBModel.group, keys, start, now, rollup=ONE_HOUR),
+            RangeQuery(TSDBModel.group, keys, start, now, rollup=ONE_HOUR, environment_ids=[1]),
+            DistinctCountsSeriesQuery(distinct_model, keys, start, now, rollup=ONE_HOUR),
+            FrequencySeriesQuery(
+                frequency_model, {"1": ["a", "b"], "2": ["c"]}, start, now, rollup=ONE_HOUR
+            ),
+        ]
+
+        for _ in range(2):
+            batch = self.db.execute_batch(queries)
+            assert batch.results == [
+                self.db.get_range(TSDBModel.group, keys, start, now, rollup=ONE_HOUR),
+                self.db.get_range(
+                    TSDBModel.group, keys, start, now, rollup=ONE_HOUR, environment_ids=[1]
+                ),
+                self.db.get_distinct_counts_series(
+                    distinct_model, keys, start, now, rollup=ONE_HOUR
+                ),
+                self.db.get_frequency_series(
+                    frequency_model, {"1": ["a", "b"], "2": ["c"]}, start, now, rollup=ONE_HOUR
+                ),
+            ]
+            # one pipeline per host, no matter how many queries
+            assert batch.round_trips <= len(self.db.cluster.hosts)
+            assert batch.unbatched_round_trips > batch.round_trips
+
+    def test_execute_batch_environments(self):
+        now = datetime.now(timezone.utc)
+        model = TSDBModel.users_affected_by_group
+        self.db.record(model, 1, ["foo", "bar"], now, environment_id=1)
+
+        query = DistinctCountsSeriesQuery(model, [1], now, now, environment_ids=[1])
+        assert self.db.execute_batch([query]).results == [
+            self.db.get_distinct_counts_series(model, [1], now, now, environment_id=1)
+        ]
+
+        # Series are stored per environment, they can't be combined
+        query = DistinctCountsSeriesQuery(model, [1], now, now, environment_ids=[1, 2])
+        with pytest.raises(NotImplementedError):
+            self.db.execute_batch([query])
+
+    def test_execute_batch_reloads_flushed_scripts(self):
+        now = datetime.now(timezone.utc)
+        model = TSDBModel.frequent_releases_by_group
+        self.db.record_frequency_multi([(model, {"1": {"a": 1}})], now)
+        query = FrequencySeriesQuery(model, {"1": ["a"]}, now, now, rollup=ONE_HOUR)
+
+        expected = [[(self.db.normalize_to_epoch(now, ONE_HOUR), {"a": 1.0})]]
+        assert self.db.execute_batch([query]).results == expected
+
+        with self.db.cluster.all() as client:
+            client.script_flush()
+
+        assert self.db.execute_batch([query]).results == expected
+
     def test_frequency_table_import_export_no_estimators(self):
         client = self.db.cluster.get_local_client_for_key("key")
 
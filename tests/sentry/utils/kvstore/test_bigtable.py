@@ -66,6 +66,17 @@ def test_compression_raw_values(
         assert store.flags_column not in columns
 
 
+def test_compression_skipped(store_factory) -> None:
+    store = store_factory("zstd")
+
+    store.set("key", b'{"foo":"bar"}', compress=False)
+    assert store.get("key") == b'{"foo":"bar"}'
+
+    columns = store._get_table().read_row("key").cells[store.column_family]
+    assert columns[store.data_column][0].value == b'{"foo":"bar"}'
+    assert store.flags_column not in columns
+
+
 def test_compression_compatibility(request, store_factory) -> None:
     stores = {
         compression: store_factory(compression)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from sentry.testutils.performance_issues.event_generators import get_event
+from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.utils.performance_issues.performance_detection import (
+    DETECTOR_CLASSES,
+    get_detection_settings,
+    run_detector_on_data,
+    run_detectors_on_data,
+)
+
+SOURCE_EVENTS = (
+    "n-plus-one-in-django-index-view",
+    "n-plus-one-in-django-new-view",
+    "query-waterfall-in-django-random-view",
+    "slow-db-spans",
+    "file-io-on-main-thread",
+    "db-on-main-thread",
+    "m-n-plus-one-db/m-n-plus-one-graphql",
+    "n-plus-one-api-calls/n-plus-one-api-calls-in-issue-stream",
+    "uncompressed-assets/uncompressed-script-asset",
+)
+
+
+def benchmark_available() -> bool:
+    try:
+        __import__("pytest_benchmark")
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+def make_large_transaction(copies: int) -> dict[str, Any]:
+    """
+    Builds a transaction with thousands of spans by repeating the spans of the fixture events,
+    shifted in time so that the copies don't overlap.
+    """
+    event = get_event(SOURCE_EVENTS[0])
+    event["spans"] = []
+
+    for i in range(copies):
+        source = get_event(SOURCE_EVENTS[i % len(SOURCE_EVENTS)])
+        offset = i * 60.0
+        for span in source["spans"]:
+            for key in ("span_id", "parent_span_id"):
+                if span.get(key):
+                    span[key] = f"{i:04x}{span[key][4:]}"
+            for key in ("start_timestamp", "timestamp"):
+                if key in span:
+                    span[key] += offset
+            event["spans"].append(span)
+
+    return event
+
+
+def detect(event: dict[str, Any], fused: bool) -> list[Any]:
+    settings = get_detection_settings()
+    detectors = [detector_class(settings, event) for detector_class in DETECTOR_CLASSES]
+    if fused:
+        run_detectors_on_data(detectors, event)
+    else:
+        for detector in detectors:
+            run_detector_on_data(detector, event)
+    return [list(detector.stored_problems.values()) for detector in detectors]
+
+
+@django_db_all
+@pytest.mark.parametrize("source", SOURCE_EVENTS)
+def test_fused_detection_matches(source):
+    event = get_event(source)
+    assert detect(event, fused=True) == detect(event, fused=False)
+
+
+@django_db_all
+def test_fused_detection_matches_large_transaction():
+    event = make_large_transaction(copies=50)
+    assert len(event["spans"]) > 1000
+
+    problems = detect(event, fused=False)
+    assert any(problems)
+    assert detect(event, fused=True) == problems
+
+
+@django_db_all
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("fused", [False, True], ids=["per_detector", "fused"])
+def test_benchmark_detection(fused, benchmark):
+    event = make_large_transaction(copies=200)
+    benchmark(detect, event, fused)
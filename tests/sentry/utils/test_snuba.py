@@ -1,23 +1,32 @@
+import time
 import unittest
 from datetime import datetime, timedelta
 from unittest import mock
 
 import pytest
+from django.core.cache import cache
 from django.utils import timezone
+from snuba_sdk import Column, Condition, Entity, Op, Query, Request
 from urllib3 import HTTPConnectionPool
 from urllib3.exceptions import HTTPError, ReadTimeoutError
 
+from sentry.locks import locks
 from sentry.models.grouprelease import GroupRelease
 from sentry.models.project import Project
 from sentry.models.release import Release
 from sentry.snuba.dataset import Dataset
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
+from sentry.utils import json
 from sentry.utils.snuba import (
     ROUND_UP,
     RetrySkipTimeout,
     SnubaQueryParams,
+    SnubaRequest,
     UnqualifiedQueryError,
+    _bulk_snuba_query_coalesced,
     _prepare_query_params,
+    get_cache_key,
     get_json_type,
     get_query_params_to_update_for_projects,
     get_snuba_column_name,
@@ -412,6 +421,130 @@ class QuantizeTimeTest(unittest.TestCase):
         assert i != j
 
 
+COALESCED_REFERRER = "api.dashboards.tablewidget"
+
+
+@override_options(
+    {
+        "snuba.coalescing.referrers": [COALESCED_REFERRER],
+        "snuba.coalescing.result-ttl-seconds": 5,
+        "snuba.coalescing.timeout-seconds": 10,
+    }
+)
+class CoalescedSnubaQueryTest(TestCase):
+    def setUp(self):
+        self.query_count = 0
+        patcher = mock.patch(
+            "sentry.utils.snuba._bulk_snuba_query", side_effect=self.fake_bulk_snuba_query
+        )
+        self.bulk_snuba_query = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_bulk_snuba_query(self, snuba_requests):
+        results = []
+        for _ in snuba_requests:
+            self.query_count += 1
+            results.append({"data": [{"count": self.query_count}]})
+        return results
+
+    def make_request(self, project_id=1, referrer=COALESCED_REFERRER):
+        now = datetime(2024, 1, 1)
+        query = Query(
+            match=Entity("events"),
+            select=[Column("event_id")],
+            where=[
+                Condition(Column("project_id"), Op.EQ, project_id),
+                Condition(Column("timestamp"), Op.GTE, now - timedelta(days=1)),
+                Condition(Column("timestamp"), Op.LT, now),
+            ],
+        )
+        request = Request(
+            dataset="events",
+            app_id="default",
+            query=query,
+            tenant_ids={"referrer": referrer, "organization_id": 1},
+        )
+        return SnubaRequest(
+            request=request, referrer=referrer, forward=lambda x: x, reverse=lambda x: x
+        )
+
+    def coalescing_key(self, snuba_request):
+        return f"{get_cache_key(snuba_request.request)}:coalesced"
+
+    def hold_lock(self, snuba_request):
+        lock = locks.get(
+            f"{self.coalescing_key(snuba_request)}:lock",
+            duration=10,
+            name="snuba_query_coalescing",
+        )
+        lock.acquire()
+        self.addCleanup(lock.release)
+        return lock
+
+    def test_other_referrers(self):
+        snuba_request = self.make_request(referrer="api.dashboards.bignumberwidget")
+        assert _bulk_snuba_query_coalesced([snuba_request]) == [{"data": [{"count": 1}]}]
+        assert _bulk_snuba_query_coalesced([snuba_request]) == [{"data": [{"count": 2}]}]
+
+    def test_result_shared(self):
+        requests = [self.make_request(), self.make_request(project_id=2)]
+        assert _bulk_snuba_query_coalesced(requests) == [
+            {"data": [{"count": 1}]},
+            {"data": [{"count": 2}]},
+        ]
+        assert _bulk_snuba_query_coalesced(requests) == [
+            {"data": [{"count": 1}]},
+            {"data": [{"count": 2}]},
+        ]
+        assert self.bulk_snuba_query.call_count == 1
+
+        with mock.patch("time.time", return_value=time.time() + 5):
+            assert _bulk_snuba_query_coalesced(requests[:1]) == [{"data": [{"count": 3}]}]
+
+    def test_wait_for_running_query(self):
+        snuba_request = self.make_request()
+        lock = self.hold_lock(snuba_request)
+
+        def finish_query(_):
+            cache.set(
+                self.coalescing_key(snuba_request),
+                json.dumps({"timestamp": time.time(), "result": {"data": []}}),
+                5,
+            )
+            lock.release()
+
+        with mock.patch("sentry.utils.snuba.time.sleep", side_effect=finish_query):
+            assert _bulk_snuba_query_coalesced([snuba_request]) == [{"data": []}]
+        assert not self.bulk_snuba_query.called
+
+    def test_running_query_failed(self):
+        snuba_request = self.make_request()
+        lock = self.hold_lock(snuba_request)
+
+        with mock.patch("sentry.utils.snuba.time.sleep", side_effect=lambda _: lock.release()):
+            assert _bulk_snuba_query_coalesced([snuba_request]) == [{"data": [{"count": 1}]}]
+
+    @override_options({"snuba.coalescing.timeout-seconds": 1})
+    def test_wait_timeout(self):
+        snuba_request = self.make_request()
+        self.hold_lock(snuba_request)
+        assert _bulk_snuba_query_coalesced([snuba_request]) == [{"data": [{"count": 1}]}]
+
+    @override_options({"snuba.coalescing.stale-while-revalidate": {COALESCED_REFERRER: 60}})
+    def test_stale_while_revalidate(self):
+        snuba_request = self.make_request()
+        assert _bulk_snuba_query_coalesced([snuba_request]) == [{"data": [{"count": 1}]}]
+
+        with mock.patch("time.time", return_value=time.time() + 30):
+            lock = self.hold_lock(snuba_request)
+            assert _bulk_snuba_query_coalesced([snuba_request]) == [{"data": [{"count": 1}]}]
+            lock.release()
+
+            # The caller that takes the lock refreshes the result
+            assert _bulk_snuba_query_coalesced([snuba_request]) == [{"data": [{"count": 2}]}]
+            assert _bulk_snuba_query_coalesced([snuba_request]) == [{"data": [{"count": 2}]}]
+
+
 class FakeConnectionPool(HTTPConnectionPool):
     def __init__(self, connection, **kwargs):
         self.connection = connection